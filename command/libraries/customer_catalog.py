@@ -0,0 +1,452 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+#
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that provides an indexed catalog of customers.  Each boolean
+customer capability is held as a bitset with one bit per customer and polling
+intervals are indexed by value, so compound queries reduce to a few integer
+operations regardless of the number of customers.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import re
+import time
+
+import libraries.customers as customers
+
+###############################################################################
+# Globals:
+#
+
+CAPABILITIES = {
+    'active' : 'customer_active',
+    'multi_region' : 'multi_region_checking',
+    'wordpress' : 'supports_wordpress',
+    'rest_api' : 'supports_rest_api',
+    'content_checking' : 'supports_content_checking',
+    'keyword_checking' : 'supports_keyword_checking',
+    'post_method' : 'supports_post_method',
+    'latency_tracking' : 'supports_latency_tracking',
+    'ssl_checking' : 'supports_ssl_expiration_checking',
+    'ping_checking' : 'supports_ping_based_polling',
+    'blacklist_checking' : 'supports_blacklist_checking',
+    'domain_checking' : 'supports_domain_expiration_checking',
+    'maintenance_mode' : 'supports_maintenance_mode',
+    'rollups' : 'supports_rollups',
+    'paused' : 'paused'
+}
+"""
+Dictionary mapping capability names, as used by the customer update command,
+to the indexed Customer properties.
+
+"""
+
+POLLING_INTERVAL_TERMS = ( 'polling_interval', 'polling', 'interval' )
+"""
+Names that can be used to refer to the polling interval in a query.
+
+"""
+
+COMPARISON_PATTERN = re.compile(
+    r'^([a-z_]+)\s*(<=|>=|==|!=|=|<|>)\s*([0-9]+)$'
+)
+"""
+Regular expression used to parse polling interval comparisons.
+
+"""
+
+NOT_KEYWORD = "not"
+"""
+Query keyword used to negate the following term.
+
+"""
+
+OR_KEYWORD = "or"
+"""
+Query keyword used to separate alternative groups of terms.
+
+"""
+
+DEFAULT_MAX_AGE = 60
+"""
+The default maximum age, in seconds, of a cached catalog.  The value matches
+the default time to live of cached customer lists.
+
+"""
+
+__catalogs = dict()
+"""
+Dictionary of catalogs built by this process, indexed by server.
+
+"""
+
+###############################################################################
+# Class CustomerCatalog:
+#
+
+class CustomerCatalog(object):
+    """
+    Class that holds an indexed catalog of customers.  Query results are
+    bitsets, held as integers, where bit N is set if customer N of the catalog
+    matches.
+
+    """
+
+    def __init__(self, all_customers):
+        """
+        Method that initializes the CustomerCatalog class.
+
+        :param all_customers:
+            An iterable of Customer instances to be indexed.
+
+        :type all_customers: iterable
+
+        """
+
+        super().__init__()
+
+        self.__customers = [
+            customer for customer in all_customers if customer is not None
+        ]
+
+        number_customers = len(self.__customers)
+        self.__all = (1 << number_customers) - 1
+
+        self.__capabilities = dict()
+        for attribute in CAPABILITIES.values():
+            self.__capabilities[attribute] = self.__bitset(
+                [ getattr(c, attribute) for c in self.__customers ]
+            )
+
+        polling_intervals = [ c.polling_interval for c in self.__customers ]
+        self.__polling_intervals = dict()
+        for value in set(polling_intervals):
+            self.__polling_intervals[value] = self.__bitset(
+                [ interval == value for interval in polling_intervals ]
+            )
+
+
+    def __len__(self):
+        """
+        Method that returns the number of customers in the catalog.
+
+        :rtype: int
+
+        """
+
+        return len(self.__customers)
+
+
+    @property
+    def all(self):
+        """
+        Read-only property holding the bitset of every customer.
+
+        :type: int
+
+        """
+
+        return self.__all
+
+
+    def capability(self, name):
+        """
+        Method that obtains the bitset of customers with a capability.
+
+        :param name:
+            The capability name, as used by the customer update command, or
+            the Customer property name.
+
+        :return:
+            Returns the bitset of matching customers.
+
+        :raises ValueError:
+            Raised if the capability is not known.
+
+        :type name: str
+        :rtype:     int
+
+        """
+
+        attribute = CAPABILITIES.get(name, name)
+        if attribute not in self.__capabilities:
+            raise ValueError("Unknown capability \"%s\""%name)
+
+        return self.__capabilities[attribute]
+
+
+    def polling_interval(self, comparison, value):
+        """
+        Method that obtains the bitset of customers whose polling interval
+        compares to a value.
+
+        :param comparison:
+            The comparison operator, one of "<", "<=", "=", "==", "!=", ">="
+            or ">".
+
+        :param value:
+            The value to compare against, in seconds.
+
+        :return:
+            Returns the bitset of matching customers.
+
+        :raises ValueError:
+            Raised if the comparison is not known.
+
+        :type comparison: str
+        :type value:      int
+        :rtype:           int
+
+        """
+
+        if comparison == '<':
+            test = lambda x: x is not None and x < value
+        elif comparison == '<=':
+            test = lambda x: x is not None and x <= value
+        elif comparison == '=' or comparison == '==':
+            test = lambda x: x == value
+        elif comparison == '!=':
+            test = lambda x: x != value
+        elif comparison == '>=':
+            test = lambda x: x is not None and x >= value
+        elif comparison == '>':
+            test = lambda x: x is not None and x > value
+        else:
+            raise ValueError("Unknown comparison \"%s\""%comparison)
+
+        result = 0
+        for interval, bitset in self.__polling_intervals.items():
+            if test(interval):
+                result |= bitset
+
+        return result
+
+
+    def query(self, terms):
+        """
+        Method that evaluates a query.  A query is a sequence of terms that
+        must all match.  Terms are capability names or polling interval
+        comparisons such as "polling_interval<=120".  A term preceded by
+        "not" must not match.  Groups of terms separated by "or" are
+        alternatives.
+
+        :param terms:
+            The query terms.
+
+        :return:
+            Returns the bitset of matching customers.
+
+        :raises ValueError:
+            Raised if the query is malformed.
+
+        :type terms: list of str
+        :rtype:      int
+
+        """
+
+        result = 0
+        group = self.__all
+        negate = False
+        group_empty = True
+
+        for raw_term in terms:
+            term = raw_term.strip().lower().replace('-', '_')
+            if term == OR_KEYWORD:
+                if negate or group_empty:
+                    raise ValueError("Expected a term before \"or\"")
+
+                result |= group
+                group = self.__all
+                group_empty = True
+            elif term == NOT_KEYWORD:
+                negate = not negate
+            else:
+                match = COMPARISON_PATTERN.match(term)
+                if match is not None:
+                    if match.group(1) not in POLLING_INTERVAL_TERMS:
+                        raise ValueError(
+                            "Only the polling interval can be compared"
+                        )
+
+                    bitset = self.polling_interval(
+                        match.group(2),
+                        int(match.group(3))
+                    )
+                else:
+                    bitset = self.capability(term)
+
+                if negate:
+                    bitset = self.__all & ~bitset
+                    negate = False
+
+                group &= bitset
+                group_empty = False
+
+        if negate or (group_empty and terms):
+            raise ValueError("Expected a term at the end of the query")
+
+        return result | group
+
+
+    def customers(self, bitset):
+        """
+        Method that obtains the customers in a bitset.
+
+        :param bitset:
+            The bitset of customers.
+
+        :return:
+            Returns the matching Customer instances in catalog order.
+
+        :type bitset: int
+        :rtype:       list of Customer instances
+
+        """
+
+        bits = bin(bitset)[:1:-1]
+        return [
+            self.__customers[index]
+            for index, bit in enumerate(bits) if bit == '1'
+        ]
+
+
+    def count(self, bitset):
+        """
+        Method that counts the customers in a bitset.
+
+        :param bitset:
+            The bitset of customers.
+
+        :return:
+            Returns the number of customers in the bitset.
+
+        :type bitset: int
+        :rtype:       int
+
+        """
+
+        return bin(bitset).count('1')
+
+
+    @staticmethod
+    def __bitset(values):
+        """
+        Method used internally to build a bitset from a list of values.
+
+        :param values:
+            The values, one per customer.  Bits are set for true values.
+
+        :return:
+            Returns the bitset.
+
+        :type values: list
+        :rtype:       int
+
+        """
+
+        if values:
+            result = int(
+                "".join([ '1' if v else '0' for v in reversed(values) ]),
+                2
+            )
+        else:
+            result = 0
+
+        return result
+
+###############################################################################
+# Functions:
+#
+
+def catalog(rest_api, secret, max_age = DEFAULT_MAX_AGE):
+    """
+    Function that obtains a catalog of every customer.  Catalogs are reused
+    by later calls from the same process until they are older than the
+    maximum age or this process changes customer data.
+
+    :param rest_api:
+        The outbound REST API instance to be used.
+
+    :param secret:
+        The secret to be used.
+
+    :param max_age:
+        The maximum age, in seconds, of a reused catalog.
+
+    :return:
+        Returns the customer catalog or None on error.
+
+    :type rest_api: outbound_rest_api_v1.Server
+    :type secret:   bytes
+    :type max_age:  float
+    :rtype:         CustomerCatalog or None
+
+    """
+
+    now = time.monotonic()
+    generation = customers.generation()
+
+    entry = __catalogs.get(rest_api)
+    if entry is not None                and \
+       entry[0] == generation           and \
+       now - entry[1] <= max_age            :
+        result = entry[2]
+    else:
+        customers_iterator = customers.Customers(
+            rest_api,
+            secret
+        ).iter_all()
+
+        if customers_iterator is not None:
+            try:
+                result = CustomerCatalog(customers_iterator)
+            except ValueError:
+                result = None
+        else:
+            result = None
+
+        if result is not None:
+            __catalogs[rest_api] = ( generation, now, result )
+        else:
+            __catalogs.pop(rest_api, None)
+
+    return result
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
@@ -45,6 +45,7 @@ import datetime
 import libraries.enumeration as enumeration
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
+import libraries.metrics as metrics
 
 ###############################################################################
 # Class Mapping:
@@ -144,6 +145,8 @@ class CustomerMapping(object):
             message = { 'customer_id' : customer_id }
         )
 
+        build_start_time = metrics.timer()
+
         if response is not None and 'status' in response:
             status = response['status']
             if status == 'OK' and 'mapping' in response:
@@ -171,6 +174,12 @@ class CustomerMapping(object):
         else:
             result = None
 
+        metrics.elapsed(
+            "mapping/get",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
         return result
 
 
@@ -293,36 +302,94 @@ class CustomerMapping(object):
 
         """
 
+        mappings = self.iter_list(server_id)
+        if mappings is not None:
+            try:
+                result = dict(mappings)
+            except ValueError:
+                result = None
+        else:
+            result = None
+
+        return result
+
+
+    def iter_list(self, server_id = None):
+        """
+        Method you can use to iterate over customer/server mappings as they
+        are received.  Unlike list, mappings are not accumulated in memory.
+
+        :param server_id:
+            If not None, then the returned mappings will only be those that
+            reference this server.
+
+        :return:
+            Returns an iterator over tuples holding the customer ID and the
+            mapping.  None is returned if the request failed.  Iteration
+            raises a ValueError if the response is malformed or reports an
+            error.
+
+        :type server_id: int or None
+        :rtype:          iterator or None
+
+        """
+
         if server_id is not None:
             message = { 'server_id' : server_id }
         else:
             message = {}
 
-        response = self.__rest_api.post_message(
+        stream = self.__rest_api.post_message_stream(
             slug = "mapping/list",
             secret = self.__secret,
-            message = message
+            message = message,
+            containers = ( 'mappings', )
         )
 
-        if response is not None and 'status' in response:
-            status = response['status']
-            if status == 'OK' and 'mappings' in response:
-                result = dict();
-                for customer_id, data in response['mappings'].items():
-                    primary_server_id = data['primary_server']
-                    servers = set(data['servers'])
-
-                    result[int(customer_id)] = Mapping(
-                        primary_server_id,
-                        servers
-                    )
-            else:
-                result = None
+        if stream is not None:
+            result = self.__iter_stream(stream)
         else:
             result = None
 
         return result
 
+
+    def __iter_stream(self, stream):
+        """
+        Generator used internally to parse a streamed mapping list.
+
+        :param stream:
+            The streamed response.
+
+        :return:
+            Yields tuples holding the customer ID and the mapping.
+
+        :type stream: json_stream.JsonStream
+
+        """
+
+        build_stopwatch = metrics.Stopwatch("mapping/list", metrics.BUILD_TIME)
+        try:
+            for container, customer_id, data in stream:
+                with build_stopwatch:
+                    try:
+                        primary_server_id = data['primary_server']
+                        servers = set(data['servers'])
+                        customer_id = int(customer_id)
+                    except Exception as e:
+                        raise ValueError(
+                            "Invalid mapping entry: %s"%str(e)
+                        )
+
+                    mapping = Mapping(primary_server_id, servers)
+
+                yield ( customer_id, mapping )
+
+            if stream.status != 'OK' or not stream.found('mappings'):
+                raise ValueError("Invalid mapping list response")
+        finally:
+            build_stopwatch.record()
+
 ###############################################################################
 # Main:
 #
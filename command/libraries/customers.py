@@ -37,12 +37,186 @@ Class providing a API you can use to process customer information.
 import sys
 import os
 import json
-import base64
 import time
 import datetime
 
+import libraries.encoded_bytes as encoded_bytes
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
+import libraries.metrics as metrics
+
+###############################################################################
+# Globals:
+#
+
+DEFAULT_BULK_THRESHOLD = 16
+"""
+The number of customers above which a single customer list request is used
+in place of individual requests, until the cost of both request types has
+been measured.  One-shot command line runs never measure both and always use
+this threshold.
+
+"""
+
+COST_SMOOTHING = 0.25
+"""
+The weight given to each new cost measurement.
+
+"""
+
+__planner = None
+"""
+The fetch planner shared by this process.
+
+"""
+
+__generation = 0
+"""
+Counter incremented whenever this process changes customer data.
+
+"""
+
+###############################################################################
+# Class FetchPlanner:
+#
+
+class FetchPlanner(object):
+    """
+    Class that chooses between fetching customers with individual
+    "customer/get" requests or with a single "customer/list" request.  The
+    choice is based on the measured cost of each request type.  Only requests
+    that reach the network are measured; responses served by the response
+    cache say nothing about the cost of a request.
+
+    Costs are only remembered for the life of the process so the planner
+    only adapts in shell and daemon sessions.  One-shot command line runs
+    always choose using the threshold.
+
+    """
+
+    def __init__(self, threshold = DEFAULT_BULK_THRESHOLD):
+        """
+        Method that initializes the FetchPlanner class.
+
+        :param threshold:
+            The number of customers above which the list request is used
+            until both request types have been measured.
+
+        :type threshold: int
+
+        """
+
+        super().__init__()
+
+        self.__threshold = threshold
+        self.__get_cost = None
+        self.__list_cost = None
+
+
+    @property
+    def get_cost(self):
+        """
+        Read-only property holding the measured cost, in seconds, of a single
+        "customer/get" request.
+
+        :type: float or None
+
+        """
+
+        return self.__get_cost
+
+
+    @property
+    def list_cost(self):
+        """
+        Read-only property holding the measured cost, in seconds, of a
+        "customer/list" request.
+
+        :type: float or None
+
+        """
+
+        return self.__list_cost
+
+
+    def use_list(self, number_customers):
+        """
+        Method that determines if a list request should be used.
+
+        :param number_customers:
+            The number of customers to be fetched.
+
+        :return:
+            Returns True if a single list request is expected to be cheaper
+            than individual requests.
+
+        :type number_customers: int
+        :rtype:                 bool
+
+        """
+
+        if self.__get_cost is not None and self.__list_cost is not None:
+            result = number_customers * self.__get_cost > self.__list_cost
+        else:
+            result = number_customers > self.__threshold
+
+        return result
+
+
+    def record_get(self, seconds):
+        """
+        Method that records the cost of a single "customer/get" request.
+
+        :param seconds:
+            The time required to complete the request.
+
+        :type seconds: float
+
+        """
+
+        self.__get_cost = self.__smooth(self.__get_cost, seconds)
+
+
+    def record_list(self, seconds):
+        """
+        Method that records the cost of a "customer/list" request.
+
+        :param seconds:
+            The time required to complete the request.
+
+        :type seconds: float
+
+        """
+
+        self.__list_cost = self.__smooth(self.__list_cost, seconds)
+
+
+    @staticmethod
+    def __smooth(current, seconds):
+        """
+        Method used internally to fold a new measurement into a cost.
+
+        :param current:
+            The current cost or None.
+
+        :param seconds:
+            The new measurement.
+
+        :return:
+            Returns the updated cost.
+
+        :type current: float or None
+        :type seconds: float
+        :rtype:        float
+
+        """
+
+        if current is None:
+            result = seconds
+        else:
+            result = current + COST_SMOOTHING * (seconds - current)
+
+        return result
 
 ###############################################################################
 # Class Customer:
@@ -582,6 +756,8 @@ class Customers(object):
             message = { 'customer_id' : customer_id }
         )
 
+        build_start_time = metrics.timer()
+
         if response is not None and 'status' in response:
             status = response['status']
             if status == 'OK' and 'customer' in response:
@@ -591,6 +767,12 @@ class Customers(object):
         else:
             result = None
 
+        metrics.elapsed(
+            "customer/get",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
         return result
 
 
@@ -759,6 +941,8 @@ class Customers(object):
             }
         )
 
+        mark_changed()
+
         if response is not None and 'status' in response:
             status = response['status']
             if status == 'OK' and 'customer' in response:
@@ -795,6 +979,8 @@ class Customers(object):
             message = { 'customer_id' : customer.customer_id }
         )
 
+        mark_changed()
+
         result = (
                 response is not None
             and 'status' in response
@@ -830,6 +1016,8 @@ class Customers(object):
             message = list(customers)
         )
 
+        mark_changed()
+
         result = (
                 response is not None
             and 'status' in response
@@ -839,6 +1027,54 @@ class Customers(object):
         return result
 
 
+    def get_many(self, customer_ids, fetch_planner = None):
+        """
+        Method you can use to obtain data for several customers.  Customers
+        are either fetched individually or filtered from a single list of all
+        customers, whichever the planner expects to be cheaper.
+
+        :param customer_ids:
+            The IDs of the desired customers.
+
+        :param fetch_planner:
+            The planner used to choose how customers are fetched.  A value of
+            None selects the planner shared by this process.
+
+        :return:
+            Returns a dictionary mapping each customer ID to a Customer
+            instance, False if the customer does not exist, or None if the
+            customer could not be fetched.  None is returned if the list
+            request fails.
+
+        :type customer_ids:  list of int
+        :type fetch_planner: FetchPlanner or None
+        :rtype:              dict or None
+
+        """
+
+        if fetch_planner is None:
+            fetch_planner = planner()
+
+        unique_ids = list(dict.fromkeys(customer_ids))
+        if fetch_planner.use_list(len(unique_ids)):
+            start_time = time.perf_counter()
+            result = self.__get_listed(unique_ids)
+            if result is not None and not self.__rest_api.last_from_cache:
+                fetch_planner.record_list(time.perf_counter() - start_time)
+        else:
+            result = dict()
+            for customer_id in unique_ids:
+                start_time = time.perf_counter()
+                customer = self.get(customer_id)
+                if customer is not None                   and \
+                   not self.__rest_api.last_from_cache        :
+                    fetch_planner.record_get(time.perf_counter() - start_time)
+
+                result[customer_id] = customer
+
+        return result
+
+
     def get_all(self):
         """
         Method you can use to obtain a list of all customers.
@@ -851,20 +1087,13 @@ class Customers(object):
 
         """
 
-        response = self.__rest_api.post_message(
-            slug = "customer/list",
-            secret = self.__secret,
-            message = { }
-        )
-
-        if response is not None and 'status' in response:
-            status = response['status']
-            if status == 'OK' and 'customers' in response:
-                result = dict()
-                customers_data = response['customers']
-                for customer_id, customer_data in customers_data.items():
-                    result[customer_id] = self.__parse_response(customer_data)
-            else:
+        stream = self.__request_all()
+        if stream is not None:
+            result = dict()
+            try:
+                for customer_id, customer in self.__iter_stream(stream):
+                    result[customer_id] = customer
+            except ValueError:
                 result = None
         else:
             result = None
@@ -872,6 +1101,31 @@ class Customers(object):
         return result
 
 
+    def iter_all(self):
+        """
+        Method you can use to iterate over all customers as they are received.
+        Unlike get_all, customers are not accumulated in memory.
+
+        :return:
+            Returns an iterator over Customer instances or None if the request
+            failed.  Iteration raises a ValueError if the response is
+            malformed or reports an error.
+
+        :rtype: iterator or None
+
+        """
+
+        stream = self.__request_all()
+        if stream is not None:
+            result = (
+                customer for customer_id, customer in self.__iter_stream(stream)
+            )
+        else:
+            result = None
+
+        return result
+
+
     def get_secret(self, customer_id):
         """
         Method you can use to obtain the secrets for a customer.
@@ -881,7 +1135,9 @@ class Customers(object):
 
         :return:
             Returns a tuple containing the customer identifier and customer
-            secret.
+            secret.  The secret is held in encoded form, as an
+            encoded_bytes.EncodedBytes instance, and is decoded when first
+            used.
 
         :type customer_id: int
         :rtype:            tuple or None
@@ -899,8 +1155,9 @@ class Customers(object):
             if status == 'OK' and 'customer' in response:
                 customer_data = response['customer']
                 customer_identifier = customer_data['identifier']
-                customer_secret_base64 = customer_data['secret']
-                customer_secret = base64.b64decode(customer_secret_base64)
+                customer_secret = encoded_bytes.EncodedBytes(
+                    customer_data['secret']
+                )
 
                 result = ( customer_identifier, customer_secret )
             else:
@@ -971,6 +1228,8 @@ class Customers(object):
             }
         )
 
+        mark_changed()
+
         result = (
                 response is not None
             and 'status' in response
@@ -980,6 +1239,108 @@ class Customers(object):
         return result
 
 
+    def __request_all(self):
+        """
+        Method used internally to request the list of all customers.
+
+        :return:
+            Returns the streamed response or None on error.
+
+        :rtype: json_stream.JsonStream or None
+
+        """
+
+        return self.__rest_api.post_message_stream(
+            slug = "customer/list",
+            secret = self.__secret,
+            message = { },
+            containers = ( 'customers', )
+        )
+
+
+    def __get_listed(self, customer_ids):
+        """
+        Method used internally to obtain customers by filtering the list of
+        all customers.  Only the requested customers are parsed.
+
+        :param customer_ids:
+            The IDs of the desired customers.
+
+        :return:
+            Returns a dictionary mapping each customer ID to a Customer
+            instance or False if the customer does not exist.  None is
+            returned on error.
+
+        :type customer_ids: list of int
+        :rtype:             dict or None
+
+        """
+
+        stream = self.__request_all()
+        if stream is not None:
+            build_stopwatch = metrics.Stopwatch(
+                "customer/list",
+                metrics.BUILD_TIME
+            )
+
+            result = dict.fromkeys(customer_ids, False)
+            try:
+                for container, customer_id, customer_data in stream:
+                    with build_stopwatch:
+                        try:
+                            customer_id = int(customer_id)
+                        except ValueError:
+                            customer_id = None
+
+                        if customer_id in result:
+                            result[customer_id] = self.__parse_response(
+                                customer_data
+                            )
+
+                if stream.status != 'OK' or not stream.found('customers'):
+                    result = None
+            except ValueError:
+                result = None
+
+            build_stopwatch.record()
+        else:
+            result = None
+
+        return result
+
+
+    def __iter_stream(self, stream):
+        """
+        Generator used internally to parse a streamed customer list.
+
+        :param stream:
+            The streamed response.
+
+        :return:
+            Yields tuples holding the customer ID, as reported, and the
+            customer instance.
+
+        :type stream: json_stream.JsonStream
+
+        """
+
+        build_stopwatch = metrics.Stopwatch(
+            "customer/list",
+            metrics.BUILD_TIME
+        )
+        try:
+            for container, customer_id, customer_data in stream:
+                with build_stopwatch:
+                    customer = self.__parse_response(customer_data)
+
+                yield ( customer_id, customer )
+
+            if stream.status != 'OK' or not stream.found('customers'):
+                raise ValueError("Invalid customer list response")
+        finally:
+            build_stopwatch.record()
+
+
     def __parse_response(self, response_data):
         """
         Method used internally to parse a response to generate a Customer
@@ -1100,6 +1461,55 @@ class Customers(object):
 
         return result
 
+###############################################################################
+# Functions:
+#
+
+def planner():
+    """
+    Function that returns the fetch planner shared by this process.  Costs
+    measured by one command are used to plan later commands run from the
+    same process, such as a shell or daemon session.
+
+    :return:
+        Returns the shared fetch planner.
+
+    :rtype: FetchPlanner
+
+    """
+
+    global __planner
+    if __planner is None:
+        __planner = FetchPlanner()
+
+    return __planner
+
+
+def generation():
+    """
+    Function that returns a counter that is incremented whenever this process
+    changes customer data.  Derived data, such as a customer catalog, can
+    compare the counter to determine if it is stale.
+
+    :return:
+        Returns the current generation.
+
+    :rtype: int
+
+    """
+
+    return __generation
+
+
+def mark_changed():
+    """
+    Function that records that this process changed customer data.
+
+    """
+
+    global __generation
+    __generation += 1
+
 ###############################################################################
 # Main:
 #
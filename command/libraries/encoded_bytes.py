@@ -0,0 +1,331 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+#
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that provides lazily decoded base64 byte fields.  Values are held
+as received and are only decoded, or encoded, the first time the other form is
+needed.  The result is remembered so later accesses are free.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import base64
+
+###############################################################################
+# Class EncodedBytes:
+#
+
+class EncodedBytes(object):
+    """
+    Class that holds a byte string in base64 encoded form.  You can use
+    instances wherever the decoded bytes are only occasionally needed.
+
+    """
+
+    __slots__ = ( '__encoded', '__decoded', '__validate' )
+
+    def __init__(self, encoded, validate = False):
+        """
+        Method that initializes the EncodedBytes class.
+
+        :param encoded:
+            The base64 encoded value, as per RFC4648.
+
+        :param validate:
+            If True, then characters outside the base64 alphabet are treated
+            as an error when decoding.  If False, they are discarded.
+
+        :type encoded:  str
+        :type validate: bool
+
+        """
+
+        super().__init__()
+
+        self.__encoded = encoded
+        self.__decoded = None
+        self.__validate = validate
+
+
+    @classmethod
+    def from_bytes(cls, decoded):
+        """
+        Method that creates an instance from a decoded value.  The value is
+        only encoded if the encoded form is requested.
+
+        :param decoded:
+            The decoded value.
+
+        :return:
+            Returns the new instance.
+
+        :type decoded: bytes
+        :rtype:        EncodedBytes
+
+        """
+
+        result = cls(None)
+        result.__decoded = bytes(decoded)
+
+        return result
+
+
+    @property
+    def encoded(self):
+        """
+        Read-only property holding the base64 encoded value.
+
+        :type: str
+
+        """
+
+        if self.__encoded is None:
+            self.__encoded = base64.b64encode(self.__decoded).decode('utf-8')
+
+        return self.__encoded
+
+
+    @property
+    def decoded(self):
+        """
+        Read-only property holding the decoded value.
+
+        :raises ValueError:
+            Raised if the encoded value is not valid base64.
+
+        :type: bytes
+
+        """
+
+        if self.__decoded is None:
+            self.__decoded = base64.b64decode(
+                self.__encoded,
+                validate = self.__validate
+            )
+
+        return self.__decoded
+
+
+    @property
+    def is_decoded(self):
+        """
+        Read-only property that is True if the decoded value is available
+        without further work.
+
+        :type: bool
+
+        """
+
+        return self.__decoded is not None
+
+
+    def decode(self, encoding = 'utf-8', errors = 'strict'):
+        """
+        Method that converts the decoded value to a string, in the same way
+        as bytes.decode.
+
+        :param encoding:
+            The encoding of the decoded value.
+
+        :param errors:
+            The error handling scheme, as per bytes.decode.
+
+        :return:
+            Returns the string.
+
+        :type encoding: str
+        :type errors:   str
+        :rtype:         str
+
+        """
+
+        return self.decoded.decode(encoding, errors)
+
+
+    def __bytes__(self):
+        """
+        Method that returns the decoded value.
+
+        :rtype: bytes
+
+        """
+
+        return self.decoded
+
+
+    def __len__(self):
+        """
+        Method that returns the length of the decoded value.
+
+        :rtype: int
+
+        """
+
+        return len(self.decoded)
+
+
+    def __eq__(self, other):
+        """
+        Method that compares this value against another.  Encoded values are
+        compared directly when both are available.
+
+        :param other:
+            The value to compare against.
+
+        :return:
+            Returns True if the values are equal.
+
+        :type other: EncodedBytes or bytes
+        :rtype:      bool
+
+        """
+
+        if isinstance(other, EncodedBytes):
+            if self.__encoded is not None         and \
+               other.__encoded is not None        and \
+               self.__encoded == other.__encoded      :
+                result = True
+            else:
+                result = self.decoded == other.decoded
+        elif isinstance(other, ( bytes, bytearray )):
+            result = self.decoded == other
+        else:
+            result = NotImplemented
+
+        return result
+
+
+    def __ne__(self, other):
+        """
+        Method that compares this value against another for inequality.
+
+        :param other:
+            The value to compare against.
+
+        :return:
+            Returns True if the values differ.
+
+        :type other: EncodedBytes or bytes
+        :rtype:      bool
+
+        """
+
+        result = self.__eq__(other)
+        if result is not NotImplemented:
+            result = not result
+
+        return result
+
+
+    def __hash__(self):
+        """
+        Method that returns a hash of the decoded value.
+
+        :rtype: int
+
+        """
+
+        return hash(self.decoded)
+
+
+    def __repr__(self):
+        """
+        Method that returns a representation of this value.
+
+        :rtype: str
+
+        """
+
+        return "EncodedBytes(%r)"%self.encoded
+
+###############################################################################
+# Functions:
+#
+
+def decoded(value):
+    """
+    Function that obtains the decoded form of a value that may or may not be
+    lazily encoded.
+
+    :param value:
+        The value to be decoded.
+
+    :return:
+        Returns the decoded value.
+
+    :raises ValueError:
+        Raised if the value is not valid base64.
+
+    :type value: EncodedBytes or bytes
+    :rtype:      bytes
+
+    """
+
+    if isinstance(value, EncodedBytes):
+        result = value.decoded
+    else:
+        result = value
+
+    return result
+
+
+def encoded(value):
+    """
+    Function that obtains the base64 encoded form of a value that may or may
+    not be lazily encoded.
+
+    :param value:
+        The value to be encoded.
+
+    :return:
+        Returns the base64 encoded value.
+
+    :type value: EncodedBytes or bytes
+    :rtype:      str
+
+    """
+
+    if isinstance(value, EncodedBytes):
+        result = value.encoded
+    else:
+        result = base64.b64encode(value).decode('utf-8')
+
+    return result
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
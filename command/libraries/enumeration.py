@@ -58,10 +58,46 @@ This module was inspired by several examples found at:
 
 class Value(object):
     """
-    Class that supports individual values in an enumerated type.
+    Class that supports individual values in an enumerated type.  Values are
+    interned so each value of an enumeration is a single shared instance.
+    Equal values are therefore always the same object, which lets
+    comparisons check for identity first.
 
     """
 
+    __slots__ = ( '__value', '__name', '__parent', '__weakref__' )
+
+    __instances = dict()
+
+    def __new__(cls, value, name, parent):
+        """
+        Method that returns the shared instance for a value, creating it if
+        needed.
+
+        :param value:
+            A numerical value to assign to this enumeration.
+
+        :param name:
+            The string name to assign to this enumeration.
+
+        :param parent:
+            Index of the parent class that owns this enumerated value.
+
+        :type value:  int or long
+        :type name:   str
+        :type parent: enumeration.Enum
+
+        """
+
+        key = ( parent, value )
+        instance = Value.__instances.get(key)
+        if instance is None:
+            instance = super().__new__(cls)
+            Value.__instances[key] = instance
+
+        return instance
+
+
     def __init__(self, value, name, parent):
         """
         Initialization method for Value.
@@ -199,6 +235,9 @@ class Value(object):
 
         """
 
+        if self is b:
+            return True
+
         if self.__parent != b.__parent:
             raise ValueError("enumeration values are incompatible")
 
@@ -222,6 +261,9 @@ class Value(object):
 
         """
 
+        if self is b:
+            return False
+
         if self.__parent != b.__parent:
             raise ValueError("enumeration values are incompatible")
 
@@ -242,6 +284,18 @@ class Value(object):
         return self.__value
 
 
+    def __reduce__(self):
+        """
+        Returns the information needed to copy or pickle this value so that
+        copies resolve to the shared instance.
+
+        :rtype: tuple
+
+        """
+
+        return ( Value, ( self.__value, self.__name, self.__parent ) )
+
+
     def __repr__(self):
         """
         Returns a representation of the enumerated value.
@@ -324,6 +378,9 @@ class Enum(list):
         print(my_enum.ENUM_A) # prints "ENUM_A"
         print(my_enum[0])     # also prints "ENUM_A"
 
+    Lookups by name are case insensitive and treat "-" and "_" alike.  Each
+    spelling is normalized once and then remembered so repeated lookups of
+    values received from the server cost a single dictionary access.
 
     """
 
@@ -342,6 +399,7 @@ class Enum(list):
         Enum.__next_parent_index += 1
 
         self._values_by_name = dict()
+        self._aliases = dict()
         for n in values.split():
             self.add(n)
 
@@ -367,6 +425,7 @@ class Enum(list):
             setattr(self, name, v)
             self.append(v)
             self._values_by_name[name] = v
+            self._aliases.setdefault(name.upper().replace('-', '_'), v)
         else:
             v = self._values_by_name[name]
 
@@ -375,7 +434,8 @@ class Enum(list):
 
     def by_name(self, s):
         """
-        Returns the value associated with the given name.
+        Returns the value associated with the given name.  The name is
+        matched without regard to case and with "-" treated as "_".
 
         :param s:
             The name to locate.
@@ -391,10 +451,11 @@ class Enum(list):
 
         """
 
-        if s in self._values_by_name:
-            return self._values_by_name[s]
-        else:
-            return None
+        v = self._values_by_name.get(s)
+        if v is None:
+            v = self._aliases.get(s.upper().replace('-', '_'))
+
+        return v
 
 
     def by_value(self, i):
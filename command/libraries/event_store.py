@@ -0,0 +1,1249 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+#
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+
+"""
+Python module that provides a local, append-only store of events.  Events are
+held in columns, one array per field, in timestamp order so that keeping the
+store current only requires requesting events newer than those already held.
+Indexes by customer, monitor, and event type are built as they are needed.
+
+The backing file holds a header followed by blocks, one per append.  Each block
+holds the number of events followed by each column as raw little-endian array
+data so the file can be loaded without unpacking individual events.  Processes
+sharing the file serialize updates through an adjacent lock file and read the
+blocks written by other processes before appending their own.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import os
+import sys
+import array
+import bisect
+import struct
+import threading
+import time
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import libraries.events as events
+
+###############################################################################
+# Globals:
+#
+
+COLUMN_TYPECODES = ( 'q', 'q', 'q', 'q', 'H' )
+"""
+The array type codes of the stored columns.  Columns are the event ID, monitor
+ID, customer ID, timestamp, and event type value.
+
+"""
+
+BLOCK_HEADER = struct.Struct("<Q")
+"""
+The binary layout of the header preceding each block of events.
+
+"""
+
+MAGIC = b"SPEEDSENTRY EVENTS 1\n"
+"""
+Bytes used to identify an event store file.  The magic is followed by the
+store namespace and a newline.
+
+"""
+
+DEFAULT_FILENAME = os.path.join(
+    os.path.expanduser("~"),
+    ".speedsentry_events"
+)
+"""
+The default file used to persist events between runs.
+
+"""
+
+DEFAULT_FLAP_DURATION = 300
+"""
+The default duration, in seconds, below which an outage is considered a flap.
+
+"""
+
+__configuration = None
+"""
+Tuple holding the namespace and filename configured for this process.
+
+"""
+
+__stores = dict()
+"""
+Dictionary of event stores opened by this process, indexed by namespace.
+
+"""
+
+__stores_lock = threading.Lock()
+"""
+Lock used to serialize access to the dictionary of event stores.
+
+"""
+
+###############################################################################
+# Class Outage:
+#
+
+class Outage(object):
+    """
+    Class that holds an outage, the interval between a monitor reporting no
+    response and the monitor reporting it is working again.
+
+    """
+
+    def __init__(
+        self,
+        monitor_id,
+        customer_id,
+        start_timestamp,
+        end_timestamp = None
+        ):
+        """
+        Method that initializes the Outage class.
+
+        :param monitor_id:
+            The ID of the monitor that was down.
+
+        :param customer_id:
+            The ID of the customer owning the monitor.
+
+        :param start_timestamp:
+            The Unix timestamp when the monitor stopped responding.
+
+        :param end_timestamp:
+            The Unix timestamp when the monitor started working again.  A
+            value of None indicates the outage is ongoing.
+
+        :type monitor_id:      int
+        :type customer_id:     int
+        :type start_timestamp: int
+        :type end_timestamp:   int or None
+
+        """
+
+        super().__init__()
+
+        self.__monitor_id = monitor_id
+        self.__customer_id = customer_id
+        self.__start_timestamp = start_timestamp
+        self.__end_timestamp = end_timestamp
+
+
+    @property
+    def monitor_id(self):
+        """
+        Read-only property holding the monitor ID.
+
+        :type: int
+
+        """
+
+        return self.__monitor_id
+
+
+    @property
+    def customer_id(self):
+        """
+        Read-only property holding the customer ID.
+
+        :type: int
+
+        """
+
+        return self.__customer_id
+
+
+    @property
+    def start_timestamp(self):
+        """
+        Read-only property holding the Unix timestamp when the outage started.
+
+        :type: int
+
+        """
+
+        return self.__start_timestamp
+
+
+    @property
+    def end_timestamp(self):
+        """
+        Read-only property holding the Unix timestamp when the outage ended.
+        The value is None if the outage is ongoing.
+
+        :type: int or None
+
+        """
+
+        return self.__end_timestamp
+
+
+    def duration(self, now = None):
+        """
+        Method that calculates the outage duration.
+
+        :param now:
+            The Unix timestamp used as the end of ongoing outages.  If None,
+            the current time is used.
+
+        :return:
+            Returns the duration in seconds.
+
+        :type now: int or None
+        :rtype:    int
+
+        """
+
+        if self.__end_timestamp is not None:
+            result = self.__end_timestamp - self.__start_timestamp
+        else:
+            if now is None:
+                now = int(time.time())
+
+            result = max(0, now - self.__start_timestamp)
+
+        return result
+
+###############################################################################
+# Class OutageSummary:
+#
+
+class OutageSummary(object):
+    """
+    Class that accumulates statistics over a group of outages.
+
+    """
+
+    def __init__(self, flap_duration = DEFAULT_FLAP_DURATION, now = None):
+        """
+        Method that initializes the OutageSummary class.
+
+        :param flap_duration:
+            Closed outages shorter than this duration, in seconds, are counted
+            as flaps.
+
+        :param now:
+            The Unix timestamp used as the end of ongoing outages.  If None,
+            the current time is used.
+
+        :type flap_duration: int
+        :type now:           int or None
+
+        """
+
+        super().__init__()
+
+        self.__flap_duration = flap_duration
+        self.__now = now if now is not None else int(time.time())
+
+        self.__monitor_ids = set()
+        self.__number_outages = 0
+        self.__number_ongoing = 0
+        self.__number_flaps = 0
+        self.__downtime = 0
+        self.__repair_time = 0
+        self.__longest = 0
+
+
+    def add(self, outage):
+        """
+        Method that adds an outage to the summary.
+
+        :param outage:
+            The outage to be added.
+
+        :type outage: Outage
+
+        """
+
+        duration = outage.duration(self.__now)
+
+        self.__monitor_ids.add(outage.monitor_id)
+        self.__number_outages += 1
+        self.__downtime += duration
+        self.__longest = max(self.__longest, duration)
+
+        if outage.end_timestamp is None:
+            self.__number_ongoing += 1
+        else:
+            self.__repair_time += duration
+            if duration < self.__flap_duration:
+                self.__number_flaps += 1
+
+
+    @property
+    def number_monitors(self):
+        """
+        Read-only property holding the number of distinct monitors with
+        outages.
+
+        :type: int
+
+        """
+
+        return len(self.__monitor_ids)
+
+
+    @property
+    def number_outages(self):
+        """
+        Read-only property holding the number of outages.
+
+        :type: int
+
+        """
+
+        return self.__number_outages
+
+
+    @property
+    def number_ongoing(self):
+        """
+        Read-only property holding the number of outages that have not ended.
+
+        :type: int
+
+        """
+
+        return self.__number_ongoing
+
+
+    @property
+    def number_flaps(self):
+        """
+        Read-only property holding the number of outages shorter than the flap
+        duration.
+
+        :type: int
+
+        """
+
+        return self.__number_flaps
+
+
+    @property
+    def downtime(self):
+        """
+        Read-only property holding the total outage duration, in seconds,
+        including ongoing outages.
+
+        :type: int
+
+        """
+
+        return self.__downtime
+
+
+    @property
+    def mean_time_to_repair(self):
+        """
+        Read-only property holding the mean duration, in seconds, of outages
+        that have ended.  The value is None if no outage has ended.
+
+        :type: float or None
+
+        """
+
+        number_closed = self.__number_outages - self.__number_ongoing
+        if number_closed > 0:
+            result = self.__repair_time / number_closed
+        else:
+            result = None
+
+        return result
+
+
+    @property
+    def longest(self):
+        """
+        Read-only property holding the longest outage duration, in seconds.
+
+        :type: int
+
+        """
+
+        return self.__longest
+
+###############################################################################
+# Class EventStore:
+#
+
+class EventStore(object):
+    """
+    Class that holds a local copy of events.  Rows are numbered in the order
+    they were stored, which is also timestamp order.  Selections are returned
+    as arrays of row numbers so they can be combined and analyzed without
+    creating an Event instance per row.
+
+    """
+
+    def __init__(self, namespace, filename = None):
+        """
+        Method that initializes the EventStore class.
+
+        :param namespace:
+            The namespace for the store, normally the server scheme and host.
+            A file holding events for a different namespace is discarded.
+
+        :param filename:
+            An optional file used to persist events between runs.
+
+        :type namespace: str
+        :type filename:  str or None
+
+        """
+
+        super().__init__()
+
+        self.__namespace = namespace
+        self.__filename = filename
+        self.__header = MAGIC + namespace.encode('utf-8') + b"\n"
+        self.__lock = threading.RLock()
+
+        self.__clear()
+
+        self.__file_valid = False
+        self.__file_identity = None
+        self.__file_offset = 0
+        if filename is not None:
+            with self.__file_lock(shared = True):
+                self.__load()
+
+
+    def __len__(self):
+        """
+        Method that returns the number of stored events.
+
+        :rtype: int
+
+        """
+
+        return len(self.__event_ids)
+
+
+    @property
+    def namespace(self):
+        """
+        Read-only property holding the store namespace.
+
+        :type: str
+
+        """
+
+        return self.__namespace
+
+
+    @property
+    def newest_timestamp(self):
+        """
+        Read-only property holding the timestamp of the newest stored event.
+        The value is None if the store is empty.
+
+        :type: int or None
+
+        """
+
+        with self.__lock:
+            return self.__timestamps[-1] if self.__timestamps else None
+
+
+    def append(self, new_events):
+        """
+        Method that stores new events.  Events older than the newest stored
+        event, events already stored, and events with an unknown event type
+        are ignored.
+
+        Events stored by other processes sharing the backing file are loaded
+        first so they are not stored twice.
+
+        :param new_events:
+            An iterable of Event instances.
+
+        :return:
+            Returns the number of events stored.
+
+        :type new_events: iterable
+        :rtype:           int
+
+        """
+
+        new_events = [
+            e for e in new_events
+            if e is not None and e.event_type is not None
+        ]
+
+        with self.__lock, self.__file_lock():
+            if self.__filename is not None:
+                self.__load()
+
+            cursor = events.EventCursor(self.newest_timestamp)
+            cursor.advance(self.events(self.__newest_rows()))
+
+            accepted = cursor.advance(new_events)
+            if accepted:
+                columns = (
+                    array.array('q', ( e.event_id for e in accepted )),
+                    array.array('q', ( e.monitor_id for e in accepted )),
+                    array.array('q', ( e.customer_id for e in accepted )),
+                    array.array('q', ( e.timestamp for e in accepted )),
+                    array.array('H', ( e.event_type.value for e in accepted ))
+                )
+
+                self.__write(columns)
+                self.__extend(columns)
+
+            return len(accepted)
+
+
+    def update(self, events_api):
+        """
+        Method that requests events newer than those stored and stores them.
+
+        :param events_api:
+            The Events instance used to request events.
+
+        :return:
+            Returns the number of events stored or None on error.
+
+        :type events_api: events.Events
+        :rtype:           int or None
+
+        """
+
+        with self.__lock:
+            event_iterator = events_api.iter_get(
+                start_timestamp = self.newest_timestamp
+            )
+
+            if event_iterator is not None:
+                try:
+                    result = self.append(event_iterator)
+                except ValueError:
+                    result = None
+            else:
+                result = None
+
+            return result
+
+
+    def rebuild(self, events_api):
+        """
+        Method that discards every stored event and requests them all again.
+        Use this method to pick up events reported with timestamps older than
+        the newest stored event.
+
+        :param events_api:
+            The Events instance used to request events.
+
+        :return:
+            Returns the number of events stored or None on error.
+
+        :type events_api: events.Events
+        :rtype:           int or None
+
+        """
+
+        with self.__lock:
+            with self.__file_lock():
+                self.__clear()
+                self.__file_valid = False
+                self.__write(None)
+
+            return self.update(events_api)
+
+
+    def select(
+        self,
+        customer_id = None,
+        monitor_id = None,
+        event_type = None,
+        start_timestamp = None,
+        end_timestamp = None
+        ):
+        """
+        Method that selects stored events.
+
+        :param customer_id:
+            If not None, only events for this customer are selected.
+
+        :param monitor_id:
+            If not None, only events for this monitor are selected.
+
+        :param event_type:
+            If not None, only events of this type are selected.
+
+        :param start_timestamp:
+            If not None, only events at or after this timestamp are selected.
+
+        :param end_timestamp:
+            If not None, only events at or before this timestamp are selected.
+
+        :return:
+            Returns the selected row numbers in timestamp order.
+
+        :type customer_id:     int or None
+        :type monitor_id:      int or None
+        :type event_type:      EVENT_TYPE enumerated value or None
+        :type start_timestamp: int or None
+        :type end_timestamp:   int or None
+        :rtype:                array.array
+
+        """
+
+        with self.__lock:
+            timestamps = self.__timestamps
+
+            if start_timestamp is not None:
+                first_row = bisect.bisect_left(timestamps, start_timestamp)
+            else:
+                first_row = 0
+
+            if end_timestamp is not None:
+                last_row = bisect.bisect_right(timestamps, end_timestamp)
+            else:
+                last_row = len(timestamps)
+
+            filters = list()
+            if customer_id is not None:
+                filters.append(
+                    (
+                        self.__index('customer'),
+                        self.__customer_ids,
+                        customer_id
+                    )
+                )
+            if monitor_id is not None:
+                filters.append(
+                    (
+                        self.__index('monitor'),
+                        self.__monitor_ids,
+                        monitor_id
+                    )
+                )
+            if event_type is not None:
+                filters.append(
+                    (
+                        self.__index('event_type'),
+                        self.__event_types,
+                        event_type.value
+                    )
+                )
+
+            if filters:
+                filters.sort(key = lambda x: len(x[0].get(x[2], ())))
+                index, column, value = filters[0]
+                candidates = index.get(value, array.array('q'))
+                candidates = candidates[
+                    bisect.bisect_left(candidates, first_row):
+                    bisect.bisect_left(candidates, last_row)
+                ]
+
+                if len(filters) > 1:
+                    remaining = [ ( c, v ) for i, c, v in filters[1:] ]
+                    candidates = array.array(
+                        'q',
+                        (
+                            row for row in candidates
+                            if all(c[row] == v for c, v in remaining)
+                        )
+                    )
+
+                result = candidates
+            else:
+                result = array.array('q', range(first_row, last_row))
+
+            return result
+
+
+    def events(self, rows):
+        """
+        Method that converts row numbers to Event instances.
+
+        :param rows:
+            The row numbers to be converted.
+
+        :return:
+            Returns an iterator over Event instances.
+
+        :type rows: iterable
+        :rtype:     iterator
+
+        """
+
+        by_value = events.EVENT_TYPE.by_value
+        return (
+            events.Event(
+                event_id = self.__event_ids[row],
+                monitor_id = self.__monitor_ids[row],
+                customer_id = self.__customer_ids[row],
+                timestamp = self.__timestamps[row],
+                event_type = by_value(self.__event_types[row])
+            )
+            for row in rows
+        )
+
+
+    def outages(self, rows):
+        """
+        Method that finds outages among selected events.  An outage starts
+        with a no response event and ends with the next working event for the
+        same monitor.  Other event types are ignored.
+
+        :param rows:
+            The row numbers to be analyzed, in timestamp order.
+
+        :return:
+            Returns the outages ordered by start time.  Outages that have not
+            ended have an end timestamp of None.
+
+        :type rows: iterable
+        :rtype:     list of Outage instances
+
+        """
+
+        no_response = events.EVENT_TYPE.NO_RESPONSE.value
+        working = events.EVENT_TYPE.WORKING.value
+
+        with self.__lock:
+            monitor_ids = self.__monitor_ids
+            customer_ids = self.__customer_ids
+            timestamps = self.__timestamps
+            event_types = self.__event_types
+
+            started = dict()
+            result = list()
+            for row in rows:
+                event_type = event_types[row]
+                if event_type == no_response:
+                    started.setdefault(monitor_ids[row], row)
+                elif event_type == working:
+                    start_row = started.pop(monitor_ids[row], None)
+                    if start_row is not None:
+                        result.append(
+                            Outage(
+                                monitor_ids[row],
+                                customer_ids[start_row],
+                                timestamps[start_row],
+                                timestamps[row]
+                            )
+                        )
+
+            for monitor_id, start_row in started.items():
+                result.append(
+                    Outage(
+                        monitor_id,
+                        customer_ids[start_row],
+                        timestamps[start_row]
+                    )
+                )
+
+        result.sort(key = lambda x: x.start_timestamp)
+        return result
+
+
+    def __clear(self):
+        """
+        Method used internally to discard every stored event.
+
+        """
+
+        self.__event_ids = array.array('q')
+        self.__monitor_ids = array.array('q')
+        self.__customer_ids = array.array('q')
+        self.__timestamps = array.array('q')
+        self.__event_types = array.array('H')
+        self.__indexes = dict()
+
+
+    def __extend(self, columns):
+        """
+        Method used internally to add events to the columns and indexes.
+
+        :param columns:
+            The columns of the events to be added, in timestamp order.
+
+        :type columns: tuple of array.array
+
+        """
+
+        first_row = len(self.__event_ids)
+
+        self.__event_ids.extend(columns[0])
+        self.__monitor_ids.extend(columns[1])
+        self.__customer_ids.extend(columns[2])
+        self.__timestamps.extend(columns[3])
+        self.__event_types.extend(columns[4])
+
+        for name, index in self.__indexes.items():
+            self.__add_to_index(index, self.__column(name), first_row)
+
+
+    def __newest_rows(self):
+        """
+        Method used internally to obtain the rows holding the newest
+        timestamp.
+
+        :return:
+            Returns the row numbers.
+
+        :rtype: range
+        """
+
+        timestamps = self.__timestamps
+        if timestamps:
+            first_row = bisect.bisect_left(timestamps, timestamps[-1])
+        else:
+            first_row = 0
+
+        return range(first_row, len(timestamps))
+
+
+    def __column(self, name):
+        """
+        Method used internally to obtain an indexed column.
+
+        :param name:
+            The index name, one of "customer", "monitor", or "event_type".
+
+        :return:
+            Returns the column.
+
+        :type name: str
+        :rtype:     array.array
+
+        """
+
+        if name == 'customer':
+            result = self.__customer_ids
+        elif name == 'monitor':
+            result = self.__monitor_ids
+        else:
+            result = self.__event_types
+
+        return result
+
+
+    def __index(self, name):
+        """
+        Method used internally to obtain an index, building it if needed.
+
+        :param name:
+            The index name, one of "customer", "monitor", or "event_type".
+
+        :return:
+            Returns a dictionary mapping column values to arrays of row
+            numbers in ascending order.
+
+        :type name: str
+        :rtype:     dict
+
+        """
+
+        index = self.__indexes.get(name)
+        if index is None:
+            index = dict()
+            self.__add_to_index(index, self.__column(name), 0)
+            self.__indexes[name] = index
+
+        return index
+
+
+    @staticmethod
+    def __add_to_index(index, column, first_row):
+        """
+        Method used internally to add rows to an index.
+
+        :param index:
+            The index to be updated.
+
+        :param column:
+            The indexed column.
+
+        :param first_row:
+            The first row to be added.  Every later row is also added.
+
+        :type index:     dict
+        :type column:    array.array
+        :type first_row: int
+
+        """
+
+        for row in range(first_row, len(column)):
+            value = column[row]
+            rows = index.get(value)
+            if rows is None:
+                rows = array.array('q')
+                index[value] = rows
+
+            rows.append(row)
+
+
+    @contextlib.contextmanager
+    def __file_lock(self, shared = False):
+        """
+        Method used internally to hold the lock serializing access to the
+        backing file between processes.  No lock is taken if there is no
+        backing file, if file locks are not supported, or if the lock file can
+        not be opened.
+
+        :param shared:
+            If True, a shared lock is taken for reading.  If False, an
+            exclusive lock is taken.
+
+        :type shared: bool
+
+        """
+
+        if self.__filename is not None and fcntl is not None:
+            try:
+                lock_descriptor = os.open(
+                    self.__filename + ".lock",
+                    os.O_RDWR | os.O_CREAT,
+                    0o600
+                )
+            except OSError:
+                lock_descriptor = None
+        else:
+            lock_descriptor = None
+
+        try:
+            if lock_descriptor is not None:
+                fcntl.flock(
+                    lock_descriptor,
+                    fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+                )
+
+            yield
+        finally:
+            if lock_descriptor is not None:
+                os.close(lock_descriptor)
+
+
+    def __load(self):
+        """
+        Method used internally to load events from the backing file.  Only
+        blocks following those already loaded are read.  If the file was
+        replaced by another process, every stored event is loaded again.
+
+        """
+
+        try:
+            with open(self.__filename, "rb") as fh:
+                status = os.fstat(fh.fileno())
+                identity = ( status.st_dev, status.st_ino )
+                if identity != self.__file_identity         or \
+                   status.st_size < self.__file_offset          :
+                    self.__clear()
+                    self.__file_identity = identity
+                    self.__file_offset = 0
+
+                fh.seek(self.__file_offset)
+                data = fh.read()
+        except OSError:
+            data = None
+
+        if data is not None:
+            if self.__file_offset == 0:
+                if data.startswith(self.__header):
+                    offset = len(self.__header)
+                else:
+                    offset = None
+            else:
+                offset = 0
+
+            if offset is not None:
+                offset = self.__load_blocks(memoryview(data), offset)
+                self.__file_offset += offset
+                self.__file_valid = (offset == len(data))
+            else:
+                self.__file_valid = False
+        else:
+            self.__file_valid = False
+
+
+    def __load_blocks(self, data, offset):
+        """
+        Method used internally to add the events held in complete blocks.
+
+        :param data:
+            The data holding the blocks.
+
+        :param offset:
+            The offset of the first block.
+
+        :return:
+            Returns the offset following the last complete block.
+
+        :type data:   memoryview
+        :type offset: int
+        :rtype:       int
+
+        """
+
+        row_size = sum(
+            array.array(typecode).itemsize for typecode in COLUMN_TYPECODES
+        )
+
+        while offset + BLOCK_HEADER.size <= len(data):
+            number_rows, = BLOCK_HEADER.unpack_from(data, offset)
+            block_end = offset + BLOCK_HEADER.size + number_rows * row_size
+            if block_end > len(data):
+                break
+
+            offset += BLOCK_HEADER.size
+            columns = list()
+            for typecode in COLUMN_TYPECODES:
+                column = array.array(typecode)
+                column_end = offset + number_rows * column.itemsize
+                column.frombytes(data[offset:column_end])
+                if sys.byteorder != 'little':
+                    column.byteswap()
+
+                columns.append(column)
+                offset = column_end
+
+            self.__extend(columns)
+
+        return offset
+
+
+    def __write(self, columns):
+        """
+        Method used internally to append a block of events to the backing
+        file.  The file is rewritten if it does not hold the events already
+        stored.
+
+        :param columns:
+            The columns of the events to be written.  A value of None writes
+            no new events.
+
+        :type columns: tuple of array.array or None
+
+        """
+
+        if self.__filename is not None:
+            blocks = list()
+            if not self.__file_valid:
+                blocks.append(self.__header)
+                if self.__event_ids:
+                    blocks.append(
+                        self.__encode_block(
+                            (
+                                self.__event_ids,
+                                self.__monitor_ids,
+                                self.__customer_ids,
+                                self.__timestamps,
+                                self.__event_types
+                            )
+                        )
+                    )
+
+            if columns is not None:
+                blocks.append(self.__encode_block(columns))
+
+            data = b"".join(blocks)
+            try:
+                if self.__file_valid:
+                    with open(self.__filename, "ab") as fh:
+                        fh.write(data)
+
+                    self.__file_offset += len(data)
+                else:
+                    temporary_filename = self.__filename + ".tmp"
+                    with open(temporary_filename, "wb") as fh:
+                        fh.write(data)
+                        status = os.fstat(fh.fileno())
+
+                    os.chmod(temporary_filename, 0o600)
+                    os.replace(temporary_filename, self.__filename)
+
+                    self.__file_identity = ( status.st_dev, status.st_ino )
+                    self.__file_offset = len(data)
+                    self.__file_valid = True
+            except OSError:
+                self.__file_valid = False
+
+
+    @staticmethod
+    def __encode_block(columns):
+        """
+        Method used internally to encode a block of events.
+
+        :param columns:
+            The columns of the events to be encoded.
+
+        :return:
+            Returns the encoded block.
+
+        :type columns: tuple of array.array
+        :rtype:        bytes
+
+        """
+
+        encoded = [ BLOCK_HEADER.pack(len(columns[0])) ]
+        for column in columns:
+            if sys.byteorder != 'little':
+                column = array.array(column.typecode, column)
+                column.byteswap()
+
+            encoded.append(column.tobytes())
+
+        return b"".join(encoded)
+
+###############################################################################
+# Functions:
+#
+
+def configure(configuration, namespace):
+    """
+    Function that configures the event store from the "event_store" section
+    of the configuration.  The section is optional and may contain:
+
+        "enabled" - False to hold events in memory only.  Defaults to True.
+        "file"    - Path to the file used to persist events between runs.
+                    Defaults to ~/.speedsentry_events.
+
+    :param configuration:
+        The parsed configuration.
+
+    :param namespace:
+        The namespace to assign to the store.
+
+    :type configuration: dict
+    :type namespace:     str
+
+    """
+
+    global __configuration
+
+    store_configuration = configuration.get('event_store', dict())
+    if store_configuration.get('enabled', True):
+        filename = os.path.expanduser(
+            store_configuration.get('file', DEFAULT_FILENAME)
+        )
+    else:
+        filename = None
+
+    __configuration = ( namespace, filename )
+
+
+def store():
+    """
+    Function that obtains the configured event store.  The store is opened
+    once and reused by later calls from the same process.  If no store has
+    been configured, events are held in memory only.
+
+    :return:
+        Returns the event store.
+
+    :rtype: EventStore
+
+    """
+
+    if __configuration is not None:
+        namespace, filename = __configuration
+    else:
+        namespace, filename = ( str(), None )
+
+    with __stores_lock:
+        result = __stores.get(namespace)
+        if result is None:
+            result = EventStore(namespace, filename)
+            __stores[namespace] = result
+
+    return result
+
+
+def summarize(outages, key, flap_duration = DEFAULT_FLAP_DURATION, now = None):
+    """
+    Function that groups outages and summarizes each group.
+
+    :param outages:
+        The outages to be summarized.
+
+    :param key:
+        Function that returns the group for an outage.  Outages for which the
+        function returns None are skipped.
+
+    :param flap_duration:
+        Closed outages shorter than this duration, in seconds, are counted as
+        flaps.
+
+    :param now:
+        The Unix timestamp used as the end of ongoing outages.  If None, the
+        current time is used.
+
+    :return:
+        Returns a dictionary of OutageSummary instances by group.
+
+    :type outages:       iterable
+    :type key:           callable
+    :type flap_duration: int
+    :type now:           int or None
+    :rtype:              dict
+
+    """
+
+    if now is None:
+        now = int(time.time())
+
+    result = dict()
+    for outage in outages:
+        group = key(outage)
+        if group is not None:
+            summary = result.get(group)
+            if summary is None:
+                summary = OutageSummary(flap_duration, now)
+                result[group] = summary
+
+            summary.add(outage)
+
+    return result
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
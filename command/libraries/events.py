@@ -37,13 +37,19 @@ Class providing a API you can use to process events information.
 import sys
 import os
 import json
-import base64
+import re
 import time
+import array
+import bisect
 import datetime
+import threading
+import concurrent.futures
 
 import libraries.enumeration as enumeration
+import libraries.encoded_bytes as encoded_bytes
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
+import libraries.metrics as metrics
 
 ###############################################################################
 # Class Globals:
@@ -83,6 +89,58 @@ Enumeration of supported monitor status values.
 
 """
 
+DEFAULT_MINIMUM_POLL_INTERVAL = 1.0
+"""
+The default shortest time, in seconds, between polls when following events.
+
+"""
+
+DEFAULT_MAXIMUM_POLL_INTERVAL = 30.0
+"""
+The default longest time, in seconds, between polls when following events.
+
+"""
+
+POLL_BACKOFF = 2.0
+"""
+The factor the poll interval grows by after each poll that returns no new
+events.
+
+"""
+
+DIFFERENCE_PATTERN = re.compile(b"[^\x00]")
+"""
+Regular expression used to locate the bytes that differ between two status
+snapshots.
+
+"""
+
+DEFAULT_REPORT_WORKERS = 8
+"""
+The default number of monitors whose reports are sent concurrently.
+
+"""
+
+DEFAULT_BATCH_SIZE = 256
+"""
+The default number of buffered reports that will trigger a flush.
+
+"""
+
+DEFAULT_FLUSH_INTERVAL = 0.5
+"""
+The default longest time, in seconds, a buffered report will wait before
+being sent.
+
+"""
+
+__batch_reports = False
+"""
+Indicates if the server accepts batches of event reports.  Set from the
+configuration.
+
+"""
+
 ###############################################################################
 # Class Event:
 #
@@ -215,6 +273,288 @@ class Event(object):
     def event_type(self, value):
         self.__event_type = int(event_type)
 
+###############################################################################
+# Class EventCursor:
+#
+
+class EventCursor(object):
+    """
+    Class that tracks the newest events received so that repeated requests
+    only report events that were not already seen.  The cursor holds the
+    newest timestamp and the IDs of the events at that timestamp so its size
+    does not grow over time.
+
+    """
+
+    def __init__(self, start_timestamp = None):
+        """
+        Method that initializes the EventCursor class.
+
+        :param start_timestamp:
+            The Unix timestamp of the oldest event to be reported.  A value of
+            None indicates all events.
+
+        :type start_timestamp: int or None
+
+        """
+
+        super().__init__()
+
+        self.__timestamp = start_timestamp
+        self.__event_ids = set()
+
+
+    @property
+    def timestamp(self):
+        """
+        Read-only property holding the newest timestamp seen.  Requests for
+        new events should start at this timestamp.
+
+        :type: int or None
+
+        """
+
+        return self.__timestamp
+
+
+    def advance(self, events):
+        """
+        Method that filters events already seen and advances the cursor.
+
+        :param events:
+            An iterable of Event instances.  Entries that are None are
+            ignored.
+
+        :return:
+            Returns a list of the events not previously seen, in timestamp
+            order.
+
+        :type events: iterable
+        :rtype:       list of Event instances
+
+        """
+
+        timestamp = self.__timestamp
+        event_ids = self.__event_ids
+
+        result = list()
+        for event in events:
+            if event is not None:
+                event_timestamp = event.timestamp
+                if timestamp is None or event_timestamp > timestamp:
+                    result.append(event)
+                elif event_timestamp == timestamp           and \
+                     event.event_id not in event_ids            :
+                    result.append(event)
+
+        if result:
+            result.sort(key = lambda x: ( x.timestamp, x.event_id ))
+
+            newest_timestamp = result[-1].timestamp
+            if newest_timestamp != timestamp:
+                self.__timestamp = newest_timestamp
+                self.__event_ids = set()
+
+            self.__event_ids.update(
+                event.event_id for event in result
+                if event.timestamp == newest_timestamp
+            )
+
+        return result
+
+###############################################################################
+# Class StatusSnapshot:
+#
+
+class StatusSnapshot(object):
+    """
+    Class that holds the status of a set of monitors at one point in time.
+    Monitor IDs are held in ascending order in an array with the matching
+    status values held in a bytes object, one byte per monitor, so snapshots
+    stay compact for large fleets and can be compared in bulk.
+
+    """
+
+    def __init__(self, monitor_ids = None, statuses = None):
+        """
+        Method that initializes the StatusSnapshot class.
+
+        :param monitor_ids:
+            The monitor IDs in ascending order.  A value of None indicates an
+            empty snapshot.
+
+        :param statuses:
+            The MONITOR_STATUS values, as integers, in the same order as the
+            monitor IDs.
+
+        :type monitor_ids: array.array or None
+        :type statuses:    bytes or None
+
+        """
+
+        super().__init__()
+
+        if monitor_ids is not None:
+            self.__monitor_ids = monitor_ids
+            self.__statuses = bytes(statuses)
+        else:
+            self.__monitor_ids = array.array('q')
+            self.__statuses = bytes()
+
+
+    def __len__(self):
+        """
+        Method that returns the number of monitors in the snapshot.
+
+        :rtype: int
+
+        """
+
+        return len(self.__monitor_ids)
+
+
+    @property
+    def monitor_ids(self):
+        """
+        Read-only property holding the monitor IDs in ascending order.
+
+        :type: array.array
+
+        """
+
+        return self.__monitor_ids
+
+
+    @property
+    def statuses(self):
+        """
+        Read-only property holding the status values, as integers, in the
+        same order as the monitor IDs.
+
+        :type: bytes
+
+        """
+
+        return self.__statuses
+
+
+    def status(self, monitor_id):
+        """
+        Method that obtains the status of a monitor.
+
+        :param monitor_id:
+            The monitor ID of interest.
+
+        :return:
+            Returns the monitor status or None if the monitor is not in the
+            snapshot.
+
+        :type monitor_id: int
+        :rtype:           MONITOR_STATUS enumerated value or None
+
+        """
+
+        index = bisect.bisect_left(self.__monitor_ids, monitor_id)
+        if     index < len(self.__monitor_ids)              \
+           and self.__monitor_ids[index] == monitor_id      :
+            result = MONITOR_STATUS.by_value(self.__statuses[index])
+        else:
+            result = None
+
+        return result
+
+
+    def transitions(self, previous):
+        """
+        Method that determines the monitors whose status changed since an
+        earlier snapshot.
+
+        :param previous:
+            The earlier snapshot.
+
+        :return:
+            Returns a list of tuples holding the monitor ID, the earlier
+            status, and the current status, in monitor ID order.  The earlier
+            status is None for monitors that are new and the current status is
+            None for monitors that were removed.
+
+        :type previous: StatusSnapshot
+        :rtype:         list of tuples
+
+        """
+
+        monitor_ids = self.__monitor_ids
+        statuses = self.__statuses
+        previous_monitor_ids = previous.monitor_ids
+        previous_statuses = previous.statuses
+        by_value = MONITOR_STATUS.by_value
+
+        result = list()
+        if monitor_ids == previous_monitor_ids:
+            if statuses != previous_statuses:
+                difference = (
+                      int.from_bytes(statuses, 'little')
+                    ^ int.from_bytes(previous_statuses, 'little')
+                ).to_bytes(len(statuses), 'little')
+
+                for match in DIFFERENCE_PATTERN.finditer(difference):
+                    index = match.start()
+                    result.append(
+                        (
+                            monitor_ids[index],
+                            by_value(previous_statuses[index]),
+                            by_value(statuses[index])
+                        )
+                    )
+        else:
+            index = 0
+            previous_index = 0
+            number_monitors = len(monitor_ids)
+            number_previous = len(previous_monitor_ids)
+            while index < number_monitors or previous_index < number_previous:
+                if previous_index >= number_previous:
+                    monitor_id = monitor_ids[index]
+                    previous_monitor_id = None
+                elif index >= number_monitors:
+                    monitor_id = None
+                    previous_monitor_id = previous_monitor_ids[previous_index]
+                else:
+                    monitor_id = monitor_ids[index]
+                    previous_monitor_id = previous_monitor_ids[previous_index]
+
+                if    previous_monitor_id is None                       \
+                   or (    monitor_id is not None
+                       and monitor_id < previous_monitor_id
+                      )                                                   :
+                    result.append(
+                        ( monitor_id, None, by_value(statuses[index]) )
+                    )
+                    index += 1
+                elif    monitor_id is None                              \
+                     or previous_monitor_id < monitor_id                  :
+                    result.append(
+                        (
+                            previous_monitor_id,
+                            by_value(previous_statuses[previous_index]),
+                            None
+                        )
+                    )
+                    previous_index += 1
+                else:
+                    if statuses[index] != previous_statuses[previous_index]:
+                        result.append(
+                            (
+                                monitor_id,
+                                by_value(previous_statuses[previous_index]),
+                                by_value(statuses[index])
+                            )
+                        )
+
+                    index += 1
+                    previous_index += 1
+
+        return result
+
 ###############################################################################
 # Class Events:
 #
@@ -225,7 +565,7 @@ class Events(object):
 
     """
 
-    def __init__(self, rest_api, secret):
+    def __init__(self, rest_api, secret, batch_reports = None):
         """
         Method that initializes the Events class.
 
@@ -235,8 +575,14 @@ class Events(object):
         :param secret:
             The secret to be used.
 
-        :type server: outbound_rest_api_v1.Server
-        :type secret: bytes
+        :param batch_reports:
+            If True, report_many sends reports in event/report_batch
+            requests.  Only enable this for servers that provide the slug.  A
+            value of None selects the configured setting.
+
+        :type server:        outbound_rest_api_v1.Server
+        :type secret:        bytes
+        :type batch_reports: bool or None
 
         """
 
@@ -245,6 +591,11 @@ class Events(object):
         self.__rest_api = rest_api
         self.__secret = secret
 
+        if batch_reports is not None:
+            self.__batch_reports = bool(batch_reports)
+        else:
+            self.__batch_reports = report_batching()
+
 
     def report(
         self,
@@ -262,7 +613,8 @@ class Events(object):
             The ID of the monitor that triggered this event.
 
         :param page_hash:
-            The page hash for the content that triggered this event.
+            The page hash for the content that triggered this event.  Hashes
+            already held in encoded form are sent without being re-encoded.
 
         :param event_type:
             The type of event detected.
@@ -280,7 +632,7 @@ class Events(object):
             Returns True on success or False on error.
 
         :type monitor_id:     int
-        :type page_hash:      bytes
+        :type page_hash:      bytes or EncodedBytes
         :type timestamp:      int
         :type event_type:     EVENT_TYPE enumerated value
         :type monitor_status: MONITOR_STATUS enumerated value
@@ -291,14 +643,14 @@ class Events(object):
         response = self.__rest_api.post_message(
             slug = "event/report",
             secret = self.__secret,
-            message = {
-                'monitor_id' : int(monitor_id),
-                'hash' : base64.b64encode(page_hash).decode('utf-8'),
-                'message' : message,
-                'event_type' : str(event_type).lower(),
-                'monitor_status' : str(monitor_status).lower(),
-                'timestamp' : int(timestamp)
-            }
+            message = self.__report_message(
+                monitor_id,
+                page_hash,
+                event_type,
+                monitor_status,
+                message,
+                timestamp
+            )
         )
 
         return (
@@ -308,6 +660,65 @@ class Events(object):
         )
 
 
+    def report_many(self, reports, workers = DEFAULT_REPORT_WORKERS):
+        """
+        Method you can use to report many events at once.
+
+        If batch reports are enabled, the reports are sent in a single
+        event/report_batch request and are applied by the server in the order
+        provided.  A failed batch request is not retried since the server may
+        already have applied it.
+
+        Otherwise reports are sent individually, grouped by monitor.  Reports
+        for different monitors are sent concurrently while reports for the
+        same monitor are sent one at a time in the order provided.
+
+        :param reports:
+            An iterable of tuples.  Each tuple holds the monitor ID, page hash,
+            event type, monitor status, message, and timestamp, in the order
+            accepted by the report method.
+
+        :param workers:
+            The maximum number of monitors whose reports are sent at the same
+            time when reports are sent individually.
+
+        :return:
+            Returns a list holding True or False for each report, in the order
+            provided.
+
+        :type reports: iterable
+        :type workers: int
+        :rtype:        list of bool
+
+        """
+
+        reports = list(reports)
+        if not reports:
+            result = list()
+        elif not self.__batch_reports:
+            result = self.__report_individually(reports, workers)
+        else:
+            response = self.__rest_api.post_message(
+                slug = "event/report_batch",
+                secret = self.__secret,
+                message = {
+                    'reports' : [
+                        self.__report_message(*report) for report in reports
+                    ]
+                }
+            )
+
+            if response is not None                                 and \
+               response.get('status') == 'OK'                       and \
+               isinstance(response.get('results'), list)            and \
+               len(response['results']) == len(reports)                 :
+                result = [ bool(r) for r in response['results'] ]
+            else:
+                result = [ False ] * len(reports)
+
+        return result
+
+
     def status(self, customer_id = None, monitor_id = None):
         """
         Method you can use to get the status of one or more monitors.
@@ -343,11 +754,13 @@ class Events(object):
             message = message
         )
 
+        build_start_time = metrics.timer()
+
         if response is not None and 'status' in response:
             status = response['status']
             if status == 'OK' and 'monitors' in response:
                 monitor_status = response['monitors']
-                result = { int(i) : MONITOR_STATUS.by_name(k.upper())
+                result = { int(i) : MONITOR_STATUS.by_name(k)
                            for i, k in monitor_status.items()
                          }
             else:
@@ -355,6 +768,12 @@ class Events(object):
         else:
             result = None
 
+        metrics.elapsed(
+            "event/status",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
         return result
 
 
@@ -395,6 +814,65 @@ class Events(object):
 
         """
 
+        events = self.iter_get(
+            customer_id,
+            monitor_id,
+            start_timestamp,
+            end_timestamp
+        )
+
+        if events is not None:
+            try:
+                result = list(events)
+            except ValueError:
+                result = None
+        else:
+            result = None
+
+        return result
+
+
+    def iter_get(
+        self,
+        customer_id = None,
+        monitor_id = None,
+        start_timestamp = None,
+        end_timestamp = None
+        ):
+        """
+        Method you can use to iterate over events as they are received.
+        Unlike get, events are not accumulated in memory.
+
+        :param customer_id:
+            The customer ID to get events for.  The provided monitor_id
+            parameter must be None if this parameter is set.
+
+        :param monitor_id:
+            The monitor ID to get events for.  The provided customer_id
+            parameter must be None if this parameter is set.
+
+        :param start_timestamp:
+            The starting Unix timestamp to get information over.  Values are
+            inclusive.  A value of None indicates all values.
+
+        :param end_timestamp:
+            The ending Unix timestamp to get information over.  Values are
+            inclusive.  A value of None indicates now.
+
+        :return:
+            Returns an iterator over Event entries or None if the request
+            failed.  Entries that can not be parsed are reported as None.
+            Iteration raises a ValueError if the response is malformed or
+            reports an error.
+
+        :type customer_id:     int or None
+        :type monitor_id:      int or None
+        :type start_timestamp: int or None
+        :type end_timestamp:   int or None
+        :rtype:                iterator or None
+
+        """
+
         message = dict()
         if customer_id is not None:
             message['customer_id'] = int(customer_id)
@@ -408,58 +886,388 @@ class Events(object):
         if end_timestamp is not None:
             message['end_timestamp'] = int(end_timestamp)
 
-
-        response = self.__rest_api.post_message(
+        stream = self.__rest_api.post_message_stream(
             slug = "event/get",
             secret = self.__secret,
-            message = message
+            message = message,
+            containers = ( 'events', )
         )
 
-        if response is not None and 'status' in response:
-            status = response['status']
-            if status == 'OK' and 'events' in response:
-                events_data = response['events']
-                result = list()
-                for event_data in events_data:
-                    event = self.__parse_event(event_data)
-                    result.append(event)
-            else:
-                result = None
+        if stream is not None:
+            result = self.__iter_stream(stream)
         else:
             result = None
 
         return result
 
 
-    def __parse_event(self, event_data):
+    def snapshot(self, customer_id = None, monitor_id = None):
         """
-        Method used internally to parse an event.
+        Method you can use to get the status of one or more monitors as a
+        compact snapshot.
 
-        :param event_data:
-            A dictionary holding the returned event data.
+        :param customer_id:
+            The customer ID to get status for.  The provided monitor_id
+            parameter must be None if this parameter is set.
+
+        :param monitor_id:
+            The monitor ID to get status for.  The provided customer_id
+            parameter must be None if this parameter is set.
 
         :return:
-            Returns an Event instance or None on error.
+            Returns the status snapshot.  A value of None is returned on
+            error.
 
-        :type event_data: dict
-        :rtype:           Event or None
+        :type customer_id: int or None
+        :type monitor_id:  int or None
+        :rtype:            StatusSnapshot or None
 
         """
 
-        try:
-            event_id = int(event_data['event_id'])
-            monitor_id = int(event_data['monitor_id'])
-            customer_id = int(event_data['customer_id'])
-            timestamp = int(event_data['timestamp'])
-            event_type = EVENT_TYPE.by_name(event_data['event_type'].upper())
-        except:
-            event_id = None
-            monitor_id = None
-            timestamp = None
-            event_type = None
+        message = dict()
+        if customer_id is not None:
+            message['customer_id'] = int(customer_id)
 
-        if event_id is not None:
-            result = Event(
+        if monitor_id is not None:
+            message['monitor_id'] = int(monitor_id)
+
+        response = self.__rest_api.post_message(
+            slug = "event/status",
+            secret = self.__secret,
+            message = message
+        )
+
+        build_start_time = metrics.timer()
+
+        if     response is not None             \
+           and response.get('status') == 'OK'   \
+           and 'monitors' in response             :
+            status_values = {
+                str(value).lower() : value.value for value in MONITOR_STATUS
+            }
+            unknown = MONITOR_STATUS.UNKNOWN.value
+
+            try:
+                entries = sorted(
+                    ( int(i), status_values.get(k.lower(), unknown) )
+                    for i, k in response['monitors'].items()
+                )
+            except (ValueError, AttributeError):
+                entries = None
+
+            if entries is not None:
+                result = StatusSnapshot(
+                    array.array('q', ( entry[0] for entry in entries )),
+                    bytes( entry[1] for entry in entries )
+                )
+            else:
+                result = None
+        else:
+            result = None
+
+        metrics.elapsed(
+            "event/status",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
+        return result
+
+
+    def watch(
+        self,
+        customer_id = None,
+        monitor_id = None,
+        minimum_interval = DEFAULT_MINIMUM_POLL_INTERVAL,
+        maximum_interval = DEFAULT_MAXIMUM_POLL_INTERVAL
+        ):
+        """
+        Generator you can use to watch for monitor status changes.  The
+        generator polls for a status snapshot and compares it against the
+        previous one.  The first poll compares against an empty snapshot so
+        every monitor is reported.  The time between polls grows while no
+        status changes and returns to the minimum interval once it does.
+
+        :param customer_id:
+            The customer ID to watch.  A value of None watches all customers.
+
+        :param monitor_id:
+            The monitor ID to watch.  A value of None watches all monitors.
+
+        :param minimum_interval:
+            The shortest time, in seconds, between polls.
+
+        :param maximum_interval:
+            The longest time, in seconds, between polls.
+
+        :return:
+            Yields a list of transitions, as returned by
+            StatusSnapshot.transitions, after each poll.  None is yielded if
+            a poll fails.
+
+        :type customer_id:      int or None
+        :type monitor_id:       int or None
+        :type minimum_interval: float
+        :type maximum_interval: float
+
+        """
+
+        previous = StatusSnapshot()
+        interval = minimum_interval
+        while True:
+            current = self.snapshot(
+                customer_id = customer_id,
+                monitor_id = monitor_id
+            )
+
+            if current is not None:
+                changes = current.transitions(previous)
+                previous = current
+            else:
+                changes = None
+
+            yield changes
+
+            if changes:
+                interval = minimum_interval
+            else:
+                interval = min(interval * POLL_BACKOFF, maximum_interval)
+
+            time.sleep(interval)
+
+
+    def follow(
+        self,
+        customer_id = None,
+        monitor_id = None,
+        start_timestamp = None,
+        minimum_interval = DEFAULT_MINIMUM_POLL_INTERVAL,
+        maximum_interval = DEFAULT_MAXIMUM_POLL_INTERVAL
+        ):
+        """
+        Generator you can use to follow events as they are reported.  Each
+        poll only requests events at or after the newest event already seen.
+        The time between polls is reset to the minimum interval when new
+        events arrive and grows towards the maximum interval while none do.
+
+        :param customer_id:
+            The customer ID to get events for.  The provided monitor_id
+            parameter must be None if this parameter is set.
+
+        :param monitor_id:
+            The monitor ID to get events for.  The provided customer_id
+            parameter must be None if this parameter is set.
+
+        :param start_timestamp:
+            The Unix timestamp of the oldest event to be reported.  A value of
+            None indicates all events.
+
+        :param minimum_interval:
+            The shortest time between polls, in seconds.
+
+        :param maximum_interval:
+            The longest time between polls, in seconds.
+
+        :return:
+            Yields a list of new Event instances after each poll.  None is
+            yielded if a poll failed.  The generator never completes.
+
+        :type customer_id:      int or None
+        :type monitor_id:       int or None
+        :type start_timestamp:  int or None
+        :type minimum_interval: float
+        :type maximum_interval: float
+
+        """
+
+        cursor = EventCursor(start_timestamp)
+        interval = minimum_interval
+        while True:
+            event_iterator = self.iter_get(
+                customer_id = customer_id,
+                monitor_id = monitor_id,
+                start_timestamp = cursor.timestamp
+            )
+
+            if event_iterator is not None:
+                try:
+                    new_events = cursor.advance(event_iterator)
+                except ValueError:
+                    new_events = None
+            else:
+                new_events = None
+
+            yield new_events
+
+            if new_events:
+                interval = minimum_interval
+            else:
+                interval = min(interval * POLL_BACKOFF, maximum_interval)
+
+            time.sleep(interval)
+
+
+    def __report_message(
+        self,
+        monitor_id,
+        page_hash,
+        event_type,
+        monitor_status,
+        message,
+        timestamp
+        ):
+        """
+        Method used internally to build the message describing a single event
+        report.
+
+        :param monitor_id:
+            The ID of the monitor that triggered this event.
+
+        :param page_hash:
+            The page hash for the content that triggered this event.
+
+        :param event_type:
+            The type of event detected.
+
+        :param monitor_status:
+            The current monitor status.
+
+        :param message:
+            An optional message to be sent.
+
+        :param timestamp:
+            The Unix timestamp indicating when the event occurred.
+
+        :return:
+            Returns the report message.
+
+        :type monitor_id:     int
+        :type page_hash:      bytes or EncodedBytes
+        :type event_type:     EVENT_TYPE enumerated value
+        :type monitor_status: MONITOR_STATUS enumerated value
+        :type message:        str
+        :type timestamp:      int
+        :rtype:               dict
+
+        """
+
+        return {
+            'monitor_id' : int(monitor_id),
+            'hash' : encoded_bytes.encoded(page_hash),
+            'message' : message,
+            'event_type' : str(event_type).lower(),
+            'monitor_status' : str(monitor_status).lower(),
+            'timestamp' : int(timestamp)
+        }
+
+
+    def __report_individually(self, reports, workers):
+        """
+        Method used internally to send reports one event at a time.  Reports
+        for different monitors are sent concurrently while reports for the
+        same monitor are sent in the order provided.
+
+        :param reports:
+            A list of report tuples, in the order accepted by the report
+            method.
+
+        :param workers:
+            The maximum number of monitors whose reports are sent at the same
+            time.
+
+        :return:
+            Returns a list holding True or False for each report, in the order
+            provided.
+
+        :type reports: list
+        :type workers: int
+        :rtype:        list of bool
+
+        """
+
+        by_monitor = dict()
+        for index, report in enumerate(reports):
+            by_monitor.setdefault(int(report[0]), list()).append(index)
+
+        result = [ False ] * len(reports)
+
+        def send(indexes):
+            for index in indexes:
+                result[index] = self.report(*reports[index])
+
+        if len(by_monitor) <= 1 or workers <= 1:
+            for indexes in by_monitor.values():
+                send(indexes)
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                    min(workers, len(by_monitor))
+                ) as pool:
+                for future in [
+                        pool.submit(send, indexes)
+                        for indexes in by_monitor.values()
+                    ]:
+                    future.result()
+
+        return result
+
+
+    def __iter_stream(self, stream):
+        """
+        Generator used internally to parse a streamed event list.
+
+        :param stream:
+            The streamed response.
+
+        :return:
+            Yields Event instances.
+
+        :type stream: json_stream.JsonStream
+
+        """
+
+        build_stopwatch = metrics.Stopwatch("event/get", metrics.BUILD_TIME)
+        try:
+            for container, index, event_data in stream:
+                with build_stopwatch:
+                    event = self.__parse_event(event_data)
+
+                yield event
+
+            if stream.status != 'OK' or not stream.found('events'):
+                raise ValueError("Invalid event list response")
+        finally:
+            build_stopwatch.record()
+
+
+    def __parse_event(self, event_data):
+        """
+        Method used internally to parse an event.
+
+        :param event_data:
+            A dictionary holding the returned event data.
+
+        :return:
+            Returns an Event instance or None on error.
+
+        :type event_data: dict
+        :rtype:           Event or None
+
+        """
+
+        try:
+            event_id = int(event_data['event_id'])
+            monitor_id = int(event_data['monitor_id'])
+            customer_id = int(event_data['customer_id'])
+            timestamp = int(event_data['timestamp'])
+            event_type = EVENT_TYPE.by_name(event_data['event_type'])
+        except:
+            event_id = None
+            monitor_id = None
+            timestamp = None
+            event_type = None
+
+        if event_id is not None:
+            result = Event(
                 event_id,
                 monitor_id,
                 customer_id,
@@ -471,6 +1279,343 @@ class Events(object):
 
         return result
 
+###############################################################################
+# Class EventBatcher:
+#
+
+class EventBatcher(object):
+    """
+    Class that buffers event reports and sends them from a background thread.
+    Buffered reports are flushed once enough have accumulated or once the
+    oldest has waited long enough.  Each batch is sent in a single request
+    and batches are sent one after another so reports for each monitor reach
+    the server in the order they were made.
+
+    """
+
+    def __init__(
+        self,
+        events,
+        batch_size = DEFAULT_BATCH_SIZE,
+        flush_interval = DEFAULT_FLUSH_INTERVAL,
+        workers = DEFAULT_REPORT_WORKERS
+        ):
+        """
+        Method that initializes the EventBatcher class.
+
+        :param events:
+            The Events instance used to send reports.
+
+        :param batch_size:
+            The number of buffered reports that will trigger a flush.
+
+        :param flush_interval:
+            The longest time, in seconds, a buffered report will wait before
+            being sent.
+
+        :param workers:
+            The maximum number of monitors whose reports are sent at the same
+            time.
+
+        :type events:         Events
+        :type batch_size:     int
+        :type flush_interval: float
+        :type workers:        int
+
+        """
+
+        super().__init__()
+
+        self.__events = events
+        self.__batch_size = max(1, int(batch_size))
+        self.__flush_interval = float(flush_interval)
+        self.__workers = workers
+
+        self.__condition = threading.Condition()
+        self.__pending = list()
+        self.__oldest = None
+        self.__in_flight = 0
+        self.__flush_requested = False
+        self.__closed = False
+
+        self.__number_sent = 0
+        self.__number_failed = 0
+
+        self.__thread = threading.Thread(target = self.__run, daemon = True)
+        self.__thread.start()
+
+
+    def __enter__(self):
+        """
+        Method that allows the batcher to be used as a context manager.
+
+        :return:
+            Returns this batcher.
+
+        :rtype: EventBatcher
+
+        """
+
+        return self
+
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        """
+        Method that sends every queued report and stops the background thread
+        when the context exits.
+
+        :param exception_type:
+            The type of the exception raised in the context or None.
+
+        :param exception_value:
+            The exception raised in the context or None.
+
+        :param traceback:
+            The traceback of the exception raised in the context or None.
+
+        :type exception_type:  type or None
+        :type exception_value: Exception or None
+        :type traceback:       traceback or None
+
+        """
+
+        self.close()
+
+
+    @property
+    def number_sent(self):
+        """
+        Read-only property holding the number of reports accepted by the
+        server.
+
+        :type: int
+
+        """
+
+        with self.__condition:
+            return self.__number_sent
+
+
+    @property
+    def number_failed(self):
+        """
+        Read-only property holding the number of reports that could not be
+        sent.
+
+        :type: int
+
+        """
+
+        with self.__condition:
+            return self.__number_failed
+
+
+    def report(
+        self,
+        monitor_id,
+        page_hash,
+        event_type,
+        monitor_status,
+        message,
+        timestamp = None
+        ):
+        """
+        Method you can use to queue a new event report.
+
+        :param monitor_id:
+            The ID of the monitor that triggered this event.
+
+        :param page_hash:
+            The page hash for the content that triggered this event.  Hashes
+            already held in encoded form are sent without being re-encoded.
+
+        :param event_type:
+            The type of event detected.
+
+        :param monitor_status:
+            The current monitor status.
+
+        :param message:
+            An optional message to be sent.
+
+        :param timestamp:
+            The Unix timestamp indicating when the event occurred.  A value of
+            None indicates the current time.
+
+        :raises ValueError:
+            Raised if the batcher has been closed.
+
+        :type monitor_id:     int
+        :type page_hash:      bytes or EncodedBytes
+        :type event_type:     EVENT_TYPE enumerated value
+        :type monitor_status: MONITOR_STATUS enumerated value
+        :type message:        str
+        :type timestamp:      int or None
+
+        """
+
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        with self.__condition:
+            if self.__closed:
+                raise ValueError("Event batcher is closed")
+
+            queued_time = time.monotonic()
+            if not self.__pending:
+                self.__oldest = queued_time
+
+            self.__pending.append(
+                (
+                    queued_time,
+                    (
+                        monitor_id,
+                        page_hash,
+                        event_type,
+                        monitor_status,
+                        message,
+                        timestamp
+                    )
+                )
+            )
+
+            if    len(self.__pending) == 1                    \
+               or len(self.__pending) >= self.__batch_size      :
+                self.__condition.notify_all()
+
+
+    def flush(self):
+        """
+        Method that sends every queued report and waits for them to complete.
+
+        :return:
+            Returns True if every report sent so far was accepted.
+
+        :rtype: bool
+
+        """
+
+        with self.__condition:
+            self.__flush_requested = True
+            self.__condition.notify_all()
+            while self.__pending or self.__in_flight:
+                self.__condition.wait()
+
+            self.__flush_requested = False
+            return self.__number_failed == 0
+
+
+    def close(self):
+        """
+        Method that sends every queued report and stops the background thread.
+
+        :return:
+            Returns True if every report was accepted.
+
+        :rtype: bool
+
+        """
+
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+        self.__thread.join()
+
+        with self.__condition:
+            return self.__number_failed == 0
+
+
+    def __run(self):
+        """
+        Method used internally by the background thread to send batches.
+
+        """
+
+        while True:
+            with self.__condition:
+                while True:
+                    if self.__pending:
+                        remaining = (
+                              self.__oldest
+                            + self.__flush_interval
+                            - time.monotonic()
+                        )
+
+                        if    self.__closed                               \
+                           or self.__flush_requested                      \
+                           or len(self.__pending) >= self.__batch_size    \
+                           or remaining <= 0                                :
+                            break
+
+                        self.__condition.wait(remaining)
+                    elif self.__closed:
+                        return
+                    else:
+                        self.__condition.wait()
+
+                batch = [
+                    report for queued_time, report
+                    in self.__pending[:self.__batch_size]
+                ]
+                del self.__pending[:self.__batch_size]
+                if self.__pending:
+                    self.__oldest = self.__pending[0][0]
+                else:
+                    self.__oldest = None
+
+                self.__in_flight = len(batch)
+
+            try:
+                results = self.__events.report_many(batch, self.__workers)
+            except Exception:
+                results = [ False ] * len(batch)
+
+            with self.__condition:
+                number_sent = sum(1 for r in results if r)
+                self.__number_sent += number_sent
+                self.__number_failed += len(batch) - number_sent
+                self.__in_flight = 0
+                self.__condition.notify_all()
+
+###############################################################################
+# Functions:
+#
+
+def configure(configuration):
+    """
+    Function that configures event reporting from the "events" section of the
+    configuration.  The section is optional and may contain:
+
+        "batch_reports" - True if the server provides the event/report_batch
+                          slug.  Defaults to False.
+
+    :param configuration:
+        The parsed configuration.
+
+    :type configuration: dict
+
+    """
+
+    global __batch_reports
+
+    events_configuration = configuration.get('events', dict())
+    __batch_reports = bool(events_configuration.get('batch_reports', False))
+
+
+def report_batching():
+    """
+    Function that indicates if event reports are sent in batches by default.
+
+    :return:
+        Returns True if the configuration enables batch reports.
+
+    :rtype: bool
+
+    """
+
+    return __batch_reports
+
 ###############################################################################
 # Main:
 #
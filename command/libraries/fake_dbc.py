@@ -0,0 +1,1987 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+# 
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#   
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#   
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that provides a local, in-process stand-in for the database
+controller (DBC).  The stand-in implements the authentication and time delta
+protocol used by outbound_rest_api_v1 and the slugs used by the facades in
+this package, backed by synthetic fleet data.  Latency and error rates can be
+injected so client behavior can be benchmarked reproducibly without access to
+a real DBC.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import sys
+import time
+import struct
+import hashlib
+import hmac
+import json
+import base64
+import random
+import threading
+import urllib.parse
+import http.server
+
+from .rest_api_common_v1 import *
+
+###############################################################################
+# Globals:
+#
+
+TIMESTAMP_OFFSET = 1609484400
+"""
+Offset applied to timestamps in binary latency records.
+
+"""
+
+LATENCY_RECORD_HEADER_SIZE = 64
+"""
+The size of the header of a binary latency record message, in bytes.
+
+"""
+
+LATENCY_RECORD_ENTRY_SIZE = 12
+"""
+The size of each entry in a binary latency record message, in bytes.
+
+"""
+
+SERVER_STATUS_CODES = ( 'all_unknown', 'active', 'inactive', 'defunct' )
+"""
+Server status names indexed by the status code used in latency records.
+
+"""
+
+CUSTOMER_FEATURES = (
+    'multi_region_checking',
+    'supports_wordpress',
+    'supports_rest_api',
+    'supports_content_checking',
+    'supports_keyword_checking',
+    'supports_post_method',
+    'supports_latency_tracking',
+    'supports_ssl_expiration_checking',
+    'supports_ping_based_polling',
+    'supports_blacklist_checking',
+    'supports_domain_expiration_checking',
+    'supports_maintenance_mode',
+    'supports_rollups'
+)
+"""
+Boolean customer settings.
+
+"""
+
+REGION_NAMES = (
+    'us-east',
+    'us-west',
+    'eu-central',
+    'eu-west',
+    'ap-southeast',
+    'ap-northeast',
+    'sa-east',
+    'af-south'
+)
+"""
+Names used for synthetic regions.
+
+"""
+
+BLANK_IMAGE = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9Q"
+    "DwADhgGAWjR9awAAAABJRU5ErkJggg=="
+)
+"""
+A 1x1 PNG image returned by the plot slugs.
+
+"""
+
+UNKNOWN_USER_ORDERING = 0xFFFF
+"""
+User ordering value reported for errors not tied to a single monitor.
+
+"""
+
+###############################################################################
+# Class Fleet:
+#
+
+class Fleet(object):
+    """
+    Class that holds synthetic fleet data.  All data is held in the same
+    dictionary layout used on the wire so responses can be built cheaply.
+    The data is generated from a seed so runs are reproducible.
+
+    """
+
+    def __init__(
+        self,
+        number_regions = 3,
+        servers_per_region = 4,
+        number_customers = 100,
+        monitors_per_customer = 10,
+        number_events = 1000,
+        number_latency_entries = 10000,
+        seed = 0
+        ):
+        """
+        Method that initializes the Fleet class.
+
+        :param number_regions:
+            The number of regions to create.
+
+        :param servers_per_region:
+            The number of polling servers in each region.
+
+        :param number_customers:
+            The number of customers to create.
+
+        :param monitors_per_customer:
+            The number of monitors assigned to each customer.
+
+        :param number_events:
+            The number of historical events to create.
+
+        :param number_latency_entries:
+            The number of latency entries to create.
+
+        :param seed:
+            The random number seed used to generate the data.
+
+        :type number_regions:         int
+        :type servers_per_region:     int
+        :type number_customers:       int
+        :type monitors_per_customer:  int
+        :type number_events:          int
+        :type number_latency_entries: int
+        :type seed:                   int
+
+        """
+
+        super().__init__()
+
+        self.__rng = random.Random(seed)
+        self.__now = int(time.time())
+
+        self.regions = dict()
+        self.servers = dict()
+        self.customers = dict()
+        self.customer_secrets = dict()
+        self.mappings = dict()
+        self.host_schemes = dict()
+        self.monitors = dict()
+        self.events = list()
+        self.latencies = list()
+        self.resources = dict()
+
+        self.__next_ids = dict()
+
+        self.__create_regions(number_regions, servers_per_region)
+        self.__create_customers(number_customers, monitors_per_customer)
+        self.__create_events(number_events)
+        self.__create_latencies(number_latency_entries)
+        self.__update_service_rates()
+
+
+    def next_id(self, kind):
+        """
+        Method that allocates a new ID.
+
+        :param kind:
+            The kind of ID to allocate, for example "server".
+
+        :return:
+            Returns the new ID.
+
+        :type kind: str
+        :rtype:     int
+
+        """
+
+        result = self.__next_ids.get(kind, 1)
+        self.__next_ids[kind] = result + 1
+        return result
+
+
+    def create_customer(self, customer_id, settings):
+        """
+        Method that creates or updates a customer.
+
+        :param customer_id:
+            The customer ID.
+
+        :param settings:
+            A dictionary of customer settings.
+
+        :return:
+            Returns the customer data.
+
+        :type customer_id: int
+        :type settings:    dict
+        :rtype:            dict
+
+        """
+
+        customer = self.customers.get(customer_id)
+        if customer is None:
+            customer = {
+                'customer_id' : customer_id,
+                'maximum_number_monitors' : 20,
+                'polling_interval' : 60,
+                'expiration_days' : 30,
+                'customer_active' : True,
+                'paused' : False
+            }
+            for feature in CUSTOMER_FEATURES:
+                customer[feature] = False
+
+            self.customers[customer_id] = customer
+            self.customer_secrets[customer_id] = (
+                "C%08X"%customer_id,
+                bytes(self.__rng.getrandbits(8) for i in range(SECRET_LENGTH))
+            )
+            self.__next_ids['customer'] = max(
+                self.__next_ids.get('customer', 1),
+                customer_id + 1
+            )
+
+        for key, value in settings.items():
+            if key in customer and key != 'customer_id':
+                customer[key] = value
+
+        return customer
+
+
+    def add_region(self, number_servers, region_name = None):
+        """
+        Method that adds a region with active servers.  Existing customers
+        are not mapped to the new region's servers.
+
+        :param number_servers:
+            The number of servers to add to the region.
+
+        :param region_name:
+            The region name.  A name is generated if None.
+
+        :return:
+            Returns the new region ID.
+
+        :type number_servers: int
+        :type region_name:    str or None
+        :rtype:               int
+
+        """
+
+        region_id = self.next_id('region')
+        if region_name is None:
+            region_index = region_id - 1
+            region_name = REGION_NAMES[region_index % len(REGION_NAMES)]
+            if region_index >= len(REGION_NAMES):
+                region_name += "-%d"%(region_index // len(REGION_NAMES) + 1)
+
+        self.regions[region_id] = region_name
+        for server_index in range(number_servers):
+            server_id = self.next_id('server')
+            self.servers[server_id] = {
+                'server_id' : server_id,
+                'region_id' : region_id,
+                'identifier' : "10.%d.%d.%d"%(
+                    region_id,
+                    server_id // 256,
+                    server_id % 256
+                ),
+                'server_status' : 'active',
+                'monitor_service_rate' : 0.0,
+                'cpu_loading' : round(self.__rng.uniform(0.1, 0.6), 3),
+                'memory_loading' : round(self.__rng.uniform(0.2, 0.5), 3)
+            }
+
+        return region_id
+
+
+    def remove_customer(self, customer_id):
+        """
+        Method that removes a customer and all data tied to the customer.
+
+        :param customer_id:
+            The customer ID.
+
+        :return:
+            Returns True if the customer existed.  Returns False if the
+            customer did not exist.
+
+        :type customer_id: int
+        :rtype:            bool
+
+        """
+
+        result = self.customers.pop(customer_id, None) is not None
+        self.customer_secrets.pop(customer_id, None)
+        self.mappings.pop(customer_id, None)
+        self.resources.pop(customer_id, None)
+
+        for monitor_id in [
+                k for k,v in self.monitors.items()
+                if v['customer_id'] == customer_id
+            ]:
+            del self.monitors[monitor_id]
+
+        for host_scheme_id in [
+                k for k,v in self.host_schemes.items()
+                if v['customer_id'] == customer_id
+            ]:
+            del self.host_schemes[host_scheme_id]
+
+        return result
+
+
+    def __create_regions(self, number_regions, servers_per_region):
+        """
+        Method that creates regions and servers.
+
+        :param number_regions:
+            The number of regions to create.
+
+        :param servers_per_region:
+            The number of servers per region.
+
+        :type number_regions:     int
+        :type servers_per_region: int
+
+        """
+
+        for region_index in range(number_regions):
+            self.add_region(servers_per_region)
+
+
+    def __create_customers(self, number_customers, monitors_per_customer):
+        """
+        Method that creates customers, their mappings, host/schemes, and
+        monitors.
+
+        :param number_customers:
+            The number of customers to create.
+
+        :param monitors_per_customer:
+            The number of monitors per customer.
+
+        :type number_customers:      int
+        :type monitors_per_customer: int
+
+        """
+
+        rng = self.__rng
+        servers_by_region = dict()
+        for server in self.servers.values():
+            servers_by_region.setdefault(server['region_id'], list()).append(
+                server['server_id']
+            )
+
+        for customer_index in range(number_customers):
+            customer_id = self.next_id('customer')
+            settings = {
+                'maximum_number_monitors' : max(20, monitors_per_customer),
+                'polling_interval' : rng.choice(( 60, 120, 300 )),
+                'expiration_days' : rng.choice(( 30, 90, 365 )),
+                'customer_active' : rng.random() < 0.95,
+                'paused' : rng.random() < 0.05
+            }
+            for feature in CUSTOMER_FEATURES:
+                settings[feature] = rng.random() < 0.5
+
+            self.create_customer(customer_id, settings)
+
+            if servers_by_region:
+                if settings['multi_region_checking']:
+                    servers = [
+                        rng.choice(s) for s in servers_by_region.values()
+                    ]
+                else:
+                    region_id = rng.choice(list(servers_by_region.keys()))
+                    servers = [ rng.choice(servers_by_region[region_id]) ]
+
+                self.mappings[customer_id] = {
+                    'primary_server' : servers[0],
+                    'servers' : servers
+                }
+
+            host_scheme_id = self.next_id('host_scheme')
+            self.host_schemes[host_scheme_id] = {
+                'host_scheme_id' : host_scheme_id,
+                'customer_id' : customer_id,
+                'url' : "https://customer%d.example.com"%customer_id,
+                'ssl_expiration_timestamp' : self.__now + rng.randint(
+                    86400,
+                    365 * 86400
+                )
+            }
+
+            for user_ordering in range(monitors_per_customer):
+                monitor_id = self.next_id('monitor')
+                if rng.random() < 0.2:
+                    content_check_mode = 'all_keywords'
+                    keywords = [
+                        base64.b64encode(
+                            ("keyword%d"%rng.randint(0, 999)).encode('utf-8')
+                        ).decode('utf-8')
+                        for i in range(rng.randint(1, 4))
+                    ]
+                else:
+                    content_check_mode = rng.choice(
+                        ( 'no_check', 'content_match', 'smart_content_match' )
+                    )
+                    keywords = list()
+
+                if rng.random() < 0.1:
+                    method = 'post'
+                    post_content_type = 'JSON'
+                    post_content = base64.b64encode(
+                        json.dumps({ 'monitor' : monitor_id }).encode('utf-8')
+                    ).decode('utf-8')
+                else:
+                    method = 'get'
+                    post_content_type = 'TEXT'
+                    post_content = ""
+
+                self.monitors[monitor_id] = {
+                    'monitor_id' : monitor_id,
+                    'customer_id' : customer_id,
+                    'host_scheme_id' : host_scheme_id,
+                    'user_ordering' : user_ordering,
+                    'path' : "/page/%d"%user_ordering,
+                    'method' : method,
+                    'content_check_mode' : content_check_mode,
+                    'keywords' : keywords,
+                    'post_content_type' : post_content_type,
+                    'post_user_agent' : "",
+                    'post_content' : post_content
+                }
+
+
+    def __create_events(self, number_events):
+        """
+        Method that creates historical events.  Each monitor alternates
+        between failing and working so outage analysis has realistic data.
+
+        :param number_events:
+            The number of events to create.
+
+        :type number_events: int
+
+        """
+
+        monitor_ids = list(self.monitors.keys())
+        if monitor_ids:
+            rng = self.__rng
+            failed = set()
+            timestamp = self.__now - 7 * 86400
+            step = max(1, int(7 * 86400 / max(1, number_events)))
+            for i in range(number_events):
+                monitor_id = rng.choice(monitor_ids)
+                if monitor_id in failed:
+                    failed.discard(monitor_id)
+                    event_type = 'working'
+                else:
+                    failed.add(monitor_id)
+                    event_type = rng.choice(
+                        ( 'no_response', 'no_response', 'content_changed' )
+                    )
+
+                timestamp += rng.randint(1, 2 * step)
+                self.events.append({
+                    'event_id' : self.next_id('event'),
+                    'monitor_id' : monitor_id,
+                    'customer_id' : self.monitors[monitor_id]['customer_id'],
+                    'timestamp' : timestamp,
+                    'event_type' : event_type
+                })
+
+
+    def __create_latencies(self, number_latency_entries):
+        """
+        Method that creates latency entries.  Entries are held as tuples of
+        monitor ID, server ID, region ID, customer ID, timestamp, and latency
+        in seconds to keep memory use reasonable for large fleets.
+
+        :param number_latency_entries:
+            The number of entries to create.
+
+        :type number_latency_entries: int
+
+        """
+
+        monitors = list(self.monitors.values())
+        if monitors and self.mappings and number_latency_entries > 0:
+            rng = self.__rng
+            start_timestamp = self.__now - 86400
+            step = 86400.0 / number_latency_entries
+            for i in range(number_latency_entries):
+                monitor = monitors[i % len(monitors)]
+                customer_id = monitor['customer_id']
+                mapping = self.mappings.get(customer_id)
+                if mapping is not None:
+                    server_id = rng.choice(mapping['servers'])
+                    self.latencies.append((
+                        monitor['monitor_id'],
+                        server_id,
+                        self.servers[server_id]['region_id'],
+                        customer_id,
+                        int(start_timestamp + i * step),
+                        round(rng.lognormvariate(-1.5, 0.5), 6)
+                    ))
+
+
+    def __update_service_rates(self):
+        """
+        Method that calculates each server's monitor service rate from the
+        customer mappings.
+
+        """
+
+        monitors_per_customer = dict()
+        for monitor in self.monitors.values():
+            customer_id = monitor['customer_id']
+            monitors_per_customer[customer_id] = (
+                monitors_per_customer.get(customer_id, 0) + 1
+            )
+
+        for server in self.servers.values():
+            server['monitor_service_rate'] = 0.0
+
+        for customer_id, mapping in self.mappings.items():
+            customer = self.customers[customer_id]
+            rate = (
+                  monitors_per_customer.get(customer_id, 0)
+                / customer['polling_interval']
+            )
+            for server_id in mapping['servers']:
+                if server_id in self.servers:
+                    self.servers[server_id]['monitor_service_rate'] += rate
+
+###############################################################################
+# Class FakeDbc:
+#
+
+class FakeDbc(object):
+    """
+    Class that runs a stand-in DBC on a local HTTP port.  Requests are
+    authenticated exactly as the real DBC authenticates them so the client
+    signing and time delta logic is exercised.
+
+    """
+
+    def __init__(
+        self,
+        secret,
+        fleet = None,
+        host = "127.0.0.1",
+        port = 0,
+        latency = 0,
+        latency_jitter = 0,
+        error_rate = 0,
+        clock_offset = 0,
+        seed = None
+        ):
+        """
+        Method that initializes the FakeDbc class.
+
+        :param secret:
+            The secret clients must use to sign requests.
+
+        :param fleet:
+            The fleet data to serve.  A default fleet is created if None.
+
+        :param host:
+            The address to listen on.
+
+        :param port:
+            The port to listen on.  A value of 0 selects a free port.
+
+        :param latency:
+            Delay, in seconds, added to every request.
+
+        :param latency_jitter:
+            Maximum random delay, in seconds, added on top of the fixed
+            latency.
+
+        :param error_rate:
+            Fraction of requests, between 0 and 1, that fail with an HTTP 503
+            status.
+
+        :param clock_offset:
+            Offset, in seconds, applied to this server's clock.  Use to
+            exercise the client's time delta handling.
+
+        :param seed:
+            Seed used for latency and error injection.
+
+        :type secret:         bytes
+        :type fleet:          Fleet or None
+        :type host:           str
+        :type port:           int
+        :type latency:        float
+        :type latency_jitter: float
+        :type error_rate:     float
+        :type clock_offset:   int
+        :type seed:           int or None
+
+        """
+
+        super().__init__()
+
+        self.__secret = bytes(secret)
+        self.__fleet = fleet if fleet is not None else Fleet()
+        self.__latency = float(latency)
+        self.__latency_jitter = float(latency_jitter)
+        self.__error_rate = float(error_rate)
+        self.__clock_offset = int(clock_offset)
+        self.__rng = random.Random(seed)
+        self.__lock = threading.RLock()
+        self.__request_counts = dict()
+
+        self.__handlers = {
+            'customer/create' : self.__customer_create,
+            'customer/delete' : self.__customer_delete,
+            'customer/get' : self.__customer_get,
+            'customer/get_secret' : self.__customer_get_secret,
+            'customer/list' : self.__customer_list,
+            'customer/pause' : self.__customer_pause,
+            'customer/purge' : self.__customer_purge,
+            'customer/reset_secret' : self.__customer_reset_secret,
+            'event/get' : self.__event_get,
+            'event/report' : self.__event_report,
+            'event/report_batch' : self.__event_report_batch,
+            'event/status' : self.__event_status,
+            'host_scheme/create' : self.__host_scheme_create,
+            'host_scheme/delete' : self.__host_scheme_delete,
+            'host_scheme/get' : self.__host_scheme_get,
+            'host_scheme/list' : self.__host_scheme_list,
+            'host_scheme/modify' : self.__host_scheme_modify,
+            'latency/get' : self.__latency_get,
+            'latency/purge' : self.__latency_purge,
+            'latency/statistics' : self.__latency_statistics,
+            'mapping/customer/activate' : self.__mapping_customer_activate,
+            'mapping/customer/deactivate' : self.__mapping_customer_activate,
+            'mapping/get' : self.__mapping_get,
+            'mapping/list' : self.__mapping_list,
+            'mapping/update' : self.__mapping_update,
+            'monitor/delete' : self.__monitor_delete,
+            'monitor/get' : self.__monitor_get,
+            'monitor/list' : self.__monitor_list,
+            'monitor/update' : self.__monitor_update,
+            'region/create' : self.__region_create,
+            'region/delete' : self.__region_delete,
+            'region/get' : self.__region_get,
+            'region/list' : self.__region_list,
+            'region/modify' : self.__region_modify,
+            'resource/available' : self.__resource_available,
+            'resource/create' : self.__resource_create,
+            'resource/list' : self.__resource_list,
+            'resource/purge' : self.__resource_purge,
+            'server/activate' : self.__server_activate,
+            'server/create' : self.__server_create,
+            'server/deactivate' : self.__server_deactivate,
+            'server/delete' : self.__server_delete,
+            'server/get' : self.__server_get,
+            'server/list' : self.__server_list,
+            'server/modify' : self.__server_modify,
+            'server/reassign' : self.__server_reassign,
+            'server/redistribute' : self.__server_redistribute,
+            'server/start' : self.__server_activate
+        }
+
+        self.__binary_handlers = {
+            'latency/record' : self.__latency_record,
+            'latency/plot' : self.__plot,
+            'resource/plot' : self.__plot
+        }
+
+        fake = self
+        class RequestHandler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                slug = urllib.parse.urlparse(self.path).path.strip('/')
+                status_code, content_type, content = fake.handle(slug, body)
+
+                self.send_response(status_code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.__http_server = http.server.ThreadingHTTPServer(
+            ( host, port ),
+            RequestHandler
+        )
+        self.__http_server.daemon_threads = True
+        self.__thread = None
+
+
+    @property
+    def fleet(self):
+        """
+        Read-only property holding the fleet data.
+
+        :type: Fleet
+
+        """
+
+        return self.__fleet
+
+
+    @property
+    def scheme_and_host(self):
+        """
+        Read-only property holding the scheme and host clients should use.
+
+        :type: str
+
+        """
+
+        host, port = self.__http_server.server_address[:2]
+        return "http://%s:%d"%(host, port)
+
+
+    @property
+    def request_counts(self):
+        """
+        Read-only property holding the number of requests received for each
+        slug.
+
+        :type: dict
+
+        """
+
+        with self.__lock:
+            return dict(self.__request_counts)
+
+
+    def reset_request_counts(self):
+        """
+        Method that clears the request counts.
+
+        """
+
+        with self.__lock:
+            self.__request_counts.clear()
+
+
+    def configuration(self):
+        """
+        Method that returns a client configuration for this server, in the
+        same format as the .speedsentry_config.json file.
+
+        :return:
+            Returns the configuration dictionary.
+
+        :rtype: dict
+
+        """
+
+        return {
+            'secret' : base64.b64encode(self.__secret).decode('utf-8'),
+            'host' : self.scheme_and_host,
+            'events' : { 'batch_reports' : True }
+        }
+
+
+    def start(self):
+        """
+        Method that starts serving requests on a background thread.
+
+        """
+
+        if self.__thread is None:
+            self.__thread = threading.Thread(
+                target = self.__http_server.serve_forever,
+                daemon = True
+            )
+            self.__thread.start()
+
+
+    def stop(self):
+        """
+        Method that stops the server.
+
+        """
+
+        if self.__thread is not None:
+            self.__http_server.shutdown()
+            self.__thread.join()
+            self.__thread = None
+
+        self.__http_server.server_close()
+
+
+    def serve_forever(self):
+        """
+        Method that serves requests on the calling thread until interrupted.
+
+        """
+
+        self.__http_server.serve_forever()
+
+
+    def __enter__(self):
+        self.start()
+        return self
+
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.stop()
+
+
+    def handle(self, slug, body):
+        """
+        Method that handles a single request.
+
+        :param slug:
+            The request slug.
+
+        :param body:
+            The raw request body.
+
+        :return:
+            Returns a tuple holding the HTTP status code, content type, and
+            response content.
+
+        :type slug: str
+        :type body: bytes
+        :rtype:     tuple
+
+        """
+
+        with self.__lock:
+            count = self.__request_counts.get(slug, 0)
+            self.__request_counts[slug] = count + 1
+            if self.__latency > 0 or self.__latency_jitter > 0:
+                delay = (
+                      self.__latency
+                    + self.__rng.uniform(0, self.__latency_jitter)
+                )
+            else:
+                delay = 0
+
+            inject_error = (
+                    self.__error_rate > 0
+                and self.__rng.random() < self.__error_rate
+            )
+
+        if delay > 0:
+            time.sleep(delay)
+
+        if inject_error:
+            result = ( 503, 'text/plain', b"Service Unavailable" )
+        elif slug.endswith('td'):
+            result = self.__time_delta(body)
+        elif slug in self.__binary_handlers:
+            payload = body[:-hashlib.sha256().digest_size]
+            received_hash = body[-hashlib.sha256().digest_size:]
+            if self.__authenticate(payload, received_hash):
+                with self.__lock:
+                    result = self.__binary_handlers[slug](payload)
+            else:
+                result = ( 401, 'text/plain', b"Unauthorized" )
+        elif slug in self.__handlers:
+            message = self.__decode(body)
+            if message is not None:
+                with self.__lock:
+                    response = self.__handlers[slug](message)
+
+                result = (
+                    200,
+                    'application/json',
+                    json.dumps(response).encode('utf-8')
+                )
+            else:
+                result = ( 401, 'text/plain', b"Unauthorized" )
+        else:
+            result = ( 404, 'text/plain', b"Not Found" )
+
+        return result
+
+
+    def __now(self):
+        """
+        Method that returns this server's current time.
+
+        :return:
+            Returns the current time, in seconds since the epoch.
+
+        :rtype: float
+
+        """
+
+        return time.time() + self.__clock_offset
+
+
+    def __time_delta(self, body):
+        """
+        Method that handles time delta requests.
+
+        :param body:
+            The raw request body.
+
+        :return:
+            Returns a tuple holding the status code, content type, and
+            content.
+
+        :type body: bytes
+        :rtype:     tuple
+
+        """
+
+        try:
+            client_timestamp = int(json.loads(body)['timestamp'])
+        except:
+            client_timestamp = None
+
+        if client_timestamp is not None:
+            response = {
+                'status' : 'OK',
+                'time_delta' : int(self.__now()) - client_timestamp
+            }
+            result = (
+                200,
+                'application/json',
+                json.dumps(response).encode('utf-8')
+            )
+        else:
+            result = ( 400, 'text/plain', b"Bad Request" )
+
+        return result
+
+
+    def __authenticate(self, payload, received_hash):
+        """
+        Method that checks a request hash.  Hashes from the adjacent 30
+        second windows are accepted to allow for small clock differences.
+
+        :param payload:
+            The signed payload.
+
+        :param received_hash:
+            The hash received with the payload.
+
+        :return:
+            Returns True if the hash is valid.  Returns False if the hash is
+            invalid.
+
+        :type payload:       bytes
+        :type received_hash: bytes
+        :rtype:              bool
+
+        """
+
+        window = int(int(self.__now()) / 30)
+        result = False
+        for hash_time_value in ( window, window - 1, window + 1 ):
+            key = self.__secret + struct.pack('<Q', hash_time_value)
+            expected_hash = hmac.new(
+                key = key,
+                msg = payload,
+                digestmod = HASH_ALGORITHM
+            ).digest()
+
+            if hmac.compare_digest(expected_hash, received_hash):
+                result = True
+                break
+
+        return result
+
+
+    def __decode(self, body):
+        """
+        Method that authenticates and decodes a JSON request.
+
+        :param body:
+            The raw request body.
+
+        :return:
+            Returns the decoded message or None if the request is malformed
+            or could not be authenticated.
+
+        :type body: bytes
+        :rtype:     dict, list, or None
+
+        """
+
+        try:
+            envelope = json.loads(body)
+            raw_message = base64.b64decode(envelope['data'])
+            received_hash = base64.b64decode(envelope['hash'])
+        except:
+            raw_message = None
+
+        if raw_message is not None                          and \
+           self.__authenticate(raw_message, received_hash)     :
+            try:
+                result = json.loads(raw_message)
+            except:
+                result = None
+        else:
+            result = None
+
+        return result
+
+
+    @staticmethod
+    def __failed(reason):
+        """
+        Method that builds a failure response.
+
+        :param reason:
+            The reason for the failure.
+
+        :return:
+            Returns the failure response.
+
+        :type reason: str
+        :rtype:       dict
+
+        """
+
+        return { 'status' : "failed, %s"%reason }
+
+
+    def __region_get(self, message):
+        region_id = message.get('region_id')
+        if region_id in self.__fleet.regions:
+            result = {
+                'status' : 'OK',
+                'region_id' : region_id,
+                'region_name' : self.__fleet.regions[region_id]
+            }
+        else:
+            result = self.__failed("unknown region")
+
+        return result
+
+
+    def __region_create(self, message):
+        region_id = self.__fleet.next_id('region')
+        self.__fleet.regions[region_id] = str(message.get('region_name'))
+        return self.__region_get({ 'region_id' : region_id })
+
+
+    def __region_modify(self, message):
+        region_id = message.get('region_id')
+        if region_id in self.__fleet.regions:
+            self.__fleet.regions[region_id] = str(message.get('region_name'))
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown region")
+
+        return result
+
+
+    def __region_delete(self, message):
+        region_id = message.get('region_id')
+        if region_id in self.__fleet.regions:
+            del self.__fleet.regions[region_id]
+            for server_id in [
+                    k for k,v in self.__fleet.servers.items()
+                    if v['region_id'] == region_id
+                ]:
+                del self.__fleet.servers[server_id]
+
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown region")
+
+        return result
+
+
+    def __region_list(self, message):
+        return {
+            'status' : 'OK',
+            'regions' : { str(k):v for k,v in self.__fleet.regions.items() }
+        }
+
+
+    def __find_server(self, message):
+        server_id = message.get('server_id')
+        if server_id is not None:
+            result = self.__fleet.servers.get(server_id)
+        else:
+            identifier = message.get('identifier')
+            result = None
+            for server in self.__fleet.servers.values():
+                if server['identifier'] == identifier:
+                    result = server
+                    break
+
+        return result
+
+
+    def __server_get(self, message):
+        server = self.__find_server(message)
+        if server is not None:
+            result = dict(server)
+            result['status'] = 'OK'
+        else:
+            result = self.__failed("unknown server")
+
+        return result
+
+
+    def __server_create(self, message):
+        region_id = message.get('region_id')
+        if region_id in self.__fleet.regions:
+            server_id = self.__fleet.next_id('server')
+            self.__fleet.servers[server_id] = {
+                'server_id' : server_id,
+                'region_id' : region_id,
+                'identifier' : str(message.get('identifier')),
+                'server_status' : 'inactive',
+                'monitor_service_rate' : 0.0,
+                'cpu_loading' : 0.0,
+                'memory_loading' : 0.0
+            }
+            result = self.__server_get({ 'server_id' : server_id })
+        else:
+            result = self.__failed("unknown region")
+
+        return result
+
+
+    def __server_modify(self, message):
+        server = self.__find_server(message)
+        if server is not None:
+            for key in ( 'region_id', 'identifier', 'server_status' ):
+                if key in message:
+                    server[key] = message[key]
+
+            result = self.__server_get(server)
+        else:
+            result = self.__failed("unknown server")
+
+        return result
+
+
+    def __server_delete(self, message):
+        server = self.__find_server(message)
+        if server is not None:
+            del self.__fleet.servers[server['server_id']]
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown server")
+
+        return result
+
+
+    def __server_list(self, message):
+        region_id = message.get('region_id')
+        server_status = message.get('server_status')
+        return {
+            'status' : 'OK',
+            'servers' : [
+                s for s in self.__fleet.servers.values()
+                if     (region_id is None or s['region_id'] == region_id)
+                   and (   server_status is None
+                        or s['server_status'] == server_status
+                       )
+            ]
+        }
+
+
+    def __server_activate(self, message):
+        return self.__set_server_status(message, 'active')
+
+
+    def __server_deactivate(self, message):
+        return self.__set_server_status(message, 'inactive')
+
+
+    def __set_server_status(self, message, server_status):
+        server = self.__find_server(message)
+        if server is not None:
+            server['server_status'] = server_status
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown server")
+
+        return result
+
+
+    def __server_reassign(self, message):
+        from_server_id = message.get('from_server_id')
+        to_server_id = message.get('to_server_id')
+        if from_server_id in self.__fleet.servers:
+            from_server = self.__fleet.servers[from_server_id]
+            if to_server_id is not None:
+                candidates = [ to_server_id ]
+            else:
+                candidates = [
+                    k for k,v in self.__fleet.servers.items()
+                    if     v['region_id'] == from_server['region_id']
+                       and v['server_status'] == 'active'
+                       and k != from_server_id
+                ]
+
+            if candidates and all(
+                    c in self.__fleet.servers for c in candidates
+                ):
+                index = 0
+                for mapping in self.__fleet.mappings.values():
+                    if from_server_id in mapping['servers']:
+                        new_server_id = candidates[index % len(candidates)]
+                        index += 1
+                        mapping['servers'] = [
+                            new_server_id if s == from_server_id else s
+                            for s in mapping['servers']
+                        ]
+                        if mapping['primary_server'] == from_server_id:
+                            mapping['primary_server'] = new_server_id
+
+                result = { 'status' : 'OK' }
+            else:
+                result = self.__failed("no destination servers")
+        else:
+            result = self.__failed("unknown server")
+
+        return result
+
+
+    def __server_redistribute(self, message):
+        if message.get('region_id') in self.__fleet.regions:
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown region")
+
+        return result
+
+
+    def __customer_get(self, message):
+        customer = self.__fleet.customers.get(message.get('customer_id'))
+        if customer is not None:
+            result = { 'status' : 'OK', 'customer' : customer }
+        else:
+            result = self.__failed("unknown customer")
+
+        return result
+
+
+    def __customer_create(self, message):
+        try:
+            customer_id = int(message['customer_id'])
+        except:
+            customer_id = None
+
+        if customer_id is not None:
+            customer = self.__fleet.create_customer(customer_id, message)
+            result = { 'status' : 'OK', 'customer' : customer }
+        else:
+            result = self.__failed("invalid customer ID")
+
+        return result
+
+
+    def __customer_delete(self, message):
+        if self.__fleet.remove_customer(message.get('customer_id')):
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown customer")
+
+        return result
+
+
+    def __customer_purge(self, message):
+        if isinstance(message, list):
+            for customer_id in message:
+                self.__fleet.remove_customer(customer_id)
+
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("expected customer list")
+
+        return result
+
+
+    def __customer_list(self, message):
+        return {
+            'status' : 'OK',
+            'customers' : {
+                str(k):v for k,v in self.__fleet.customers.items()
+            }
+        }
+
+
+    def __customer_get_secret(self, message):
+        customer_id = message.get('customer_id')
+        if customer_id in self.__fleet.customer_secrets:
+            identifier, secret = self.__fleet.customer_secrets[customer_id]
+            result = {
+                'status' : 'OK',
+                'customer' : {
+                    'identifier' : identifier,
+                    'secret' : base64.b64encode(secret).decode('utf-8')
+                }
+            }
+        else:
+            result = self.__failed("unknown customer")
+
+        return result
+
+
+    def __customer_reset_secret(self, message):
+        customer_id = message.get('customer_id')
+        if customer_id in self.__fleet.customer_secrets:
+            identifier, secret = self.__fleet.customer_secrets[customer_id]
+            self.__fleet.customer_secrets[customer_id] = (
+                identifier,
+                bytes(self.__rng.getrandbits(8) for i in range(SECRET_LENGTH))
+            )
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown customer")
+
+        return result
+
+
+    def __customer_pause(self, message):
+        customer = self.__fleet.customers.get(message.get('customer_id'))
+        if customer is not None:
+            customer['paused'] = bool(message.get('pause'))
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown customer")
+
+        return result
+
+
+    def __mapping_get(self, message):
+        mapping = self.__fleet.mappings.get(message.get('customer_id'))
+        if mapping is not None:
+            result = { 'status' : 'OK', 'mapping' : mapping }
+        else:
+            result = self.__failed("unknown customer")
+
+        return result
+
+
+    def __mapping_update(self, message):
+        customer_id = message.get('customer_id')
+        server_ids = message.get('mapping')
+        if customer_id not in self.__fleet.customers:
+            result = self.__failed("unknown customer")
+        elif not server_ids                                           or \
+             not all(s in self.__fleet.servers for s in server_ids)     :
+            result = self.__failed("invalid mapping")
+        else:
+            self.__fleet.mappings[customer_id] = {
+                'primary_server' : server_ids[0],
+                'servers' : list(server_ids)
+            }
+            result = { 'status' : 'OK' }
+
+        return result
+
+
+    def __mapping_customer_activate(self, message):
+        if message.get('customer_id') in self.__fleet.customers:
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown customer")
+
+        return result
+
+
+    def __mapping_list(self, message):
+        server_id = message.get('server_id')
+        return {
+            'status' : 'OK',
+            'mappings' : {
+                str(k):v for k,v in self.__fleet.mappings.items()
+                if server_id is None or server_id in v['servers']
+            }
+        }
+
+
+    def __host_scheme_get(self, message):
+        host_scheme = self.__fleet.host_schemes.get(
+            message.get('host_scheme_id')
+        )
+        if host_scheme is not None:
+            result = dict(host_scheme)
+            result['status'] = 'OK'
+        else:
+            result = self.__failed("unknown host/scheme")
+
+        return result
+
+
+    def __host_scheme_create(self, message):
+        customer_id = message.get('customer_id')
+        if customer_id in self.__fleet.customers:
+            host_scheme_id = self.__fleet.next_id('host_scheme')
+            self.__fleet.host_schemes[host_scheme_id] = {
+                'host_scheme_id' : host_scheme_id,
+                'customer_id' : customer_id,
+                'url' : str(message.get('url')),
+                'ssl_expiration_timestamp' : 0
+            }
+            result = self.__host_scheme_get(
+                { 'host_scheme_id' : host_scheme_id }
+            )
+        else:
+            result = self.__failed("unknown customer")
+
+        return result
+
+
+    def __host_scheme_modify(self, message):
+        host_scheme = self.__fleet.host_schemes.get(
+            message.get('host_scheme_id')
+        )
+        if host_scheme is not None:
+            for key in ( 'customer_id', 'url' ):
+                if key in message:
+                    host_scheme[key] = message[key]
+
+            result = self.__host_scheme_get(host_scheme)
+        else:
+            result = self.__failed("unknown host/scheme")
+
+        return result
+
+
+    def __host_scheme_delete(self, message):
+        if 'host_scheme_id' in message:
+            host_scheme_ids = [ message['host_scheme_id'] ]
+        else:
+            host_scheme_ids = [
+                k for k,v in self.__fleet.host_schemes.items()
+                if v['customer_id'] == message.get('customer_id')
+            ]
+
+        if all(h in self.__fleet.host_schemes for h in host_scheme_ids):
+            for host_scheme_id in host_scheme_ids:
+                del self.__fleet.host_schemes[host_scheme_id]
+                for monitor_id in [
+                        k for k,v in self.__fleet.monitors.items()
+                        if v['host_scheme_id'] == host_scheme_id
+                    ]:
+                    del self.__fleet.monitors[monitor_id]
+
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown host/scheme")
+
+        return result
+
+
+    def __host_scheme_list(self, message):
+        customer_id = message.get('customer_id')
+        return {
+            'status' : 'OK',
+            'data' : {
+                str(k):v for k,v in self.__fleet.host_schemes.items()
+                if customer_id is None or v['customer_id'] == customer_id
+            }
+        }
+
+
+    def __monitor_get(self, message):
+        monitor = self.__fleet.monitors.get(message.get('monitor_id'))
+        if monitor is not None:
+            result = { 'status' : 'OK', 'monitor' : monitor }
+        else:
+            result = self.__failed("unknown monitor")
+
+        return result
+
+
+    def __monitor_delete(self, message):
+        if 'monitor_id' in message:
+            monitor_ids = [ message['monitor_id'] ]
+        else:
+            monitor_ids = [
+                k for k,v in self.__fleet.monitors.items()
+                if v['customer_id'] == message.get('customer_id')
+            ]
+
+        if all(m in self.__fleet.monitors for m in monitor_ids):
+            for monitor_id in monitor_ids:
+                del self.__fleet.monitors[monitor_id]
+
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown monitor")
+
+        return result
+
+
+    def __monitor_list(self, message):
+        customer_id = message.get('customer_id')
+        if customer_id is not None:
+            data = {
+                str(v['user_ordering']):v
+                for v in self.__fleet.monitors.values()
+                if v['customer_id'] == customer_id
+            }
+        else:
+            data = { str(k):v for k,v in self.__fleet.monitors.items() }
+
+        return { 'status' : 'OK', 'data' : data }
+
+
+    def __monitor_update(self, message):
+        """
+        Method that replaces a customer's monitors.  Monitors whose host,
+        scheme, and path are unchanged keep their monitor ID.
+
+        """
+
+        customer_id = message.get('customer_id')
+        update_data = message.get('data')
+        customer = self.__fleet.customers.get(customer_id)
+        errors = list()
+
+        if customer is None:
+            errors.append((UNKNOWN_USER_ORDERING, "unknown customer"))
+        elif not isinstance(update_data, dict):
+            errors.append((UNKNOWN_USER_ORDERING, "invalid update data"))
+        elif len(update_data) > customer['maximum_number_monitors']:
+            errors.append((UNKNOWN_USER_ORDERING, "too many monitors"))
+        else:
+            entries = list()
+            try:
+                ordered = sorted(
+                    ( int(k), v ) for k,v in update_data.items()
+                )
+            except:
+                ordered = None
+                errors.append((UNKNOWN_USER_ORDERING, "invalid user ordering"))
+
+            current_host = None
+            for user_ordering, entry in ordered or list():
+                uri = entry.get('uri') if isinstance(entry, dict) else None
+                if not uri:
+                    errors.append((user_ordering, "missing uri"))
+                else:
+                    parsed = urllib.parse.urlparse(uri)
+                    if parsed.scheme and parsed.netloc:
+                        current_host = "%s://%s"%(parsed.scheme, parsed.netloc)
+                        path = parsed.path or "/"
+                    elif current_host is None:
+                        errors.append((user_ordering, "no host for path"))
+                        path = None
+                    else:
+                        path = uri
+
+                    if path is not None:
+                        entries.append(
+                            ( user_ordering, current_host, path, entry )
+                        )
+
+        if errors:
+            result = {
+                'status' : 'failed',
+                'errors' : [
+                    { 'user_ordering' : u, 'text' : t } for u, t in errors
+                ]
+            }
+        else:
+            self.__replace_monitors(customer_id, entries)
+            result = { 'status' : 'OK' }
+
+        return result
+
+
+    def __replace_monitors(self, customer_id, entries):
+        fleet = self.__fleet
+        host_scheme_ids = {
+            v['url'] : k for k,v in fleet.host_schemes.items()
+            if v['customer_id'] == customer_id
+        }
+        existing = {
+            ( fleet.host_schemes[v['host_scheme_id']]['url'], v['path'] ) : k
+            for k,v in fleet.monitors.items()
+            if     v['customer_id'] == customer_id
+               and v['host_scheme_id'] in fleet.host_schemes
+        }
+
+        for monitor_id in [
+                k for k,v in fleet.monitors.items()
+                if v['customer_id'] == customer_id
+            ]:
+            del fleet.monitors[monitor_id]
+
+        used_host_scheme_ids = set()
+        for user_ordering, url, path, entry in entries:
+            host_scheme_id = host_scheme_ids.get(url)
+            if host_scheme_id is None:
+                host_scheme_id = fleet.next_id('host_scheme')
+                host_scheme_ids[url] = host_scheme_id
+                fleet.host_schemes[host_scheme_id] = {
+                    'host_scheme_id' : host_scheme_id,
+                    'customer_id' : customer_id,
+                    'url' : url,
+                    'ssl_expiration_timestamp' : 0
+                }
+
+            used_host_scheme_ids.add(host_scheme_id)
+            monitor_id = existing.get(( url, path ))
+            if monitor_id is None:
+                monitor_id = fleet.next_id('monitor')
+
+            fleet.monitors[monitor_id] = {
+                'monitor_id' : monitor_id,
+                'customer_id' : customer_id,
+                'host_scheme_id' : host_scheme_id,
+                'user_ordering' : user_ordering,
+                'path' : path,
+                'method' : str(entry.get('method', 'get')).lower(),
+                'content_check_mode' : str(
+                    entry.get('content_check_mode', 'no_check')
+                ).lower(),
+                'keywords' : list(entry.get('keywords', list())),
+                'post_content_type' : str(
+                    entry.get('post_content_type', 'text')
+                ).upper(),
+                'post_user_agent' : str(entry.get('post_user_agent', "")),
+                'post_content' : str(entry.get('post_content', ""))
+            }
+
+        for url, host_scheme_id in host_scheme_ids.items():
+            if host_scheme_id not in used_host_scheme_ids:
+                del fleet.host_schemes[host_scheme_id]
+
+
+    def __event_report(self, message):
+        monitor = self.__fleet.monitors.get(message.get('monitor_id'))
+        if monitor is not None:
+            self.__fleet.events.append({
+                'event_id' : self.__fleet.next_id('event'),
+                'monitor_id' : monitor['monitor_id'],
+                'customer_id' : monitor['customer_id'],
+                'timestamp' : int(message.get('timestamp', self.__now())),
+                'event_type' : str(message.get('event_type', 'working'))
+            })
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown monitor")
+
+        return result
+
+
+    def __event_report_batch(self, message):
+        reports = message.get('reports')
+        if isinstance(reports, list):
+            result = {
+                'status' : 'OK',
+                'results' : [
+                        isinstance(report, dict)
+                    and self.__event_report(report)['status'] == 'OK'
+                    for report in reports
+                ]
+            }
+        else:
+            result = self.__failed("invalid reports")
+
+        return result
+
+
+    def __event_status(self, message):
+        customer_id = message.get('customer_id')
+        monitor_id = message.get('monitor_id')
+        last_event_type = dict()
+        for event in self.__fleet.events:
+            last_event_type[event['monitor_id']] = event['event_type']
+
+        monitors = dict()
+        for v in self.__fleet.monitors.values():
+            if     (customer_id is None or v['customer_id'] == customer_id) \
+               and (monitor_id is None or v['monitor_id'] == monitor_id)      :
+                event_type = last_event_type.get(v['monitor_id'])
+                if event_type is None:
+                    status = 'unknown'
+                elif event_type in ( 'no_response', 'content_changed' ):
+                    status = 'failed'
+                else:
+                    status = 'working'
+
+                monitors[str(v['monitor_id'])] = status
+
+        return { 'status' : 'OK', 'monitors' : monitors }
+
+
+    def __event_get(self, message):
+        customer_id = message.get('customer_id')
+        monitor_id = message.get('monitor_id')
+        start_timestamp = message.get('start_timestamp')
+        end_timestamp = message.get('end_timestamp')
+        return {
+            'status' : 'OK',
+            'events' : [
+                e for e in self.__fleet.events
+                if     (customer_id is None or e['customer_id'] == customer_id)
+                   and (monitor_id is None or e['monitor_id'] == monitor_id)
+                   and (   start_timestamp is None
+                        or e['timestamp'] >= start_timestamp
+                       )
+                   and (   end_timestamp is None
+                        or e['timestamp'] <= end_timestamp
+                       )
+            ]
+        }
+
+
+    def __select_latencies(self, message):
+        customer_id = message.get('customer_id')
+        monitor_id = message.get('monitor_id')
+        server_id = message.get('server_id')
+        region_id = message.get('region_id')
+        start_timestamp = message.get('start_timestamp')
+        end_timestamp = message.get('end_timestamp')
+
+        for entry in self.__fleet.latencies:
+            if     (monitor_id is None or entry[0] == monitor_id)           \
+               and (server_id is None or entry[1] == server_id)             \
+               and (region_id is None or entry[2] == region_id)             \
+               and (customer_id is None or entry[3] == customer_id)         \
+               and (start_timestamp is None or entry[4] >= start_timestamp) \
+               and (end_timestamp is None or entry[4] <= end_timestamp)       :
+                yield entry
+
+
+    def __latency_get(self, message):
+        return {
+            'status' : 'OK',
+            'recent' : [
+                {
+                    'monitor_id' : e[0],
+                    'server_id' : e[1],
+                    'region_id' : e[2],
+                    'customer_id' : e[3],
+                    'timestamp' : e[4],
+                    'latency' : e[5]
+                }
+                for e in self.__select_latencies(message)
+            ],
+            'aggregated' : []
+        }
+
+
+    def __latency_statistics(self, message):
+        values = [ e[5] for e in self.__select_latencies(message) ]
+        if values:
+            mean = sum(values) / len(values)
+            variance = sum((v - mean) ** 2 for v in values) / len(values)
+            statistics = {
+                'number_samples' : len(values),
+                'average' : mean,
+                'variance' : variance,
+                'minimum' : min(values),
+                'maximum' : max(values)
+            }
+        else:
+            statistics = { 'number_samples' : 0 }
+
+        return { 'status' : 'OK', 'statistics' : statistics }
+
+
+    def __latency_purge(self, message):
+        if isinstance(message, list):
+            customer_ids = set(message)
+            self.__fleet.latencies[:] = [
+                e for e in self.__fleet.latencies if e[3] not in customer_ids
+            ]
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("expected customer list")
+
+        return result
+
+
+    def __latency_record(self, payload):
+        """
+        Method that handles binary latency records.  The header identifies
+        the reporting server by address and carries its loading; each entry
+        holds a monitor ID, offset timestamp, and latency in microseconds.
+
+        """
+
+        number_entries = (
+              (len(payload) - LATENCY_RECORD_HEADER_SIZE)
+            // LATENCY_RECORD_ENTRY_SIZE
+        )
+
+        if len(payload) < LATENCY_RECORD_HEADER_SIZE                       or \
+           (   len(payload) - LATENCY_RECORD_HEADER_SIZE
+             - number_entries * LATENCY_RECORD_ENTRY_SIZE
+           ) != 0                                                             :
+            response = self.__failed("invalid record")
+        else:
+            ipv4_address = payload[0:16].rstrip(b'\x00').decode('utf-8')
+            ipv6_address = payload[16:56].rstrip(b'\x00').decode('utf-8')
+            (
+                server_status_code,
+                cpu_loading,
+                memory_loading,
+                unused,
+                number_monitors
+            ) = struct.unpack("BBBBI", payload[56:64])
+
+            server = None
+            for s in self.__fleet.servers.values():
+                if s['identifier'] in ( ipv4_address, ipv6_address ):
+                    server = s
+                    break
+
+            if server is None:
+                response = self.__failed("unknown server")
+            else:
+                if server_status_code < len(SERVER_STATUS_CODES):
+                    server['server_status'] = (
+                        SERVER_STATUS_CODES[server_status_code]
+                    )
+
+                server['cpu_loading'] = cpu_loading / 255.0
+                server['memory_loading'] = memory_loading / 255.0
+
+                for monitor_id, timestamp, latency in struct.iter_unpack(
+                        "III",
+                        payload[LATENCY_RECORD_HEADER_SIZE:]
+                    ):
+                    monitor = self.__fleet.monitors.get(monitor_id)
+                    if monitor is not None:
+                        self.__fleet.latencies.append((
+                            monitor_id,
+                            server['server_id'],
+                            server['region_id'],
+                            monitor['customer_id'],
+                            timestamp + TIMESTAMP_OFFSET,
+                            latency / 1000000.0
+                        ))
+
+                response = { 'status' : 'OK' }
+
+        return (
+            200,
+            'application/json',
+            json.dumps(response).encode('utf-8')
+        )
+
+
+    def __plot(self, payload):
+        return ( 200, 'image/png', BLANK_IMAGE )
+
+
+    def __resource_available(self, message):
+        resources = self.__fleet.resources.get(message.get('customer_id'), {})
+        return { 'status' : 'OK', 'value_types' : sorted(resources.keys()) }
+
+
+    def __resource_create(self, message):
+        customer_id = message.get('customer_id')
+        if customer_id in self.__fleet.customers:
+            timestamp = message.get('timestamp')
+            if timestamp is None:
+                timestamp = int(self.__now())
+
+            customer_resources = self.__fleet.resources.setdefault(
+                customer_id,
+                dict()
+            )
+            customer_resources.setdefault(
+                int(message.get('value_type', 0)),
+                list()
+            ).append({
+                'timestamp' : int(timestamp),
+                'value' : float(message.get('value', 0))
+            })
+            result = { 'status' : 'OK' }
+        else:
+            result = self.__failed("unknown customer")
+
+        return result
+
+
+    def __resource_list(self, message):
+        customer_resources = self.__fleet.resources.get(
+            message.get('customer_id'),
+            dict()
+        )
+        start_timestamp = message.get('start_timestamp')
+        end_timestamp = message.get('end_timestamp')
+        return {
+            'status' : 'OK',
+            'data' : {
+                'resources' : [
+                    r for r in customer_resources.get(
+                        message.get('value_type'),
+                        list()
+                    )
+                    if     (   start_timestamp is None
+                            or r['timestamp'] >= start_timestamp
+                           )
+                       and (   end_timestamp is None
+                            or r['timestamp'] <= end_timestamp
+                           )
+                ]
+            }
+        }
+
+
+    def __resource_purge(self, message):
+        customer_resources = self.__fleet.resources.get(
+            message.get('customer_id'),
+            dict()
+        )
+        timestamp = message.get('timestamp')
+        for value_type, entries in customer_resources.items():
+            entries[:] = [
+                r for r in entries
+                if timestamp is not None and r['timestamp'] >= timestamp
+            ]
+
+        return { 'status' : 'OK' }
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
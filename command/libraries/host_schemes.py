@@ -45,6 +45,7 @@ import urllib
 import libraries.enumeration as enumeration
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
+import libraries.metrics as metrics
 
 ###############################################################################
 # Globals:
@@ -244,6 +245,8 @@ class HostSchemes(object):
             message = { 'host_scheme_id' : host_scheme_id }
         )
 
+        build_start_time = metrics.timer()
+
         if response is not None and 'status' in response:
             status = response['status']
             if status == 'OK':
@@ -273,7 +276,7 @@ class HostSchemes(object):
                     )
 
                     try:
-                        scheme = SCHEME.by_name(scheme_string.upper())
+                        scheme = SCHEME.by_name(scheme_string)
                     except:
                         scheme = None
 
@@ -294,6 +297,12 @@ class HostSchemes(object):
         else:
             result = None
 
+        metrics.elapsed(
+            "host_scheme/get",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
         return result
 
 
@@ -356,7 +365,7 @@ class HostSchemes(object):
                     )
 
                     try:
-                        scheme = SCHEME.by_name(scheme_string.upper())
+                        scheme = SCHEME.by_name(scheme_string)
                     except:
                         scheme = None
 
@@ -455,7 +464,7 @@ class HostSchemes(object):
                     )
 
                     try:
-                        scheme = SCHEME.by_name(scheme_string.upper())
+                        scheme = SCHEME.by_name(scheme_string)
                     except:
                         scheme = None
 
@@ -571,75 +580,147 @@ class HostSchemes(object):
 
         """
 
+        host_schemes = self.iter_list(customer_id)
+        if host_schemes is not None:
+            result = dict()
+            try:
+                for host_scheme in host_schemes:
+                    result[host_scheme.host_scheme_id] = host_scheme
+            except ValueError:
+                result = None
+        else:
+            result = None
+
+        return result
+
+
+    def iter_list(self, customer_id = None):
+        """
+        Method you can use to iterate over host schemes as they are received.
+        Unlike list, host schemes are not accumulated in memory.
+
+        :param customer_id:
+            An optional customer ID used to constraint the list to only
+            host/schemes tied to a single customer.  A value of None will cause
+            host/schemes for all customers to be returned.
+
+        :return:
+            Returns an iterator over host/scheme instances or None if the
+            request failed.  Iteration raises a ValueError if the response is
+            malformed or reports an error.
+
+        :type customer_id: int or None
+        :rtype:            iterator or None
+
+        """
+
         if customer_id is not None:
             message = { 'customer_id' : customer_id }
         else:
             message = dict()
 
-        response = self.__rest_api.post_message(
+        stream = self.__rest_api.post_message_stream(
             slug = "host_scheme/list",
             secret = self.__secret,
-            message = message
+            message = message,
+            containers = ( 'data', )
         )
 
-        if response is not None and 'status' in response:
-            status = response['status']
-            if status == 'OK' and 'data' in response:
-                host_schemes_data = response['data']
-                result = dict()
-                for host_scheme_data in host_schemes_data.values():
-                    if result is not None:
-                        try:
-                            host_scheme_id = int(
-                                host_scheme_data['host_scheme_id']
-                            )
-                            customer_id = int(
-                                host_scheme_data['customer_id']
-                            )
-                            url = host_scheme_data['url']
-                            ssl_expiration_timestamp = int(
-                                host_scheme_data['ssl_expiration_timestamp']
-                            )
-                        except Exception as e:
-                            host_scheme_id = None
-                            customer_id = None
-                            url = None
-                            ssl_expiration_timestamp = None
-
-                        if host_scheme_id is not None:
-                            (
-                                scheme_string,
-                                network_location,
-                                path,
-                                parameters,
-                                query_fields,
-                                fragment
-                            ) = urllib.parse.urlparse(
-                                url
-                            )
-
-                            try:
-                                scheme = SCHEME.by_name(scheme_string.upper())
-                            except:
-                                print("C")
-                                scheme = None
-
-                            if scheme is not None:
-                                host_scheme = HostScheme(
-                                    host_scheme_id = host_scheme_id,
-                                    customer_id = customer_id,
-                                    host = network_location,
-                                    scheme = scheme,
-                                    ssl_expiration_timestamp = \
-                                                       ssl_expiration_timestamp
-                                )
-
-                                result[host_scheme_id] = host_scheme
-                            else:
-                                print("D")
-                                result = None
-                        else:
-                            result = None
+        if stream is not None:
+            result = self.__iter_stream(stream)
+        else:
+            result = None
+
+        return result
+
+
+    def __iter_stream(self, stream):
+        """
+        Generator used internally to parse a streamed host/scheme list.
+
+        :param stream:
+            The streamed response.
+
+        :return:
+            Yields host/scheme instances.
+
+        :type stream: json_stream.JsonStream
+
+        """
+
+        build_stopwatch = metrics.Stopwatch(
+            "host_scheme/list",
+            metrics.BUILD_TIME
+        )
+        try:
+            for container, key, host_scheme_data in stream:
+                with build_stopwatch:
+                    host_scheme = self.__convert_to_host_scheme(
+                        host_scheme_data
+                    )
+
+                if host_scheme is None:
+                    raise ValueError("Invalid host/scheme entry")
+
+                yield host_scheme
+
+            if stream.status != 'OK' or not stream.found('data'):
+                raise ValueError("Invalid host/scheme list response")
+        finally:
+            build_stopwatch.record()
+
+
+    def __convert_to_host_scheme(self, host_scheme_data):
+        """
+        Method used internally to convert a response entry to a HostScheme
+        instance.
+
+        :param host_scheme_data:
+            A dictionary holding the returned data.
+
+        :return:
+            Returns the host/scheme instance or None on error.
+
+        :type host_scheme_data: dict
+        :rtype:                 HostScheme or None
+
+        """
+
+        try:
+            host_scheme_id = int(host_scheme_data['host_scheme_id'])
+            customer_id = int(host_scheme_data['customer_id'])
+            url = host_scheme_data['url']
+            ssl_expiration_timestamp = int(
+                host_scheme_data['ssl_expiration_timestamp']
+            )
+        except Exception as e:
+            host_scheme_id = None
+
+        if host_scheme_id is not None:
+            (
+                scheme_string,
+                network_location,
+                path,
+                parameters,
+                query_fields,
+                fragment
+            ) = urllib.parse.urlparse(
+                url
+            )
+
+            try:
+                scheme = SCHEME.by_name(scheme_string)
+            except:
+                scheme = None
+
+            if scheme is not None:
+                result = HostScheme(
+                    host_scheme_id = host_scheme_id,
+                    customer_id = customer_id,
+                    host = network_location,
+                    scheme = scheme,
+                    ssl_expiration_timestamp = ssl_expiration_timestamp
+                )
             else:
                 result = None
         else:
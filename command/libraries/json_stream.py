@@ -0,0 +1,505 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+# 
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#   
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#   
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that provides an incremental JSON decoder for large responses.
+The decoder walks the top level object of a response as chunks arrive and
+yields the members of selected top level containers one at a time so the
+complete response never needs to be held in memory.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import re
+import json
+import codecs
+
+from . import metrics
+
+###############################################################################
+# Globals:
+#
+
+WHITESPACE = " \t\n\r"
+"""
+Characters treated as JSON whitespace.
+
+"""
+
+WHITESPACE_PATTERN = re.compile(r'[ \t\n\r]*')
+"""
+Regular expression used to skip JSON whitespace.
+
+"""
+
+COMPACT_THRESHOLD = 65536
+"""
+Number of consumed characters allowed to accumulate at the start of the
+buffer before the buffer is compacted.
+
+"""
+
+###############################################################################
+# Class JsonStream:
+#
+
+class JsonStream(object):
+    """
+    Class that incrementally decodes a JSON object.  Iterating over the
+    stream yields a tuple of container name, member key, and member value for
+    each member of the selected containers.  Member keys are strings for
+    objects and indexes for arrays.  Every other member is decoded in full
+    and made available through the fields property.
+
+    A stream can only be iterated once.  Malformed data or a failure reading
+    the underlying chunks raises a ValueError.
+
+    """
+
+    def __init__(self, chunks, containers, slug = None):
+        """
+        Method that initializes the JsonStream class.
+
+        :param chunks:
+            An iterable of bytes or str chunks holding the document.
+
+        :param containers:
+            The containers to be streamed.  Top level containers are
+            identified by name.  Nested containers are identified by a tuple
+            holding the names leading to the container.
+
+        :param slug:
+            An optional slug used to record the time spent decoding the
+            document, excluding the time spent waiting for chunks.
+
+        :type chunks:     iterable
+        :type containers: tuple, list, or set of str or tuple
+        :type slug:       str or None
+
+        """
+
+        super().__init__()
+
+        self.__chunks = iter(chunks)
+        self.__containers = dict()
+        for container in containers:
+            if isinstance(container, str):
+                path = ( container, )
+            else:
+                path = tuple(container)
+
+            node = self.__containers
+            for name in path[:-1]:
+                node = node.setdefault(name, dict())
+
+            node[path[-1]] = container
+
+        self.__text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.__json_decoder = json.JSONDecoder()
+        self.__buffer = str()
+        self.__position = 0
+        self.__end_of_data = False
+        self.__fields = dict()
+        self.__found = set()
+        self.__started = False
+        self.__bytes_read = 0
+
+        if slug is not None:
+            self.__decode_stopwatch = metrics.Stopwatch(
+                slug,
+                metrics.DECODE_TIME
+            )
+            self.__read_stopwatch = metrics.Stopwatch(
+                slug,
+                metrics.NETWORK_TIME
+            )
+        else:
+            self.__decode_stopwatch = None
+            self.__read_stopwatch = None
+
+
+    @property
+    def fields(self):
+        """
+        Read-only property holding the members that were not streamed.
+        Objects holding nested streamed containers are represented by
+        dictionaries of their remaining members.  Members that follow the
+        streamed containers are only available once iteration completes.
+
+        :type: dict
+
+        """
+
+        return self.__fields
+
+
+    @property
+    def status(self):
+        """
+        Read-only property holding the top level "status" member or None if
+        no status has been received.
+
+        :type: str or None
+
+        """
+
+        return self.__fields.get('status')
+
+
+    @property
+    def bytes_read(self):
+        """
+        Read-only property holding the number of bytes read so far.
+
+        :type: int
+
+        """
+
+        return self.__bytes_read
+
+
+    def found(self, container):
+        """
+        Method you can use to determine if a streamed container was present
+        in the document.
+
+        :param container:
+            The container name or path.
+
+        :return:
+            Returns True if the container was found.  Returns False if the
+            container was not found.
+
+        :type container: str or tuple
+        :rtype:          bool
+
+        """
+
+        return container in self.__found
+
+
+    def __iter__(self):
+        if self.__started:
+            raise ValueError("JSON stream can only be iterated once")
+
+        self.__started = True
+        if self.__decode_stopwatch is not None:
+            result = self.__timed(self.__parse_document())
+        else:
+            result = self.__parse_document()
+
+        return result
+
+
+    def __timed(self, members):
+        """
+        Generator that records the time spent producing members.  Time spent
+        by the caller between members and time spent waiting for chunks is
+        not counted.
+
+        :param members:
+            The generator producing the members.
+
+        :type members: generator
+
+        """
+
+        try:
+            while True:
+                with self.__decode_stopwatch:
+                    member = next(members, None)
+
+                if member is None:
+                    break
+
+                yield member
+        finally:
+            members.close()
+            self.__decode_stopwatch.record(self.__read_stopwatch.seconds)
+
+
+    def __parse_document(self):
+        """
+        Generator that parses the top level object.
+
+        """
+
+        yield from self.__parse_object(self.__containers, self.__fields)
+        if self.__peek() is not None:
+            raise ValueError("Extra data in JSON stream")
+
+
+    def __parse_object(self, containers, fields):
+        """
+        Generator that parses an object holding streamed containers.
+
+        :param containers:
+            Dictionary mapping member names to either a container name or a
+            dictionary describing nested containers.
+
+        :param fields:
+            Dictionary to receive the members that are not streamed.
+
+        :type containers: dict
+        :type fields:     dict
+
+        """
+
+        self.__expect('{')
+        if self.__peek() == '}':
+            self.__position += 1
+        else:
+            while True:
+                key = self.__value()
+                if not isinstance(key, str):
+                    raise ValueError("Expected string key in JSON stream")
+
+                self.__expect(':')
+                container = containers.get(key)
+                next_character = self.__peek()
+                if isinstance(container, dict) and next_character == '{':
+                    nested_fields = dict()
+                    fields[key] = nested_fields
+                    yield from self.__parse_object(container, nested_fields)
+                elif container is not None                  and \
+                     not isinstance(container, dict)        and \
+                     next_character is not None             and \
+                     next_character in '{['                     :
+                    self.__found.add(container)
+                    yield from self.__parse_container(container)
+                else:
+                    fields[key] = self.__value()
+
+                if self.__expect(',}') == '}':
+                    break
+
+
+    def __parse_container(self, container):
+        """
+        Generator that parses a streamed container.  Members are decoded
+        directly from the buffer, one complete member at a time.  A member
+        that is not yet complete is retried once more data has been read.
+
+        :param container:
+            The container name or path.
+
+        :type container: str or tuple
+
+        """
+
+        is_object = self.__expect('{[') == '{'
+        if is_object:
+            closing = '}'
+        else:
+            closing = ']'
+
+        if self.__peek() == closing:
+            self.__position += 1
+        else:
+            scan = self.__json_decoder.scan_once
+            skip = WHITESPACE_PATTERN.match
+            index = 0
+            done = False
+            while not done:
+                buffer = self.__buffer
+                try:
+                    position = skip(buffer, self.__position).end()
+                    if is_object:
+                        if buffer[position] != '"':
+                            raise ValueError("Expected string key")
+
+                        key, position = scan(buffer, position)
+                        position = skip(buffer, position).end()
+                        if buffer[position] != ':':
+                            raise ValueError("Expected ':'")
+
+                        position = skip(buffer, position + 1).end()
+                    else:
+                        key = index
+
+                    value, position = scan(buffer, position)
+                    position = skip(buffer, position).end()
+                    separator = buffer[position]
+                    if separator != ',' and separator != closing:
+                        raise ValueError("Expected ',' or '%s'"%closing)
+                except ( ValueError, IndexError, StopIteration ):
+                    if not self.__fill():
+                        raise ValueError(
+                            "Invalid JSON stream in \"%s\""%container
+                        )
+                else:
+                    self.__position = position + 1
+                    done = separator == closing
+                    index += 1
+
+                    yield ( container, key, value )
+
+
+    def __fill(self):
+        """
+        Method that appends the next chunk to the buffer.
+
+        :return:
+            Returns True if more data may be available.  Returns False at
+            the end of the data.
+
+        :rtype: bool
+
+        """
+
+        if self.__end_of_data:
+            result = False
+        else:
+            try:
+                if self.__read_stopwatch is not None:
+                    with self.__read_stopwatch:
+                        chunk = next(self.__chunks)
+                else:
+                    chunk = next(self.__chunks)
+            except StopIteration:
+                chunk = None
+            except Exception as e:
+                raise ValueError("Failed to read JSON stream: %s"%str(e))
+
+            if chunk is None:
+                self.__end_of_data = True
+                text = self.__text_decoder.decode(b'', final = True)
+            elif isinstance(chunk, str):
+                self.__bytes_read += len(chunk)
+                text = chunk
+            else:
+                self.__bytes_read += len(chunk)
+                text = self.__text_decoder.decode(chunk)
+
+            if self.__position > COMPACT_THRESHOLD           or \
+               self.__position == len(self.__buffer)            :
+                self.__buffer = self.__buffer[self.__position:] + text
+                self.__position = 0
+            else:
+                self.__buffer += text
+
+            result = True
+
+        return result
+
+
+    def __peek(self):
+        """
+        Method that skips whitespace and returns the next character without
+        consuming it.
+
+        :return:
+            Returns the next character or None at the end of the data.
+
+        :rtype: str or None
+
+        """
+
+        while True:
+            buffer = self.__buffer
+            length = len(buffer)
+            position = self.__position
+            while position < length and buffer[position] in WHITESPACE:
+                position += 1
+
+            self.__position = position
+            if position < length:
+                return buffer[position]
+            elif not self.__fill():
+                return None
+
+
+    def __expect(self, characters):
+        """
+        Method that consumes one of a set of structural characters.
+
+        :param characters:
+            The allowed characters.
+
+        :return:
+            Returns the consumed character.
+
+        :type characters: str
+        :rtype:           str
+
+        """
+
+        character = self.__peek()
+        if character is None or character not in characters:
+            raise ValueError(
+                "Expected one of \"%s\" in JSON stream, found %r"%(
+                    characters,
+                    character
+                )
+            )
+
+        self.__position += 1
+        return character
+
+
+    def __value(self):
+        """
+        Method that decodes a complete JSON value, reading more data as
+        needed.  Values ending at the end of the buffer are only accepted
+        once more data arrives since a number may continue in the next
+        chunk.
+
+        :return:
+            Returns the decoded value.
+
+        """
+
+        if self.__peek() is None:
+            raise ValueError("Unexpected end of JSON stream")
+
+        while True:
+            try:
+                value, end = self.__json_decoder.raw_decode(
+                    self.__buffer,
+                    self.__position
+                )
+            except json.JSONDecodeError as e:
+                if not self.__fill():
+                    raise ValueError("Invalid JSON stream: %s"%str(e))
+            else:
+                if end < len(self.__buffer) or not self.__fill():
+                    self.__position = end
+                    return value
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
@@ -46,6 +46,7 @@ import libraries.enumeration as enumeration
 import libraries.servers as servers
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
+import libraries.metrics as metrics
 
 ###############################################################################
 # Globals:
@@ -596,119 +597,117 @@ class Latencies(object):
 
         """
 
-        message = {}
-        if customer_id is not None:
-            message['customer_id'] = customer_id
+        stream = self.__get_stream(
+            customer_id,
+            monitor_id,
+            server_id,
+            region_id,
+            start_timestamp,
+            end_timestamp
+        )
 
-        if monitor_id is not None:
-            message['monitor_id'] = monitor_id
+        if stream is not None:
+            build_stopwatch = metrics.Stopwatch(
+                "latency/get",
+                metrics.BUILD_TIME
+            )
 
-        if server_id is not None:
-            message['server_id'] = server_id
+            raw_data = list()
+            aggregated_data = list()
+            try:
+                for container, index, entry in stream:
+                    with build_stopwatch:
+                        if container == 'recent':
+                            raw_data.append(self.__convert_to_latency(entry))
+                        else:
+                            aggregated_data.append(
+                                self.__convert_to_aggregated_latency(entry)
+                            )
+
+                if stream.status == 'OK'               and \
+                   stream.found('recent')              and \
+                   stream.found('aggregated')              :
+                    result = ( raw_data, aggregated_data )
+                else:
+                    result = None
+            except ValueError:
+                result = None
 
-        if region_id is not None:
-            message['region_id'] = region_id
+            build_stopwatch.record()
+        else:
+            result = None
 
-        if start_timestamp is not None:
-            message['start_timestamp'] = start_timestamp
+        return result
 
-        if end_timestamp is not None:
-            message['end_timestamp'] = end_timestamp
 
-        response = self.__rest_api.post_message(
-            slug = "latency/get",
-            secret = self.__secret,
-            message = message
+    def iter_get(
+        self,
+        customer_id = None,
+        monitor_id = None,
+        server_id = None,
+        region_id = None,
+        start_timestamp = None,
+        end_timestamp = None
+        ):
+        """
+        Method you can use to iterate over latency information as it is
+        received.  Unlike get, entries are not accumulated in memory.
+
+        :param customer_id:
+            The customer ID of the desired customer.  A value of None indicates
+            all customers.  Note that you should specify customer_id or
+            monitor_id, never both.
+
+        :param monitor_id:
+            The monitor ID of the desired customer.  A value of None indicates
+            all monitors.  Note that you should specify customer_id or
+            monitor_id, never both.
+
+        :param server_id:
+            The server ID of the server that triggered the request.  A value of
+            None indicates all servers.  Note that you should specify server_id
+            or region_id, never both.
+
+        :param region_id:
+            The region ID of the server(s) that triggered the request.  A value
+            of None indicates all regions.  Note that you should specify
+            server_id or region_id, never both.
+
+        :param start_timestamp:
+            The start timestamp for the entries.  A value of None indicates the
+            earliest entries are desired.
+
+        :param end_timestmap:
+            The end timestamp for the entries.  A value of None indicates now.
+
+        :return:
+            Returns an iterator over Latency entries for the raw latency data
+            and AggregatedLatency entries for the longer term aggregated data,
+            in the order they are received.  None is returned if the request
+            failed.  Iteration raises a ValueError if the response is
+            malformed or reports an error.
+
+        :type customer_id:     int or None
+        :type monitor_id:      int or None
+        :type server_id:       int or None
+        :type region_id:       int or None
+        :type start_timestamp: int or None
+        :type end_timestamp:   int or None
+        :rtype:                iterator or None
+
+        """
+
+        stream = self.__get_stream(
+            customer_id,
+            monitor_id,
+            server_id,
+            region_id,
+            start_timestamp,
+            end_timestamp
         )
 
-        if response is not None and 'status' in response:
-            status = response['status']
-            if status == 'OK'           and \
-               'recent' in response     and \
-               'aggregated' in response     :
-                recent_entries = response['recent']
-                aggregated_entries = response['aggregated']
-
-                raw_data = list()
-                for entry in recent_entries:
-                    try:
-                        monitor_id = int(entry['monitor_id'])
-                        server_id = int(entry['server_id'])
-                        region_id = int(entry['region_id'])
-                        customer_id = int(entry['customer_id'])
-                        timestamp = int(entry['timestamp'])
-                        latency = float(entry['latency'])
-                    except:
-                        monitor_id = None
-                        server_id = None
-                        region_id = None
-                        customer_id = None
-                        timestamp = None
-                        latency = None
-
-                    latency_entry = Latency(
-                        monitor_id = monitor_id,
-                        server_id = server_id,
-                        region_id = region_id,
-                        customer_id = customer_id,
-                        timestamp = timestamp,
-                        latency = latency
-                    )
-
-                    raw_data.append(latency_entry)
-
-                aggregated_data = list()
-                for entry in aggregated_entries:
-                    try:
-                        monitor_id = int(entry['monitor_id'])
-                        server_id = int(entry['server_id'])
-                        region_id = int(entry['region_id'])
-                        customer_id = int(entry['customer_id'])
-                        timestamp = int(entry['timestamp'])
-                        latency = float(entry['latency'])
-                        average = float(entry['average'])
-                        variance = float(entry['variance'])
-                        minimum = float(entry['minimum'])
-                        maximum = float(entry['maximum'])
-                        number_samples = int(entry['number_samples'])
-                        start_timestamp = int(entry['start_timestamp'])
-                        end_timestamp = int(entry['end_timestamp'])
-                    except:
-                        monitor_id = None
-                        server_id = None
-                        region_id = None
-                        customer_id = None
-                        timestamp = None
-                        latency = None
-                        average = None
-                        variance = None
-                        minimum = None
-                        maximum = None
-                        number_samples = None
-                        start_timestamp = None
-                        end_timestamp = None
-
-                    latency_entry = AggregatedLatency(
-                        monitor_id = monitor_id,
-                        server_id = server_id,
-                        region_id = region_id,
-                        customer_id = customer_id,
-                        timestamp = timestamp,
-                        latency = latency,
-                        mean_latency = average,
-                        variance_latency = variance,
-                        minimum_latency = minimum,
-                        maximum_latency = maximum,
-                        start_timestamp = start_timestamp,
-                        end_timestamp = end_timestamp,
-                        number_samples = number_samples
-                    )
-
-                    aggregated_data.append(latency_entry)
-
-                result = ( raw_data, aggregated_data )
-            else:
-                result = None
+        if stream is not None:
+            result = self.__iter_stream(stream)
         else:
             result = None
 
@@ -994,6 +993,8 @@ class Latencies(object):
             message = message
         )
 
+        build_start_time = metrics.timer()
+
         if response is not None and 'status' in response:
             status = response['status']
             if status == 'OK' and 'statistics' in response:
@@ -1003,8 +1004,229 @@ class Latencies(object):
         else:
             result = None
 
+        metrics.elapsed(
+            "latency/statistics",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
+        return result
+
+
+    def __get_stream(
+        self,
+        customer_id,
+        monitor_id,
+        server_id,
+        region_id,
+        start_timestamp,
+        end_timestamp
+        ):
+        """
+        Method used internally to issue a latency/get request.
+
+        :param customer_id:
+            The customer ID of the desired customer or None.
+
+        :param monitor_id:
+            The monitor ID of the desired monitor or None.
+
+        :param server_id:
+            The server ID of the desired server or None.
+
+        :param region_id:
+            The region ID of the desired region or None.
+
+        :param start_timestamp:
+            The start timestamp for the entries or None.
+
+        :param end_timestmap:
+            The end timestamp for the entries or None.
+
+        :return:
+            Returns the streamed response or None if the request failed.
+
+        :type customer_id:     int or None
+        :type monitor_id:      int or None
+        :type server_id:       int or None
+        :type region_id:       int or None
+        :type start_timestamp: int or None
+        :type end_timestamp:   int or None
+        :rtype:                json_stream.JsonStream or None
+
+        """
+
+        message = {}
+        if customer_id is not None:
+            message['customer_id'] = customer_id
+
+        if monitor_id is not None:
+            message['monitor_id'] = monitor_id
+
+        if server_id is not None:
+            message['server_id'] = server_id
+
+        if region_id is not None:
+            message['region_id'] = region_id
+
+        if start_timestamp is not None:
+            message['start_timestamp'] = start_timestamp
+
+        if end_timestamp is not None:
+            message['end_timestamp'] = end_timestamp
+
+        stream = self.__rest_api.post_message_stream(
+            slug = "latency/get",
+            secret = self.__secret,
+            message = message,
+            containers = ( 'recent', 'aggregated' )
+        )
+
+        return stream
+
+
+    def __iter_stream(self, stream):
+        """
+        Generator used internally to parse a streamed latency response.
+
+        :param stream:
+            The streamed response.
+
+        :return:
+            Yields Latency and AggregatedLatency instances.
+
+        :type stream: json_stream.JsonStream
+
+        """
+
+        build_stopwatch = metrics.Stopwatch("latency/get", metrics.BUILD_TIME)
+        try:
+            for container, index, entry in stream:
+                with build_stopwatch:
+                    if container == 'recent':
+                        latency = self.__convert_to_latency(entry)
+                    else:
+                        latency = self.__convert_to_aggregated_latency(entry)
+
+                yield latency
+
+            if stream.status != 'OK'          or \
+               not stream.found('recent')     or \
+               not stream.found('aggregated')    :
+                raise ValueError("Invalid latency response")
+        finally:
+            build_stopwatch.record()
+
+
+    def __convert_to_latency(self, entry):
+        """
+        Method used internally to convert a response entry to a Latency
+        instance.
+
+        :param entry:
+            A dictionary holding the returned data.
+
+        :return:
+            Returns the latency instance.  Fields are set to None if the entry
+            is malformed.
+
+        :type entry: dict
+        :rtype:      Latency
+
+        """
+
+        try:
+            monitor_id = int(entry['monitor_id'])
+            server_id = int(entry['server_id'])
+            region_id = int(entry['region_id'])
+            customer_id = int(entry['customer_id'])
+            timestamp = int(entry['timestamp'])
+            latency = float(entry['latency'])
+        except:
+            monitor_id = None
+            server_id = None
+            region_id = None
+            customer_id = None
+            timestamp = None
+            latency = None
+
+        result = Latency(
+            monitor_id = monitor_id,
+            server_id = server_id,
+            region_id = region_id,
+            customer_id = customer_id,
+            timestamp = timestamp,
+            latency = latency
+        )
+
+        return result
+
+
+    def __convert_to_aggregated_latency(self, entry):
+        """
+        Method used internally to convert a response entry to an
+        AggregatedLatency instance.
+
+        :param entry:
+            A dictionary holding the returned data.
+
+        :return:
+            Returns the aggregated latency instance.  Fields are set to None
+            if the entry is malformed.
+
+        :type entry: dict
+        :rtype:      AggregatedLatency
+
+        """
+
+        try:
+            monitor_id = int(entry['monitor_id'])
+            server_id = int(entry['server_id'])
+            region_id = int(entry['region_id'])
+            customer_id = int(entry['customer_id'])
+            timestamp = int(entry['timestamp'])
+            latency = float(entry['latency'])
+            average = float(entry['average'])
+            variance = float(entry['variance'])
+            minimum = float(entry['minimum'])
+            maximum = float(entry['maximum'])
+            number_samples = int(entry['number_samples'])
+            start_timestamp = int(entry['start_timestamp'])
+            end_timestamp = int(entry['end_timestamp'])
+        except:
+            monitor_id = None
+            server_id = None
+            region_id = None
+            customer_id = None
+            timestamp = None
+            latency = None
+            average = None
+            variance = None
+            minimum = None
+            maximum = None
+            number_samples = None
+            start_timestamp = None
+            end_timestamp = None
+
+        result = AggregatedLatency(
+            monitor_id = monitor_id,
+            server_id = server_id,
+            region_id = region_id,
+            customer_id = customer_id,
+            timestamp = timestamp,
+            latency = latency,
+            mean_latency = average,
+            variance_latency = variance,
+            minimum_latency = minimum,
+            maximum_latency = maximum,
+            start_timestamp = start_timestamp,
+            end_timestamp = end_timestamp,
+            number_samples = number_samples
+        )
+
         return result
 
+
 ###############################################################################
 # Main:
 #
@@ -0,0 +1,841 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+# 
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#   
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#   
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that collects per-slug histograms used to determine where time
+is spent when talking to the database controller.  Collection is disabled by
+default and costs almost nothing until enabled.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import sys
+import time
+import json
+import bisect
+import threading
+
+###############################################################################
+# Globals:
+#
+
+REQUEST_SIZE = 'request_bytes'
+"""
+Quantity holding the size of each request, in bytes.
+
+"""
+
+RESPONSE_SIZE = 'response_bytes'
+"""
+Quantity holding the size of each response, in bytes.
+
+"""
+
+SIGN_TIME = 'sign_seconds'
+"""
+Quantity holding the time required to encode and sign each request.
+
+"""
+
+NETWORK_TIME = 'network_seconds'
+"""
+Quantity holding the time spent waiting on the network for each request.
+
+"""
+
+DECODE_TIME = 'decode_seconds'
+"""
+Quantity holding the time required to decode each response.
+
+"""
+
+BUILD_TIME = 'build_seconds'
+"""
+Quantity holding the time the facades spend building objects from each
+response.
+
+"""
+
+QUANTITY_DESCRIPTIONS = {
+    REQUEST_SIZE : "Request size in bytes.",
+    RESPONSE_SIZE : "Response size in bytes.",
+    SIGN_TIME : "Time spent encoding and signing requests.",
+    NETWORK_TIME : "Time spent waiting on the network.",
+    DECODE_TIME : "Time spent decoding responses.",
+    BUILD_TIME : "Time spent building objects from responses."
+}
+"""
+Descriptions of each quantity, used in reports.
+
+"""
+
+TIME_BUCKETS = tuple(0.0001 * (2 ** i) for i in range(20))
+"""
+Histogram bucket upper bounds used for times, in seconds.
+
+"""
+
+SIZE_BUCKETS = tuple(64 * (4 ** i) for i in range(10))
+"""
+Histogram bucket upper bounds used for sizes, in bytes.
+
+"""
+
+STATS_FORMATS = ( 'json', 'prometheus' )
+"""
+The supported statistics dump formats.
+
+"""
+
+METRIC_PREFIX = "speedsentry_"
+"""
+Prefix applied to Prometheus metric names.
+
+"""
+
+__registry = None
+"""
+The active metrics registry.  None if collection is disabled.
+
+"""
+
+###############################################################################
+# Class Histogram:
+#
+
+class Histogram(object):
+    """
+    Class that tracks a histogram of values using fixed buckets.
+
+    """
+
+    def __init__(self, buckets):
+        """
+        Method that initializes the Histogram class.
+
+        :param buckets:
+            The ordered bucket upper bounds.
+
+        :type buckets: tuple
+
+        """
+
+        super().__init__()
+
+        self.__buckets = buckets
+        self.__counts = [ 0 ] * (len(buckets) + 1)
+        self.__count = 0
+        self.__sum = 0
+        self.__minimum = None
+        self.__maximum = None
+
+
+    @property
+    def count(self):
+        """
+        Read-only property holding the number of observations.
+
+        :type: int
+
+        """
+
+        return self.__count
+
+
+    @property
+    def sum(self):
+        """
+        Read-only property holding the sum of all observations.
+
+        :type: float
+
+        """
+
+        return self.__sum
+
+
+    @property
+    def minimum(self):
+        """
+        Read-only property holding the smallest observation.
+
+        :type: float or None
+
+        """
+
+        return self.__minimum
+
+
+    @property
+    def maximum(self):
+        """
+        Read-only property holding the largest observation.
+
+        :type: float or None
+
+        """
+
+        return self.__maximum
+
+
+    @property
+    def mean(self):
+        """
+        Read-only property holding the mean observation.
+
+        :type: float or None
+
+        """
+
+        if self.__count > 0:
+            result = self.__sum / self.__count
+        else:
+            result = None
+
+        return result
+
+
+    def observe(self, value):
+        """
+        Method that adds an observation to the histogram.
+
+        :param value:
+            The value to add.
+
+        :type value: float
+
+        """
+
+        self.__counts[bisect.bisect_left(self.__buckets, value)] += 1
+        self.__count += 1
+        self.__sum += value
+
+        if self.__minimum is None or value < self.__minimum:
+            self.__minimum = value
+
+        if self.__maximum is None or value > self.__maximum:
+            self.__maximum = value
+
+
+    def percentile(self, fraction):
+        """
+        Method that estimates a percentile.  The estimate is the upper bound
+        of the bucket holding the percentile, limited to the largest
+        observation.
+
+        :param fraction:
+            The percentile, as a fraction between 0 and 1.
+
+        :return:
+            Returns the estimated percentile or None if there are no
+            observations.
+
+        :type fraction: float
+        :rtype:         float or None
+
+        """
+
+        if self.__count > 0:
+            target = fraction * self.__count
+            running = 0
+            result = self.__maximum
+            for index, count in enumerate(self.__counts[:-1]):
+                running += count
+                if running >= target:
+                    result = min(self.__buckets[index], self.__maximum)
+                    break
+        else:
+            result = None
+
+        return result
+
+
+    def cumulative_buckets(self):
+        """
+        Method that returns the cumulative bucket counts.
+
+        :return:
+            Returns a list of tuples holding each upper bound and the number of
+            observations less than or equal to the bound.  The last entry uses
+            an upper bound of "+Inf".
+
+        :rtype: list
+
+        """
+
+        result = list()
+        running = 0
+        for bound, count in zip(self.__buckets + ( "+Inf", ), self.__counts):
+            running += count
+            result.append(( bound, running ))
+
+        return result
+
+
+    def as_dictionary(self):
+        """
+        Method that returns a dictionary representation of the histogram.
+
+        :return:
+            Returns a dictionary holding the histogram statistics.
+
+        :rtype: dict
+
+        """
+
+        return {
+            'count' : self.__count,
+            'sum' : self.__sum,
+            'minimum' : self.__minimum,
+            'maximum' : self.__maximum,
+            'mean' : self.mean,
+            'p50' : self.percentile(0.50),
+            'p90' : self.percentile(0.90),
+            'p99' : self.percentile(0.99),
+            'buckets' : [ [ str(b), c ] for b, c in self.cumulative_buckets() ]
+        }
+
+###############################################################################
+# Class Metrics:
+#
+
+class Metrics(object):
+    """
+    Class that holds a histogram for each slug and quantity.
+
+    """
+
+    def __init__(self):
+        """
+        Method that initializes the Metrics class.
+
+        """
+
+        super().__init__()
+
+        self.__lock = threading.Lock()
+        self.__histograms = dict()
+
+
+    def observe(self, slug, quantity, value):
+        """
+        Method that records an observation.
+
+        :param slug:
+            The slug the observation applies to.
+
+        :param quantity:
+            The quantity being observed, for example NETWORK_TIME.
+
+        :param value:
+            The observed value.
+
+        :type slug:     str
+        :type quantity: str
+        :type value:    float
+
+        """
+
+        key = ( slug, quantity )
+        with self.__lock:
+            histogram = self.__histograms.get(key)
+            if histogram is None:
+                if quantity.endswith('_bytes'):
+                    histogram = Histogram(SIZE_BUCKETS)
+                else:
+                    histogram = Histogram(TIME_BUCKETS)
+
+                self.__histograms[key] = histogram
+
+            histogram.observe(value)
+
+
+    def histograms(self):
+        """
+        Method that returns the histograms, sorted by slug and quantity.
+
+        :return:
+            Returns a list of tuples holding the slug, quantity, and
+            histogram.
+
+        :rtype: list
+
+        """
+
+        with self.__lock:
+            result = [
+                ( slug, quantity, histogram )
+                for ( slug, quantity ), histogram in self.__histograms.items()
+            ]
+
+        result.sort(key = lambda x: ( x[0], x[1] ))
+        return result
+
+
+    def as_json(self):
+        """
+        Method that returns the metrics in JSON format.
+
+        :return:
+            Returns the metrics as a JSON document keyed by slug and then by
+            quantity.
+
+        :rtype: str
+
+        """
+
+        result = dict()
+        for slug, quantity, histogram in self.histograms():
+            slug_data = result.setdefault(slug, dict())
+            slug_data[quantity] = histogram.as_dictionary()
+
+        return json.dumps(result, indent = 4)
+
+
+    def as_prometheus(self):
+        """
+        Method that returns the metrics in Prometheus text exposition
+        format.
+
+        :return:
+            Returns the metrics as Prometheus text.
+
+        :rtype: str
+
+        """
+
+        by_quantity = dict()
+        for slug, quantity, histogram in self.histograms():
+            by_quantity.setdefault(quantity, list()).append((slug, histogram))
+
+        lines = list()
+        for quantity in sorted(by_quantity):
+            name = METRIC_PREFIX + quantity
+            lines.append(
+                "# HELP %s %s"%(name, QUANTITY_DESCRIPTIONS.get(quantity, ""))
+            )
+            lines.append("# TYPE %s histogram"%name)
+            for slug, histogram in by_quantity[quantity]:
+                for bound, count in histogram.cumulative_buckets():
+                    lines.append(
+                        "%s_bucket{slug=\"%s\",le=\"%s\"} %d"%(
+                            name,
+                            slug,
+                            bound,
+                            count
+                        )
+                    )
+
+                lines.append(
+                    "%s_sum{slug=\"%s\"} %r"%(name, slug, histogram.sum)
+                )
+                lines.append(
+                    "%s_count{slug=\"%s\"} %d"%(name, slug, histogram.count)
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+    def summary(self):
+        """
+        Method that returns a human readable summary of the metrics.
+
+        :return:
+            Returns a table of the metrics.
+
+        :rtype: str
+
+        """
+
+        rows = [ (
+            "Slug", "Quantity", "Count", "Mean", "P50", "P90", "Max", "Total"
+        ) ]
+        for slug, quantity, histogram in self.histograms():
+            if quantity.endswith('_bytes'):
+                fmt = lambda x: "%d"%x
+            else:
+                fmt = lambda x: "%.2f ms"%(1000.0 * x)
+
+            rows.append((
+                slug,
+                quantity,
+                str(histogram.count),
+                fmt(histogram.mean),
+                fmt(histogram.percentile(0.50)),
+                fmt(histogram.percentile(0.90)),
+                fmt(histogram.maximum),
+                fmt(histogram.sum)
+            ))
+
+        widths = [ max(len(r[i]) for r in rows) for i in range(len(rows[0])) ]
+        fmt_string = "%%-%ds  %%-%ds  %s\n"%(
+            widths[0],
+            widths[1],
+            "  ".join("%%%ds"%w for w in widths[2:])
+        )
+
+        return "".join(fmt_string%row for row in rows)
+
+###############################################################################
+# Class Stopwatch:
+#
+
+class Stopwatch(object):
+    """
+    Class that accumulates the time spent in a section of code that is
+    entered many times, such as the body of a generator, and records the
+    total as a single observation.  The stopwatch does nothing if collection
+    is disabled when it is created.
+
+    """
+
+    def __init__(self, slug, quantity):
+        """
+        Method that initializes the Stopwatch class.
+
+        :param slug:
+            The slug the measurement applies to.
+
+        :param quantity:
+            The quantity being measured, for example BUILD_TIME.
+
+        :type slug:     str
+        :type quantity: str
+
+        """
+
+        super().__init__()
+
+        self.__slug = slug
+        self.__quantity = quantity
+        self.__enabled = timer() is not None
+        self.__start_time = None
+        self.__seconds = 0.0
+        self.__recorded = False
+
+
+    def __enter__(self):
+        """
+        Method that starts timing a section.
+
+        :return:
+            Returns this stopwatch.
+
+        :rtype: Stopwatch
+
+        """
+
+        if self.__enabled:
+            self.__start_time = time.perf_counter()
+
+        return self
+
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        """
+        Method that stops timing a section.
+
+        :param exception_type:
+            The type of exception raised in the section, if any.
+
+        :param exception_value:
+            The exception raised in the section, if any.
+
+        :param traceback:
+            The traceback of the exception, if any.
+
+        :return:
+            Returns False so exceptions are propagated.
+
+        :rtype: bool
+
+        """
+
+        if self.__enabled:
+            self.__seconds += time.perf_counter() - self.__start_time
+
+        return False
+
+
+    @property
+    def seconds(self):
+        """
+        Read-only property holding the time accumulated so far.
+
+        :type: float
+
+        """
+
+        return self.__seconds
+
+
+    def record(self, excluded_seconds = 0.0):
+        """
+        Method that records the accumulated time.  Only the first call
+        records an observation.
+
+        :param excluded_seconds:
+            Time included in the sections that should not be counted.
+
+        :type excluded_seconds: float
+
+        """
+
+        if self.__enabled and not self.__recorded:
+            self.__recorded = True
+            observe(
+                self.__slug,
+                self.__quantity,
+                max(0.0, self.__seconds - excluded_seconds)
+            )
+
+###############################################################################
+# Functions:
+#
+
+def enable():
+    """
+    Function that enables metrics collection.
+
+    :return:
+        Returns the active metrics registry.
+
+    :rtype: Metrics
+
+    """
+
+    global __registry
+    if __registry is None:
+        __registry = Metrics()
+
+    return __registry
+
+
+def reset():
+    """
+    Function that discards all collected metrics.  Collection remains
+    enabled if it was enabled.
+
+    """
+
+    global __registry
+    if __registry is not None:
+        __registry = Metrics()
+
+
+def registry():
+    """
+    Function that returns the active metrics registry.
+
+    :return:
+        Returns the active metrics registry or None if collection is
+        disabled.
+
+    :rtype: Metrics or None
+
+    """
+
+    return __registry
+
+
+def observe(slug, quantity, value):
+    """
+    Function that records an observation if collection is enabled.
+
+    :param slug:
+        The slug the observation applies to.
+
+    :param quantity:
+        The quantity being observed.
+
+    :param value:
+        The observed value.
+
+    :type slug:     str
+    :type quantity: str
+    :type value:    float
+
+    """
+
+    if __registry is not None:
+        __registry.observe(slug, quantity, value)
+
+
+def timer():
+    """
+    Function that starts a timing measurement.
+
+    :return:
+        Returns the start time or None if collection is disabled.
+
+    :rtype: float or None
+
+    """
+
+    if __registry is not None:
+        result = time.perf_counter()
+    else:
+        result = None
+
+    return result
+
+
+def elapsed(slug, quantity, start_time):
+    """
+    Function that completes a timing measurement started with timer.
+
+    :param slug:
+        The slug the measurement applies to.
+
+    :param quantity:
+        The quantity being measured.
+
+    :param start_time:
+        The value returned by timer.
+
+    :type slug:       str
+    :type quantity:   str
+    :type start_time: float or None
+
+    """
+
+    if start_time is not None and __registry is not None:
+        __registry.observe(slug, quantity, time.perf_counter() - start_time)
+
+
+def add_arguments(parser):
+    """
+    Function that adds the statistics command line switches to an argument
+    parser.
+
+    :param parser:
+        The argument parser to update.
+
+    :type parser: argparse.ArgumentParser
+
+    """
+
+    parser.add_argument(
+        "--stats",
+        help = "You can use this switch to collect per-request statistics "
+               "and report them on stderr when the command completes.",
+        action = "store_true",
+        default = False,
+        dest = 'stats'
+    )
+
+    parser.add_argument(
+        "--stats-file",
+        help = "You can use this switch to write the collected statistics to "
+               "a file.  Implies --stats.",
+        type = str,
+        default = None,
+        dest = 'stats_file'
+    )
+
+    parser.add_argument(
+        "--stats-format",
+        help = "You can use this switch to select the statistics file format. "
+               "Supported values are %s.  The default is json."%(
+                   ", ".join(STATS_FORMATS)
+               ),
+        type = str,
+        choices = STATS_FORMATS,
+        default = 'json',
+        dest = 'stats_format'
+    )
+
+
+def configure(arguments):
+    """
+    Function that enables metrics collection if requested on the command
+    line.
+
+    :param arguments:
+        The parsed command line arguments.
+
+    :type arguments: argparse.Namespace
+
+    """
+
+    if arguments.stats or arguments.stats_file is not None:
+        enable()
+
+
+def report(arguments):
+    """
+    Function that reports the collected statistics as requested on the
+    command line.
+
+    :param arguments:
+        The parsed command line arguments.
+
+    :return:
+        Returns True on success.  Returns False on error.
+
+    :rtype: bool
+
+    """
+
+    success = True
+    if __registry is not None:
+        if arguments.stats:
+            sys.stderr.write(__registry.summary())
+
+        if arguments.stats_file is not None:
+            if arguments.stats_format == 'prometheus':
+                contents = __registry.as_prometheus()
+            else:
+                contents = __registry.as_json()
+
+            try:
+                with open(arguments.stats_file, 'w') as fh:
+                    fh.write(contents)
+            except Exception as e:
+                success = False
+                sys.stderr.write(
+                    "*** Could not write statistics file %s: %s\n"%(
+                        arguments.stats_file,
+                        str(e)
+                    )
+                )
+
+    return success
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
@@ -0,0 +1,670 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+#
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that locates and loads monitor description files, as accepted
+by the monitor update command.  Many files can be parsed at once using a pool
+of worker processes.  YAML is parsed using libyaml when it is available and
+parsed descriptions are cached by file content so unchanged files are not
+parsed again.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import os
+import stat
+import json
+import hashlib
+import marshal
+import threading
+import collections
+import multiprocessing
+import concurrent.futures
+
+import yaml
+
+###############################################################################
+# Globals:
+#
+
+FILE_TYPES = {
+    '.yaml' : 'yaml',
+    '.yml' : 'yaml',
+    '.json' : 'json'
+}
+"""
+Dictionary mapping description filename extensions to file types.
+
+"""
+
+MINIMUM_POOL_SIZE = 4
+"""
+The smallest number of files that will be parsed using worker processes.
+Fewer files are parsed by the calling process.
+
+"""
+
+POOL_START_METHOD = "fork"
+"""
+The method used to start worker processes.  Workers must be forked as the
+command line scripts are not safe to import from a spawned process.  Files
+are parsed by the calling process on platforms that can not fork.
+
+"""
+
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+"""
+The loader used to parse YAML descriptions.  The libyaml based loader is used
+when PyYAML was built with libyaml support.
+
+"""
+
+DEFAULT_CACHE_DIRECTORY = "~/.speedsentry_descriptions"
+"""
+The default directory used to persist parsed descriptions between runs.
+
+"""
+
+MAXIMUM_CACHE_ENTRIES = 8192
+"""
+The largest number of parsed descriptions kept in the cache directory.  The
+least recently written entries are removed first.
+
+"""
+
+__cache_directory = None
+"""
+The directory used to persist parsed descriptions or None if parsed
+descriptions are only cached in memory.
+
+"""
+
+__cache_pruned = False
+"""
+Flag indicating if the cache directory has been pruned by this process.
+
+"""
+
+MAXIMUM_MEMORY_ENTRIES = 256
+"""
+The largest number of parsed descriptions, and of file digests, held in
+memory.  The least recently used entries are discarded first.
+
+"""
+
+PLAIN_TYPES = ( str, int, float, bool, type(None) )
+"""
+The scalar types a cached description may hold.  Descriptions may also hold
+lists and dictionaries of these types.
+
+"""
+
+__file_digests = collections.OrderedDict()
+"""
+Dictionary of file digests keyed by filename and file type.  Each entry holds
+the file modification time, size, and digest.
+
+"""
+
+__parsed = collections.OrderedDict()
+"""
+Dictionary of serialized descriptions keyed by digest.
+
+"""
+
+__cache_lock = threading.Lock()
+"""
+Lock used to serialize access to the in-memory caches.
+
+"""
+
+###############################################################################
+# Functions:
+#
+
+def configure(configuration):
+    """
+    Function that configures the description cache from the
+    "description_cache" section of the configuration.  The section is
+    optional and may contain:
+
+        "enabled"   - False to cache parsed descriptions in memory only.
+                      Defaults to True.
+        "directory" - Path to the directory used to persist parsed
+                      descriptions between runs.  Defaults to
+                      ~/.speedsentry_descriptions.
+
+    :param configuration:
+        The parsed configuration.
+
+    :type configuration: dict
+
+    """
+
+    global __cache_directory
+    global __cache_pruned
+
+    cache_configuration = configuration.get('description_cache', dict())
+    if cache_configuration.get('enabled', True):
+        __cache_directory = os.path.expanduser(
+            cache_configuration.get('directory', DEFAULT_CACHE_DIRECTORY)
+        )
+    else:
+        __cache_directory = None
+
+    __cache_pruned = False
+
+
+def file_type(filename):
+    """
+    Function that determines the file type of a description from its
+    filename extension.
+
+    :param filename:
+        The description filename.
+
+    :return:
+        Returns "yaml", "json", or None if the extension is not recognized.
+
+    :type filename: str
+    :rtype:         str or None
+
+    """
+
+    return FILE_TYPES.get(os.path.splitext(filename)[1].lower())
+
+
+def load(filename, description_type = None):
+    """
+    Function that loads a monitor description.
+
+    :param filename:
+        The description filename.
+
+    :param description_type:
+        The file type, either "yaml" or "json".  If None, the type is
+        determined from the filename extension.
+
+    :return:
+        Returns the description.
+
+    :raises ValueError:
+        Raised if the file can not be read or parsed.
+
+    :type filename:         str
+    :type description_type: str or None
+    :rtype:                 object
+
+    """
+
+    if description_type is None:
+        description_type = file_type(filename)
+
+    if description_type != 'yaml' and description_type != 'json':
+        raise ValueError("Unknown file type for \"%s\""%filename)
+
+    try:
+        status = os.stat(filename)
+        file_key = ( os.path.abspath(filename), description_type )
+        with __cache_lock:
+            digest_entry = __file_digests.get(file_key)
+            if digest_entry is not None:
+                __file_digests.move_to_end(file_key)
+
+        if digest_entry is not None                      and \
+           digest_entry[0] == status.st_mtime_ns         and \
+           digest_entry[1] == status.st_size                 :
+            digest = digest_entry[2]
+            content = None
+        else:
+            with open(filename, 'rb') as fh:
+                content = fh.read()
+
+            digest = hashlib.sha256(
+                description_type.encode('utf-8') + b'\0' + content
+            ).hexdigest()
+
+            with __cache_lock:
+                __file_digests[file_key] = (
+                    status.st_mtime_ns,
+                    status.st_size,
+                    digest
+                )
+                while len(__file_digests) > MAXIMUM_MEMORY_ENTRIES:
+                    __file_digests.popitem(last = False)
+    except OSError as e:
+        raise ValueError("Could not read \"%s\": %s"%(filename, str(e)))
+
+    result = __cached(digest)
+    if result is None and content is None:
+        try:
+            with open(filename, 'rb') as fh:
+                content = fh.read()
+        except OSError as e:
+            raise ValueError("Could not read \"%s\": %s"%(filename, str(e)))
+
+    if result is None:
+        try:
+            text = content.decode('utf-8')
+            if description_type == 'json':
+                result = json.loads(text)
+            else:
+                result = yaml.load(text, Loader = YAML_LOADER)
+        except Exception as e:
+            raise ValueError(
+                "Could not parse \"%s\": %s"%(filename, str(e))
+            )
+
+        __cache(digest, result)
+
+    return result
+
+
+def load_many(filenames, workers = None):
+    """
+    Function that loads many monitor descriptions, parsing files in a pool of
+    worker processes.
+
+    :param filenames:
+        The description filenames.  File types are determined from the
+        filename extensions.
+
+    :param workers:
+        The number of worker processes.  A value of None uses one worker per
+        processor.  Worker processes are only used if they can be forked from
+        a process with no other threads running.
+
+    :return:
+        Returns a list holding a tuple for each file, in the order provided.
+        Each tuple holds the description and None on success or None and an
+        error message on failure.
+
+    :type filenames: list of str
+    :type workers:   int or None
+    :rtype:          list of tuples
+
+    """
+
+    filenames = list(filenames)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    workers = min(workers, len(filenames))
+    if workers > 1                                                      and \
+       len(filenames) >= MINIMUM_POOL_SIZE                              and \
+       POOL_START_METHOD in multiprocessing.get_all_start_methods()     and \
+       threading.active_count() == 1                                        :
+        chunk_size = max(1, len(filenames) // (workers * 4))
+        with concurrent.futures.ProcessPoolExecutor(
+                workers,
+                mp_context = multiprocessing.get_context(POOL_START_METHOD)
+            ) as executor:
+            result = list(
+                executor.map(__load_entry, filenames, chunksize = chunk_size)
+            )
+    else:
+        result = [ __load_entry(filename) for filename in filenames ]
+
+    return result
+
+
+def find(path):
+    """
+    Function that locates the description files to be applied.  If the path
+    is a directory, each file named "<customer id>.yaml", "<customer
+    id>.yml", or "<customer id>.json" in the directory is used.  Otherwise
+    the path is treated as a YAML or JSON manifest holding a dictionary of
+    description filenames keyed by customer ID.  Relative filenames in a
+    manifest are relative to the manifest.
+
+    :param path:
+        The directory or manifest.
+
+    :return:
+        Returns a list of tuples holding a customer ID and filename, ordered
+        by customer ID.
+
+    :raises ValueError:
+        Raised if the directory or manifest is invalid.
+
+    :type path: str
+    :rtype:     list of tuples
+
+    """
+
+    result = list()
+    if os.path.isdir(path):
+        try:
+            entries = sorted(os.listdir(path))
+        except OSError as e:
+            raise ValueError("Could not read \"%s\": %s"%(path, str(e)))
+
+        for entry in entries:
+            stem, extension = os.path.splitext(entry)
+            if extension.lower() in FILE_TYPES:
+                try:
+                    customer_id = int(stem)
+                except ValueError:
+                    raise ValueError(
+                        "Filename \"%s\" is not a customer ID"%entry
+                    )
+
+                result.append(( customer_id, os.path.join(path, entry) ))
+    else:
+        manifest = load(path, file_type(path) or 'yaml')
+        if not isinstance(manifest, dict):
+            raise ValueError("Manifest \"%s\" must be a dictionary"%path)
+
+        directory = os.path.dirname(path)
+        for key, filename in manifest.items():
+            try:
+                customer_id = int(key)
+            except (TypeError, ValueError):
+                raise ValueError("Invalid customer ID \"%s\""%str(key))
+
+            result.append(
+                ( customer_id, os.path.join(directory, str(filename)) )
+            )
+
+    customer_ids = [ customer_id for customer_id, filename in result ]
+    if len(set(customer_ids)) != len(customer_ids):
+        raise ValueError("Customers must only be listed once")
+
+    for customer_id in customer_ids:
+        if customer_id <= 0 or customer_id > 0xFFFFFFFF:
+            raise ValueError("Invalid customer ID %d"%customer_id)
+
+    return sorted(result)
+
+
+def __cached(digest):
+    """
+    Function used internally to locate a cached description.  Entries in the
+    cache directory are only used if the directory and entry belong to the
+    current user, can not be modified by other users, and hold plain data.
+
+    :param digest:
+        The digest of the description file.
+
+    :return:
+        Returns a new copy of the description or None if the description is
+        not cached.
+
+    :type digest: str
+    :rtype:       object or None
+
+    """
+
+    with __cache_lock:
+        serialized = __parsed.get(digest)
+        if serialized is not None:
+            __parsed.move_to_end(digest)
+
+    if serialized is None and __private_directory(False):
+        try:
+            descriptor = os.open(
+                os.path.join(__cache_directory, digest),
+                os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0)
+            )
+            with os.fdopen(descriptor, 'rb') as fh:
+                if __is_private(os.fstat(fh.fileno())):
+                    serialized = fh.read()
+        except OSError:
+            serialized = None
+
+    if serialized is not None:
+        try:
+            result = marshal.loads(serialized)
+        except (EOFError, ValueError, TypeError):
+            result = None
+
+        if result is not None and __is_plain(result):
+            __remember(digest, serialized)
+        else:
+            result = None
+    else:
+        result = None
+
+    return result
+
+
+def __cache(digest, description):
+    """
+    Function used internally to cache a parsed description.  Descriptions
+    holding anything other than plain data are not cached.  Failures to write
+    the cache directory are ignored.
+
+    :param digest:
+        The digest of the description file.
+
+    :param description:
+        The parsed description.
+
+    :type digest:      str
+    :type description: object
+
+    """
+
+    global __cache_pruned
+
+    if __is_plain(description):
+        serialized = marshal.dumps(description)
+        __remember(digest, serialized)
+
+        if __private_directory(True):
+            try:
+                if not __cache_pruned:
+                    __cache_pruned = True
+                    __prune()
+
+                filename = os.path.join(__cache_directory, digest)
+                temporary_filename = "%s.%d.tmp"%(filename, os.getpid())
+                descriptor = os.open(
+                    temporary_filename,
+                    os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                    0o600
+                )
+                with os.fdopen(descriptor, 'wb') as fh:
+                    fh.write(serialized)
+
+                os.replace(temporary_filename, filename)
+            except OSError:
+                pass
+
+
+def __remember(digest, serialized):
+    """
+    Function used internally to hold a serialized description in memory.
+
+    :param digest:
+        The digest of the description file.
+
+    :param serialized:
+        The serialized description.
+
+    :type digest:     str
+    :type serialized: bytes
+
+    """
+
+    with __cache_lock:
+        __parsed[digest] = serialized
+        __parsed.move_to_end(digest)
+        while len(__parsed) > MAXIMUM_MEMORY_ENTRIES:
+            __parsed.popitem(last = False)
+
+
+def __is_plain(value):
+    """
+    Function used internally to determine if a value only holds plain data:
+    strings, numbers, booleans, None, and lists and dictionaries of these.
+
+    :param value:
+        The value to check.
+
+    :return:
+        Returns True if the value only holds plain data.
+
+    :type value: object
+    :rtype:      bool
+
+    """
+
+    pending = [ value ]
+    result = True
+    while result and pending:
+        item = pending.pop()
+        if type(item) is list:
+            pending.extend(item)
+        elif type(item) is dict:
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        else:
+            result = type(item) in PLAIN_TYPES
+
+    return result
+
+
+def __is_private(status):
+    """
+    Function used internally to determine if a file or directory belongs to
+    the current user and can not be modified by other users.
+
+    :param status:
+        The status of the file or directory.
+
+    :return:
+        Returns True if the file or directory is private.
+
+    :type status: os.stat_result
+    :rtype:       bool
+
+    """
+
+    return (
+            status.st_uid == os.getuid()
+        and (status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)) == 0
+    )
+
+
+def __private_directory(create):
+    """
+    Function used internally to check that the cache directory can be
+    trusted.  A directory belonging to the current user is made private if
+    other users can modify it.
+
+    :param create:
+        If True, then the directory is created if it does not exist.
+
+    :return:
+        Returns True if the cache directory can be used.
+
+    :type create: bool
+    :rtype:       bool
+
+    """
+
+    if __cache_directory is not None:
+        try:
+            if create:
+                os.makedirs(__cache_directory, mode = 0o700, exist_ok = True)
+
+            status = os.lstat(__cache_directory)
+            if stat.S_ISDIR(status.st_mode)           and \
+               status.st_uid == os.getuid()               :
+                if not __is_private(status):
+                    os.chmod(__cache_directory, 0o700)
+
+                result = True
+            else:
+                result = False
+        except OSError:
+            result = False
+    else:
+        result = False
+
+    return result
+
+
+def __prune():
+    """
+    Function used internally to remove the least recently written entries
+    from the cache directory.
+
+    """
+
+    entries = list()
+    for entry in os.scandir(__cache_directory):
+        if entry.is_file():
+            entries.append(( entry.stat().st_mtime, entry.path ))
+
+    if len(entries) >= MAXIMUM_CACHE_ENTRIES:
+        entries.sort()
+        for mtime, path in entries[:len(entries) - MAXIMUM_CACHE_ENTRIES + 1]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def __load_entry(filename):
+    """
+    Function used internally to load a single description in a worker
+    process.
+
+    :param filename:
+        The description filename.
+
+    :return:
+        Returns a tuple holding the description and None on success or None
+        and an error message on failure.
+
+    :type filename: str
+    :rtype:         tuple
+
+    """
+
+    try:
+        result = ( load(filename), None )
+    except ValueError as e:
+        result = ( None, str(e) )
+
+    return result
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
@@ -0,0 +1,658 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+#
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that compares a customer's current monitors against a desired
+monitor description, as accepted by the monitor update command, and reports
+the differences by user ordering.
+
+The monitor/update endpoint replaces every monitor tied to a customer, so a
+plan can not be used to send a partial update.  A plan can be used to skip
+updates that would not change anything and to report what an update will do
+before it is sent.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import urllib.parse
+import concurrent.futures
+
+import libraries.enumeration as enumeration
+import libraries.host_schemes as host_schemes
+import libraries.monitors as monitors
+
+###############################################################################
+# Globals:
+#
+
+ACTION = enumeration.Enum("UNCHANGED ADDED REMOVED CHANGED")
+"""
+The actions a plan can report for a single user ordering.
+
+"""
+
+FIELDS = (
+    'uri',
+    'method',
+    'content_check_mode',
+    'keywords',
+    'post_content_type',
+    'post_user_agent',
+    'post_content'
+)
+"""
+The monitor description fields that are compared, in reporting order.
+
+"""
+
+DEFAULTS = {
+    'method' : 'GET',
+    'content_check_mode' : 'NO_CHECK',
+    'keywords' : (),
+    'post_content_type' : 'TEXT',
+    'post_user_agent' : None,
+    'post_content' : ''
+}
+"""
+Values used for fields missing from a monitor description.  A value of None
+indicates that the server selects the value so the field is not compared.
+
+"""
+
+DEFAULT_UPDATE_WORKERS = 8
+"""
+The default number of customers updated at the same time by update_many.
+
+"""
+
+###############################################################################
+# Class MonitorChange:
+#
+
+class MonitorChange(object):
+    """
+    Class that holds the planned change for a single user ordering.
+
+    """
+
+    def __init__(self, user_ordering, action, fields = ()):
+        """
+        Method that initializes the MonitorChange class.
+
+        :param user_ordering:
+            The user ordering of the monitor.
+
+        :param action:
+            The planned action.
+
+        :param fields:
+            The names of the fields that differ.
+
+        :type user_ordering: int
+        :type action:        monitor_plan.ACTION enumerated value
+        :type fields:        tuple of str
+
+        """
+
+        super().__init__()
+
+        self.__user_ordering = user_ordering
+        self.__action = action
+        self.__fields = tuple(fields)
+
+
+    @property
+    def user_ordering(self):
+        """
+        Read-only property holding the user ordering of the monitor.
+
+        :type: int
+
+        """
+
+        return self.__user_ordering
+
+
+    @property
+    def action(self):
+        """
+        Read-only property holding the planned action.
+
+        :type: monitor_plan.ACTION enumerated value
+
+        """
+
+        return self.__action
+
+
+    @property
+    def fields(self):
+        """
+        Read-only property holding the names of the fields that differ.
+
+        :type: tuple of str
+
+        """
+
+        return self.__fields
+
+###############################################################################
+# Class MonitorPlan:
+#
+
+class MonitorPlan(object):
+    """
+    Class that holds the planned changes for a single customer.
+
+    """
+
+    def __init__(self, customer_id, changes):
+        """
+        Method that initializes the MonitorPlan class.
+
+        :param customer_id:
+            The customer ID of the customer the plan applies to.
+
+        :param changes:
+            The planned change for every user ordering, in user ordering
+            order.
+
+        :type customer_id: int
+        :type changes:     list of MonitorChange instances
+
+        """
+
+        super().__init__()
+
+        self.__customer_id = customer_id
+        self.__changes = list(changes)
+
+        self.__counts = dict()
+        for change in self.__changes:
+            self.__counts[change.action] = (
+                self.__counts.get(change.action, 0) + 1
+            )
+
+
+    def __len__(self):
+        """
+        Method that returns the number of user orderings that will change.
+
+        :rtype: int
+
+        """
+
+        return len(self.__changes) - self.number_unchanged
+
+
+    def __iter__(self):
+        """
+        Method that iterates over the user orderings that will change.
+
+        :rtype: iterator over MonitorChange instances
+
+        """
+
+        return (
+            change for change in self.__changes
+            if change.action != ACTION.UNCHANGED
+        )
+
+
+    @property
+    def customer_id(self):
+        """
+        Read-only property holding the customer ID.
+
+        :type: int
+
+        """
+
+        return self.__customer_id
+
+
+    @property
+    def is_empty(self):
+        """
+        Read-only property that is True if the update would not change any
+        monitor.
+
+        :type: bool
+
+        """
+
+        return len(self) == 0
+
+
+    @property
+    def number_unchanged(self):
+        """
+        Read-only property holding the number of monitors left unchanged.
+
+        :type: int
+
+        """
+
+        return self.__counts.get(ACTION.UNCHANGED, 0)
+
+
+    @property
+    def number_added(self):
+        """
+        Read-only property holding the number of monitors to be added.
+
+        :type: int
+
+        """
+
+        return self.__counts.get(ACTION.ADDED, 0)
+
+
+    @property
+    def number_removed(self):
+        """
+        Read-only property holding the number of monitors to be removed.
+
+        :type: int
+
+        """
+
+        return self.__counts.get(ACTION.REMOVED, 0)
+
+
+    @property
+    def number_changed(self):
+        """
+        Read-only property holding the number of monitors to be modified.
+
+        :type: int
+
+        """
+
+        return self.__counts.get(ACTION.CHANGED, 0)
+
+###############################################################################
+# Functions:
+#
+
+def desired_state(update_data):
+    """
+    Function that normalizes a monitor description, as accepted by the
+    monitor update command.  Entries that can not be normalized are held as
+    None so they never compare as unchanged and the server reports the
+    problem.
+
+    :param update_data:
+        The monitor description, keyed by user ordering.
+
+    :return:
+        Returns a dictionary of normalized entries keyed by user ordering.
+        Each entry is a dictionary keyed by field name.
+
+    :raises ValueError:
+        Raised if the description is not a dictionary keyed by user ordering.
+
+    :type update_data: dict
+    :rtype:            dict
+
+    """
+
+    if not isinstance(update_data, dict):
+        raise ValueError("Monitor description must be a dictionary")
+
+    try:
+        ordered = sorted(( int(k), v ) for k,v in update_data.items())
+    except (TypeError, ValueError):
+        raise ValueError("Monitor description has an invalid user ordering")
+
+    result = dict()
+    current_host = None
+    for user_ordering, entry in ordered:
+        uri = entry.get('uri') if isinstance(entry, dict) else None
+        if uri:
+            uri = str(uri)
+            parsed = urllib.parse.urlparse(uri)
+            if parsed.scheme and parsed.netloc:
+                current_host = ( parsed.scheme.lower(), parsed.netloc.lower() )
+                path = parsed.path or "/"
+                if parsed.query:
+                    path += "?" + parsed.query
+
+                location = current_host + ( path, )
+            elif current_host is not None:
+                location = current_host + ( uri, )
+            else:
+                location = None
+        else:
+            location = None
+
+        if location is not None:
+            normalized = { 'uri' : location }
+            for field in FIELDS[1:]:
+                value = entry.get(field, DEFAULTS[field])
+                if value is None:
+                    normalized[field] = DEFAULTS[field]
+                elif field == 'keywords':
+                    if isinstance(value, ( list, tuple )):
+                        normalized[field] = tuple(str(k) for k in value)
+                    else:
+                        normalized[field] = str(value)
+                elif field == 'post_user_agent' or field == 'post_content':
+                    normalized[field] = str(value)
+                else:
+                    normalized[field] = str(value).upper().replace('-', '_')
+
+            result[user_ordering] = normalized
+        else:
+            result[user_ordering] = None
+
+    return result
+
+
+def current_state(monitor_list, host_scheme_dictionary):
+    """
+    Function that normalizes a customer's current monitors so they can be
+    compared against a desired state.
+
+    :param monitor_list:
+        The customer's monitors, as returned by monitors.Monitors.list, with
+        None entries where no monitor is defined.
+
+    :param host_scheme_dictionary:
+        The customer's host/schemes, keyed by host/scheme ID, as returned by
+        host_schemes.HostSchemes.list.
+
+    :return:
+        Returns a dictionary of normalized entries keyed by user ordering.
+        Monitors tied to an unknown host/scheme are held as None.
+
+    :type monitor_list:           list
+    :type host_scheme_dictionary: dict
+    :rtype:                       dict
+
+    """
+
+    result = dict()
+    for monitor in monitor_list:
+        if monitor is not None:
+            host_scheme = host_scheme_dictionary.get(monitor.host_scheme_id)
+            if host_scheme is not None:
+                result[monitor.user_ordering] = {
+                    'uri' : (
+                        str(host_scheme.scheme).lower(),
+                        host_scheme.host.lower(),
+                        monitor.path
+                    ),
+                    'method' : str(monitor.method),
+                    'content_check_mode' : str(monitor.content_check_mode),
+                    'keywords' : tuple(monitor.encoded_keywords),
+                    'post_content_type' : str(monitor.content_type),
+                    'post_user_agent' : monitor.user_agent,
+                    'post_content' : monitor.encoded_post_content
+                }
+            else:
+                result[monitor.user_ordering] = None
+
+    return result
+
+
+def compare(customer_id, current, desired):
+    """
+    Function that compares normalized current and desired states.
+
+    :param customer_id:
+        The customer ID of the customer the states belong to.
+
+    :param current:
+        The current state, as returned by current_state.
+
+    :param desired:
+        The desired state, as returned by desired_state.
+
+    :return:
+        Returns the plan.
+
+    :type customer_id: int
+    :type current:     dict
+    :type desired:     dict
+    :rtype:            MonitorPlan
+
+    """
+
+    changes = list()
+    for user_ordering in sorted(set(current) | set(desired)):
+        if user_ordering not in desired:
+            change = MonitorChange(user_ordering, ACTION.REMOVED)
+        elif user_ordering not in current:
+            change = MonitorChange(user_ordering, ACTION.ADDED)
+        else:
+            current_entry = current[user_ordering]
+            desired_entry = desired[user_ordering]
+            if current_entry is None or desired_entry is None:
+                fields = FIELDS
+            else:
+                fields = tuple(
+                    field for field in FIELDS
+                    if desired_entry[field] is not None
+                       and desired_entry[field] != current_entry[field]
+                )
+
+            if fields:
+                change = MonitorChange(user_ordering, ACTION.CHANGED, fields)
+            else:
+                change = MonitorChange(user_ordering, ACTION.UNCHANGED)
+
+        changes.append(change)
+
+    return MonitorPlan(customer_id, changes)
+
+
+def plan(rest_api, secret, customer_id, update_data):
+    """
+    Function that plans a monitor update by comparing the customer's current
+    monitors against a monitor description.
+
+    :param rest_api:
+        The outbound REST API instance to be used.
+
+    :param secret:
+        The secret to be used.
+
+    :param customer_id:
+        The customer ID of the customer to be updated.
+
+    :param update_data:
+        The monitor description, as accepted by the monitor update command.
+
+    :return:
+        Returns the plan or None if the current monitors could not be
+        obtained.
+
+    :raises ValueError:
+        Raised if the description is not a dictionary keyed by user ordering.
+
+    :type rest_api:    outbound_rest_api_v1.Server
+    :type secret:      bytes
+    :type customer_id: int
+    :type update_data: dict
+    :rtype:            MonitorPlan or None
+
+    """
+
+    desired = desired_state(update_data)
+
+    monitor_list = monitors.Monitors(rest_api, secret).list(customer_id)
+    if monitor_list is not None:
+        host_scheme_dictionary = host_schemes.HostSchemes(
+            rest_api,
+            secret
+        ).list(customer_id)
+    else:
+        host_scheme_dictionary = None
+
+    if host_scheme_dictionary is not None:
+        result = compare(
+            customer_id,
+            current_state(monitor_list, host_scheme_dictionary),
+            desired
+        )
+    else:
+        result = None
+
+    return result
+
+
+def update(rest_api, secret, customer_id, update_data, plan_only = False):
+    """
+    Function that plans a monitor update and sends it if it would change
+    anything.
+
+    :param rest_api:
+        The outbound REST API instance to be used.
+
+    :param secret:
+        The secret to be used.
+
+    :param customer_id:
+        The customer ID of the customer to be updated.
+
+    :param update_data:
+        The monitor description, as accepted by the monitor update command.
+
+    :param plan_only:
+        If True, then the update is planned but not sent.
+
+    :return:
+        Returns a tuple holding the plan and a list of errors.  The plan is
+        None if it could not be created.  Each error is a tuple holding a
+        user ordering, or None, and an error message.
+
+    :type rest_api:    outbound_rest_api_v1.Server
+    :type secret:      bytes
+    :type customer_id: int
+    :type update_data: dict
+    :type plan_only:   bool
+    :rtype:            tuple
+
+    """
+
+    try:
+        update_plan = plan(rest_api, secret, customer_id, update_data)
+    except ValueError as e:
+        update_plan = None
+        errors = [ ( None, str(e) ) ]
+    else:
+        if update_plan is None:
+            errors = [ ( None, "could not retrieve monitors" ) ]
+        elif update_plan.is_empty or plan_only:
+            errors = list()
+        else:
+            errors = monitors.Monitors(rest_api, secret).update(
+                customer_id,
+                update_data
+            )
+
+    return ( update_plan, errors )
+
+
+def update_many(
+        rest_api,
+        secret,
+        updates,
+        workers = DEFAULT_UPDATE_WORKERS,
+        plan_only = False
+        ):
+    """
+    Function that updates monitors for many customers.  Customers are planned
+    and updated concurrently using a bounded pool of threads.
+
+    :param rest_api:
+        The outbound REST API instance to be used.
+
+    :param secret:
+        The secret to be used.
+
+    :param updates:
+        An iterable of tuples holding a customer ID and monitor description.
+
+    :param workers:
+        The largest number of customers updated at the same time.
+
+    :param plan_only:
+        If True, then updates are planned but not sent.
+
+    :return:
+        Returns a list holding a tuple for each customer, in the order
+        provided.  Each tuple holds the plan and list of errors, as returned
+        by update.  An exception raised while updating a customer is reported
+        as an error for that customer.
+
+    :type rest_api:  outbound_rest_api_v1.Server
+    :type secret:    bytes
+    :type updates:   iterable
+    :type workers:   int
+    :type plan_only: bool
+    :rtype:          list of tuples
+
+    """
+
+    updates = list(updates)
+    with concurrent.futures.ThreadPoolExecutor(max(1, workers)) as executor:
+        futures = [
+            executor.submit(
+                update,
+                rest_api,
+                secret,
+                customer_id,
+                update_data,
+                plan_only
+            )
+            for customer_id, update_data in updates
+        ]
+
+        result = list()
+        for future in futures:
+            try:
+                result.append(future.result())
+            except Exception as e:
+                result.append(( None, [ ( None, str(e) ) ] ))
+
+    return result
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
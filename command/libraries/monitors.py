@@ -37,14 +37,16 @@ Class providing a API you can use to manage monitors information.
 import sys
 import os
 import json
-import base64
 import time
 import datetime
 import urllib
+import array
 
 import libraries.enumeration as enumeration
+import libraries.encoded_bytes as encoded_bytes
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
+import libraries.metrics as metrics
 
 ###############################################################################
 # Globals:
@@ -74,6 +76,12 @@ The supported POST content type values.
 
 """
 
+DEFAULT_BATCH_SIZE = 4096
+"""
+The default number of monitors decoded together by the batch decoder.
+
+"""
+
 ###############################################################################
 # Class MonitorEntry:
 #
@@ -111,7 +119,9 @@ class MonitorEntry(object):
             The mode to be applied to check content.
 
         :param keywords:
-            The list of keywords to be tied to this monitor.
+            The list of keywords to be tied to this monitor.  Keywords can be
+            provided as bytes or as encoded_bytes.EncodedBytes instances that
+            are decoded when first used.
 
         :param content_type:
             The content-type to report in the POST header.
@@ -120,16 +130,17 @@ class MonitorEntry(object):
             The user agent to report in the POST header.
 
         :param post_content:
-            The content to send with the POST request.
+            The content to send with the POST request.  Content can be
+            provided as bytes or as an encoded_bytes.EncodedBytes instance.
 
         :type user_ordering:      int
         :type path:               str
         :type method:             monitors.METHOD enumerated value.
         :type content_check_mode: monitors.CONTENT_CHECK_MODE enumerated value.
-        :type keywords:           list of str
+        :type keywords:           list of bytes or EncodedBytes
         :type content_type:       monitors.CONTENT_TYPE enumerated value.
         :type user_agent:         str
-        :type post_content:       str
+        :type post_content:       bytes or EncodedBytes
 
         """
 
@@ -216,13 +227,27 @@ class MonitorEntry(object):
     @property
     def keywords(self):
         """
-        Property that holds the keywords used for content checking.
+        Property that holds the keywords used for content checking.  Keywords
+        held in encoded form are decoded when this property is read.
 
         :type: int
 
         """
 
-        return self.__keywords
+        return [ encoded_bytes.decoded(k) for k in self.__keywords ]
+
+
+    @property
+    def encoded_keywords(self):
+        """
+        Read-only property that holds the base64 encoded keywords.  Keywords
+        received from the server are returned without being decoded.
+
+        :type: list of str
+
+        """
+
+        return [ encoded_bytes.encoded(k) for k in self.__keywords ]
 
 
     @keywords.setter
@@ -273,7 +298,20 @@ class MonitorEntry(object):
 
         """
 
-        return self.__post_content
+        return encoded_bytes.decoded(self.__post_content)
+
+
+    @property
+    def encoded_post_content(self):
+        """
+        Read-only property that holds the base64 encoded post content.
+        Content received from the server is returned without being decoded.
+
+        :type: str
+
+        """
+
+        return encoded_bytes.encoded(self.__post_content)
 
 
     @post_content.setter
@@ -282,6 +320,19 @@ class MonitorEntry(object):
 
 
     def as_dictionary(self):
+        """
+        Method that returns the monitor entry as a dictionary.
+
+        :return:
+            Returns the dictionary.
+
+        :raises ValueError:
+            Raised if the keywords or post content are not valid base64.
+
+        :rtype: dict
+
+        """
+
         return {
             'user_ordering' : self.__user_ordering,
             'path' : self.__path,
@@ -366,10 +417,10 @@ class Monitor(MonitorEntry):
         :type path:               str
         :type method:             monitors.METHOD enumerated value.
         :type content_check_mode: monitors.CONTENT_CHECK_MODE enumerated value.
-        :type keywords:           list of str
+        :type keywords:           list of bytes or EncodedBytes
         :type content_type:       monitors.CONTENT_TYPE enumerated value.
         :type user_agent:         str
-        :type post_content:       str
+        :type post_content:       bytes or EncodedBytes
 
         """
 
@@ -437,6 +488,19 @@ class Monitor(MonitorEntry):
 
 
     def as_dictionary(self):
+        """
+        Method that returns the monitor as a dictionary.
+
+        :return:
+            Returns the dictionary.
+
+        :raises ValueError:
+            Raised if the keywords or post content are not valid base64.
+
+        :rtype: dict
+
+        """
+
         v = MonitorEntry.as_dictionary(self)
         v['monitor_id'] = self.__monitor_id
         v['customer_id'] = self.__customer_id
@@ -444,6 +508,378 @@ class Monitor(MonitorEntry):
 
         return v
 
+###############################################################################
+# Class MonitorTable:
+#
+
+class MonitorTable(object):
+    """
+    Class that holds monitors as columns, one list or array per field.
+    Monitors are decoded a batch at a time, one column at a time, and no
+    Monitor instances are created unless requested.  Keywords and post content
+    are held as encoded_bytes.EncodedBytes instances and are only decoded when
+    accessed.
+
+    """
+
+    def __init__(self):
+        """
+        Method that initializes the MonitorTable class.
+
+        """
+
+        super().__init__()
+
+        self.__monitor_ids = array.array('q')
+        self.__customer_ids = array.array('q')
+        self.__host_scheme_ids = array.array('q')
+        self.__user_orderings = array.array('q')
+        self.__paths = list()
+        self.__methods = list()
+        self.__content_check_modes = list()
+        self.__content_types = list()
+        self.__user_agents = list()
+        self.__keywords = list()
+        self.__post_contents = list()
+        self.__number_invalid = 0
+
+
+    def __len__(self):
+        """
+        Method that returns the number of monitors in the table.
+
+        :rtype: int
+
+        """
+
+        return len(self.__monitor_ids)
+
+
+    def __iter__(self):
+        """
+        Method that iterates over the table as Monitor instances.
+
+        :return:
+            Returns an iterator over Monitor instances.  Entries whose
+            keywords or post content can not be decoded are returned as None.
+
+        :rtype: iterator
+
+        """
+
+        return ( self.monitor(row) for row in range(len(self)) )
+
+
+    @property
+    def number_invalid(self):
+        """
+        Read-only property holding the number of received entries that were
+        discarded because they were malformed.
+
+        :type: int
+
+        """
+
+        return self.__number_invalid
+
+
+    @property
+    def monitor_ids(self):
+        """
+        Read-only property holding the monitor ID column.
+
+        :type: array.array
+
+        """
+
+        return self.__monitor_ids
+
+
+    @property
+    def customer_ids(self):
+        """
+        Read-only property holding the customer ID column.
+
+        :type: array.array
+
+        """
+
+        return self.__customer_ids
+
+
+    @property
+    def host_scheme_ids(self):
+        """
+        Read-only property holding the host/scheme ID column.
+
+        :type: array.array
+
+        """
+
+        return self.__host_scheme_ids
+
+
+    @property
+    def user_orderings(self):
+        """
+        Read-only property holding the user ordering column.
+
+        :type: array.array
+
+        """
+
+        return self.__user_orderings
+
+
+    @property
+    def paths(self):
+        """
+        Read-only property holding the path column.
+
+        :type: list of str
+
+        """
+
+        return self.__paths
+
+
+    @property
+    def methods(self):
+        """
+        Read-only property holding the method column.
+
+        :type: list of monitors.METHOD enumerated values
+
+        """
+
+        return self.__methods
+
+
+    @property
+    def content_check_modes(self):
+        """
+        Read-only property holding the content check mode column.
+
+        :type: list of monitors.CONTENT_CHECK_MODE enumerated values
+
+        """
+
+        return self.__content_check_modes
+
+
+    @property
+    def content_types(self):
+        """
+        Read-only property holding the POST content type column.
+
+        :type: list of monitors.CONTENT_TYPE enumerated values
+
+        """
+
+        return self.__content_types
+
+
+    @property
+    def user_agents(self):
+        """
+        Read-only property holding the user agent column.
+
+        :type: list of str
+
+        """
+
+        return self.__user_agents
+
+
+    def keywords(self, row):
+        """
+        Method that obtains the decoded keywords of a monitor.  Keywords are
+        decoded on first access and the result is remembered by each
+        EncodedBytes instance.
+
+        :param row:
+            The row of the monitor in the table.
+
+        :return:
+            Returns the list of keywords or None if the keywords could not be
+            decoded.
+
+        :type row: int
+        :rtype:    list of bytes or None
+
+        """
+
+        try:
+            result = [ k.decoded for k in self.__keywords[row] ]
+        except ValueError:
+            result = None
+
+        return result
+
+
+    def post_content(self, row):
+        """
+        Method that obtains the decoded POST content of a monitor.  Content is
+        decoded on first access and the result is remembered by the
+        EncodedBytes instance.
+
+        :param row:
+            The row of the monitor in the table.
+
+        :return:
+            Returns the POST content or None if the content could not be
+            decoded.
+
+        :type row: int
+        :rtype:    bytes or None
+
+        """
+
+        try:
+            result = self.__post_contents[row].decoded
+        except ValueError:
+            result = None
+
+        return result
+
+
+    def monitor(self, row):
+        """
+        Method that creates a Monitor instance for a row of the table.
+
+        :param row:
+            The row of the monitor in the table.
+
+        :return:
+            Returns the Monitor instance or None if the keywords or post
+            content could not be decoded.
+
+        :type row: int
+        :rtype:    Monitor or None
+
+        """
+
+        if self.keywords(row) is not None        and \
+           self.post_content(row) is not None       :
+            result = Monitor(
+                monitor_id = self.__monitor_ids[row],
+                customer_id = self.__customer_ids[row],
+                host_scheme_id = self.__host_scheme_ids[row],
+                user_ordering = self.__user_orderings[row],
+                path = self.__paths[row],
+                method = self.__methods[row],
+                content_check_mode = self.__content_check_modes[row],
+                keywords = self.__keywords[row],
+                content_type = self.__content_types[row],
+                user_agent = self.__user_agents[row],
+                post_content = self.__post_contents[row]
+            )
+        else:
+            result = None
+
+        return result
+
+
+    def extend(self, entries):
+        """
+        Method that decodes a batch of entries, as received from the server,
+        and adds them to the table.  Malformed entries are discarded.
+
+        :param entries:
+            The entries to be added.  Each entry is a dictionary holding the
+            returned monitor data, including the user ordering.
+
+        :return:
+            Returns the number of monitors added.
+
+        :type entries: list of dict
+        :rtype:        int
+
+        """
+
+        try:
+            columns = self.__decode(entries)
+        except Exception:
+            columns = None
+
+        if columns is None:
+            valid_entries = list()
+            for entry in entries:
+                try:
+                    self.__decode(( entry, ))
+                except Exception:
+                    self.__number_invalid += 1
+                else:
+                    valid_entries.append(entry)
+
+            columns = self.__decode(valid_entries)
+
+        self.__monitor_ids.extend(columns[0])
+        self.__customer_ids.extend(columns[1])
+        self.__host_scheme_ids.extend(columns[2])
+        self.__user_orderings.extend(columns[3])
+        self.__paths.extend(columns[4])
+        self.__methods.extend(columns[5])
+        self.__content_check_modes.extend(columns[6])
+        self.__content_types.extend(columns[7])
+        self.__user_agents.extend(columns[8])
+        self.__keywords.extend(columns[9])
+        self.__post_contents.extend(columns[10])
+
+        return len(columns[0])
+
+
+    @staticmethod
+    def __decode(entries):
+        """
+        Method used internally to decode a batch of entries into columns.
+
+        :param entries:
+            The entries to be decoded.
+
+        :return:
+            Returns a tuple holding the decoded columns.
+
+        :raises Exception:
+            Raised if any entry is malformed.
+
+        :type entries: list of dict
+        :rtype:        tuple
+
+        """
+
+        method_by_name = METHOD.by_name
+        content_check_mode_by_name = CONTENT_CHECK_MODE.by_name
+        content_type_by_name = CONTENT_TYPE.by_name
+
+        columns = (
+            array.array('q', [ int(e['monitor_id']) for e in entries ]),
+            array.array('q', [ int(e['customer_id']) for e in entries ]),
+            array.array('q', [ int(e['host_scheme_id']) for e in entries ]),
+            array.array('q', [ int(e['user_ordering']) for e in entries ]),
+            [ str(e['path']) for e in entries ],
+            [ method_by_name(e['method']) for e in entries ],
+            [
+                content_check_mode_by_name(e['content_check_mode'])
+                for e in entries
+            ],
+            [ content_type_by_name(e['post_content_type']) for e in entries ],
+            [ str(e['post_user_agent']) for e in entries ],
+            [
+                [ encoded_bytes.EncodedBytes(str(k)) for k in e['keywords'] ]
+                for e in entries
+            ],
+            [
+                encoded_bytes.EncodedBytes(
+                    str(e['post_content']),
+                    validate = True
+                )
+                for e in entries
+            ]
+        )
+
+        return columns
+
 ###############################################################################
 # Class Monitors:
 #
@@ -497,6 +933,8 @@ class Monitors(object):
             message = { 'monitor_id' : monitor_id }
         )
 
+        build_start_time = metrics.timer()
+
         if response is not None and 'status' in response:
             status = response['status']
             if status == 'OK' and 'monitor' in response:
@@ -507,6 +945,12 @@ class Monitors(object):
         else:
             result = None
 
+        metrics.elapsed(
+            "monitor/get",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
         return result
 
 
@@ -598,48 +1042,140 @@ class Monitors(object):
 
         """
 
-        if customer_id is not None:
-            message = { 'customer_id' : customer_id }
-        else:
-            message = dict()
-
-        response = self.__rest_api.post_message(
-            slug = "monitor/list",
-            secret = self.__secret,
-            message = message
-        )
-
-        if response is not None and 'status' in response:
-            status = response['status']
-            if status == 'OK' and 'data' in response:
-                monitors_data = response['data']
-                if customer_id is None:
-                    result = dict()
-                    for user_ordering, monitor_data in monitors_data.items():
-                        monitor_data['user_ordering'] = user_ordering
-                        m = self.__convert_to_monitor(monitor_data)
-                        result[m.monitor_id] = m
-                else:
-                    result_dict = dict()
-                    highest_user_ordering = -1
-                    for user_ordering, monitor_data in monitors_data.items():
-                        monitor_data['user_ordering'] = user_ordering
-                        m = self.__convert_to_monitor(monitor_data)
+        monitors = self.iter_list(customer_id)
+        if monitors is not None:
+            result_dict = dict()
+            highest_user_ordering = -1
+            try:
+                for m in monitors:
+                    if customer_id is None:
+                        result_dict[m.monitor_id] = m
+                    else:
                         result_dict[m.user_ordering] = m
-
                         highest_user_ordering = max(
                             highest_user_ordering,
                             m.user_ordering
                         )
+            except ValueError:
+                result_dict = None
 
-                    result = list()
-                    for user_ordering in range(highest_user_ordering + 1):
-                        if user_ordering in result_dict:
-                            result.append(result_dict[user_ordering])
-                        else:
-                            result.append(None)
+            if result_dict is None:
+                result = None
+            elif customer_id is None:
+                result = result_dict
             else:
+                result = list()
+                for user_ordering in range(highest_user_ordering + 1):
+                    if user_ordering in result_dict:
+                        result.append(result_dict[user_ordering])
+                    else:
+                        result.append(None)
+        else:
+            result = None
+
+        return result
+
+
+    def iter_list(self, customer_id = None):
+        """
+        Method you can use to iterate over monitors as they are received.
+        Unlike list, monitors are not accumulated in memory.
+
+        :param customer_id:
+            An optional customer ID used to constraint the list to only
+            monitors to a single customer.  A value of None will cause
+            monitors for all customers to be returned.
+
+        :return:
+            Returns an iterator over monitor instances, in the order reported
+            by the server, or None if the request failed.  Iteration raises a
+            ValueError if the response is malformed or reports an error.
+
+        :type customer_id: int or None
+        :rtype:            iterator or None
+
+        """
+
+        entries = self.__iter_entries(customer_id)
+        if entries is not None:
+            result = self.__iter_monitors(entries)
+        else:
+            result = None
+
+        return result
+
+
+    def table(self, customer_id = None, batch_size = DEFAULT_BATCH_SIZE):
+        """
+        Method you can use to obtain monitors as a single columnar table.
+
+        :param customer_id:
+            An optional customer ID used to constraint the table to only
+            monitors to a single customer.  A value of None will cause
+            monitors for all customers to be returned.
+
+        :param batch_size:
+            The number of monitors to decode together.
+
+        :return:
+            Returns the table of monitors, in the order reported by the
+            server, or None on error.
+
+        :type customer_id: int or None
+        :type batch_size:  int
+        :rtype:            MonitorTable or None
+
+        """
+
+        entries = self.__iter_entries(customer_id)
+        if entries is not None:
+            build_stopwatch = metrics.Stopwatch(
+                "monitor/list",
+                metrics.BUILD_TIME
+            )
+
+            result = MonitorTable()
+            try:
+                for batch in self.__batches(entries, batch_size):
+                    with build_stopwatch:
+                        result.extend(batch)
+            except ValueError:
                 result = None
+
+            build_stopwatch.record()
+        else:
+            result = None
+
+        return result
+
+
+    def iter_tables(self, customer_id = None, batch_size = DEFAULT_BATCH_SIZE):
+        """
+        Method you can use to iterate over monitors, one columnar table per
+        batch, as they are received.
+
+        :param customer_id:
+            An optional customer ID used to constraint the tables to only
+            monitors to a single customer.  A value of None will cause
+            monitors for all customers to be returned.
+
+        :param batch_size:
+            The number of monitors in each table.
+
+        :return:
+            Returns an iterator over MonitorTable instances or None if the
+            request failed.  Iteration raises a ValueError if the response is
+            malformed or reports an error.
+
+        :type customer_id: int or None
+        :type batch_size:  int
+        :rtype:            iterator or None
+
+        """
+
+        entries = self.__iter_entries(customer_id)
+        if entries is not None:
+            result = self.__iter_tables(entries, batch_size)
         else:
             result = None
 
@@ -699,9 +1235,158 @@ class Monitors(object):
         return result
 
 
+    def __iter_entries(self, customer_id):
+        """
+        Method used internally to request monitors and iterate over the
+        entries received.
+
+        :param customer_id:
+            The customer ID of the monitors to request.  A value of None
+            requests monitors for all customers.
+
+        :return:
+            Returns an iterator over entry dictionaries or None if the request
+            failed.
+
+        :type customer_id: int or None
+        :rtype:            iterator or None
+
+        """
+
+        if customer_id is not None:
+            message = { 'customer_id' : customer_id }
+        else:
+            message = dict()
+
+        stream = self.__rest_api.post_message_stream(
+            slug = "monitor/list",
+            secret = self.__secret,
+            message = message,
+            containers = ( 'data', )
+        )
+
+        if stream is not None:
+            result = self.__iter_stream(stream)
+        else:
+            result = None
+
+        return result
+
+
+    def __iter_stream(self, stream):
+        """
+        Generator used internally to iterate over the entries of a streamed
+        monitor list.
+
+        :param stream:
+            The streamed response.
+
+        :return:
+            Yields entry dictionaries, including the user ordering.
+
+        :type stream: json_stream.JsonStream
+
+        """
+
+        for container, user_ordering, monitor_data in stream:
+            monitor_data['user_ordering'] = user_ordering
+            yield monitor_data
+
+        if stream.status != 'OK' or not stream.found('data'):
+            raise ValueError("Invalid monitor list response")
+
+
+    def __iter_tables(self, entries, batch_size):
+        """
+        Generator used internally to decode entries one batch at a time.
+
+        :param entries:
+            An iterator over entry dictionaries.
+
+        :param batch_size:
+            The number of monitors in each table.
+
+        :return:
+            Yields MonitorTable instances.
+
+        :type entries:    iterator
+        :type batch_size: int
+
+        """
+
+        build_stopwatch = metrics.Stopwatch("monitor/list", metrics.BUILD_TIME)
+        try:
+            for batch in self.__batches(entries, batch_size):
+                with build_stopwatch:
+                    monitor_table = MonitorTable()
+                    monitor_table.extend(batch)
+
+                yield monitor_table
+        finally:
+            build_stopwatch.record()
+
+
+    def __iter_monitors(self, entries):
+        """
+        Generator used internally to convert entries to monitors.
+
+        :param entries:
+            An iterator over entry dictionaries.
+
+        :return:
+            Yields monitor instances.
+
+        :type entries: iterator
+
+        """
+
+        build_stopwatch = metrics.Stopwatch("monitor/list", metrics.BUILD_TIME)
+        try:
+            for entry in entries:
+                with build_stopwatch:
+                    monitor = self.__convert_to_monitor(entry)
+
+                yield monitor
+        finally:
+            build_stopwatch.record()
+
+
+    @staticmethod
+    def __batches(entries, batch_size):
+        """
+        Generator used internally to group entries into batches.
+
+        :param entries:
+            An iterator over entry dictionaries.
+
+        :param batch_size:
+            The largest number of entries in each batch.
+
+        :return:
+            Yields lists of entry dictionaries.
+
+        :type entries:    iterator
+        :type batch_size: int
+
+        """
+
+        batch_size = max(1, int(batch_size))
+        batch = list()
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = list()
+
+        if batch:
+            yield batch
+
+
     def __convert_to_monitor(self, returned_data):
         """
         Method used internally to convert a response to a Monitor instance.
+        Keywords and post content are held in encoded form and are only
+        decoded when used.
 
         :param returned_data:
             A dictionary holding the returned data.
@@ -715,70 +1400,30 @@ class Monitors(object):
         """
 
         try:
-            monitor_id = int(returned_data['monitor_id'])
-            customer_id = int(returned_data['customer_id'])
-            host_scheme_id = int(returned_data['host_scheme_id'])
-            user_ordering = int(returned_data['user_ordering'])
-            path = str(returned_data['path'])
-            method = METHOD.by_name(returned_data['method'].upper())
-            content_check_mode = CONTENT_CHECK_MODE.by_name(
-                returned_data['content_check_mode'].upper()
-            )
-            encoded_keywords = list(returned_data['keywords'])
-            content_type = CONTENT_TYPE.by_name(
-                returned_data['post_content_type']
+            result = Monitor(
+                monitor_id = int(returned_data['monitor_id']),
+                customer_id = int(returned_data['customer_id']),
+                host_scheme_id = int(returned_data['host_scheme_id']),
+                user_ordering = int(returned_data['user_ordering']),
+                path = str(returned_data['path']),
+                method = METHOD.by_name(returned_data['method']),
+                content_check_mode = CONTENT_CHECK_MODE.by_name(
+                    returned_data['content_check_mode']
+                ),
+                keywords = [
+                    encoded_bytes.EncodedBytes(str(k))
+                    for k in returned_data['keywords']
+                ],
+                content_type = CONTENT_TYPE.by_name(
+                    returned_data['post_content_type']
+                ),
+                user_agent = str(returned_data['post_user_agent']),
+                post_content = encoded_bytes.EncodedBytes(
+                    str(returned_data['post_content']),
+                    validate = True
+                )
             )
-            user_agent = str(returned_data['post_user_agent'])
-            encoded_post_content = str(returned_data['post_content'])
         except:
-            monitor_id = None
-            customer_id = None
-            host_scheme_id = None
-            user_ordering = None
-            path = None
-            method = None
-            content_check_mode = None
-            encoded_keywords = None
-            content_type = None
-            user_agent = None
-            encoded_post_content = None
-
-        if monitor_id is not None:
-            try:
-                keywords = [ base64.standard_b64decode(k)
-                             for k in encoded_keywords
-                           ]
-            except:
-                keywords = None
-
-            if keywords is not None:
-                try:
-                    post_content = base64.b64decode(
-                        encoded_post_content,
-                        validate = True
-                    )
-                except:
-                    post_content = None
-
-                if post_content is not None:
-                    result = Monitor(
-                        monitor_id = monitor_id,
-                        customer_id = customer_id,
-                        host_scheme_id = host_scheme_id,
-                        user_ordering = user_ordering,
-                        path = path,
-                        method = method,
-                        content_check_mode = content_check_mode,
-                        keywords = keywords,
-                        content_type = content_type,
-                        user_agent = user_agent,
-                        post_content = post_content
-                    )
-                else:
-                    result = None
-            else:
-                result = None
-        else:
             result = None
 
         return result
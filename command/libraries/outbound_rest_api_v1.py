@@ -39,6 +39,9 @@ module and related dependencies are included.
 #
 
 import time
+import copy
+import threading
+import contextlib
 import struct
 import hashlib
 import hmac
@@ -48,6 +51,8 @@ import requests
 import cherrypy
 
 from .rest_api_common_v1 import *
+from . import metrics
+from .json_stream import JsonStream
 
 ###############################################################################
 # Globals:
@@ -59,6 +64,38 @@ The default slug to use to obtain time deltas.
 
 """
 
+COALESCED_SLUGS = frozenset((
+    'customer/get',
+    'customer/list',
+    'event/get',
+    'event/status',
+    'host_scheme/get',
+    'host_scheme/list',
+    'latency/get',
+    'latency/statistics',
+    'mapping/get',
+    'mapping/list',
+    'monitor/get',
+    'monitor/list',
+    'region/get',
+    'region/list',
+    'resource/available',
+    'resource/list',
+    'server/get',
+    'server/list'
+))
+"""
+Read-only slugs.  Identical concurrent requests to these slugs share a single
+network call.  Mutating slugs must never be listed here.
+
+"""
+
+STREAM_CHUNK_SIZE = 65536
+"""
+The number of bytes read from the network at a time when streaming a response.
+
+"""
+
 ###############################################################################
 # Class Server:
 #
@@ -72,7 +109,9 @@ class Server(object):
     def __init__(
         self,
         scheme_and_host,
-        time_delta_slug = DEFAULT_TIME_DELTA_SLUG
+        time_delta_slug = DEFAULT_TIME_DELTA_SLUG,
+        cache = None,
+        governor = None
         ):
         """
         Method that initializes the Server class.
@@ -84,7 +123,18 @@ class Server(object):
             The endpoint used to determine the time delta between this
             machine and the server.
 
+        :param cache:
+            An optional response cache used to avoid re-fetching reference
+            data.
+
+        :param governor:
+            An optional governor used to limit the request rate and the
+            number of requests in flight.
+
         :type scheme_and_host: str
+        :type time_delta_slug: str
+        :type cache:           response_cache.ResponseCache or None
+        :type governor:        rate_limiter.Governor or None
 
         """
 
@@ -93,6 +143,68 @@ class Server(object):
         self.__scheme_and_host = self.__fix_scheme_and_host(scheme_and_host)
         self.__time_delta_slug = self.__fix_slug(time_delta_slug)
         self.__current_time_delta = 0
+        self.__cache = cache
+        self.__governor = governor
+        self.__session = requests.Session()
+
+        self.__flights_lock = threading.Lock()
+        self.__flights = dict()
+
+        self.__local = threading.local()
+
+    @property
+    def cache(self):
+        """
+        Read-only property holding the response cache.
+
+        :type: response_cache.ResponseCache or None
+
+        """
+
+        return self.__cache
+
+
+    @property
+    def governor(self):
+        """
+        Read-only property holding the rate and concurrency governor.
+
+        :type: rate_limiter.Governor or None
+
+        """
+
+        return self.__governor
+
+
+    @property
+    def last_from_cache(self):
+        """
+        Read-only property that is True if the most recent post_message or
+        post_message_stream call made by the calling thread was answered by
+        the response cache rather than the network.
+
+        :type: bool
+
+        """
+
+        return getattr(self.__local, 'from_cache', False)
+
+
+    def invalidate_cache(self, slug_prefix = None):
+        """
+        Method you can use to discard cached responses so that subsequent
+        requests fetch fresh data.
+
+        :param slug_prefix:
+            The slug family to discard, for example "server/".  If None, then
+            all cached responses are discarded.
+
+        :type slug_prefix: str or None
+
+        """
+
+        if self.__cache is not None:
+            self.__cache.invalidate(slug_prefix)
 
 
     def post_message(self, slug, secret, message):
@@ -121,16 +233,109 @@ class Server(object):
         """
 
         fixed_slug = self.__fix_slug(slug)
-        response = self.__post_message(fixed_slug, secret, message)
+        if self.__cache is not None:
+            response = self.__cache.get(fixed_slug, message)
+        else:
+            response = None
+
+        self.__local.from_cache = response is not None
         if response is None:
-            new_time_delta = self.__time_delta()
-            if new_time_delta is not None:
-                self.__current_time_delta = new_time_delta
-                response = self.__post_message(fixed_slug, secret, message)
+            if fixed_slug in COALESCED_SLUGS:
+                response = self.__coalesce_message(fixed_slug, secret, message)
+            else:
+                response = self.__issue_message(fixed_slug, secret, message)
 
         return response
 
 
+    def post_message_stream(self, slug, secret, message, containers):
+        """
+        Method that will issue a request to a remote server and decode the
+        response incrementally as it arrives.  Use this method for requests
+        that can return very large responses.  If needed, the method will
+        query for an updated time delta and retry.
+
+        Requests whose responses are cached are not streamed.  These
+        responses are served from the response cache or are read in full,
+        shared between threads that issue the same request, and added to the
+        cache.  Other responses are neither cached nor shared between
+        threads.
+
+        :param slug:
+            The slug to be used.
+
+        :param secret:
+            The Inesonic secret to be used to authenticate the message.
+
+        :param message:
+            A dictionary holding the message to be sent.
+
+        :param containers:
+            The names of the top level containers to be streamed.
+
+        :return:
+            Returns a json_stream.JsonStream instance or None if an error
+            occurred.  Errors detected while the response is being read raise
+            a ValueError during iteration.
+
+        :type slug:       str
+        :type secret:     bytes or bytearray
+        :type message:    dict
+        :type containers: tuple, list, or set of str
+        :rtype:           json_stream.JsonStream or None
+
+        """
+
+        fixed_slug = self.__fix_slug(slug)
+        if self.__cache is not None and self.__cache.is_cacheable(fixed_slug):
+            text = self.__cache.get_text(fixed_slug, message)
+            self.__local.from_cache = text is not None
+            if text is None:
+                if fixed_slug in COALESCED_SLUGS:
+                    response = self.__coalesce_message(
+                        fixed_slug,
+                        secret,
+                        message
+                    )
+                else:
+                    response = self.__issue_message(
+                        fixed_slug,
+                        secret,
+                        message
+                    )
+
+                if response is not None:
+                    text = json.dumps(response)
+
+            if text is not None:
+                result = JsonStream(( text, ), containers, fixed_slug)
+            else:
+                result = None
+        else:
+            self.__local.from_cache = False
+            response = self.__post_message_stream(fixed_slug, secret, message)
+            if response is None:
+                new_time_delta = self.__time_delta()
+                if new_time_delta is not None:
+                    self.__current_time_delta = new_time_delta
+                    response = self.__post_message_stream(
+                        fixed_slug,
+                        secret,
+                        message
+                    )
+
+            if response is not None:
+                result = JsonStream(
+                    self.__iter_content(fixed_slug, response),
+                    containers,
+                    fixed_slug
+                )
+            else:
+                result = None
+
+        return result
+
+
     def post_binary_message(self, slug, secret, message):
         """
         Method that will issue a request to a remote server using a binary
@@ -184,6 +389,7 @@ class Server(object):
                 )
 
         if status_code == 200: # OK
+            decode_start_time = metrics.timer()
             content_type = None
             if 'content-type' in headers:
                 content_type = headers['content-type']
@@ -206,9 +412,14 @@ class Server(object):
                         result = None
                 else:
                     result = bytes(response_data)
+
+            metrics.elapsed(fixed_slug, metrics.DECODE_TIME, decode_start_time)
         else:
             result = None
 
+        if self.__cache is not None:
+            self.__cache.update(fixed_slug, None, result)
+
         return result
 
 
@@ -269,6 +480,106 @@ class Server(object):
         return response
 
 
+    def __coalesce_message(self, fixed_slug, secret, message):
+        """
+        Method that issues a read-only request, sharing a single network call
+        between all threads that issue an identical request at the same time.
+        Each caller receives an independent copy of the response as several
+        facades modify the response they receive.
+
+        :param fixed_slug:
+            The fixed slug to be used.
+
+        :param secret:
+            The secret used to generate and decode the hash.
+
+        :param message:
+            A dictionary holding the message to be sent.
+
+        :return:
+            Returns a dictionary with the response or None if an error occured.
+
+        :type fixed_slug: str
+        :type secret:     bytes or bytearray
+        :type message:    dict
+        :rtype:           dict or None
+
+        """
+
+        key = (
+            fixed_slug,
+            bytes(secret),
+            json.dumps(message, sort_keys = True, separators = (',', ':'))
+        )
+
+        with self.__flights_lock:
+            flight = self.__flights.get(key)
+            if flight is None:
+                is_leader = True
+                flight = [ threading.Event(), None, 0 ]
+                self.__flights[key] = flight
+            else:
+                is_leader = False
+                flight[2] += 1
+
+        if is_leader:
+            try:
+                response = self.__issue_message(fixed_slug, secret, message)
+                flight[1] = response
+            finally:
+                with self.__flights_lock:
+                    del self.__flights[key]
+                    number_followers = flight[2]
+
+                flight[0].set()
+
+            if number_followers > 0 and response is not None:
+                response = copy.deepcopy(response)
+        else:
+            flight[0].wait()
+            response = copy.deepcopy(flight[1])
+
+        return response
+
+
+    def __issue_message(self, fixed_slug, secret, message):
+        """
+        Method that sends a request to the remote server, retrying once with
+        an updated time delta if needed.  The response cache is updated with
+        the result.
+
+        :param fixed_slug:
+            The fixed slug to be used.
+
+        :param secret:
+            The secret used to generate and decode the hash.
+
+        :param message:
+            A dictionary holding the message to be sent.
+
+        :return:
+            Returns a dictionary with the response or None if an error occured.
+
+        :type fixed_slug: str
+        :type secret:     bytes or bytearray
+        :type message:    dict
+        :rtype:           dict or None
+
+        """
+
+        response = self.__post_message(fixed_slug, secret, message)
+        if response is None:
+            new_time_delta = self.__time_delta()
+            if new_time_delta is not None:
+                self.__current_time_delta = new_time_delta
+                response = self.__post_message(fixed_slug, secret, message)
+
+        if self.__cache is not None:
+            self.__cache.update(fixed_slug, message, response)
+
+        return response
+
+
     def __time_delta(self):
         """
         Function you can use to determine the system clock time delta between us
@@ -293,9 +604,9 @@ class Server(object):
         url = "%s/%s"%(self.__scheme_and_host, self.__time_delta_slug)
 
         message_payload = { 'timestamp' : int(time.time()) }
-        payload = json.dumps(message_payload)
+        payload = json.dumps(message_payload).encode('utf-8')
 
-        response = requests.post(
+        response = self.__session.post(
             url,
             data = payload,
             headers = {
@@ -360,41 +671,25 @@ class Server(object):
         """
 
         url = "%s/%s"%(self.__scheme_and_host, fixed_slug)
-        raw_message = json.dumps(payload).encode('utf-8')
-
-        hash_time_value = int(
-              (int(time.time()) + self.__current_time_delta)
-            / 30
-        )
-
-        hash_time_data = struct.pack('<Q', hash_time_value)
-        key = secret + hash_time_data
+        payload = self.__encode_message(fixed_slug, secret, payload)
 
-        raw_hash = hmac.new(
-            key = key,
-            msg = raw_message,
-            digestmod = HASH_ALGORITHM
-        ).digest()
-
-        encoded_message = base64.b64encode(raw_message)
-        encoded_hash = base64.b64encode(raw_hash)
-
-        message_payload = {
-            'data' : encoded_message.decode('utf-8'),
-            'hash' : encoded_hash.decode('utf-8')
-        }
-
-        payload = json.dumps(message_payload)
         try:
-            response = requests.post(
-                url,
-                data = payload,
-                headers = {
-                    'User-Agent' : 'Inesonic, LLC',
-                    'Content-Type' : 'application/json',
-                    'Content-Length' : str(len(payload))
-                }
-            )
+            with self.__limit(fixed_slug):
+                network_start_time = metrics.timer()
+                response = self.__session.post(
+                    url,
+                    data = payload,
+                    headers = {
+                        'User-Agent' : 'Inesonic, LLC',
+                        'Content-Type' : 'application/json',
+                        'Content-Length' : str(len(payload))
+                    }
+                )
+                metrics.elapsed(
+                    fixed_slug,
+                    metrics.NETWORK_TIME,
+                    network_start_time
+                )
         except requests.exceptions.ConnectionError as e:
             response = None
             cherrypy.log(
@@ -402,16 +697,156 @@ class Server(object):
             )
 
         if response is not None and response.status_code == 200:
+            metrics.observe(
+                fixed_slug,
+                metrics.RESPONSE_SIZE,
+                len(response.content)
+            )
+
+            decode_start_time = metrics.timer()
             try:
                 result = json.loads(response.text)
             except:
                 result = None
+
+            metrics.elapsed(fixed_slug, metrics.DECODE_TIME, decode_start_time)
         else:
             result = None
 
         return result
 
 
+    def __post_message_stream(self, fixed_slug, secret, payload):
+        """
+        Function that sends a message and returns the response without
+        reading the response body.
+
+        :param fixed_slug:
+            The fixed slug to be used.
+
+        :param secret:
+            The secret used to generate and decode the hash.
+
+        :param payload:
+            A data structure to be sent.
+
+        :return:
+            Returns the streaming response or None if a bad response was
+            received.
+
+        :type fixed_slug: str
+        :type secret:     bytes or bytearray
+        :type payload:    dict
+        :rtype:           requests.Response or None
+
+        """
+
+        url = "%s/%s"%(self.__scheme_and_host, fixed_slug)
+        payload = self.__encode_message(fixed_slug, secret, payload)
+
+        try:
+            with self.__limit(fixed_slug):
+                network_start_time = metrics.timer()
+                response = self.__session.post(
+                    url,
+                    data = payload,
+                    headers = {
+                        'User-Agent' : 'Inesonic, LLC',
+                        'Content-Type' : 'application/json',
+                        'Content-Length' : str(len(payload))
+                    },
+                    stream = True
+                )
+                metrics.elapsed(
+                    fixed_slug,
+                    metrics.NETWORK_TIME,
+                    network_start_time
+                )
+        except requests.exceptions.ConnectionError as e:
+            response = None
+            cherrypy.log(
+                "*** No response from %s: %s"%(url, str(e))
+            )
+
+        if response is not None and response.status_code != 200:
+            response.close()
+            response = None
+
+        return response
+
+
+    def __iter_content(self, fixed_slug, response):
+        """
+        Generator used internally to read a streamed response body.  The
+        response size is recorded once the body has been read.
+
+        :param fixed_slug:
+            The fixed slug used for the request.
+
+        :param response:
+            The streaming response.
+
+        :return:
+            Yields chunks of the response body.
+
+        :type fixed_slug: str
+        :type response:   requests.Response
+
+        """
+
+        response_size = 0
+        for chunk in response.iter_content(chunk_size = STREAM_CHUNK_SIZE):
+            response_size += len(chunk)
+            yield chunk
+
+        metrics.observe(fixed_slug, metrics.RESPONSE_SIZE, response_size)
+
+
+    def __encode_message(self, fixed_slug, secret, payload):
+        """
+        Method that signs a message and builds the JSON request body.
+
+        :param fixed_slug:
+            The fixed slug to be used.
+
+        :param secret:
+            The secret used to generate the hash.
+
+        :param payload:
+            A data structure to be sent.
+
+        :return:
+            Returns the UTF-8 encoded JSON request body.  The body is encoded
+            so that the request headers and body are sent together.
+
+        :type fixed_slug: str
+        :type secret:     bytes or bytearray
+        :type payload:    dict
+        :rtype:           bytes
+
+        """
+
+        sign_start_time = metrics.timer()
+
+        raw_message = json.dumps(payload).encode('utf-8')
+        raw_hash = sign_message(secret, raw_message, self.__current_time_delta)
+
+        encoded_message = base64.b64encode(raw_message)
+        encoded_hash = base64.b64encode(raw_hash)
+
+        message_payload = {
+            'data' : encoded_message.decode('utf-8'),
+            'hash' : encoded_hash.decode('utf-8')
+        }
+
+        result = json.dumps(message_payload).encode('utf-8')
+
+        metrics.elapsed(fixed_slug, metrics.SIGN_TIME, sign_start_time)
+        metrics.observe(fixed_slug, metrics.REQUEST_SIZE, len(result))
+
+        return result
+
+
     def __post_binary_message(self, fixed_slug, secret, payload):
         """
         Function that can be used to send an arbitrary message to an Inesonic
@@ -438,33 +873,39 @@ class Server(object):
 
         """
 
-        url = "%s/%s"%(self.__scheme_and_host, fixed_slug)
+        sign_start_time = metrics.timer()
 
-        hash_time_value = int(
-              (int(time.time()) + self.__current_time_delta)
-            / 30
-        )
-
-        hash_time_data = struct.pack('<Q', hash_time_value)
-        key = secret + hash_time_data
+        url = "%s/%s"%(self.__scheme_and_host, fixed_slug)
 
-        raw_hash = hmac.new(
-            key = key,
-            msg = payload,
-            digestmod = HASH_ALGORITHM
-        ).digest()
+        raw_hash = sign_message(secret, payload, self.__current_time_delta)
 
         data_to_send = bytearray(payload)
         data_to_send.extend(raw_hash)
 
-        response = requests.post(
-            url,
-            data = bytes(data_to_send),
-            headers = {
-                'User-Agent' : 'Inesonic, LLC',
-                'Content-Type' : 'application/octet-stream',
-                'Content-Length' : str(len(data_to_send))
-            }
+        metrics.elapsed(fixed_slug, metrics.SIGN_TIME, sign_start_time)
+        metrics.observe(fixed_slug, metrics.REQUEST_SIZE, len(data_to_send))
+
+        with self.__limit(fixed_slug):
+            network_start_time = metrics.timer()
+            response = self.__session.post(
+                url,
+                data = bytes(data_to_send),
+                headers = {
+                    'User-Agent' : 'Inesonic, LLC',
+                    'Content-Type' : 'application/octet-stream',
+                    'Content-Length' : str(len(data_to_send))
+                }
+            )
+            metrics.elapsed(
+                fixed_slug,
+                metrics.NETWORK_TIME,
+                network_start_time
+            )
+
+        metrics.observe(
+            fixed_slug,
+            metrics.RESPONSE_SIZE,
+            len(response.content)
         )
 
         return (response.status_code, response.content, response.headers )
@@ -509,20 +950,12 @@ class Server(object):
         url = "%s/%s"%(self.__scheme_and_host, fixed_slug)
         raw_message = json.dumps(payload).encode('utf-8')
 
-        hash_time_value = int(
-              (int(time.time()) + self.__current_time_delta)
-            / 30
+        raw_hash = sign_message(
+            customer_secret,
+            raw_message,
+            self.__current_time_delta
         )
 
-        hash_time_data = struct.pack('<Q', hash_time_value)
-        key = customer_secret + hash_time_data
-
-        raw_hash = hmac.new(
-            key = key,
-            msg = raw_message,
-            digestmod = HASH_ALGORITHM
-        ).digest()
-
         encoded_message = base64.b64encode(raw_message)
         encoded_hash = base64.b64encode(raw_hash)
 
@@ -532,16 +965,17 @@ class Server(object):
             'hash' : encoded_hash.decode('utf-8')
         }
 
-        payload = json.dumps(message_payload)
-        response = requests.post(
-            url,
-            data = payload,
-            headers = {
-                'User-Agent' : 'Inesonic, LLC',
-                'Content-Type' : 'application/json',
-                'Content-Length' : str(len(payload))
-            }
-        )
+        payload = json.dumps(message_payload).encode('utf-8')
+        with self.__limit(fixed_slug):
+            response = self.__session.post(
+                url,
+                data = payload,
+                headers = {
+                    'User-Agent' : 'Inesonic, LLC',
+                    'Content-Type' : 'application/json',
+                    'Content-Length' : str(len(payload))
+                }
+            )
 
         if response.status_code == 200:
             try:
@@ -554,6 +988,29 @@ class Server(object):
         return result
 
 
+    def __limit(self, fixed_slug):
+        """
+        Method that returns a context manager that holds a request slot from
+        the governor, if any.
+
+        :param fixed_slug:
+            The fixed slug being requested.
+
+        :return:
+            Returns a context manager.
+
+        :type fixed_slug: str
+
+        """
+
+        if self.__governor is not None:
+            result = self.__governor.limit(fixed_slug)
+        else:
+            result = contextlib.nullcontext()
+
+        return result
+
+
     def __fix_slug(self, slug):
         """
         Method used to fix a provided slug, removing leading and trailing
@@ -604,6 +1061,41 @@ class Server(object):
 # Functions:
 #
 
+def sign_message(secret, raw_message, time_delta = 0):
+    """
+    Function that calculates the hash used to authenticate a message.  The
+    hash is an HMAC of the message keyed by the secret and the current 30
+    second time window.
+
+    :param secret:
+        The secret used to generate the hash.
+
+    :param raw_message:
+        The raw message to be signed.
+
+    :param time_delta:
+        The time delta, in seconds, between this machine and the server.
+
+    :return:
+        Returns the raw hash.
+
+    :type secret:      bytes or bytearray
+    :type raw_message: bytes or bytearray
+    :type time_delta:  int
+    :rtype:            bytes
+
+    """
+
+    hash_time_value = int((int(time.time()) + time_delta) / 30)
+    key = secret + struct.pack('<Q', hash_time_value)
+
+    return hmac.new(
+        key = key,
+        msg = raw_message,
+        digestmod = HASH_ALGORITHM
+    ).digest()
+
+
 def debug_dump_bytes(data):
     """
     Function you can use to dump an bytes or bytearray object.
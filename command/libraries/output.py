@@ -0,0 +1,866 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+# 
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#   
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#   
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that writes command output in the format selected on the
+command line.  Tables are rendered by the table module.  Machine readable
+formats are written as records keyed by column name, streamed in batches.
+
+The arrow format is only available if the pyarrow package is installed.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import sys
+import io
+import csv
+import json
+import json.encoder
+import math
+import itertools
+import threading
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+import libraries.table as table
+
+###############################################################################
+# Globals:
+#
+
+OUTPUT_FORMATS = ( 'table', 'json', 'ndjson', 'csv', 'arrow' )
+"""
+The supported output formats.
+
+"""
+
+DEFAULT_BATCH_SIZE = 512
+"""
+The number of text records written per write call.
+
+"""
+
+ARROW_BATCH_SIZE = 65536
+"""
+The number of rows held in each Arrow record batch.
+
+"""
+
+__output_format = 'table'
+"""
+The output format selected by the main thread.
+
+"""
+
+__thread_output_format = threading.local()
+"""
+Output formats selected by other threads.  Commands run in parallel each
+select their own output format.
+
+"""
+
+###############################################################################
+# Class TableWriter:
+#
+
+class TableWriter(object):
+    """
+    Class that writes rows as a text table.
+
+    """
+
+    def __init__(self, columns, output = None, show_empty = True):
+        """
+        Method that initializes the TableWriter class.
+
+        :param columns:
+            The table columns.
+
+        :param output:
+            The stream to write to.  A value of None selects sys.stdout.
+
+        :param show_empty:
+            If True, the header is written even when there are no rows.
+
+        :type columns:    list of table.Column instances
+        :type output:     file-like object or None
+        :type show_empty: bool
+
+        """
+
+        super().__init__()
+
+        self.__table = table.Table(
+            columns,
+            output = output,
+            show_empty = show_empty
+        )
+        self.__show_empty = show_empty
+        self.__started = False
+
+
+    def write(self, rows, number_values = None):
+        """
+        Method that writes rows.
+
+        :param rows:
+            An iterable of row tuples.
+
+        :param number_values:
+            The number of leading columns supplied by each row.  A value of
+            None indicates rows supply a value for every column.
+
+        :type rows:          iterable
+        :type number_values: int or None
+
+        """
+
+        if self.__started:
+            self.__table.write_rows(rows, number_values)
+        else:
+            self.__started = True
+            self.__table.render(rows, number_values)
+
+
+    def close(self):
+        """
+        Method that completes the output.
+
+        """
+
+        if not self.__started and self.__show_empty:
+            self.__table.write_header()
+
+        self.__started = True
+
+###############################################################################
+# Class RecordWriter:
+#
+
+class RecordWriter(object):
+    """
+    Class that writes rows as JSON, newline delimited JSON, CSV, or Arrow IPC
+    stream records.  Missing trailing values are written as nulls.
+
+    """
+
+    def __init__(self, columns, output_format, output = None):
+        """
+        Method that initializes the RecordWriter class.
+
+        :param columns:
+            The columns.  Column names are used as field names.
+
+        :param output_format:
+            The output format, "json", "ndjson", "csv", or "arrow".
+
+        :param output:
+            The text stream to write to.  Arrow data is written to the
+            underlying binary buffer.  A value of None selects sys.stdout.
+
+        :type columns:       list of table.Column instances
+        :type output_format: str
+        :type output:        file-like object or None
+
+        """
+
+        super().__init__()
+
+        if output_format == 'arrow' and pyarrow is None:
+            raise ValueError("The arrow format requires pyarrow")
+
+        self.__columns = tuple(columns)
+        self.__names = tuple(column.name for column in self.__columns)
+        self.__output_format = output_format
+        self.__output = output
+        self.__number_records = 0
+        self.__header_written = False
+
+        self.__json_encoder = json.JSONEncoder(allow_nan = False)
+        self.__json_scalar_encoders = {
+            type(None) : lambda value: "null",
+            bool : lambda value: "true" if value else "false",
+            int : int.__repr__,
+            float : self.__json_float,
+            str : json.encoder.encode_basestring_ascii
+        }
+        self.__json_templates = dict()
+
+        self.__arrow_rows = list()
+        self.__arrow_schema = None
+        self.__arrow_writer = None
+
+
+    def write(self, rows, number_values = None):
+        """
+        Method that writes rows.
+
+        :param rows:
+            An iterable of row tuples.
+
+        :param number_values:
+            The number of leading columns supplied by each row.  A value of
+            None indicates rows supply a value for every column.
+
+        :type rows:          iterable
+        :type number_values: int or None
+
+        """
+
+        if number_values is not None and number_values >= len(self.__names):
+            number_values = None
+
+        if self.__output_format == 'json'   or \
+           self.__output_format == 'ndjson'    :
+            self.__write_json(rows, number_values)
+        else:
+            if number_values is not None:
+                padding = ( None, ) * (len(self.__names) - number_values)
+                rows = ( tuple(row) + padding for row in rows )
+
+            if self.__output_format == 'arrow':
+                self.__write_arrow(rows)
+            else:
+                self.__write_csv(rows)
+
+
+    def close(self):
+        """
+        Method that completes the output.
+
+        """
+
+        output = self.__stream()
+        if self.__output_format == 'json':
+            if self.__number_records:
+                output.write("\n]\n")
+            else:
+                output.write("[]\n")
+        elif self.__output_format == 'csv':
+            if not self.__header_written:
+                self.__write_csv(( ))
+        elif self.__output_format == 'arrow':
+            self.__flush_arrow()
+            if self.__arrow_writer is None:
+                self.__open_arrow(
+                    pyarrow.schema(
+                        [
+                            ( name, self.__arrow_type(column) or
+                                    pyarrow.string()
+                            )
+                            for name, column in zip(
+                                self.__names,
+                                self.__columns
+                            )
+                        ]
+                    )
+                )
+
+            self.__arrow_writer.close()
+            self.__binary_stream().flush()
+
+        output.flush()
+
+
+    def __write_json(self, rows, number_values):
+        """
+        Method used internally to write JSON or newline delimited JSON
+        records.
+
+        :param rows:
+            An iterable of row tuples.
+
+        :param number_values:
+            The number of leading columns supplied by each row or None.
+
+        :type rows:          iterable
+        :type number_values: int or None
+
+        """
+
+        output = self.__stream()
+        is_array = self.__output_format == 'json'
+
+        rows = iter(rows)
+        batch = list(itertools.islice(rows, DEFAULT_BATCH_SIZE))
+        while batch:
+            records = self.__json_records(batch, number_values)
+            if not is_array:
+                output.write(records + "\n")
+            elif self.__number_records:
+                output.write(",\n" + records)
+            else:
+                output.write("[\n" + records)
+
+            self.__number_records += len(batch)
+            batch = list(itertools.islice(rows, DEFAULT_BATCH_SIZE))
+
+
+    def __json_records(self, batch, number_values):
+        """
+        Method used internally to format a batch of rows as JSON objects.
+        Each value is encoded on its own and placed into a template holding
+        one object per row.  Batches the template can not represent, such as
+        batches holding non-finite floating point values, are formatted row
+        by row.
+
+        :param batch:
+            The row tuples.
+
+        :param number_values:
+            The number of leading columns supplied by each row or None.
+
+        :return:
+            Returns the records, separated by the record separator.
+
+        :type batch:         list
+        :type number_values: int or None
+        :rtype:              str
+
+        """
+
+        if number_values is not None:
+            row_length = number_values
+        else:
+            row_length = len(self.__names)
+
+        if self.__output_format == 'json':
+            separator = ",\n"
+        else:
+            separator = "\n"
+
+        try:
+            if set(map(len, batch)) != { row_length }:
+                raise TypeError("Rows do not match the columns")
+
+            result = (
+                  self.__json_template(number_values, len(batch), separator)
+                % self.__json_values(itertools.chain.from_iterable(batch))
+            )
+        except (TypeError, ValueError):
+            result = separator.join(
+                self.__json_record(row, number_values) for row in batch
+            )
+
+        return result
+
+
+    def __json_record(self, row, number_values):
+        """
+        Method used internally to format a single row as a JSON object.
+        Non-finite floating point values are written as nulls.
+
+        :param row:
+            The row tuple.
+
+        :param number_values:
+            The number of leading columns supplied by the row or None.
+
+        :return:
+            Returns the record.
+
+        :type row:           tuple
+        :type number_values: int or None
+        :rtype:              str
+
+        """
+
+        encode = self.__json_encoder.encode
+        try:
+            result = (
+                  self.__json_template(number_values)
+                % self.__json_values(row)
+            )
+        except (TypeError, ValueError):
+            if number_values is not None:
+                padding = ( None, ) * (len(self.__names) - number_values)
+            else:
+                padding = ( )
+
+            result = encode(
+                self.__json_safe(dict(zip(self.__names, tuple(row) + padding)))
+            )
+
+        return result
+
+
+    def __json_values(self, values):
+        """
+        Method used internally to encode values as JSON.  Common scalar
+        types are encoded directly, producing the same text as json.dumps
+        without the cost of a full encoder call.
+
+        :param values:
+            An iterable of values.
+
+        :return:
+            Returns a tuple holding the JSON text of each value.
+
+        :type values: iterable
+        :rtype:       tuple
+
+        """
+
+        encoder = self.__json_scalar_encoders.get
+        default = self.__json_encoder.encode
+        return tuple([ encoder(type(v), default)(v) for v in values ])
+
+
+    @staticmethod
+    def __json_float(value):
+        """
+        Method used internally to encode a floating point value as JSON.
+
+        :param value:
+            The value to encode.
+
+        :return:
+            Returns the JSON text.
+
+        :raises ValueError:
+            Raised if the value is not finite.
+
+        :type value: float
+        :rtype:      str
+
+        """
+
+        if not math.isfinite(value):
+            raise ValueError("Non-finite values are not JSON compliant")
+
+        return float.__repr__(value)
+
+
+    def __json_template(self, number_values, count = 1, separator = ""):
+        """
+        Method used internally to build the template used to format rows as
+        JSON objects.  The template holds one %s field for each JSON encoded
+        value supplied by each row.
+
+        :param number_values:
+            The number of leading columns supplied by each row or None.
+
+        :param count:
+            The number of rows formatted by the template.
+
+        :param separator:
+            The text placed between records.
+
+        :return:
+            Returns the template.
+
+        :type number_values: int or None
+        :type count:         int
+        :type separator:     str
+        :rtype:              str
+
+        """
+
+        key = ( number_values, count, separator )
+        result = self.__json_templates.get(key)
+        if result is None:
+            fields = list()
+            for index, column in enumerate(self.__columns):
+                name = json.dumps(column.name).replace("%", "%%")
+                if number_values is not None and index >= number_values:
+                    fields.append("%s: null"%name)
+                else:
+                    fields.append("%s: %%s"%name)
+
+            record = "{" + ", ".join(fields) + "}"
+            result = separator.join(( record, ) * count)
+            self.__json_templates[key] = result
+
+        return result
+
+
+    def __json_safe(self, value):
+        """
+        Method used internally to replace non-finite floating point values,
+        which JSON can not represent, with None.
+
+        :param value:
+            The value to convert.
+
+        :return:
+            Returns the converted value.
+
+        :type value: object
+        :rtype:      object
+
+        """
+
+        if isinstance(value, float):
+            result = value if math.isfinite(value) else None
+        elif isinstance(value, dict):
+            result = { k : self.__json_safe(v) for k, v in value.items() }
+        elif isinstance(value, ( list, tuple )):
+            result = [ self.__json_safe(v) for v in value ]
+        else:
+            result = value
+
+        return result
+
+
+    def __write_csv(self, rows):
+        """
+        Method used internally to write CSV records.  The header is written
+        with the first record.  Lists and dictionaries are written as JSON.
+
+        :param rows:
+            An iterable of row tuples.
+
+        :type rows: iterable
+
+        """
+
+        output = self.__stream()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator = "\n")
+        if not self.__header_written:
+            writer.writerow(self.__names)
+            self.__header_written = True
+
+        object_indexes = tuple(
+            index for index, column in enumerate(self.__columns)
+            if not column.conversion.endswith(( "d", "f" ))
+        )
+        if object_indexes:
+            rows = ( self.__csv_row(row, object_indexes) for row in rows )
+
+        rows = iter(rows)
+        batch = list(itertools.islice(rows, DEFAULT_BATCH_SIZE))
+        while batch:
+            writer.writerows(batch)
+            self.__number_records += len(batch)
+
+            output.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+
+            batch = list(itertools.islice(rows, DEFAULT_BATCH_SIZE))
+
+        output.write(buffer.getvalue())
+
+
+    def __csv_row(self, row, object_indexes):
+        """
+        Method used internally to encode list and dictionary values in a row
+        as JSON.
+
+        :param row:
+            The row tuple.
+
+        :param object_indexes:
+            The indexes of the columns that may hold lists or dictionaries.
+
+        :return:
+            Returns the converted row.
+
+        :type row:            tuple
+        :type object_indexes: tuple
+        :rtype:               tuple or list
+
+        """
+
+        result = row
+        for index in object_indexes:
+            if index < len(row) and isinstance(row[index], ( list, dict )):
+                if result is row:
+                    result = list(row)
+
+                result[index] = json.dumps(row[index])
+
+        return result
+
+
+    def __write_arrow(self, rows):
+        """
+        Method used internally to write Arrow record batches.
+
+        :param rows:
+            An iterable of row tuples.
+
+        :type rows: iterable
+
+        """
+
+        pending = self.__arrow_rows
+        for row in rows:
+            pending.append(row)
+            self.__number_records += 1
+            if len(pending) >= ARROW_BATCH_SIZE:
+                self.__flush_arrow()
+
+
+    def __flush_arrow(self):
+        """
+        Method used internally to write pending rows as an Arrow record
+        batch.  The schema is determined from the column conversions and the
+        first batch.
+
+        """
+
+        if self.__arrow_rows:
+            columns = list(zip(*self.__arrow_rows))
+            self.__arrow_rows.clear()
+
+            if self.__arrow_schema is None:
+                arrays = list()
+                for values, column in zip(columns, self.__columns):
+                    array = pyarrow.array(values, self.__arrow_type(column))
+                    if pyarrow.types.is_null(array.type):
+                        array = pyarrow.array(values, pyarrow.string())
+                    elif pyarrow.types.is_string(array.type):
+                        array = pyarrow.array(
+                            [ None if v is None else str(v) for v in values ],
+                            pyarrow.string()
+                        )
+
+                    arrays.append(array)
+
+                batch = pyarrow.RecordBatch.from_arrays(
+                    arrays,
+                    names = list(self.__names)
+                )
+                self.__open_arrow(batch.schema)
+            else:
+                arrays = list()
+                for values, field in zip(columns, self.__arrow_schema):
+                    if pyarrow.types.is_string(field.type):
+                        values = [
+                            None if v is None else str(v) for v in values
+                        ]
+
+                    arrays.append(pyarrow.array(values, field.type))
+
+                batch = pyarrow.RecordBatch.from_arrays(
+                    arrays,
+                    schema = self.__arrow_schema
+                )
+
+            self.__arrow_writer.write_batch(batch)
+
+
+    def __open_arrow(self, schema):
+        """
+        Method used internally to start the Arrow IPC stream.
+
+        :param schema:
+            The stream schema.
+
+        :type schema: pyarrow.Schema
+
+        """
+
+        self.__stream().flush()
+        self.__arrow_schema = schema
+        self.__arrow_writer = pyarrow.ipc.new_stream(
+            self.__binary_stream(),
+            schema
+        )
+
+
+    def __arrow_type(self, column):
+        """
+        Method used internally to determine the Arrow type for a column.
+
+        :param column:
+            The column.
+
+        :return:
+            Returns the Arrow type or None if the type should be inferred.
+
+        :type column: table.Column
+
+        """
+
+        if column.conversion.endswith("d"):
+            result = pyarrow.int64()
+        elif column.conversion.endswith("f"):
+            result = pyarrow.float64()
+        else:
+            result = None
+
+        return result
+
+
+    def __stream(self):
+        """
+        Method used internally to obtain the text output stream.
+
+        :rtype: file-like object
+
+        """
+
+        if self.__output is not None:
+            return self.__output
+        else:
+            return sys.stdout
+
+
+    def __binary_stream(self):
+        """
+        Method used internally to obtain the binary output stream.
+
+        :rtype: file-like object
+
+        """
+
+        output = self.__stream()
+        return getattr(output, 'buffer', output)
+
+###############################################################################
+# Functions:
+#
+
+def add_arguments(parser):
+    """
+    Function that adds the output format command line switch to an argument
+    parser.
+
+    :param parser:
+        The argument parser to update.
+
+    :type parser: argparse.ArgumentParser
+
+    """
+
+    parser.add_argument(
+        "--format",
+        help = "You can use this switch to select the output format for "
+               "commands that list data.  Supported values are %s.  The "
+               "default is table."%", ".join(OUTPUT_FORMATS),
+        type = str,
+        choices = OUTPUT_FORMATS,
+        default = 'table',
+        dest = 'output_format'
+    )
+
+
+def configure(arguments):
+    """
+    Function that selects the output format requested on the command line.
+    When called from a thread other than the main thread, the format applies
+    only to that thread.
+
+    :param arguments:
+        The parsed command line arguments.
+
+    :return:
+        Returns True on success.  Returns False if the requested format is
+        not available.
+
+    :type arguments: argparse.Namespace
+    :rtype:          bool
+
+    """
+
+    global __output_format
+
+    output_format = arguments.output_format
+    if output_format == 'arrow' and pyarrow is None:
+        sys.stderr.write(
+            "*** The arrow output format requires the pyarrow package.\n"
+        )
+        success = False
+    else:
+        if threading.current_thread() is threading.main_thread():
+            __output_format = output_format
+        else:
+            __thread_output_format.value = output_format
+
+        success = True
+
+    return success
+
+
+def output_format():
+    """
+    Function that returns the selected output format.
+
+    :return:
+        Returns the output format.
+
+    :rtype: str
+
+    """
+
+    return getattr(__thread_output_format, 'value', __output_format)
+
+
+def writer(columns, show_empty = True, output = None):
+    """
+    Function that creates a writer for the selected output format.  Writers
+    provide a write method that accepts an iterable of row tuples and a close
+    method that must be called once all rows are written.
+
+    :param columns:
+        The columns.
+
+    :param show_empty:
+        If True, table headers are written even when there are no rows.
+        Ignored by machine readable formats.
+
+    :param output:
+        The stream to write to.  A value of None selects sys.stdout.
+
+    :return:
+        Returns the writer.
+
+    :type columns:    list of table.Column instances
+    :type show_empty: bool
+    :type output:     file-like object or None
+    :rtype:           TableWriter or RecordWriter
+
+    """
+
+    selected_format = output_format()
+    if selected_format == 'table':
+        result = TableWriter(columns, output, show_empty)
+    else:
+        result = RecordWriter(columns, selected_format, output)
+
+    return result
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
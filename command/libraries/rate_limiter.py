@@ -0,0 +1,309 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+# 
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#   
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#   
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that provides a client-side rate limiter and concurrency
+governor used to keep bulk jobs from overloading the database controller.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import time
+import fnmatch
+import threading
+import contextlib
+
+###############################################################################
+# Class TokenBucket:
+#
+
+class TokenBucket(object):
+    """
+    Class that implements a thread-safe token bucket rate limiter.
+
+    """
+
+    def __init__(self, rate, burst = None):
+        """
+        Method that initializes the TokenBucket class.
+
+        :param rate:
+            The sustained rate, in requests per second.
+
+        :param burst:
+            The maximum number of requests that can be issued back-to-back.
+            If None, then the burst size will be the larger of 1 and the
+            rate.
+
+        :type rate:  float
+        :type burst: float or None
+
+        """
+
+        super().__init__()
+
+        self.__rate = float(rate)
+        if burst is None:
+            self.__burst = max(1.0, self.__rate)
+        else:
+            self.__burst = max(1.0, float(burst))
+
+        self.__tokens = self.__burst
+        self.__last_update = time.monotonic()
+        self.__lock = threading.Lock()
+
+
+    @property
+    def rate(self):
+        """
+        Read-only property holding the sustained rate, in requests per second.
+
+        :type: float
+
+        """
+
+        return self.__rate
+
+
+    @property
+    def burst(self):
+        """
+        Read-only property holding the burst size.
+
+        :type: float
+
+        """
+
+        return self.__burst
+
+
+    def acquire(self):
+        """
+        Method that blocks until a token is available and then consumes it.
+
+        :return:
+            Returns the time spent waiting, in seconds.
+
+        :rtype: float
+
+        """
+
+        total_delay = 0.0
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(
+                    self.__burst,
+                    self.__tokens + (now - self.__last_update) * self.__rate
+                )
+                self.__last_update = now
+
+                if self.__tokens >= 1.0:
+                    self.__tokens -= 1.0
+                    delay = 0.0
+                else:
+                    delay = (1.0 - self.__tokens) / self.__rate
+
+            if delay > 0:
+                time.sleep(delay)
+                total_delay += delay
+            else:
+                break
+
+        return total_delay
+
+###############################################################################
+# Class Governor:
+#
+
+class Governor(object):
+    """
+    Class that applies rate and concurrency limits to slugs.  Limits are
+    assigned to slug families using shell style patterns such as "latency/*".
+    Patterns are checked in the order they are added and the first match
+    wins.  Slugs that match no pattern are not limited.
+
+    """
+
+    def __init__(self):
+        """
+        Method that initializes the Governor class.
+
+        """
+
+        super().__init__()
+
+        self.__limits = list()
+        self.__limits_by_slug = dict()
+
+
+    def add_limit(self, pattern, rate = None, burst = None, concurrency = None):
+        """
+        Method that adds a limit for a slug family.
+
+        :param pattern:
+            The slug pattern, for example "latency/*".
+
+        :param rate:
+            The sustained rate, in requests per second.  A value of None
+            disables rate limiting for this family.
+
+        :param burst:
+            The burst size.  If None, then a burst size is selected based on
+            the rate.
+
+        :param concurrency:
+            The maximum number of requests that can be in flight at once.  A
+            value of None disables the concurrency limit for this family.
+
+        :type pattern:     str
+        :type rate:        float or None
+        :type burst:       float or None
+        :type concurrency: int or None
+
+        """
+
+        if rate is not None and float(rate) > 0:
+            bucket = TokenBucket(rate, burst)
+        else:
+            bucket = None
+
+        if concurrency is not None and int(concurrency) > 0:
+            semaphore = threading.BoundedSemaphore(int(concurrency))
+        else:
+            semaphore = None
+
+        self.__limits.append(( pattern.strip('/'), bucket, semaphore ))
+        self.__limits_by_slug.clear()
+
+
+    @contextlib.contextmanager
+    def limit(self, fixed_slug):
+        """
+        Method that returns a context manager that holds a request slot for
+        a slug.  The context blocks on entry until both the concurrency and
+        rate limits allow the request to proceed.
+
+        :param fixed_slug:
+            The fixed slug being requested.
+
+        :type fixed_slug: str
+
+        """
+
+        limits = self.__limits_by_slug.get(fixed_slug)
+        if limits is None:
+            limits = ( None, None )
+            for pattern, bucket, semaphore in self.__limits:
+                if fnmatch.fnmatchcase(fixed_slug, pattern):
+                    limits = ( bucket, semaphore )
+                    break
+
+            self.__limits_by_slug[fixed_slug] = limits
+
+        bucket, semaphore = limits
+        if semaphore is not None:
+            semaphore.acquire()
+
+        try:
+            if bucket is not None:
+                bucket.acquire()
+
+            yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+###############################################################################
+# Functions:
+#
+
+def configure(configuration, default_limits = None):
+    """
+    Function that creates a governor from the "rate_limits" section of the
+    configuration.  The section is a dictionary keyed by slug pattern.  Each
+    value is a dictionary that may contain "rate", "burst", and
+    "concurrency" entries, for example:
+
+        "rate_limits" : {
+            "latency/*" : { "rate" : 50, "burst" : 100, "concurrency" : 8 },
+            "*" : { "rate" : 10, "concurrency" : 2 }
+        }
+
+    :param configuration:
+        The parsed configuration.
+
+    :param default_limits:
+        Limits, in the same format, that apply to slugs not matched by any
+        configured pattern.  Configured patterns are checked first so any
+        configured limit takes precedence over the defaults.
+
+    :return:
+        Returns the governor or None if no limits apply.
+
+    :type configuration:  dict
+    :type default_limits: dict or None
+    :rtype:               Governor or None
+
+    """
+
+    limits = list(configuration.get('rate_limits', dict()).items())
+    if default_limits is not None:
+        configured_patterns = set(pattern for pattern, settings in limits)
+        limits.extend(
+            ( pattern, settings )
+            for pattern, settings in default_limits.items()
+            if pattern not in configured_patterns
+        )
+
+    if limits:
+        result = Governor()
+        for pattern, settings in limits:
+            result.add_limit(
+                pattern,
+                rate = settings.get('rate'),
+                burst = settings.get('burst'),
+                concurrency = settings.get('concurrency')
+            )
+    else:
+        result = None
+
+    return result
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
@@ -43,6 +43,7 @@ import datetime
 
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
+import libraries.metrics as metrics
 
 ###############################################################################
 # Class Region:
@@ -155,6 +156,8 @@ class Regions(object):
             message = { 'region_id' : region_id }
         )
 
+        build_start_time = metrics.timer()
+
         if response is not None and 'status' in response:
             status = response['status']
             if status == 'OK'             and \
@@ -169,6 +172,12 @@ class Regions(object):
         else:
             result = None
 
+        metrics.elapsed(
+            "region/get",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
         return result
 
 
@@ -308,6 +317,8 @@ class Regions(object):
             message = { }
         )
 
+        build_start_time = metrics.timer()
+
         if response is not None and 'status' in response:
             status = response['status']
             if status == 'OK' and 'regions' in response:
@@ -322,6 +333,12 @@ class Regions(object):
         else:
             result = None
 
+        metrics.elapsed(
+            "region/list",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
         return result
 
 ###############################################################################
@@ -43,6 +43,7 @@ import datetime
 
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
+import libraries.metrics as metrics
 
 ###############################################################################
 # Class Resources:
@@ -109,6 +110,8 @@ class Resources(object):
             message = { 'customer_id' : customer_id }
         )
 
+        build_start_time = metrics.timer()
+
         if response is not None       and \
            'status' in response       and \
            'value_types' in response  and \
@@ -117,6 +120,12 @@ class Resources(object):
         else:
             result = None
 
+        metrics.elapsed(
+            "resource/available",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
         return result
 
 
@@ -203,29 +212,74 @@ class Resources(object):
 
         """
 
-        message = {
-            'customer_id' : customer_id,
-            'value_type' : value_type
-        }
+        stream = self.__request_list(
+            customer_id,
+            value_type,
+            start_timestamp,
+            end_timestamp
+        )
 
-        if start_timestamp is not None:
-            message['start_timestamp'] = start_timestamp
+        if stream is not None:
+            try:
+                resources = list(self.__iter_stream(stream))
+                result = stream.fields['data']
+                result['resources'] = resources
+            except ValueError:
+                result = None
+        else:
+            result = None
 
-        if end_timestamp is not None:
-            message['end_timestamp'] = end_timestamp
+        return result
 
-        response = self.__rest_api.post_message(
-            slug = "resource/list",
-            secret = self.__secret,
-            message = message
+
+    def iter_list(
+        self,
+        customer_id,
+        value_type,
+        start_timestamp = None,
+        end_timestamp = None
+        ):
+        """
+        Method you can use to iterate over resource values as they are
+        received.  Unlike list, values are not accumulated in memory.
+
+        :param customer_id:
+            The ID of customer of interest.
+
+        :param value_type:
+            The value type represented as an integer value.
+
+        :param start_timestamp:
+            The start timestamp.  A value of None means no explicit start
+            timestamp.
+
+        :param end_timestamp:
+            The end timestamp.  A value of None means no explicit end
+            timestamp.
+
+        :return:
+            Returns an iterator over dictionaries holding the "timestamp" and
+            "value" of each entry.  None is returned if the request failed.
+            Iteration raises a ValueError if the response is malformed or
+            reports an error.
+
+        :type customer_id:     int
+        :type value_type:      int
+        :type start_timestamp: int or None
+        :type end_timestamp:   int or None
+        :rtype:                iterator or None
+
+        """
+
+        stream = self.__request_list(
+            customer_id,
+            value_type,
+            start_timestamp,
+            end_timestamp
         )
 
-        if response is not None and 'status' in response:
-            status = response['status']
-            if status == 'OK' and 'data' in response:
-                result = response['data']
-            else:
-                result = None
+        if stream is not None:
+            result = self.__iter_stream(stream)
         else:
             result = None
 
@@ -392,6 +446,79 @@ class Resources(object):
 
         return result
 
+
+    def __request_list(
+        self,
+        customer_id,
+        value_type,
+        start_timestamp,
+        end_timestamp
+        ):
+        """
+        Method used internally to request a list of resource values.
+
+        :param customer_id:
+            The ID of customer of interest.
+
+        :param value_type:
+            The value type represented as an integer value.
+
+        :param start_timestamp:
+            The start timestamp or None.
+
+        :param end_timestamp:
+            The end timestamp or None.
+
+        :return:
+            Returns the streamed response or None on error.
+
+        :type customer_id:     int
+        :type value_type:      int
+        :type start_timestamp: int or None
+        :type end_timestamp:   int or None
+        :rtype:                json_stream.JsonStream or None
+
+        """
+
+        message = {
+            'customer_id' : customer_id,
+            'value_type' : value_type
+        }
+
+        if start_timestamp is not None:
+            message['start_timestamp'] = start_timestamp
+
+        if end_timestamp is not None:
+            message['end_timestamp'] = end_timestamp
+
+        return self.__rest_api.post_message_stream(
+            slug = "resource/list",
+            secret = self.__secret,
+            message = message,
+            containers = ( ( 'data', 'resources' ), )
+        )
+
+
+    def __iter_stream(self, stream):
+        """
+        Generator used internally to parse a streamed resource list.
+
+        :param stream:
+            The streamed response.
+
+        :return:
+            Yields resource value dictionaries.
+
+        :type stream: json_stream.JsonStream
+
+        """
+
+        for container, index, entry in stream:
+            yield entry
+
+        if stream.status != 'OK' or not stream.found(( 'data', 'resources' )):
+            raise ValueError("Invalid resource list response")
+
 ###############################################################################
 # Main:
 #
@@ -0,0 +1,475 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+# 
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#   
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#   
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that provides a small time-to-live cache for responses to
+requests that return slowly changing reference data such as regions, servers,
+and customers.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import os
+import sys
+import time
+import json
+import threading
+
+###############################################################################
+# Globals:
+#
+
+DEFAULT_TIME_TO_LIVE = {
+    'region/get' : 300,
+    'region/list' : 300,
+    'server/get' : 15,
+    'server/list' : 15,
+    'customer/get' : 60,
+    'customer/list' : 60
+}
+"""
+The default time to live, in seconds, for each cacheable slug.  Slugs not
+listed here are never cached.
+
+"""
+
+INVALIDATED_FAMILIES = {
+    'region/create' : ( 'region/', ),
+    'region/modify' : ( 'region/', ),
+    'region/delete' : ( 'region/', 'server/' ),
+    'server/create' : ( 'server/', ),
+    'server/modify' : ( 'server/', ),
+    'server/delete' : ( 'server/', ),
+    'server/activate' : ( 'server/', ),
+    'server/deactivate' : ( 'server/', ),
+    'server/start' : ( 'server/', ),
+    'server/reassign' : ( 'server/', ),
+    'server/redistribute' : ( 'server/', ),
+    'latency/record' : ( 'server/', ),
+    'customer/create' : ( 'customer/', ),
+    'customer/delete' : ( 'customer/', ),
+    'customer/purge' : ( 'customer/', ),
+    'customer/pause' : ( 'customer/', )
+}
+"""
+Dictionary mapping mutating slugs to the slug families whose cached responses
+must be discarded when the slug is posted.  Note that latency/record reports
+server loading so it invalidates cached server data.
+
+"""
+
+###############################################################################
+# Class ResponseCache:
+#
+
+class ResponseCache(object):
+    """
+    Class that caches responses from the remote server.  Entries are keyed by
+    slug and the canonicalized request message.  Responses are held as JSON
+    text so that every hit returns a fresh, independent dictionary.
+
+    """
+
+    def __init__(self, namespace, time_to_live = None, filename = None):
+        """
+        Method that initializes the ResponseCache class.
+
+        :param namespace:
+            The namespace for the cache, normally the server scheme and host.
+            The namespace keeps responses from different servers apart when
+            they share a backing file.
+
+        :param time_to_live:
+            An optional dictionary of slugs to time to live values, in
+            seconds, used to override the defaults.  A value of 0 disables
+            caching for the slug.
+
+        :param filename:
+            An optional file used to persist the cache between runs.
+
+        :type namespace:    str
+        :type time_to_live: dict or None
+        :type filename:     str or None
+
+        """
+
+        super().__init__()
+
+        self.__namespace = namespace
+        self.__filename = filename
+        self.__lock = threading.Lock()
+        self.__entries = dict()
+        self.__modified = False
+
+        self.__time_to_live = dict(DEFAULT_TIME_TO_LIVE)
+        if time_to_live is not None:
+            for slug, ttl in time_to_live.items():
+                self.__time_to_live[slug.strip('/')] = float(ttl)
+
+        if filename is not None:
+            self.__load()
+
+
+    @property
+    def filename(self):
+        """
+        Read-only property holding the backing file name.
+
+        :type: str or None
+
+        """
+
+        return self.__filename
+
+
+    def is_cacheable(self, slug):
+        """
+        Method you can use to determine if responses to a slug are cached.
+
+        :param slug:
+            The fixed slug to check.
+
+        :return:
+            Returns True if the slug is cached.  Returns False if the slug is
+            not cached.
+
+        :type slug: str
+        :rtype:     bool
+
+        """
+
+        return self.__time_to_live.get(slug, 0) > 0
+
+
+    def get(self, slug, message):
+        """
+        Method that obtains a cached response.
+
+        :param slug:
+            The fixed slug used for the request.
+
+        :param message:
+            The request message.
+
+        :return:
+            Returns the cached response or None if there is no unexpired
+            entry for this request.
+
+        :type slug:    str
+        :type message: dict
+        :rtype:        dict or None
+
+        """
+
+        text = self.get_text(slug, message)
+        if text is not None:
+            result = json.loads(text)
+        else:
+            result = None
+
+        return result
+
+
+    def get_text(self, slug, message):
+        """
+        Method that obtains a cached response as JSON text.
+
+        :param slug:
+            The fixed slug used for the request.
+
+        :param message:
+            The request message.
+
+        :return:
+            Returns the cached JSON text or None if there is no unexpired
+            entry for this request.
+
+        :type slug:    str
+        :type message: dict
+        :rtype:        str or None
+
+        """
+
+        if self.is_cacheable(slug):
+            key = self.__key(slug, message)
+            with self.__lock:
+                entry = self.__entries.get(key)
+                if entry is not None and entry[0] <= time.time():
+                    del self.__entries[key]
+                    self.__modified = True
+                    entry = None
+
+            if entry is not None:
+                result = entry[1]
+            else:
+                result = None
+        else:
+            result = None
+
+        return result
+
+
+    def update(self, slug, message, response):
+        """
+        Method that should be called after every request is posted.  The
+        method caches successful responses to cacheable slugs and discards
+        entries made stale by mutating slugs.  Stale entries are discarded
+        even if the mutating request failed as the remote state may still
+        have changed.
+
+        :param slug:
+            The fixed slug used for the request.
+
+        :param message:
+            The request message.
+
+        :param response:
+            The response received.  A value of None indicates an error.
+
+        :type slug:     str
+        :type message:  dict
+        :type response: dict or None
+
+        """
+
+        if slug in INVALIDATED_FAMILIES:
+            for family in INVALIDATED_FAMILIES[slug]:
+                self.invalidate(family)
+        elif response is not None                     and \
+             self.is_cacheable(slug)                  and \
+             'status' in response                     and \
+             str(response['status']).lower() == 'ok'     :
+            key = self.__key(slug, message)
+            expiration = time.time() + self.__time_to_live[slug]
+            text = json.dumps(response)
+            with self.__lock:
+                self.__entries[key] = ( expiration, text )
+                self.__modified = True
+
+
+    def invalidate(self, slug_prefix = None):
+        """
+        Method that discards cached responses.
+
+        :param slug_prefix:
+            The slug prefix to discard, for example "server/".  If None, then
+            every entry is discarded.
+
+        :type slug_prefix: str or None
+
+        """
+
+        with self.__lock:
+            if slug_prefix is None:
+                if self.__entries:
+                    self.__entries.clear()
+                    self.__modified = True
+            else:
+                slug_prefix = slug_prefix.lstrip('/')
+                stale = [
+                    k for k in self.__entries if k.startswith(slug_prefix)
+                ]
+                for key in stale:
+                    del self.__entries[key]
+
+                if stale:
+                    self.__modified = True
+
+
+    def save(self):
+        """
+        Method that writes the cache to the backing file, if one was
+        specified.  Entries for other namespaces held in the file are
+        preserved.  The file is only readable by the current user.
+
+        :return:
+            Returns True on success.  Returns False on error.
+
+        :rtype: bool
+
+        """
+
+        success = True
+        if self.__filename is not None and self.__modified:
+            all_namespaces = self.__read_file()
+            now = time.time()
+            with self.__lock:
+                all_namespaces[self.__namespace] = {
+                    k:list(v) for k,v in self.__entries.items() if v[0] > now
+                }
+                self.__modified = False
+
+            try:
+                descriptor = os.open(
+                    self.__filename,
+                    os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                    0o600
+                )
+                with os.fdopen(descriptor, 'w') as fh:
+                    fh.write(json.dumps(all_namespaces))
+            except Exception as e:
+                success = False
+                sys.stderr.write(
+                    "*** Could not write cache file %s: %s\n"%(
+                        self.__filename,
+                        str(e)
+                    )
+                )
+
+        return success
+
+
+    def __load(self):
+        """
+        Method that loads unexpired entries for this namespace from the
+        backing file.
+
+        """
+
+        entries = self.__read_file().get(self.__namespace)
+        if isinstance(entries, dict):
+            now = time.time()
+            for key, entry in entries.items():
+                try:
+                    expiration = float(entry[0])
+                    text = str(entry[1])
+                except:
+                    expiration = 0
+
+                if expiration > now:
+                    self.__entries[key] = ( expiration, text )
+
+
+    def __read_file(self):
+        """
+        Method that reads the raw contents of the backing file.  Missing or
+        corrupt files are treated as empty.
+
+        :return:
+            Returns a dictionary keyed by namespace.
+
+        :rtype: dict
+
+        """
+
+        try:
+            with open(self.__filename, 'r') as fh:
+                result = json.loads(fh.read())
+        except:
+            result = dict()
+
+        if not isinstance(result, dict):
+            result = dict()
+
+        return result
+
+
+    @staticmethod
+    def __key(slug, message):
+        """
+        Method that calculates the key used for a request.
+
+        :param slug:
+            The fixed slug used for the request.
+
+        :param message:
+            The request message.
+
+        :return:
+            Returns the key for the request.
+
+        :type slug:    str
+        :type message: dict
+        :rtype:        str
+
+        """
+
+        return "%s %s"%(
+            slug,
+            json.dumps(message, sort_keys = True, separators = (',', ':'))
+        )
+
+###############################################################################
+# Functions:
+#
+
+def configure(configuration, namespace):
+    """
+    Function that creates a response cache from the "cache" section of the
+    configuration.  The section is optional and may contain:
+
+        "enabled"      - False to disable caching.  Defaults to True.
+        "file"         - Path to a file used to persist the cache between
+                         runs.  The cache is held in memory only if not
+                         specified.
+        "time_to_live" - Dictionary of slugs to time to live values, in
+                         seconds.
+
+    :param configuration:
+        The parsed configuration.
+
+    :param namespace:
+        The namespace to assign to the cache.
+
+    :return:
+        Returns the response cache or None if caching is disabled.
+
+    :type configuration: dict
+    :type namespace:     str
+    :rtype:              ResponseCache or None
+
+    """
+
+    cache_configuration = configuration.get('cache', dict())
+    if cache_configuration.get('enabled', True):
+        filename = cache_configuration.get('file')
+        if filename is not None:
+            filename = os.path.expanduser(filename)
+
+        result = ResponseCache(
+            namespace,
+            time_to_live = cache_configuration.get('time_to_live'),
+            filename = filename
+        )
+    else:
+        result = None
+
+    return result
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
@@ -44,6 +44,7 @@ import datetime
 import libraries.enumeration as enumeration
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
+import libraries.metrics as metrics
 
 ###############################################################################
 # Globals:
@@ -278,6 +279,8 @@ class Servers(object):
             message = message
         )
 
+        build_start_time = metrics.timer()
+
         if response is not None and 'status' in response:
             status = response['status']
             if status == 'OK':
@@ -285,9 +288,7 @@ class Servers(object):
                     server_id = int(response['server_id'])
                     region_id = int(response['region_id'])
                     identifier = str(response['identifier'])
-                    server_status = STATUS.by_name(
-                        response['server_status'].upper()
-                    )
+                    server_status = STATUS.by_name(response['server_status'])
                     monitors_per_second = float(
                         response['monitor_service_rate']
                     )
@@ -319,6 +320,12 @@ class Servers(object):
         else:
             result = None
 
+        metrics.elapsed(
+            "server/get",
+            metrics.BUILD_TIME,
+            build_start_time
+        )
+
         return result
 
 
@@ -360,9 +367,7 @@ class Servers(object):
                     server_id = int(response['server_id'])
                     region_id = int(response['region_id'])
                     identifier = str(response['identifier'])
-                    server_status = STATUS.by_name(
-                        response['server_status'].upper()
-                    )
+                    server_status = STATUS.by_name(response['server_status'])
                     monitors_per_second = float(
                         response['monitor_service_rate']
                     )
@@ -457,9 +462,7 @@ class Servers(object):
                     server_id = int(response['server_id'])
                     region_id = int(response['region_id'])
                     identifier = str(response['identifier'])
-                    server_status = STATUS.by_name(
-                        response['server_status'].upper()
-                    )
+                    server_status = STATUS.by_name(response['server_status'])
                     monitors_per_second = float(
                         response['monitor_service_rate']
                     )
@@ -551,6 +554,42 @@ class Servers(object):
 
         """
 
+        servers = self.iter_list(region_id, status)
+        if servers is not None:
+            try:
+                result = list(servers)
+            except ValueError:
+                result = None
+        else:
+            result = None
+
+        return result
+
+
+    def iter_list(self, region_id = None, status = None):
+        """
+        Method you can use to iterate over servers as they are received.
+        Unlike list, servers are not accumulated in memory.
+
+        :param region_id:
+            An optional region ID to use to constrain the returned list.  A
+            value of None will return servers in all regions.
+
+        :param status:
+            An optional status value to use to constraint the returned list.  A
+            value of None will return servers with any status.
+
+        :return:
+            Returns an iterator over servers or None if the request failed.
+            Iteration raises a ValueError if the response is malformed or
+            reports an error.
+
+        :type region_id: int or None
+        :type status:    STATUS enumerated value or None
+        :rtype:          iterator or None
+
+        """
+
         message = dict()
 
         if region_id is not None:
@@ -559,55 +598,17 @@ class Servers(object):
         if status is not None and status != STATUS.ALL_UNKNOWN:
             message['server_status'] = str(status).lower()
 
-        response = self.__rest_api.post_message(
+        stream = self.__rest_api.post_message_stream(
             slug = "server/list",
             secret = self.__secret,
-            message = message
+            message = message,
+            containers = ( 'servers', )
         )
 
-        if response is not None and 'status' in response:
-            status = response['status']
-            if status == 'OK' and 'servers' in response:
-                servers_data = response['servers']
-
-                result = list()
-                for server_data in servers_data:
-                    try:
-                        server_id = int(server_data['server_id'])
-                        region_id = int(server_data['region_id'])
-                        identifier = str(server_data['identifier'])
-                        server_status = STATUS.by_name(
-                            server_data['server_status'].upper()
-                        )
-                        monitors_per_second = float(
-                            server_data['monitor_service_rate']
-                        )
-                        cpu_loading = float(server_data['cpu_loading'])
-                        memory_loading = float(server_data['memory_loading'])
-                    except:
-                        server_id = None
-                        region_id = None
-                        identifier = None
-                        status = None
-                        monitors_per_second = None
-                        cpu_loading = None
-                        memory_loading = None
-
-                    if server_id is not None:
-                        server_instance = Server(
-                            server_id = server_id,
-                            region_id = region_id,
-                            identifier = identifier,
-                            status = server_status,
-                            monitors_per_second = monitors_per_second,
-                            cpu_loading = cpu_loading,
-                            memory_loading = memory_loading
-                        )
-                        result.append(server_instance)
-            else:
-                result = None
+        if stream is not None:
+            result = self.__iter_stream(stream)
         else:
-            result = False
+            result = None
 
         return result
 
@@ -784,6 +785,62 @@ class Servers(object):
 
         return result
 
+
+    def __iter_stream(self, stream):
+        """
+        Generator used internally to parse a streamed server list.  Malformed
+        server entries are skipped.
+
+        :param stream:
+            The streamed response.
+
+        :return:
+            Yields server instances.
+
+        :type stream: json_stream.JsonStream
+
+        """
+
+        build_stopwatch = metrics.Stopwatch("server/list", metrics.BUILD_TIME)
+        try:
+            for container, index, server_data in stream:
+                with build_stopwatch:
+                    try:
+                        server_id = int(server_data['server_id'])
+                        region_id = int(server_data['region_id'])
+                        identifier = str(server_data['identifier'])
+                        server_status = STATUS.by_name(
+                            server_data['server_status']
+                        )
+                        monitors_per_second = float(
+                            server_data['monitor_service_rate']
+                        )
+                        cpu_loading = float(server_data['cpu_loading'])
+                        memory_loading = float(server_data['memory_loading'])
+                    except:
+                        server_id = None
+
+                    if server_id is not None:
+                        server = Server(
+                            server_id = server_id,
+                            region_id = region_id,
+                            identifier = identifier,
+                            status = server_status,
+                            monitors_per_second = monitors_per_second,
+                            cpu_loading = cpu_loading,
+                            memory_loading = memory_loading
+                        )
+                    else:
+                        server = None
+
+                if server is not None:
+                    yield server
+
+            if stream.status != 'OK' or not stream.found('servers'):
+                raise ValueError("Invalid server list response")
+        finally:
+            build_stopwatch.record()
+
 ###############################################################################
 # Main:
 #
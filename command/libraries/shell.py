@@ -0,0 +1,890 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+#
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that runs many commands from a single process so that the
+server connection, clock time delta, and response cache stay warm between
+commands.  Commands can be entered interactively, run as a batch, or
+received over a local Unix socket.
+
+The socket protocol is line based.  Each request is a single line holding
+either a JSON array of command line arguments or a shell style command line.
+Each response is a single line holding a JSON object with the "status",
+"stdout", and "stderr" of the command.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import sys
+import os
+import io
+import json
+import shlex
+import signal
+import socket
+import socketserver
+import threading
+import time
+import concurrent.futures
+
+###############################################################################
+# Globals:
+#
+
+PROMPT = "speedsentry> "
+"""
+The prompt displayed by the interactive shell.
+
+"""
+
+EXIT_COMMANDS = ( 'exit', 'quit' )
+"""
+Commands that end a shell session or a socket connection.
+
+"""
+
+WAIT_COMMAND = "wait"
+"""
+Batch directive that waits for all earlier commands to complete before
+starting later commands.
+
+"""
+
+PROGRAM_NAME = "speedsentry"
+"""
+The program name.  Batch lines may start with the program name so that
+existing shell scripts can be run as batches.
+
+"""
+
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.path.expanduser("~"),
+    ".speedsentry.sock"
+)
+"""
+The default Unix socket used by the daemon.
+
+"""
+
+###############################################################################
+# Class Shell:
+#
+
+class Shell(object):
+    """
+    Class that reads commands from a stream and executes them one at a time.
+
+    """
+
+    def __init__(self, execute, input = None):
+        """
+        Method that initializes the Shell class.
+
+        :param execute:
+            The function used to execute a command.  The function accepts a
+            list of command line arguments and returns True on success.
+
+        :param input:
+            The stream to read commands from.  A value of None selects
+            sys.stdin.
+
+        :type execute: callable
+        :type input:   file-like object or None
+
+        """
+
+        super().__init__()
+
+        self.__execute = execute
+        self.__input = input if input is not None else sys.stdin
+
+
+    def run(self):
+        """
+        Method that executes commands until the input is exhausted or an exit
+        command is received.  A prompt is displayed if the input is a
+        terminal.
+
+        :return:
+            Returns True if every command succeeded.  Returns False if any
+            command failed.
+
+        :rtype: bool
+
+        """
+
+        interactive = self.__input is sys.stdin and sys.stdin.isatty()
+        if interactive:
+            try:
+                import readline
+            except ImportError:
+                pass
+
+        success = True
+        while True:
+            if interactive:
+                try:
+                    line = input(PROMPT)
+                except EOFError:
+                    sys.stdout.write("\n")
+                    break
+                except KeyboardInterrupt:
+                    sys.stdout.write("\n")
+                    continue
+            else:
+                line = self.__input.readline()
+                if not line:
+                    break
+
+            try:
+                command_arguments = split_command(line)
+            except ValueError as e:
+                sys.stderr.write("*** Invalid command: %s\n"%str(e))
+                success = False
+                command_arguments = None
+
+            if command_arguments:
+                if command_arguments[0] in EXIT_COMMANDS:
+                    break
+
+                try:
+                    if not self.__execute(command_arguments):
+                        success = False
+                except KeyboardInterrupt:
+                    if not interactive:
+                        raise
+
+                    sys.stderr.write("*** Interrupted\n")
+                    success = False
+
+                sys.stdout.flush()
+
+        return success
+
+###############################################################################
+# Class ThreadStream:
+#
+
+class ThreadStream(object):
+    """
+    Class that stands in for a process wide output stream.  Threads can
+    redirect their own writes to a separate stream.  Writes from all other
+    threads go to the original stream.
+
+    """
+
+    def __init__(self, stream):
+        """
+        Method that initializes the ThreadStream class.
+
+        :param stream:
+            The original stream.
+
+        :type stream: file-like object
+
+        """
+
+        super().__init__()
+
+        self.__stream = stream
+        self.__local = threading.local()
+
+
+    @property
+    def stream(self):
+        """
+        Read-only property holding the original stream.
+
+        :type: file-like object
+
+        """
+
+        return self.__stream
+
+
+    @property
+    def buffer(self):
+        """
+        Read-only property holding the binary buffer of the current thread's
+        stream.
+
+        :type: binary file-like object
+
+        """
+
+        return self.__target().buffer
+
+
+    def redirect(self, stream):
+        """
+        Method that redirects writes from the current thread.
+
+        :param stream:
+            The stream to write to.  A value of None restores the original
+            stream.
+
+        :type stream: file-like object or None
+
+        """
+
+        self.__local.stream = stream
+
+
+    def write(self, text):
+        """
+        Method that writes text to the current thread's stream.
+
+        :param text:
+            The text to write.
+
+        :return:
+            Returns the number of characters written.
+
+        :type text: str
+        :rtype:     int
+
+        """
+
+        return self.__target().write(text)
+
+
+    def flush(self):
+        """
+        Method that flushes the current thread's stream.
+
+        """
+
+        self.__target().flush()
+
+
+    def __getattr__(self, name):
+        """
+        Method that forwards all other attributes to the current thread's
+        stream.
+
+        :param name:
+            The attribute name.
+
+        :type name: str
+
+        """
+
+        return getattr(self.__target(), name)
+
+
+    def __target(self):
+        """
+        Method used internally to obtain the current thread's stream.
+
+        :rtype: file-like object
+
+        """
+
+        result = getattr(self.__local, 'stream', None)
+        if result is None:
+            result = self.__stream
+
+        return result
+
+###############################################################################
+# Class Batch:
+#
+
+class Batch(object):
+    """
+    Class that runs a script of commands, one command per line.  Commands can
+    optionally be run in parallel.  Output is always written in script order.
+
+    """
+
+    def __init__(self, execute, input, jobs = 1):
+        """
+        Method that initializes the Batch class.
+
+        :param execute:
+            The function used to execute a command.  The function accepts a
+            list of command line arguments and returns True on success.
+
+        :param input:
+            The stream to read commands from.
+
+        :param jobs:
+            The maximum number of commands to run at the same time.
+
+        :type execute: callable
+        :type input:   file-like object
+        :type jobs:    int
+
+        """
+
+        super().__init__()
+
+        self.__execute = execute
+        self.__input = input
+        self.__jobs = max(1, jobs)
+
+
+    def run(self):
+        """
+        Method that runs every command in the script and reports the results
+        on stderr.  Commands are separated into groups by "wait" lines.  The
+        commands in a group are independent and may run in parallel.
+
+        :return:
+            Returns True if every command succeeded.  Returns False if any
+            line could not be parsed or any command failed.
+
+        :rtype: bool
+
+        """
+
+        start_time = time.monotonic()
+
+        groups = [ [ ] ]
+        failures = list()
+        for line_number, line in enumerate(self.__input, 1):
+            try:
+                command_arguments = split_command(line)
+            except ValueError as e:
+                sys.stderr.write(
+                    "*** Line %d: Invalid command: %s\n"%(line_number, str(e))
+                )
+                failures.append(( line_number, line.strip() ))
+                command_arguments = None
+
+            if command_arguments and command_arguments[0] == PROGRAM_NAME:
+                command_arguments = command_arguments[1:]
+
+            if command_arguments:
+                if command_arguments == [ WAIT_COMMAND ]:
+                    groups.append(list())
+                else:
+                    groups[-1].append(( line_number, command_arguments ))
+
+        number_invalid = len(failures)
+
+        number_commands = sum(len(group) for group in groups)
+        if self.__jobs > 1 and number_commands > 1:
+            failures.extend(self.__run_parallel(groups))
+        else:
+            failures.extend(self.__run_sequential(groups))
+
+        number_commands += number_invalid
+
+        failures.sort()
+        for line_number, command_line in failures:
+            sys.stderr.write(
+                "*** Line %d failed: %s\n"%(line_number, command_line)
+            )
+
+        sys.stderr.write(
+            "%d commands, %d succeeded, %d failed, %.2f seconds.\n"%(
+                number_commands,
+                number_commands - len(failures),
+                len(failures),
+                time.monotonic() - start_time
+            )
+        )
+
+        return not failures
+
+
+    def __run_sequential(self, groups):
+        """
+        Method used internally to run commands one at a time.
+
+        :param groups:
+            The groups of ( line number, command arguments ) tuples.
+
+        :return:
+            Returns a list of ( line number, command line ) tuples for the
+            commands that failed.
+
+        :type groups: list of lists
+        :rtype:       list
+
+        """
+
+        failures = list()
+        for group in groups:
+            for line_number, command_arguments in group:
+                try:
+                    success = self.__execute(command_arguments)
+                except Exception as e:
+                    sys.stderr.write("*** Command failed: %s\n"%str(e))
+                    success = False
+
+                if not success:
+                    failures.append(
+                        ( line_number, shlex.join(command_arguments) )
+                    )
+
+        return failures
+
+
+    def __run_parallel(self, groups):
+        """
+        Method used internally to run commands on a pool of threads.  Each
+        command's output is captured and written once all earlier commands
+        have been written.
+
+        :param groups:
+            The groups of ( line number, command arguments ) tuples.
+
+        :return:
+            Returns a list of ( line number, command line ) tuples for the
+            commands that failed.
+
+        :type groups: list of lists
+        :rtype:       list
+
+        """
+
+        stdout = ThreadStream(sys.stdout)
+        stderr = ThreadStream(sys.stderr)
+
+        failures = list()
+        ( sys.stdout, sys.stderr ) = ( stdout, stderr )
+        try:
+            with concurrent.futures.ThreadPoolExecutor(self.__jobs) as pool:
+                for group in groups:
+                    futures = [
+                        pool.submit(
+                            self.__run_captured,
+                            stdout,
+                            stderr,
+                            command_arguments
+                        )
+                        for line_number, command_arguments in group
+                    ]
+
+                    for future, ( line_number, command_arguments ) in zip(
+                            futures,
+                            group
+                        ):
+                        ( success, output, errors ) = future.result()
+
+                        stdout.stream.flush()
+                        stdout.stream.buffer.write(output)
+                        stdout.stream.flush()
+                        stderr.stream.buffer.write(errors)
+                        stderr.stream.flush()
+
+                        if not success:
+                            failures.append(
+                                ( line_number, shlex.join(command_arguments) )
+                            )
+        finally:
+            ( sys.stdout, sys.stderr ) = ( stdout.stream, stderr.stream )
+
+        return failures
+
+
+    def __run_captured(self, stdout, stderr, command_arguments):
+        """
+        Method used internally to run a command on a worker thread,
+        capturing its output.
+
+        :param stdout:
+            The stream standing in for sys.stdout.
+
+        :param stderr:
+            The stream standing in for sys.stderr.
+
+        :param command_arguments:
+            The command line arguments.
+
+        :return:
+            Returns a tuple holding the command status, the captured standard
+            output, and the captured standard error.
+
+        :type stdout:            ThreadStream
+        :type stderr:            ThreadStream
+        :type command_arguments: list of str
+        :rtype:                  tuple
+
+        """
+
+        captured_stdout = io.TextIOWrapper(io.BytesIO(), encoding = 'utf-8')
+        captured_stderr = io.TextIOWrapper(io.BytesIO(), encoding = 'utf-8')
+
+        stdout.redirect(captured_stdout)
+        stderr.redirect(captured_stderr)
+        try:
+            success = self.__execute(command_arguments)
+        except Exception as e:
+            captured_stderr.write("*** Command failed: %s\n"%str(e))
+            success = False
+        finally:
+            stdout.redirect(None)
+            stderr.redirect(None)
+
+        captured_stdout.flush()
+        captured_stderr.flush()
+
+        return (
+            bool(success),
+            captured_stdout.buffer.getvalue(),
+            captured_stderr.buffer.getvalue()
+        )
+
+###############################################################################
+# Class Daemon:
+#
+
+class Daemon(object):
+    """
+    Class that executes commands received over a local Unix socket.  Clients
+    are served concurrently but commands are executed one at a time since
+    each command writes to the process wide standard output streams.
+
+    """
+
+    def __init__(self, socket_path, execute):
+        """
+        Method that initializes the Daemon class.
+
+        :param socket_path:
+            The path of the Unix socket to listen on.
+
+        :param execute:
+            The function used to execute a command.  The function accepts a
+            list of command line arguments and returns True on success.
+
+        :type socket_path: str
+        :type execute:     callable
+
+        """
+
+        super().__init__()
+
+        self.__socket_path = socket_path
+        self.__execute = execute
+        self.__lock = threading.Lock()
+
+
+    @property
+    def socket_path(self):
+        """
+        Read-only property holding the Unix socket path.
+
+        :type: str
+
+        """
+
+        return self.__socket_path
+
+
+    def run(self):
+        """
+        Method that serves requests until the process receives SIGINT or
+        SIGTERM.
+
+        :return:
+            Returns True on success.  Returns False if the socket could not be
+            opened.
+
+        :rtype: bool
+
+        """
+
+        success = True
+        if os.path.exists(self.__socket_path):
+            if self.__is_listening():
+                sys.stderr.write(
+                    "*** A daemon is already listening on %s\n"%(
+                        self.__socket_path
+                    )
+                )
+                success = False
+            else:
+                os.unlink(self.__socket_path)
+
+        if success:
+            daemon = self
+            class Handler(socketserver.StreamRequestHandler):
+                def handle(self):
+                    daemon.handle(self.rfile, self.wfile)
+
+            # The socket is created with owner only permissions so no other
+            # user can connect between the bind and the chmod below.
+            previous_umask = os.umask(0o077)
+            try:
+                server = socketserver.ThreadingUnixStreamServer(
+                    self.__socket_path,
+                    Handler
+                )
+            except OSError as e:
+                sys.stderr.write(
+                    "*** Could not open %s: %s\n"%(self.__socket_path, str(e))
+                )
+                success = False
+            finally:
+                os.umask(previous_umask)
+
+        if success:
+            server.daemon_threads = True
+            os.chmod(self.__socket_path, 0o600)
+
+            def stop(signal_number, frame):
+                raise KeyboardInterrupt()
+
+            previous_handler = signal.signal(signal.SIGTERM, stop)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                signal.signal(signal.SIGTERM, previous_handler)
+                server.server_close()
+                try:
+                    os.unlink(self.__socket_path)
+                except OSError:
+                    pass
+
+        return success
+
+
+    def handle(self, rfile, wfile):
+        """
+        Method that serves a single client connection.  Requests are
+        processed until the client disconnects or sends an exit command.
+
+        :param rfile:
+            The stream to read requests from.
+
+        :param wfile:
+            The stream to write responses to.
+
+        :type rfile: binary file-like object
+        :type wfile: binary file-like object
+
+        """
+
+        for raw_line in rfile:
+            try:
+                command_arguments = split_command(raw_line.decode('utf-8'))
+            except ValueError as e:
+                response = {
+                    'status' : False,
+                    'stdout' : "",
+                    'stderr' : "*** Invalid command: %s\n"%str(e)
+                }
+                command_arguments = None
+
+            if command_arguments is not None:
+                if not command_arguments:
+                    continue
+
+                if command_arguments[0] in EXIT_COMMANDS:
+                    break
+
+                response = self.__run(command_arguments)
+
+            wfile.write(json.dumps(response).encode('utf-8') + b"\n")
+            wfile.flush()
+
+
+    def __run(self, command_arguments):
+        """
+        Method used internally to execute a command, capturing its output.
+
+        :param command_arguments:
+            The command line arguments.
+
+        :return:
+            Returns the response to send to the client.
+
+        :type command_arguments: list of str
+        :rtype:                  dict
+
+        """
+
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding = 'utf-8')
+        stderr = io.TextIOWrapper(io.BytesIO(), encoding = 'utf-8')
+
+        with self.__lock:
+            ( saved_stdout, saved_stderr ) = ( sys.stdout, sys.stderr )
+            ( sys.stdout, sys.stderr ) = ( stdout, stderr )
+            try:
+                success = self.__execute(command_arguments)
+            except Exception as e:
+                stderr.write("*** Command failed: %s\n"%str(e))
+                success = False
+            finally:
+                ( sys.stdout, sys.stderr ) = ( saved_stdout, saved_stderr )
+
+        stdout.flush()
+        stderr.flush()
+
+        return {
+            'status' : bool(success),
+            'stdout' : stdout.buffer.getvalue().decode(
+                'utf-8',
+                'surrogateescape'
+            ),
+            'stderr' : stderr.buffer.getvalue().decode(
+                'utf-8',
+                'surrogateescape'
+            )
+        }
+
+
+    def __is_listening(self):
+        """
+        Method used internally to determine if another process is listening
+        on the socket.
+
+        :return:
+            Returns True if the socket accepts connections.
+
+        :rtype: bool
+
+        """
+
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client.connect(self.__socket_path)
+            result = True
+        except OSError:
+            result = False
+        finally:
+            client.close()
+
+        return result
+
+###############################################################################
+# Functions:
+#
+
+def split_command(line):
+    """
+    Function that splits a command line into arguments.  Lines starting with
+    "[" are parsed as a JSON array of strings.  All other lines are split
+    using shell quoting rules.  Text after a "#" is treated as a comment.
+
+    :param line:
+        The command line to split.
+
+    :return:
+        Returns the list of arguments.  The list is empty for blank lines.
+
+    :raises ValueError:
+        Raised if the line is malformed.
+
+    :type line: str
+    :rtype:     list of str
+
+    """
+
+    line = line.strip()
+    if line.startswith("["):
+        result = json.loads(line)
+        if not isinstance(result, list)                  or \
+           not all(isinstance(v, str) for v in result)    :
+            raise ValueError("Expected a JSON array of strings.")
+    else:
+        result = shlex.split(line, comments = True)
+
+    return result
+
+
+def forward(socket_path, command_arguments):
+    """
+    Function that sends a command to a running daemon and writes the
+    command's output to stdout and stderr.
+
+    :param socket_path:
+        The path of the daemon's Unix socket.
+
+    :param command_arguments:
+        The command line arguments to send.
+
+    :return:
+        Returns True if the command succeeded.  Returns False if the command
+        failed or the daemon could not be reached.
+
+    :type socket_path:       str
+    :type command_arguments: list of str
+    :rtype:                  bool
+
+    """
+
+    request = json.dumps(list(command_arguments)).encode('utf-8') + b"\n"
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+        client.sendall(request)
+        with client.makefile('rb') as rfile:
+            raw_response = rfile.readline()
+    except OSError as e:
+        raw_response = None
+        sys.stderr.write(
+            "*** Could not reach daemon on %s: %s\n"%(socket_path, str(e))
+        )
+    finally:
+        client.close()
+
+    if raw_response:
+        try:
+            response = json.loads(raw_response)
+        except ValueError:
+            response = None
+
+        if response is not None:
+            sys.stdout.flush()
+            sys.stdout.buffer.write(
+                response['stdout'].encode('utf-8', 'surrogateescape')
+            )
+            sys.stdout.flush()
+            sys.stderr.write(response['stderr'])
+            success = response['status']
+        else:
+            sys.stderr.write("*** Invalid response from daemon.\n")
+            success = False
+    else:
+        if raw_response is not None:
+            sys.stderr.write("*** Daemon closed the connection.\n")
+
+        success = False
+
+    return success
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
@@ -0,0 +1,511 @@
+#!/usr/bin/python
+#-*-python-*-##################################################################
+# Copyright 2021 - 2023 Inesonic, LLC
+# 
+# This file is licensed under two licenses.
+#
+# Inesonic Commercial License, Version 1:
+#   All rights reserved.  Inesonic, LLC retains all rights to this software,
+#   including the right to relicense the software in source or binary formats
+#   under different terms.  Unauthorized use under the terms of this license is
+#   strictly prohibited.
+#
+# GNU Public License, Version 3:
+#   This program is free software: you can redistribute it and/or modify it
+#   under the terms of the GNU General Public License as published by the Free
+#   Software Foundation, either version 3 of the License, or (at your option)
+#   any later version.
+#   
+#   This program is distributed in the hope that it will be useful, but WITHOUT
+#   ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+#   FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for
+#   more details.
+#   
+#   You should have received a copy of the GNU General Public License along
+#   with this program.  If not, see <https://www.gnu.org/licenses/>.
+###############################################################################
+
+"""
+Python module that renders tables for the command line tools.  Rows are
+formatted with a single precomputed format string and written in batches so
+that very large tables are not bound by per-row formatting and write calls.
+
+"""
+
+###############################################################################
+# Import:
+#
+
+import sys
+import re
+
+import libraries.enumeration as enumeration
+
+###############################################################################
+# Globals:
+#
+
+ALIGNMENT = enumeration.Enum("LEFT RIGHT")
+"""
+Enumeration of column alignments.
+
+"""
+
+DEFAULT_SAMPLE_SIZE = 1000
+"""
+The default number of rows used to size columns without an explicit width.
+
+"""
+
+DEFAULT_BATCH_SIZE = 512
+"""
+The default number of rows formatted per write.
+
+"""
+
+###############################################################################
+# Class Column:
+#
+
+class Column(object):
+    """
+    Class that describes a single table column.
+
+    """
+
+    def __init__(
+        self,
+        title,
+        conversion = "s",
+        width = None,
+        alignment = None,
+        title_alignment = ALIGNMENT.LEFT,
+        name = None
+        ):
+        """
+        Method that initializes the Column class.
+
+        :param title:
+            The column title.
+
+        :param conversion:
+            The printf style conversion used for values, without the leading
+            percent sign or field width.  Examples are "d", "s", and ".3f".
+
+        :param width:
+            The column width.  A value of None causes the width to be
+            determined from the title and the sampled rows.
+
+        :param alignment:
+            The value alignment.  A value of None right aligns numeric
+            conversions and left aligns all others.
+
+        :param title_alignment:
+            The title alignment.
+
+        :param name:
+            The field name used by machine readable output formats.  A value
+            of None derives the name from the title.
+
+        :type title:           str
+        :type conversion:      str
+        :type width:           int or None
+        :type alignment:       ALIGNMENT enumerated value or None
+        :type title_alignment: ALIGNMENT enumerated value
+        :type name:            str or None
+
+        """
+
+        super().__init__()
+
+        self.__title = title
+        if name is None:
+            self.__name = re.sub(r'[^0-9a-z]+', '_', title.lower()).strip('_')
+        else:
+            self.__name = name
+
+        self.__conversion = conversion
+        self.__width = width
+
+        if alignment is None:
+            if conversion.endswith("s"):
+                self.__alignment = ALIGNMENT.LEFT
+            else:
+                self.__alignment = ALIGNMENT.RIGHT
+        else:
+            self.__alignment = alignment
+
+        self.__title_alignment = title_alignment
+
+
+    @property
+    def title(self):
+        """
+        Read-only property holding the column title.
+
+        :type: str
+
+        """
+
+        return self.__title
+
+
+    @property
+    def name(self):
+        """
+        Read-only property holding the field name used by machine readable
+        output formats.
+
+        :type: str
+
+        """
+
+        return self.__name
+
+
+    @property
+    def conversion(self):
+        """
+        Read-only property holding the printf style conversion.
+
+        :type: str
+
+        """
+
+        return self.__conversion
+
+
+    @property
+    def width(self):
+        """
+        Read-only property holding the fixed column width, if any.
+
+        :type: int or None
+
+        """
+
+        return self.__width
+
+
+    @property
+    def alignment(self):
+        """
+        Read-only property holding the value alignment.
+
+        :type: ALIGNMENT enumerated value
+
+        """
+
+        return self.__alignment
+
+
+    @property
+    def title_alignment(self):
+        """
+        Read-only property holding the title alignment.
+
+        :type: ALIGNMENT enumerated value
+
+        """
+
+        return self.__title_alignment
+
+
+    def cell_format(self, width):
+        """
+        Method that returns the printf style format for a value in this
+        column.
+
+        :param width:
+            The column width.
+
+        :return:
+            Returns the format string.
+
+        :type width: int
+        :rtype:      str
+
+        """
+
+        if self.__alignment == ALIGNMENT.LEFT:
+            return "%%-%d%s"%(width, self.__conversion)
+        else:
+            return "%%%d%s"%(width, self.__conversion)
+
+###############################################################################
+# Class Table:
+#
+
+class Table(object):
+    """
+    Class that renders rows of values as a text table with a divider after
+    every row.  Rows are tuples holding one value per column.
+
+    Columns without an explicit width are sized from the first rows rendered.
+    Values wider than the column after sizing extend the cell rather than
+    being truncated.
+
+    """
+
+    def __init__(
+        self,
+        columns,
+        output = None,
+        sample_size = DEFAULT_SAMPLE_SIZE,
+        batch_size = DEFAULT_BATCH_SIZE,
+        show_empty = True
+        ):
+        """
+        Method that initializes the Table class.
+
+        :param columns:
+            The table columns.
+
+        :param output:
+            The stream to write to.  A value of None selects sys.stdout at the
+            time the table is rendered.
+
+        :param sample_size:
+            The number of rows used to size columns without an explicit width.
+            A value of None samples every row.
+
+        :param batch_size:
+            The number of rows formatted per write.
+
+        :param show_empty:
+            If True, the header is written even when there are no rows.
+
+        :type columns:     list of Column instances
+        :type output:      file-like object or None
+        :type sample_size: int or None
+        :type batch_size:  int
+        :type show_empty:  bool
+
+        """
+
+        super().__init__()
+
+        self.__columns = tuple(columns)
+        self.__output = output
+        self.__sample_size = sample_size
+        self.__batch_size = max(1, batch_size)
+        self.__show_empty = show_empty
+
+        self.__widths = None
+        self.__row_formats = None
+        self.__divider = None
+
+
+    @property
+    def columns(self):
+        """
+        Read-only property holding the table columns.
+
+        :type: tuple
+
+        """
+
+        return self.__columns
+
+
+    def render(self, rows, number_values = None):
+        """
+        Method that renders a table, including the header.
+
+        :param rows:
+            An iterable of row tuples.
+
+        :param number_values:
+            The number of leading columns supplied by each row.  Remaining
+            columns are left blank.  A value of None indicates rows supply a
+            value for every column.
+
+        :type rows:          iterable
+        :type number_values: int or None
+
+        """
+
+        rows = iter(rows)
+        sample = list()
+        if self.__widths is None:
+            if any(column.width is None for column in self.__columns):
+                sample_size = self.__sample_size
+                for row in rows:
+                    sample.append(row)
+                    if sample_size is not None and len(sample) >= sample_size:
+                        break
+
+            self.__size_columns(sample, number_values)
+
+        if sample or self.__show_empty:
+            self.write_header()
+            self.write_rows(sample, number_values)
+            self.write_rows(rows, number_values)
+        else:
+            self.write_rows(rows, number_values, header = True)
+
+
+    def write_header(self):
+        """
+        Method that writes the table header.  Columns without an explicit
+        width are sized using their titles if no rows have been rendered.
+
+        """
+
+        if self.__widths is None:
+            self.__size_columns(( ), None)
+
+        output = self.__stream()
+        titles = list()
+        for column, width in zip(self.__columns, self.__widths):
+            if column.title_alignment == ALIGNMENT.LEFT:
+                titles.append(column.title.ljust(width))
+            else:
+                titles.append(column.title.rjust(width))
+
+        output.write(
+              self.__divider
+            + "| " + " | ".join(titles) + " |\n"
+            + "+=" + "=+=".join("=" * width for width in self.__widths)
+            + "=+\n"
+        )
+
+
+    def write_rows(self, rows, number_values = None, header = False):
+        """
+        Method that writes rows without a header.  Use this method to append
+        rows to a table that has already been started.
+
+        :param rows:
+            An iterable of row tuples.
+
+        :param number_values:
+            The number of leading columns supplied by each row.  A value of
+            None indicates rows supply a value for every column.
+
+        :param header:
+            If True, the header is written before the first row, if any.
+
+        :type rows:          iterable
+        :type number_values: int or None
+        :type header:        bool
+
+        """
+
+        if self.__widths is None:
+            self.__size_columns(( ), None)
+
+        row_format = self.__row_format(number_values)
+        batch_size = self.__batch_size
+        output = self.__stream()
+
+        batch = list()
+        for row in rows:
+            batch.append(row_format%row)
+            if len(batch) >= batch_size:
+                if header:
+                    self.write_header()
+                    header = False
+
+                output.write("".join(batch))
+                batch.clear()
+
+        if batch:
+            if header:
+                self.write_header()
+
+            output.write("".join(batch))
+
+
+    def __size_columns(self, sample, number_values):
+        """
+        Method used internally to determine the column widths.
+
+        :param sample:
+            The rows used to size columns.
+
+        :param number_values:
+            The number of leading columns supplied by each row.
+
+        :type sample:        list
+        :type number_values: int or None
+
+        """
+
+        widths = list()
+        for index, column in enumerate(self.__columns):
+            width = column.width
+            if width is None:
+                width = len(column.title)
+                if number_values is None or index < number_values:
+                    value_format = "%" + column.conversion
+                    for row in sample:
+                        width = max(width, len(value_format%row[index]))
+
+            widths.append(width)
+
+        self.__widths = widths
+        self.__row_formats = dict()
+        self.__divider = (
+            "+-" + "-+-".join("-" * width for width in widths) + "-+\n"
+        )
+
+
+    def __row_format(self, number_values):
+        """
+        Method used internally to obtain the format for a row followed by the
+        row divider.
+
+        :param number_values:
+            The number of leading columns supplied by each row.
+
+        :return:
+            Returns the format string.
+
+        :type number_values: int or None
+        :rtype:              str
+
+        """
+
+        result = self.__row_formats.get(number_values)
+        if result is None:
+            cells = list()
+            for index, column in enumerate(self.__columns):
+                width = self.__widths[index]
+                if number_values is None or index < number_values:
+                    cells.append(column.cell_format(width))
+                else:
+                    cells.append(" " * width)
+
+            result = (
+                  "| " + " | ".join(cells) + " |\n"
+                + self.__divider.replace("%", "%%")
+            )
+            self.__row_formats[number_values] = result
+
+        return result
+
+
+    def __stream(self):
+        """
+        Method used internally to obtain the output stream.
+
+        :rtype: file-like object
+
+        """
+
+        if self.__output is not None:
+            return self.__output
+        else:
+            return sys.stdout
+
+###############################################################################
+# Main:
+#
+
+if __name__ == "__main__":
+    import sys
+    sys.stderr.write(
+        "*** This module is not intended to be run as a script..\n"
+    )
+    exit(1)
@@ -35,9 +35,11 @@ Class providing a API you can use to process customer information.
 #
 
 import sys
-import base64
 
 import libraries.customers as customers
+import libraries.customer_catalog as customer_catalog
+import libraries.table as table
+import libraries.output as output
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
 
@@ -72,6 +74,9 @@ following subcommands:
   customer list
     Generates a list of every known customer.
 
+  customer query <term> [ <term> [ <term> ... ]]
+    Lists customers matching capabilities and polling intervals.
+
   customer gets <customer id>
     Gets the REST API secrets for a specific customer.
 
@@ -217,6 +222,32 @@ Help text for this extension.
 
 """
 
+CUSTOMER_QUERY_HELP = """
+The customer query command allows you to list the customers that match a
+combination of capabilities and polling intervals.  The syntax for the command
+is:
+
+  customer query <term> [ <term> [ <term> ... ]]
+
+Each <term> is either a capability name, as used by the customer update
+command, "paused", or a polling interval comparison such as
+"polling_interval<=120".  Customers must match every term.  Precede a term
+with "not" to require that the term not match.  Use "or" to separate
+alternative groups of terms.
+
+Use the --count switch to report only the number of matching customers.
+
+Examples:
+
+  customer query active multi_region latency_tracking not paused
+  customer query "polling_interval<60" or rollups not active
+
+"""
+"""
+Help text for this extension.
+
+"""
+
 CUSTOMER_GETS_HELP = """
 The customer gets command allows you to obtain the secrets for a customer REST
 API account.  The syntax for the command is:
@@ -289,7 +320,14 @@ def add_arguments(command_line_parser):
 
     """
 
-    pass
+    command_line_parser.add_argument(
+        "--count",
+        help = "You can use this switch with the customer query command to "
+               "report only the number of matching customers.",
+        action = "store_true",
+        default = False,
+        dest = 'count'
+    )
 
 
 def customer_get(positional_arguments, arguments, rest_api, secret):
@@ -341,18 +379,23 @@ def customer_get(positional_arguments, arguments, rest_api, secret):
                 i += 1
                 customer_ids.append(customer_id)
 
-        customers_data = list()
         c = customers.Customers(rest_api, secret)
-        for customer_id in customer_ids:
-            customer_data = c.get(customer_id)
-            if customer_data is not None:
-                customers_data.append(customer_data)
-            else:
-                sys.stdout.write(
-                    "%5d *** Invalid customer ID ***\n"%customer_id
-                )
+        customers_by_id = c.get_many(customer_ids)
+        if customers_by_id is not None:
+            customers_data = list()
+            for customer_id in customer_ids:
+                customer_data = customers_by_id[customer_id]
+                if customer_data:
+                    customers_data.append(customer_data)
+                else:
+                    sys.stdout.write(
+                        "%5d *** Invalid customer ID ***\n"%customer_id
+                    )
 
-        __dump(customers_data)
+            __dump(customers_data)
+        else:
+            sys.stderr.write("*** Failed to obtain customers.\n")
+            success = False
     else:
         sys.stderr.write("*** You must provide at least one region ID.\n")
         success = False
@@ -648,9 +691,15 @@ def customer_list(positional_arguments, arguments, rest_api, secret):
     success = True
     if len(positional_arguments) == 0:
         c = customers.Customers(rest_api, secret)
-        customers_dict = c.get_all()
-        if customers_dict is not None:
-            __dump(customers_dict.values())
+        customers_iterator = c.iter_all()
+        if customers_iterator is not None:
+            try:
+                __dump(customers_iterator)
+            except ValueError as e:
+                sys.stderr.write(
+                    "*** Failed to get customer data: %s\n"%str(e)
+                )
+                success = False
         else:
             sys.stderr.write(
                 "*** Failed to get customer data.\n"
@@ -665,6 +714,59 @@ def customer_list(positional_arguments, arguments, rest_api, secret):
     return success
 
 
+def customer_query(positional_arguments, arguments, rest_api, secret):
+    """
+    Function that handles the customer query command.
+
+    :param positional_arguments:
+        The command line positional arguments.
+
+    :param arguments:
+        The command line arguments parsed by argparse.
+
+    :param rest_api:
+        The outbound REST API to use to communicate with Inesonic
+        infrastructure.
+
+    :param secret:
+        The secret required to use the Inesonic REST API.
+
+    :return:
+        Returns True on success.  Returns False on error.
+
+    :type positional_arguments: list
+    :type arguments:            argparse.Namespace
+    :type rest_api:             outbound_rest_api_v1.Server
+    :type secret:               bytes
+    :rtype:                     bool
+
+    """
+
+    success = True
+    if len(positional_arguments) > 0:
+        catalog = customer_catalog.catalog(rest_api, secret)
+        if catalog is not None:
+            try:
+                matches = catalog.query(positional_arguments)
+            except ValueError as e:
+                sys.stderr.write("*** Invalid query: %s\n"%str(e))
+                success = False
+
+            if success:
+                if arguments.count:
+                    sys.stdout.write("%d\n"%catalog.count(matches))
+                else:
+                    __dump(catalog.customers(matches))
+        else:
+            sys.stderr.write("*** Failed to obtain customers.\n")
+            success = False
+    else:
+        sys.stderr.write("*** You must provide at least one query term.\n")
+        success = False
+
+    return success
+
+
 def customer_gets(positional_arguments, arguments, rest_api, secret):
     """
     Function that handles the customer gets command.
@@ -708,9 +810,7 @@ def customer_gets(positional_arguments, arguments, rest_api, secret):
                     "identifier: %s\n"%secrets[0]
                 )
                 sys.stdout.write(
-                    "secret:     %s (base64 encoded)\n"%(
-                        base64.b64encode(secrets[1])
-                    )
+                    "secret:     %s (base64 encoded)\n"%secrets[1].encoded
                 )
             else:
                 success = False
@@ -894,52 +994,110 @@ def __dump(customers_capabilities):
 
     """
 
-    h = "+---------+--------------+---------------+------------+--------+---" \
-        "-----------+-----------+----------+---------+----------+-----------" \
-        "--+---------+-------+--------+----------+--------+-----------------" \
-        "-+---------+--------+\n"
-    s = h + \
-        "| ID      | num monitors | poll interval | expiration | active | mu" \
-        "lti-region | wordpress | rest-api | content | keywords | post-metho" \
-        "d | latency | ssl   | ping  | blacklist | domain | maintenance-mode" \
-        " | rollups | paused |\n" \
-        "+=========+==============+===============+============+========+===" \
-        "===========+===========+==========+=========+==========+===========" \
-        "==+=========+=======+========+==========+========+=================" \
-        "=+=========+========+\n"
-
-    sys.stdout.write(s)
-
-    for cc in customers_capabilities:
-        sys.stdout.write(
-            "| %7d | %12d | %13d | %10d | "%(
-                cc.customer_id,
-                cc.maximum_number_monitors,
-                cc.polling_interval,
-                cc.expiration_days
-            )
+    customer_writer = output.writer(
+        (
+            table.Column("ID", "d", 7, name = "customer_id"),
+            table.Column(
+                "num monitors",
+                "d",
+                12,
+                name = "maximum_number_monitors"
+            ),
+            table.Column("poll interval", "d", 13, name = "polling_interval"),
+            table.Column("expiration", "d", 10, name = "expiration_days"),
+            table.Column("active", "s", 6, name = "customer_active"),
+            table.Column(
+                "multi-region",
+                "s",
+                12,
+                name = "multi_region_checking"
+            ),
+            table.Column("wordpress", "s", 9, name = "supports_wordpress"),
+            table.Column("rest-api", "s", 8, name = "supports_rest_api"),
+            table.Column(
+                "content",
+                "s",
+                7,
+                name = "supports_content_checking"
+            ),
+            table.Column(
+                "keywords",
+                "s",
+                8,
+                name = "supports_keyword_checking"
+            ),
+            table.Column(
+                "post-method",
+                "s",
+                11,
+                name = "supports_post_method"
+            ),
+            table.Column(
+                "latency",
+                "s",
+                7,
+                name = "supports_latency_tracking"
+            ),
+            table.Column(
+                "ssl",
+                "s",
+                5,
+                name = "supports_ssl_expiration_checking"
+            ),
+            table.Column(
+                "ping",
+                "s",
+                5,
+                name = "supports_ping_based_polling"
+            ),
+            table.Column(
+                "blacklist",
+                "s",
+                9,
+                name = "supports_blacklist_checking"
+            ),
+            table.Column(
+                "domain",
+                "s",
+                6,
+                name = "supports_domain_expiration_checking"
+            ),
+            table.Column(
+                "maintenance-mode",
+                "s",
+                16,
+                name = "supports_maintenance_mode"
+            ),
+            table.Column("rollups", "s", 7, name = "supports_rollups"),
+            table.Column("paused", "s", 6, name = "paused")
         )
-        sys.stdout.write(
-            "%-6s | %-12s | %-9s | %-8s | %-7s | %-8s | %-11s | %-7s | %-5s "
-            "| %-5s | %-9s | %-6s | %-16s | %-7s | %-6s |\n"%(
-                str(cc.customer_active),
-                str(cc.multi_region_checking),
-                str(cc.supports_wordpress),
-                str(cc.supports_rest_api),
-                str(cc.supports_content_checking),
-                str(cc.supports_keyword_checking),
-                str(cc.supports_post_method),
-                str(cc.supports_latency_tracking),
-                str(cc.supports_ssl_expiration_checking),
-                str(cc.supports_ping_based_polling),
-                str(cc.supports_blacklist_checking),
-                str(cc.supports_domain_expiration_checking),
-                str(cc.supports_maintenance_mode),
-                str(cc.supports_rollups),
-                str(cc.paused)
-            )
+    )
+
+    customer_writer.write(
+        (
+            cc.customer_id,
+            cc.maximum_number_monitors,
+            cc.polling_interval,
+            cc.expiration_days,
+            cc.customer_active,
+            cc.multi_region_checking,
+            cc.supports_wordpress,
+            cc.supports_rest_api,
+            cc.supports_content_checking,
+            cc.supports_keyword_checking,
+            cc.supports_post_method,
+            cc.supports_latency_tracking,
+            cc.supports_ssl_expiration_checking,
+            cc.supports_ping_based_polling,
+            cc.supports_blacklist_checking,
+            cc.supports_domain_expiration_checking,
+            cc.supports_maintenance_mode,
+            cc.supports_rollups,
+            cc.paused
         )
-        sys.stdout.write(h)
+        for cc in customers_capabilities
+    )
+    customer_writer.close()
 
 ###############################################################################
 # Extension configuration:
@@ -970,6 +1128,10 @@ COMMANDS = {
                 'help' : CUSTOMER_LIST_HELP,
                 'execute' : customer_list
             },
+            'query' : {
+                'help' : CUSTOMER_QUERY_HELP,
+                'execute' : customer_query
+            },
             'gets' : {
                 'help' : CUSTOMER_GETS_HELP,
                 'execute' : customer_gets
@@ -39,6 +39,11 @@ import time
 import datetime
 
 import libraries.events as events
+import libraries.event_store as event_store
+import libraries.customer_mapping as customer_mapping
+import libraries.servers as servers
+import libraries.table as table
+import libraries.output as output
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
 
@@ -65,6 +70,9 @@ supports the following subcommands:
 
   event get <field> <value> [ <field> <value> [ <field> <value> ... ]]
     Reports information about events given a specified criteria.
+
+  event analyze [ <field> <value> [ <field> <value> ... ]]
+    Reports outage statistics from a local copy of the events.
 """
 """
 Help text for this extension.
@@ -96,6 +104,29 @@ Help text for this extension.
 
 """
 
+EVENT_STATUS_HELP = """
+The event status command allows you to get the status of monitors.
+
+  event status [ ( monitor <monitor id> | customer <customer id> ) ]
+
+Displays the status of a single monitor, all monitors tied to a customer, or,
+if no field is provided, every monitor.
+
+Use the --watch switch to continue reporting status changes until
+interrupted.  The status of every monitor is reported first.  After that, only
+monitors whose status changed, were added, or were removed are reported.
+Polls are repeated every %d seconds while status changes, slowing to every %d
+seconds while none does.
+
+"""%(
+    events.DEFAULT_MINIMUM_POLL_INTERVAL,
+    events.DEFAULT_MAXIMUM_POLL_INTERVAL
+)
+"""
+Help text for this extension.
+
+"""
+
 EVENT_GET_HELP = """
 The event report command allows you to get information about events.
 
@@ -120,12 +151,76 @@ about.  The following field/value pairs are supported.
 |          |                   | timestamp should be included.                |
 +----------+-------------------+----------------------------------------------+
 
+Use the --follow switch to continue reporting new events as they occur until
+interrupted.  When following events, the end field can not be used and, if no
+start field is provided, only events reported from now on are included.  Polls
+are repeated every %d seconds while new events arrive, slowing to every %d
+seconds while none do.
+
+"""%(
+    events.DEFAULT_MINIMUM_POLL_INTERVAL,
+    events.DEFAULT_MAXIMUM_POLL_INTERVAL
+)
 """
+Help text for this extension.
+
+"""
+
+EVENT_ANALYZE_HELP = """
+The event analyze command reports outage statistics.
+
+  event analyze [ <field> <value> [ <field> <value> ... ]]
+
+Events are kept in a local store so that each analysis only requests events
+reported since the last one.  An outage starts when a monitor reports no
+response and ends when the monitor next reports it is working.  Outages shorter
+than the flap duration are also counted as flaps.  The following field/value
+pairs are supported.
+
++----------+-------------------+----------------------------------------------+
+| Field    | Value             | Function                                     |
++==========+===================+==============================================+
+| customer | <customer id>     | Constrains outages to those belonging to a   |
+|          |                   | specific customer.                           |
++----------+-------------------+----------------------------------------------+
+| monitor  | <monitor id>      | Constrains outages to those belonging to a   |
+|          |                   | specific monitor.                            |
++----------+-------------------+----------------------------------------------+
+| start    | <start timestamp> | Indicates only events at or after this       |
+|          |                   | timestamp should be analyzed.                |
++----------+-------------------+----------------------------------------------+
+| end      | <end timestamp>   | Indicates only events at or before this      |
+|          |                   | timestamp should be analyzed.                |
++----------+-------------------+----------------------------------------------+
+| flap     | <seconds>         | The flap duration.  Default is %3d seconds.  |
++----------+-------------------+----------------------------------------------+
+| by       | monitor           | Summarizes outages by monitor.  This is the  |
+|          |                   | default.                                     |
+|          +-------------------+----------------------------------------------+
+|          | customer          | Summarizes outages by customer.              |
+|          +-------------------+----------------------------------------------+
+|          | region            | Summarizes outages by the region of each     |
+|          |                   | customer's primary server.                   |
+|          +-------------------+----------------------------------------------+
+|          | outage            | Lists each outage.                           |
++----------+-------------------+----------------------------------------------+
+
+Use the --rebuild switch to discard the local store and request every event
+again.  This picks up events reported with timestamps older than the newest
+stored event.
+
+"""%event_store.DEFAULT_FLAP_DURATION
 """
 Help text for this extension.
 
 """
 
+ANALYZE_GROUPS = ( 'monitor', 'customer', 'region', 'outage' )
+"""
+Values accepted by the by field of the event analyze command.
+
+"""
+
 ###############################################################################
 # Functions:
 #
@@ -142,7 +237,32 @@ def add_arguments(command_line_parser):
 
     """
 
-    pass
+    command_line_parser.add_argument(
+        "--follow",
+        help = "You can use this switch with the event get command to keep "
+               "reporting new events as they occur.",
+        action = "store_true",
+        default = False,
+        dest = 'follow'
+    )
+
+    command_line_parser.add_argument(
+        "--watch",
+        help = "You can use this switch with the event status command to keep "
+               "reporting status changes as they occur.",
+        action = "store_true",
+        default = False,
+        dest = 'watch'
+    )
+
+    command_line_parser.add_argument(
+        "--rebuild",
+        help = "You can use this switch with the event analyze command to "
+               "discard the local event store and request every event again.",
+        action = "store_true",
+        default = False,
+        dest = 'rebuild'
+    )
 
 
 def event_report(positional_arguments, arguments, rest_api, secret):
@@ -183,15 +303,13 @@ def event_report(positional_arguments, arguments, rest_api, secret):
 
         if monitor_id is not None and monitor_id > 0:
             try:
-                event_type = events.EVENT_TYPE.by_name(
-                    positional_arguments[1].upper().replace('-','_')
-                )
+                event_type = events.EVENT_TYPE.by_name(positional_arguments[1])
             except:
                 event_type = None
 
             try:
                 monitor_status = events.MONITOR_STATUS.by_name(
-                    positional_arguments[2].upper().replace('-', '_')
+                    positional_arguments[2]
                 )
             except:
                 monitor_status = None
@@ -276,11 +394,9 @@ def event_status(positional_arguments, arguments, rest_api, secret):
 
     success = True
     number_parameters = len(positional_arguments)
-    monitor_status = None
-    if number_parameters == 0:
-        e = events.Events(rest_api, secret)
-        monitor_status = e.status()
-    elif number_parameters == 2:
+    customer_id = None
+    monitor_id = None
+    if number_parameters == 2:
         field = positional_arguments[0]
         try:
             value = int(positional_arguments[1])
@@ -289,29 +405,44 @@ def event_status(positional_arguments, arguments, rest_api, secret):
 
         if value is not None:
             if field == 'customer':
-                e = events.Events(rest_api, secret)
-                monitor_status = e.status(customer_id = value)
+                customer_id = value
             elif field == 'monitor':
-                e = events.Events(rest_api, secret)
-                monitor_status = e.status(monitor_id = value)
+                monitor_id = value
             else:
                 sys.stderr.write("*** Must specify customer or monitor.\n")
                 success = False
         else:
             sys.stderr.write("*** Invalid value.\n")
             success = False
-    else:
+    elif number_parameters != 0:
         sys.stderr.write("*** You must provide at least one event name.\n")
         success = False
 
     if success:
-      sys.stdout.write("+------------+---------+\n");
-      sys.stdout.write("| monitor id | status  |\n");
-      sys.stdout.write("+============+=========+\n");
+        e = events.Events(rest_api, secret)
+        if arguments.watch:
+            success = __watch(e, customer_id, monitor_id)
+        else:
+            monitor_status = e.status(
+                customer_id = customer_id,
+                monitor_id = monitor_id
+            )
 
-      for id, status in monitor_status.items():
-          sys.stdout.write("| %10d | %-7s |\n"%(id, str(status).lower()))
-          sys.stdout.write("+------------+---------+\n");
+            if monitor_status is not None:
+                status_writer = output.writer(
+                    (
+                        table.Column("monitor id", "d", 10),
+                        table.Column("status", "s", 7)
+                    )
+                )
+                status_writer.write(
+                    ( id, str(status).lower() )
+                    for id, status in monitor_status.items()
+                )
+                status_writer.close()
+            else:
+                sys.stderr.write("*** Failed to retrieve monitor status.\n")
+                success = False
 
     return success
 
@@ -374,20 +505,165 @@ def event_get(positional_arguments, arguments, rest_api, secret):
                 sys.stderr.write("*** Invalid field value.\n")
                 success = False
 
-        if success:
+        if success and arguments.follow:
+            if end_timestamp is None:
+                if start_timestamp is None:
+                    start_timestamp = int(time.time())
+
+                success = __follow(
+                    events.Events(rest_api, secret),
+                    customer_id,
+                    monitor_id,
+                    start_timestamp
+                )
+            else:
+                sys.stderr.write(
+                    "*** The end field can not be used with --follow.\n"
+                )
+                success = False
+        elif success:
             e = events.Events(rest_api, secret)
-            event_list = e.get(
+            event_iterator = e.iter_get(
                 customer_id = customer_id,
                 monitor_id = monitor_id,
                 start_timestamp = start_timestamp,
                 end_timestamp = end_timestamp
             )
 
-            if events is not None:
-                __dump(event_list)
+            if event_iterator is not None:
+                try:
+                    __dump(event_iterator)
+                except ValueError as e:
+                    sys.stderr.write(
+                        "*** Failed to retrieve events: %s\n"%str(e)
+                    )
+                    success = False
+            else:
+                sys.stderr.write("*** Failed to retrieve events.\n")
+                success = False
+    else:
+        sys.stderr.write("*** Invalid number of arguments.\n")
+        success = False
+
+    return success
+
+
+def event_analyze(positional_arguments, arguments, rest_api, secret):
+    """
+    Function that handles the event analyze command.
+
+    :param positional_arguments:
+        The command line positional arguments.
+
+    :param arguments:
+        The command line arguments parsed by argparse.
+
+    :param rest_api:
+        The outbound REST API to use to communicate with Inesonic
+        infrastructure.
+
+    :param secret:
+        The secret required to use the Inesonic REST API.
+
+    :return:
+        Returns True on success.  Returns False on error.
+
+    :type positional_arguments: list
+    :type arguments:            argparse.Namespace
+    :type rest_api:             outbound_rest_api_v1.Server
+    :type secret:               bytes
+    :rtype:                     bool
+
+    """
+
+    success = True
+    number_arguments = len(positional_arguments)
+    if (number_arguments % 2) == 0:
+        index = 0
+        customer_id = None
+        monitor_id = None
+        start_timestamp = None
+        end_timestamp = None
+        flap_duration = event_store.DEFAULT_FLAP_DURATION
+        group = 'monitor'
+
+        while success and index < number_arguments:
+            field_name = positional_arguments[index + 0].lower()
+            field_value = positional_arguments[index + 1]
+            if field_name == 'by':
+                group = field_value.lower()
+                if group not in ANALYZE_GROUPS:
+                    sys.stderr.write("*** Invalid grouping: %s\n"%group)
+                    success = False
+            else:
+                try:
+                    value = int(field_value)
+                except:
+                    value = None
+
+                if value is None:
+                    sys.stderr.write("*** Invalid field value.\n")
+                    success = False
+                elif field_name == 'customer':
+                    customer_id = value
+                elif field_name == 'monitor':
+                    monitor_id = value
+                elif field_name == 'start':
+                    start_timestamp = value
+                elif field_name == 'end':
+                    end_timestamp = value
+                elif field_name == 'flap':
+                    flap_duration = value
+                else:
+                    sys.stderr.write("*** Invalid field: %s\n"%field_name)
+                    success = False
+
+            index += 2
+
+        if success:
+            store = event_store.store()
+            e = events.Events(rest_api, secret)
+            if arguments.rebuild:
+                number_added = store.rebuild(e)
             else:
+                number_added = store.update(e)
+
+            if number_added is None:
                 sys.stderr.write("*** Failed to retrieve events.\n")
                 success = False
+
+        if success:
+            outages = store.outages(
+                store.select(
+                    customer_id = customer_id,
+                    monitor_id = monitor_id,
+                    start_timestamp = start_timestamp,
+                    end_timestamp = end_timestamp
+                )
+            )
+
+            if group == 'outage':
+                __dump_outages(outages)
+            else:
+                if group == 'monitor':
+                    key = lambda x: x.monitor_id
+                elif group == 'customer':
+                    key = lambda x: x.customer_id
+                else:
+                    customer_regions = __customer_regions(rest_api, secret)
+                    if customer_regions is not None:
+                        key = lambda x: customer_regions.get(x.customer_id)
+                    else:
+                        sys.stderr.write(
+                            "*** Failed to retrieve customer regions.\n"
+                        )
+                        success = False
+
+                if success:
+                    __dump_summaries(
+                        group,
+                        event_store.summarize(outages, key, flap_duration)
+                    )
     else:
         sys.stderr.write("*** Invalid number of arguments.\n")
         success = False
@@ -395,6 +671,124 @@ def event_get(positional_arguments, arguments, rest_api, secret):
     return success
 
 
+def __watch(e, customer_id, monitor_id):
+    """
+    Method used internally to report monitor status changes until
+    interrupted.
+
+    :param e:
+        The Events instance used to request monitor status.
+
+    :param customer_id:
+        The customer ID to watch.
+
+    :param monitor_id:
+        The monitor ID to watch.
+
+    :return:
+        Returns True on success.
+
+    :type e:           events.Events
+    :type customer_id: int or None
+    :type monitor_id:  int or None
+    :rtype:            bool
+
+    """
+
+    transition_writer = output.writer(
+        (
+            table.Column("timestamp", "d", 11, table.ALIGNMENT.LEFT),
+            table.Column(
+                "date/time",
+                "s",
+                19,
+                table.ALIGNMENT.RIGHT,
+                name = "date_time"
+            ),
+            table.Column("monitor_id", "d", 10),
+            table.Column("was", "s", 7, table.ALIGNMENT.LEFT),
+            table.Column("status", "s", 7, table.ALIGNMENT.LEFT)
+        )
+    )
+
+    try:
+        for transitions in e.watch(
+                customer_id = customer_id,
+                monitor_id = monitor_id
+            ):
+            if transitions is not None:
+                now = int(time.time())
+                date_time = str(datetime.datetime.fromtimestamp(now))
+                transition_writer.write(
+                    (
+                        now,
+                        date_time,
+                        monitor_id,
+                        str(was).lower() if was is not None else "-",
+                        str(status).lower() if status is not None else "-"
+                    )
+                    for monitor_id, was, status in transitions
+                )
+                sys.stdout.flush()
+            else:
+                sys.stderr.write("*** Failed to retrieve monitor status.\n")
+    except KeyboardInterrupt:
+        pass
+
+    transition_writer.close()
+    sys.stdout.flush()
+
+    return True
+
+
+def __follow(e, customer_id, monitor_id, start_timestamp):
+    """
+    Method used internally to report new events until interrupted.
+
+    :param e:
+        The Events instance used to request events.
+
+    :param customer_id:
+        The customer ID to follow events for.
+
+    :param monitor_id:
+        The monitor ID to follow events for.
+
+    :param start_timestamp:
+        The Unix timestamp of the oldest event to report.
+
+    :return:
+        Returns True on success.
+
+    :type e:               events.Events
+    :type customer_id:     int or None
+    :type monitor_id:      int or None
+    :type start_timestamp: int
+    :rtype:                bool
+
+    """
+
+    event_writer = __event_writer()
+    try:
+        for new_events in e.follow(
+                customer_id = customer_id,
+                monitor_id = monitor_id,
+                start_timestamp = start_timestamp
+            ):
+            if new_events is not None:
+                event_writer.write(__event_rows(new_events))
+                sys.stdout.flush()
+            else:
+                sys.stderr.write("*** Failed to retrieve events.\n")
+    except KeyboardInterrupt:
+        pass
+
+    event_writer.close()
+    sys.stdout.flush()
+
+    return True
+
+
 def __dump(events):
     """
     Method used internally to dump events.
@@ -406,34 +800,215 @@ def __dump(events):
 
     """
 
-    sys.stdout.write(
-        "+-------------+---------------------+----------+------------+"
-        "-------------+-----------------+\n"
+    event_writer = __event_writer()
+    event_writer.write(__event_rows(events))
+    event_writer.close()
+
+
+def __customer_regions(rest_api, secret):
+    """
+    Method used internally to determine the region of each customer's primary
+    server.
+
+    :param rest_api:
+        The outbound REST API to use to communicate with Inesonic
+        infrastructure.
+
+    :param secret:
+        The secret required to use the Inesonic REST API.
+
+    :return:
+        Returns a dictionary of region IDs by customer ID.  None is returned
+        on error.
+
+    :type rest_api: outbound_rest_api_v1.Server
+    :type secret:   bytes
+    :rtype:         dict or None
+
+    """
+
+    server_list = servers.Servers(rest_api, secret).list()
+    mappings = customer_mapping.CustomerMapping(rest_api, secret).iter_list()
+    if server_list is not None and mappings is not None:
+        server_regions = {
+            server.server_id : server.region_id for server in server_list
+        }
+
+        try:
+            result = {
+                customer_id : server_regions.get(mapping.primary_server_id)
+                for customer_id, mapping in mappings
+            }
+        except ValueError:
+            result = None
+    else:
+        result = None
+
+    return result
+
+
+def __dump_summaries(group, summaries):
+    """
+    Method used internally to dump outage summaries.
+
+    :param group:
+        The grouping used, one of "monitor", "customer", or "region".
+
+    :param summaries:
+        Dictionary of outage summaries by group.
+
+    :type group:     str
+    :type summaries: dict
+
+    """
+
+    summary_writer = output.writer(
+        (
+            table.Column("%s_id"%group, "d", 11),
+            table.Column("monitors", "d", 8, name = "number_monitors"),
+            table.Column("outages", "d", 7, name = "number_outages"),
+            table.Column("ongoing", "d", 7, name = "number_ongoing"),
+            table.Column("flaps", "d", 5, name = "number_flaps"),
+            table.Column("downtime", "d", 10),
+            table.Column(
+                "MTTR",
+                "s",
+                10,
+                table.ALIGNMENT.RIGHT,
+                name = "mean_time_to_repair"
+            ),
+            table.Column("longest", "d", 10)
+        )
     )
-    sys.stdout.write(
-        "| timestamp   | date/time           | event_id | monitor_id | "
-        "customer_id | event_type      |\n"
+
+    summary_writer.write(
+        (
+            group_id,
+            summary.number_monitors,
+            summary.number_outages,
+            summary.number_ongoing,
+            summary.number_flaps,
+            summary.downtime,
+            (
+                "%.1f"%summary.mean_time_to_repair
+                if summary.mean_time_to_repair is not None
+                else "-"
+            ),
+            summary.longest
+        )
+        for group_id, summary in sorted(summaries.items())
+    )
+
+    summary_writer.close()
+
+
+def __dump_outages(outages):
+    """
+    Method used internally to dump individual outages.  Ongoing outages are
+    reported with an end of "ongoing" in tables and null otherwise.
+
+    :param outages:
+        The outages to be dumped.
+
+    :type outages: list
+
+    """
+
+    now = int(time.time())
+    if output.output_format() == 'table':
+        end_column = table.Column("end", "s", 11, table.ALIGNMENT.RIGHT)
+        end_value = lambda x: str(x) if x is not None else "ongoing"
+    else:
+        end_column = table.Column("end", "d", 11, table.ALIGNMENT.RIGHT)
+        end_value = lambda x: x
+
+    outage_writer = output.writer(
+        (
+            table.Column("start", "d", 11, table.ALIGNMENT.LEFT),
+            table.Column(
+                "date/time",
+                "s",
+                19,
+                table.ALIGNMENT.RIGHT,
+                name = "date_time"
+            ),
+            end_column,
+            table.Column("duration", "d", 10),
+            table.Column("monitor_id", "d", 10),
+            table.Column("customer_id", "d", 11)
+        )
     )
-    sys.stdout.write(
-        "+=============+=====================+==========+============+"
-        "=============+=================+\n"
+
+    outage_writer.write(
+        (
+            outage.start_timestamp,
+            str(datetime.datetime.fromtimestamp(outage.start_timestamp)),
+            end_value(outage.end_timestamp),
+            outage.duration(now),
+            outage.monitor_id,
+            outage.customer_id
+        )
+        for outage in outages
     )
 
-    for event in events:
-        sys.stdout.write(
-            "| %-11d | %19s | %8d | %10d | %11d | %-15s |\n"%(
-                event.timestamp,
-                str(datetime.datetime.fromtimestamp(event.timestamp)),
-                event.event_id,
-                event.monitor_id,
-                event.customer_id,
-                str(event.event_type).lower()
-            )
+    outage_writer.close()
+
+
+def __event_writer():
+    """
+    Method used internally to create the writer used to dump events.
+
+    :return:
+        Returns the writer.
+
+    :rtype: output.TableWriter or output.RecordWriter
+
+    """
+
+    return output.writer(
+        (
+            table.Column("timestamp", "d", 11, table.ALIGNMENT.LEFT),
+            table.Column(
+                "date/time",
+                "s",
+                19,
+                table.ALIGNMENT.RIGHT,
+                name = "date_time"
+            ),
+            table.Column("event_id", "d", 8),
+            table.Column("monitor_id", "d", 10),
+            table.Column("customer_id", "d", 11),
+            table.Column("event_type", "s", 15)
         )
-        sys.stdout.write(
-            "+-------------+---------------------+----------+------------+"
-            "-------------+-----------------+\n"
+    )
+
+
+def __event_rows(events):
+    """
+    Method used internally to convert events to rows.
+
+    :param events:
+        The events to be converted.
+
+    :return:
+        Returns an iterator over row tuples.
+
+    :type events: iterable
+    :rtype:       iterator
+
+    """
+
+    return (
+        (
+            event.timestamp,
+            str(datetime.datetime.fromtimestamp(event.timestamp)),
+            event.event_id,
+            event.monitor_id,
+            event.customer_id,
+            str(event.event_type).lower()
         )
+        for event in events
+    )
 
 ###############################################################################
 # Extension configuration:
@@ -449,12 +1024,16 @@ COMMANDS = {
                 'execute' : event_report,
             },
             'status' : {
-                'help' : EVENT_HELP,
+                'help' : EVENT_STATUS_HELP,
                 'execute' : event_status,
             },
             'get' : {
                 'help' : EVENT_GET_HELP,
                 'execute' : event_get,
+            },
+            'analyze' : {
+                'help' : EVENT_ANALYZE_HELP,
+                'execute' : event_analyze,
             }
         }
     }
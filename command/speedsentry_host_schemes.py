@@ -37,6 +37,8 @@ Class providing a API you can use to process host/scheme information.
 import sys
 
 import libraries.host_schemes as host_schemes
+import libraries.table as table
+import libraries.output as output
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
 
@@ -572,9 +574,15 @@ def host_scheme_list(positional_arguments, arguments, rest_api, secret):
     number_arguments = len(positional_arguments)
     if number_arguments == 0:
         hs = host_schemes.HostSchemes(rest_api, secret)
-        host_scheme_data = hs.list()
-        if host_scheme_data is not None:
-            __dump(host_scheme_data.values())
+        host_scheme_iterator = hs.iter_list()
+        if host_scheme_iterator is not None:
+            try:
+                __dump(host_scheme_iterator)
+            except ValueError as e:
+                sys.stderr.write(
+                    "*** Failed to retrieve host/schemes: %s\n"%str(e)
+                )
+                success = False
         else:
             sys.stderr.write("*** Failed to retrieve host/schemes.\n")
             success = False
@@ -588,9 +596,15 @@ def host_scheme_list(positional_arguments, arguments, rest_api, secret):
            customer_id > 0           and \
            customer_id <= 0xFFFFFFFF     :
             hs = host_schemes.HostSchemes(rest_api, secret)
-            host_scheme_data = hs.list(customer_id)
-            if host_scheme_data is not None:
-                __dump(host_scheme_data.values())
+            host_scheme_iterator = hs.iter_list(customer_id)
+            if host_scheme_iterator is not None:
+                try:
+                    __dump(host_scheme_iterator)
+                except ValueError as e:
+                    sys.stderr.write(
+                        "*** Failed to retrieve host/schemes: %s\n"%str(e)
+                    )
+                    success = False
             else:
                 sys.stderr.write("*** Failed to retrieve host/schemes.\n")
                 success = False
@@ -609,80 +623,65 @@ def __dump(host_scheme_data):
     Function that dumps information about host/schemes.
 
     :param host_scheme_data:
-        A list of all the host/scheme instances to be dumped.
+        A list or iterator of the host/scheme instances to be dumped.  Lists
+        may include the integer IDs of unknown host/schemes.
 
-    :type host_scheme_data: list of HostScheme instances
+    :type host_scheme_data: list or iterator of HostScheme instances
 
     """
 
-    maximum_url_length = len("scheme://host")
-    valid_data = list()
-    invalid_data = list()
-
-    for host_scheme in host_scheme_data:
-        if not isinstance(host_scheme, int):
-            valid_data.append(host_scheme)
-            url = "%s://%s"%(
-                str(host_scheme.scheme),
-                host_scheme.host
-            )
-            maximum_url_length = max(maximum_url_length, len(url))
+    if isinstance(host_scheme_data, list):
+        if output.output_format() == 'table':
+            message_stream = sys.stdout
         else:
-            invalid_data.append(host_scheme)
+            message_stream = sys.stderr
 
-    for host_scheme_id in invalid_data:
-        sys.stdout.write(
-            "*** Unknown host scheme %d\n"%host_scheme_id
-        )
-
-    if valid_data:
-        fmt_string = "| %%14d | %%11d | %%-%ds | %%24d |\n"%(
-            maximum_url_length
-        )
+        for host_scheme in host_scheme_data:
+            if isinstance(host_scheme, int):
+                message_stream.write(
+                    "*** Unknown host scheme %d\n"%host_scheme
+                )
 
-        fmt_head_string = "| %%14s | %%11s | %%-%ds | %%24s |\n"%(
-            maximum_url_length
-        )
+        host_scheme_data = [
+            host_scheme for host_scheme in host_scheme_data
+            if not isinstance(host_scheme, int)
+        ]
 
-        divider_string = (
-              "+-"
-            + "-" * 14 + "-+-"
-            + "-" * 11 + "-+-"
-            + "-" * maximum_url_length + "-+-"
-            + "-" * 24 + "-+\n"
-        )
-
-        sys.stdout.write(divider_string)
-        sys.stdout.write(
-            fmt_head_string%(
+    host_scheme_writer = output.writer(
+        (
+            table.Column(
                 "host scheme id",
+                "d",
+                14,
+                title_alignment = table.ALIGNMENT.RIGHT
+            ),
+            table.Column(
                 "customer id",
-                "scheme://host",
-                "ssl expiration timestamp"
+                "d",
+                11,
+                title_alignment = table.ALIGNMENT.RIGHT
+            ),
+            table.Column("scheme://host", "s", name = "url"),
+            table.Column(
+                "ssl expiration timestamp",
+                "d",
+                24,
+                title_alignment = table.ALIGNMENT.RIGHT
             )
-        )
+        ),
+        show_empty = False
+    )
 
-        sys.stdout.write(
-              "+="
-            + "=" * 14 + "=+="
-            + "=" * 11 + "=+="
-            + "=" * maximum_url_length + "=+="
-            + "=" * 24 + "=+\n"
+    host_scheme_writer.write(
+        (
+            host_scheme.host_scheme_id,
+            host_scheme.customer_id,
+            "%s://%s"%(str(host_scheme.scheme).lower(), host_scheme.host),
+            host_scheme.ssl_expiration_timestamp
         )
-
-        for host_scheme in valid_data:
-            sys.stdout.write(
-                fmt_string%(
-                    host_scheme.host_scheme_id,
-                    host_scheme.customer_id,
-                    "%s://%s"%(
-                        str(host_scheme.scheme).lower(),
-                        host_scheme.host
-                    ),
-                    host_scheme.ssl_expiration_timestamp
-                )
-            )
-            sys.stdout.write(divider_string)
+        for host_scheme in host_scheme_data
+    )
+    host_scheme_writer.close()
 
 ###############################################################################
 # Extension configuration:
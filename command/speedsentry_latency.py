@@ -36,9 +36,13 @@ Class providing a API you can use to process latencies information.
 
 import sys
 import json
+import operator
+import itertools
 
 import libraries.latencies as latencies
 import libraries.servers as servers
+import libraries.table as table
+import libraries.output as output
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
 
@@ -282,6 +286,39 @@ Help text for this extension.
 
 """
 
+RAW_LATENCY_FIELDS = operator.attrgetter(
+    'customer_id',
+    'monitor_id',
+    'server_id',
+    'region_id',
+    'timestamp',
+    'latency'
+)
+"""
+Function that returns the output row for a raw latency entry.
+
+"""
+
+AGGREGATED_LATENCY_FIELDS = operator.attrgetter(
+    'customer_id',
+    'monitor_id',
+    'server_id',
+    'region_id',
+    'timestamp',
+    'latency',
+    'mean_latency',
+    'variance_latency',
+    'minimum_latency',
+    'maximum_latency',
+    'start_timestamp',
+    'end_timestamp',
+    'number_samples'
+)
+"""
+Function that returns the output row for an aggregated latency entry.
+
+"""
+
 ###############################################################################
 # Functions:
 #
@@ -334,9 +371,7 @@ def latency_record(positional_arguments, arguments, rest_api, secret):
         try:
             ipv4_address = str(positional_arguments[0])
             ipv6_address = str(positional_arguments[1])
-            server_status = servers.STATUS.by_name(
-                positional_arguments[2].upper().replace('-','_')
-            )
+            server_status = servers.STATUS.by_name(positional_arguments[2])
             cpu_loading = float(positional_arguments[3])
             memory_loading = float(positional_arguments[4])
             number_monitors = int(positional_arguments[5])
@@ -484,7 +519,7 @@ def latency_get(positional_arguments, arguments, rest_api, secret):
 
         if success:
             l = latencies.Latencies(rest_api, secret)
-            result = l.get(
+            latency_iterator = l.iter_get(
                 customer_id = customer_id,
                 monitor_id = monitor_id,
                 server_id = server_id,
@@ -493,8 +528,14 @@ def latency_get(positional_arguments, arguments, rest_api, secret):
                 end_timestamp = end_timestamp
             )
 
-            if result is not None:
-                __dump(result[0], result[1])
+            if latency_iterator is not None:
+                try:
+                    __dump(latency_iterator)
+                except ValueError as e:
+                    sys.stderr.write(
+                        "*** Failed to retrieve latency data: %s\n"%str(e)
+                    )
+                    success = False
             else:
                 sys.stderr.write("*** Failed to retrieve latency data.\n")
                 success = False
@@ -828,77 +869,49 @@ def latency_statistics(positional_arguments, arguments, rest_api, secret):
     return success
 
 
-def __dump(raw_data, aggregated_data):
+def __dump(entries):
     """
-    Method that dumps latency data.
+    Method that dumps latency data as it is received.  Runs of raw entries
+    only supply the leading columns.
 
-    :param raw_data:
-        The raw, most recent latency data.
+    :param entries:
+        An iterable of raw Latency and AggregatedLatency entries.
 
-    :param aggregated_data:
-        The older aggregated data.
-
-    :type raw_data:        list
-    :type aggregated_data: list
+    :type entries: iterable
 
     """
 
-    divider_string = "+-------------+------------+-----------+-----------" \
-                     "+------------+---------+---------+----------+---------" \
-                     "+---------+------------+------------+----------------+\n"
-
-    sys.stdout.write(divider_string)
-    sys.stdout.write(
-        "| customer_id | monitor_id | server_id | region_id | timestamp  | "
-        "latency | average | variance | minimum | maximum | start_time | "
-        "end_time   | number samples |\n"
-    )
-    sys.stdout.write(
-        "+=============+============+===========+===========+============+"
-        "=========+=========+==========+=========+=========+============+"
-        "============+================+\n"
+    latency_writer = output.writer(
+        (
+            table.Column("customer_id", "d", 11),
+            table.Column("monitor_id", "d", 10),
+            table.Column("server_id", "d", 9),
+            table.Column("region_id", "d", 9),
+            table.Column("timestamp", "d", 10),
+            table.Column("latency", ".3f", 7),
+            table.Column("average", ".3f", 7, name = "mean_latency"),
+            table.Column("variance", ".3f", 8, name = "variance_latency"),
+            table.Column("minimum", ".3f", 7, name = "minimum_latency"),
+            table.Column("maximum", ".3f", 7, name = "maximum_latency"),
+            table.Column("start_time", "d", 10, name = "start_timestamp"),
+            table.Column("end_time", "d", 10, name = "end_timestamp"),
+            table.Column("number samples", "d", 14, name = "number_samples")
+        )
     )
 
-    aggregated_format = "| %%11d | %%10d | %%9d | %%9d | %%10d | %%7.3f | " \
-                        "%%7.3f | %%8.3f | %%7.3f | %%7.3f | %%10d | " \
-                        "%%10d | %%14d |\n"
-
-    for entry in raw_data:
-        sys.stdout.write(
-            "| %11d | %10d | %9d | %9d | %10d | %7.3f "
-            "|         |          |         |         |            |"
-            "            |                |\n"%(
-                entry.customer_id,
-                entry.monitor_id,
-                entry.server_id,
-                entry.region_id,
-                entry.timestamp,
-                entry.latency
-            )
-        )
-        sys.stdout.write(divider_string)
-
-    for entry in aggregated_data:
-        sys.stdout.write(
-            "| %11d | %10d | %9d | %9d | %10d | %7.3f | "
-            "%7.3f | %8.3f | %7.3f | %7.3f | %10d | "
-            "%10d | %14d |\n"%(
-                entry.customer_id,
-                entry.monitor_id,
-                entry.server_id,
-                entry.region_id,
-                entry.timestamp,
-                entry.latency,
-                entry.mean_latency,
-                entry.variance_latency,
-                entry.minimum_latency,
-                entry.maximum_latency,
-                entry.start_timestamp,
-                entry.end_timestamp,
-                entry.number_samples
+    for is_aggregated, group in itertools.groupby(
+            entries,
+            lambda entry: isinstance(entry, latencies.AggregatedLatency)
+        ):
+        if is_aggregated:
+            latency_writer.write(map(AGGREGATED_LATENCY_FIELDS, group))
+        else:
+            latency_writer.write(
+                map(RAW_LATENCY_FIELDS, group),
+                number_values = 6
             )
-        )
-        sys.stdout.write(divider_string)
+
+    latency_writer.close()
 
 ###############################################################################
 # Extension configuration:
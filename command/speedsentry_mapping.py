@@ -37,6 +37,8 @@ Class providing a API you can use to process server information.
 import sys
 
 import libraries.customer_mapping as customer_mapping
+import libraries.table as table
+import libraries.output as output
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
 
@@ -191,7 +193,7 @@ def mapping_get(positional_arguments, arguments, rest_api, secret):
 
             result = c.get(customer_id)
             if result is not None:
-                __dump(result)
+                __dump_records(( ( customer_id, result ), ))
             else:
                 success = False
                 sys.stderr.write("*** Failed response.\n")
@@ -439,13 +441,22 @@ def mapping_list(positional_arguments, arguments, rest_api, secret):
                 secret = secret
             )
 
-            result = c.list(server_id)
-            if result is not None:
-                for customer_id, data in result.items():
-                    sys.stdout.write("%7d: "%customer_id)
-                    __dump(data)
+            mapping_iterator = c.iter_list(server_id)
+            if mapping_iterator is not None:
+                try:
+                    if output.output_format() == 'table':
+                        for customer_id, data in mapping_iterator:
+                            sys.stdout.write(
+                                "%7d: %s\n"%(customer_id, __server_list(data))
+                            )
+                    else:
+                        __dump_records(mapping_iterator)
+                except ValueError as e:
+                    sys.stderr.write("*** Failed response: %s\n"%str(e))
+                    success = False
             else:
                 sys.stderr.write("*** Failed response.\n")
+                success = False
     else:
         sys.stderr.write("*** Invalid number of parameters.\n")
         success = False
@@ -453,30 +464,63 @@ def mapping_list(positional_arguments, arguments, rest_api, secret):
     return success
 
 
-def __dump(mapping):
+def __server_list(mapping):
     """
-    Function that dumps mapping information.
+    Function that formats the servers of a mapping for display.  The primary
+    server is shown in parenthesis.
 
     :param mapping:
-        The mapping to be dumped.
+        The mapping to be formatted.
+
+    :return:
+        Returns the formatted server list.
 
     :type mapping: Mapping instance.
+    :rtype:        str
 
     """
 
-    s = str()
-    for server_id in mapping:
-        if server_id == mapping.primary_server_id:
-            e = "(%d)"%server_id
-        else:
-            e = "%d"%server_id
+    return " ".join(
+        "(%d)"%server_id if server_id == mapping.primary_server_id
+        else "%d"%server_id
+        for server_id in mapping
+    )
 
-        if s:
-            s += " " + e;
-        else:
-            s = e
 
-    sys.stdout.write(s + "\n")
+def __dump_records(mappings):
+    """
+    Function that dumps mapping information in the selected output format.
+    Tables show the server list with the primary server in parenthesis.
+
+    :param mappings:
+        An iterable of customer ID, mapping tuples.
+
+    :type mappings: iterable
+
+    """
+
+    mapping_writer = output.writer(
+        (
+            table.Column("customer id", "d", name = "customer_id"),
+            table.Column(
+                "primary server id",
+                "d",
+                name = "primary_server_id"
+            ),
+            table.Column("server ids", "s", name = "server_ids")
+        )
+    )
+
+    if output.output_format() == 'table':
+        server_ids = __server_list
+    else:
+        server_ids = list
+
+    mapping_writer.write(
+        ( customer_id, mapping.primary_server_id, server_ids(mapping) )
+        for customer_id, mapping in mappings
+    )
+    mapping_writer.close()
 
 ###############################################################################
 # Extension configuration:
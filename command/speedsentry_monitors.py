@@ -39,6 +39,10 @@ import yaml
 
 import libraries.host_schemes as host_schemes
 import libraries.monitors as monitors
+import libraries.monitor_plan as monitor_plan
+import libraries.monitor_descriptions as monitor_descriptions
+import libraries.table as table
+import libraries.output as output
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
 
@@ -72,6 +76,9 @@ monitors.  The monitor command supports the following subcommands:
   monitor update (yaml|json) <customer id> <filename>
     Reads a monitor definition from a YAML or JSON description.
 
+  monitor update-many <directory | manifest>
+    Reads monitor definitions for many customers and updates them together.
+
 """
 """
 Help text for this extension.
@@ -189,6 +196,38 @@ the following fields:
 Note that only the "uri" field is required.  All other fields are optional and
 will take-on default values.
 
+Before sending the update, the description is compared against the customer's
+current monitors and the monitors that will be added, removed, or changed are
+reported by user ordering.  The update is not sent if nothing would change.
+You can use the --plan switch to only report the changes.
+
+"""
+"""
+Help text for this extension.
+
+"""
+
+MONITOR_UPDATE_MANY_HELP = """
+The monitor update-many command allows you to update monitors for many
+customers at once.
+
+  monitor update-many <directory | manifest>
+
+If you specify a directory, each file in the directory named
+"<customer id>.yaml", "<customer id>.yml", or "<customer id>.json" holds the
+description for that customer.  Otherwise the file you specify should be a
+YAML or JSON manifest holding a dictionary of description filenames keyed by
+customer ID.  Relative filenames are relative to the manifest.
+
+Descriptions use the same format as the monitor update command.  Files are
+parsed using one process per processor.  Each customer's update is planned
+and only sent if it would change something.  Up to 8 customers are updated at
+the same time.  You can use the --workers switch to change this limit and the
+--plan switch to only report the changes.
+
+A summary is reported for each customer followed by a single report of every
+error, by customer and user ordering.
+
 """
 """
 Help text for this extension.
@@ -211,7 +250,24 @@ def add_arguments(command_line_parser):
 
     """
 
-    pass
+    command_line_parser.add_argument(
+        "--plan",
+        help = "You can use this switch with the monitor update command to "
+               "report the changes an update would make without sending it.",
+        action = "store_true",
+        default = False,
+        dest = 'plan_only'
+    )
+
+    command_line_parser.add_argument(
+        "--workers",
+        help = "You can use this switch with the monitor update-many command "
+               "to specify the number of customers updated at the same time.  "
+               "The default is %d."%monitor_plan.DEFAULT_UPDATE_WORKERS,
+        type = int,
+        default = monitor_plan.DEFAULT_UPDATE_WORKERS,
+        dest = 'workers'
+    )
 
 
 def monitor_get(positional_arguments, arguments, rest_api, secret):
@@ -258,7 +314,15 @@ def monitor_get(positional_arguments, arguments, rest_api, secret):
             if mi is not None and mi > 0:
                 monitor = m.get(mi)
                 if monitor is not None:
-                    monitor_data.append(monitor.as_dictionary())
+                    try:
+                        monitor_dictionary = monitor.as_dictionary()
+                    except ValueError:
+                        monitor_dictionary = None
+                else:
+                    monitor_dictionary = None
+
+                if monitor_dictionary is not None:
+                    monitor_data.append(monitor_dictionary)
                 else:
                     monitor_data.append(mi)
             else:
@@ -421,16 +485,15 @@ def monitor_list(positional_arguments, arguments, rest_api, secret):
     number_arguments = len(positional_arguments)
     if number_arguments == 0:
         m = monitors.Monitors(rest_api, secret)
-        monitors_data = m.list()
-        if monitors_data is not None:
-            if isinstance(monitors_data, dict):
-                __dump(
-                    { monitor_id : m.as_dictionary()
-                      for monitor_id, m in monitors_data.items()
-                    }
+        table_iterator = m.iter_tables()
+        if table_iterator is not None:
+            try:
+                __dump(__table_dictionaries(table_iterator))
+            except ValueError as e:
+                sys.stderr.write(
+                    "*** Failed to retrieve monitors: %s\n"%str(e)
                 )
-            else:
-                __dump([ m.as_dictionary() for m in monitors_data ])
+                success = False
         else:
             sys.stderr.write("*** Failed to retrieve monitors.\n")
             success = False
@@ -449,7 +512,10 @@ def monitor_list(positional_arguments, arguments, rest_api, secret):
                 md = list()
                 for m in monitors_data:
                     if m is not None:
-                        md.append(m.as_dictionary())
+                        try:
+                            md.append(m.as_dictionary())
+                        except ValueError:
+                            md.append(None)
                     else:
                         md.append(None)
 
@@ -508,33 +574,27 @@ def monitor_update(positional_arguments, arguments, rest_api, secret):
                customer_id > 0           and \
                customer_id <= 0xFFFFFFFF     :
                 filename = positional_arguments[2]
-                with open(filename, 'r') as fh:
-                    update_data_text = fh.read()
-
-                if file_type == 'json':
-                    update_data = json.loads(update_data_text)
-                else:
-                    try:
-                        update_data = yaml.load(
-                            update_data_text,
-                            Loader = yaml.FullLoader
-                        )
-                    except Exception as e1:
-                        try:
-                            update_data = yaml.load(update_data_text)
-                        except Excetion as e2:
-                            sys.stderr.write(
-                                "Could not parse update file \"%s\":\n"%(
-                                    configuration_filename
-                                )
-                            )
-                            sys.stderr.write("Pass 1:\n%s\n"%str(e1))
-                            sys.stderr.write("Pass 2:\n%s\n"%str(e2))
-                            success = False
+                try:
+                    update_data = monitor_descriptions.load(
+                        filename,
+                        file_type
+                    )
+                except ValueError as e:
+                    sys.stderr.write("*** %s\n"%str(e))
+                    success = False
 
                 if success:
-                    m = monitors.Monitors(rest_api, secret)
-                    result = m.update(customer_id, update_data)
+                    update_plan, result = monitor_plan.update(
+                        rest_api,
+                        secret,
+                        customer_id,
+                        update_data,
+                        plan_only = arguments.plan_only
+                    )
+
+                    if update_plan is not None:
+                        __dump_plan(update_plan)
+
                     if result:
                         sys.stderr.write("*** Update failed:\n")
                         for user_ordering, message in result:
@@ -564,19 +624,330 @@ def monitor_update(positional_arguments, arguments, rest_api, secret):
     return success
 
 
+def monitor_update_many(positional_arguments, arguments, rest_api, secret):
+    """
+    Function that handles the monitor update-many command.
+
+    :param positional_arguments:
+        The command line positional arguments.
+
+    :param arguments:
+        The command line arguments parsed by argparse.
+
+    :param rest_api:
+        The outbound REST API to use to communicate with Inesonic
+        infrastructure.
+
+    :param secret:
+        The secret required to use the Inesonic REST API.
+
+    :return:
+        Returns True on success.  Returns False on error.
+
+    :type positional_arguments: list
+    :type arguments:            argparse.Namespace
+    :type rest_api:             outbound_rest_api_v1.Server
+    :type secret:               bytes
+    :rtype:                     bool
+
+    """
+
+    success = True
+    if len(positional_arguments) == 1:
+        try:
+            entries = monitor_descriptions.find(positional_arguments[0])
+        except ValueError as e:
+            sys.stderr.write("*** %s\n"%str(e))
+            success = False
+
+        if success:
+            descriptions = monitor_descriptions.load_many(
+                [ filename for customer_id, filename in entries ]
+            )
+
+            errors = dict()
+            updates = list()
+            for ( customer_id, filename ), ( update_data, error ) in zip(
+                    entries,
+                    descriptions
+                ):
+                if error is None:
+                    updates.append(( customer_id, update_data ))
+                else:
+                    errors[customer_id] = [ ( None, error ) ]
+
+            results = monitor_plan.update_many(
+                rest_api,
+                secret,
+                updates,
+                workers = arguments.workers,
+                plan_only = arguments.plan_only
+            )
+
+            plans = dict()
+            for ( customer_id, update_data ), ( update_plan, result ) in zip(
+                    updates,
+                    results
+                ):
+                plans[customer_id] = update_plan
+                if result:
+                    errors[customer_id] = result
+
+            __dump_update_summary(entries, plans, errors, arguments.plan_only)
+
+            if errors:
+                sys.stderr.write(
+                    "*** Update failed for %d customers:\n"%len(errors)
+                )
+                for customer_id in sorted(errors):
+                    for user_ordering, message in errors[customer_id]:
+                        if user_ordering is not None:
+                            sys.stderr.write(
+                                "    %10d %5d %s\n"%(
+                                    customer_id,
+                                    user_ordering,
+                                    message
+                                )
+                            )
+                        else:
+                            sys.stderr.write(
+                                "    %10d       %s\n"%(customer_id, message)
+                            )
+
+                success = False
+    else:
+        sys.stderr.write("*** Invalid number of parameters.\n")
+        success = False
+
+    return success
+
+
+def __dump_update_summary(entries, plans, errors, plan_only):
+    """
+    Function that dumps a summary of the updates made for many customers.
+
+    :param entries:
+        The customer IDs and filenames of the descriptions, in order.
+
+    :param plans:
+        The plans, keyed by customer ID.  Customers whose update could not be
+        planned are missing or hold None.
+
+    :param errors:
+        The errors reported, keyed by customer ID.
+
+    :param plan_only:
+        If True, then updates were planned but not sent.
+
+    :type entries:   list of tuples
+    :type plans:     dict
+    :type errors:    dict
+    :type plan_only: bool
+
+    """
+
+    rows = list()
+    number_updated = 0
+    number_unchanged = 0
+    for customer_id, filename in entries:
+        update_plan = plans.get(customer_id)
+        if customer_id in errors:
+            status = "failed"
+        elif update_plan.is_empty:
+            status = "unchanged"
+            number_unchanged += 1
+        elif plan_only:
+            status = "planned"
+            number_updated += 1
+        else:
+            status = "updated"
+            number_updated += 1
+
+        if update_plan is not None:
+            rows.append(
+                (
+                    customer_id,
+                    update_plan.number_added,
+                    update_plan.number_removed,
+                    update_plan.number_changed,
+                    update_plan.number_unchanged,
+                    status
+                )
+            )
+        else:
+            rows.append(( customer_id, 0, 0, 0, 0, status ))
+
+    summary_writer = output.writer(
+        (
+            table.Column("customer_id", "d", 11),
+            table.Column("added", "d", 7),
+            table.Column("removed", "d", 7),
+            table.Column("changed", "d", 7),
+            table.Column("unchanged", "d", 9),
+            table.Column("status", "s", 9, table.ALIGNMENT.LEFT)
+        )
+    )
+
+    summary_writer.write(rows)
+    summary_writer.close()
+
+    if output.output_format() == 'table':
+        sys.stdout.write(
+            "%d customers, %d %s, %d unchanged, %d failed.\n"%(
+                len(entries),
+                number_updated,
+                "planned" if plan_only else "updated",
+                number_unchanged,
+                len(errors)
+            )
+        )
+
+
+def __dump_plan(update_plan):
+    """
+    Function that dumps the changes planned by a monitor update.
+
+    :param update_plan:
+        The plan to be dumped.
+
+    :type update_plan: monitor_plan.MonitorPlan
+
+    """
+
+    plan_writer = output.writer(
+        (
+            table.Column("user_ordering", "d", 13),
+            table.Column("action", "s", 9, table.ALIGNMENT.LEFT),
+            table.Column("fields", "s", 48, table.ALIGNMENT.LEFT)
+        )
+    )
+
+    plan_writer.write(
+        (
+            change.user_ordering,
+            str(change.action).lower(),
+            ", ".join(change.fields)
+        )
+        for change in update_plan
+    )
+
+    plan_writer.close()
+
+    if output.output_format() == 'table':
+        sys.stdout.write(
+            "%d added, %d removed, %d changed, %d unchanged.\n"%(
+                update_plan.number_added,
+                update_plan.number_removed,
+                update_plan.number_changed,
+                update_plan.number_unchanged
+            )
+        )
+
+
+def __table_dictionaries(table_iterator):
+    """
+    Generator that converts monitor tables to monitor dictionaries, column by
+    column, without creating monitor instances.  Monitors whose keywords or
+    post content can not be decoded are skipped.
+
+    :param table_iterator:
+        An iterator over monitors.MonitorTable instances.
+
+    :return:
+        Yields tuples holding a monitor ID and monitor dictionary.
+
+    :type table_iterator: iterator
+
+    """
+
+    for monitor_table in table_iterator:
+        methods = [ str(v) for v in monitor_table.methods ]
+        content_check_modes = [
+            str(v) for v in monitor_table.content_check_modes
+        ]
+        content_types = [ str(v) for v in monitor_table.content_types ]
+
+        for row, monitor_id in enumerate(monitor_table.monitor_ids):
+            keywords = monitor_table.keywords(row)
+            post_content = monitor_table.post_content(row)
+            if keywords is not None and post_content is not None:
+                yield (
+                    monitor_id,
+                    {
+                        'user_ordering' : monitor_table.user_orderings[row],
+                        'path' : monitor_table.paths[row],
+                        'method' : methods[row],
+                        'content_check_mode' : content_check_modes[row],
+                        'keywords' : [
+                            k.decode('utf-8', errors = 'backslashreplace')
+                            for k in keywords
+                        ],
+                        'content_type' : content_types[row],
+                        'user_agent' : monitor_table.user_agents[row],
+                        'post_content' : post_content.decode(
+                            'utf-8',
+                            errors = 'backslashreplace'
+                        ),
+                        'monitor_id' : monitor_id,
+                        'customer_id' : monitor_table.customer_ids[row],
+                        'host_scheme_id' : monitor_table.host_scheme_ids[row]
+                    }
+                )
+
+
 def __dump(monitor_data):
     """
-    Function that dumps information about monitors.
+    Function that dumps information about monitors.  Monitors are dumped as
+    YAML unless a machine readable output format was selected.
 
     :param monitor_data:
-        A list of all the monitor instances to be dumped.
+        A list of monitor dictionaries to be dumped or an iterator over
+        tuples holding a monitor ID and monitor dictionary.  Iterators are
+        dumped as a mapping by monitor ID, one monitor at a time.
 
-    :type monitor_data: list of Monitor instances
+    :type monitor_data: list or iterator
 
     """
 
-    dump_data = yaml.dump(monitor_data, default_flow_style = False)
-    sys.stdout.write(dump_data)
+    if output.output_format() == 'table':
+        if isinstance(monitor_data, list):
+            dump_data = yaml.dump(monitor_data, default_flow_style = False)
+            sys.stdout.write(dump_data)
+        else:
+            for monitor_id, monitor_dictionary in monitor_data:
+                dump_data = yaml.dump(
+                    { monitor_id : monitor_dictionary },
+                    default_flow_style = False
+                )
+                sys.stdout.write(dump_data)
+    else:
+        if isinstance(monitor_data, list):
+            monitor_dictionaries = (
+                md for md in monitor_data if isinstance(md, dict)
+            )
+        else:
+            monitor_dictionaries = ( md for monitor_id, md in monitor_data )
+
+        columns = (
+            table.Column("monitor_id", "d"),
+            table.Column("customer_id", "d"),
+            table.Column("host_scheme_id", "d"),
+            table.Column("user_ordering", "d"),
+            table.Column("path", "s"),
+            table.Column("method", "s"),
+            table.Column("content_check_mode", "s"),
+            table.Column("keywords", "s"),
+            table.Column("content_type", "s"),
+            table.Column("user_agent", "s"),
+            table.Column("post_content", "s")
+        )
+
+        monitor_writer = output.writer(columns)
+        monitor_writer.write(
+            tuple(md.get(column.name) for column in columns)
+            for md in monitor_dictionaries
+        )
+        monitor_writer.close()
 
 ###############################################################################
 # Extension configuration:
@@ -606,6 +977,10 @@ COMMANDS = {
             'update' : {
                 'help' : MONITOR_UPDATE_HELP,
                 'execute' : monitor_update
+            },
+            'update-many' : {
+                'help' : MONITOR_UPDATE_MANY_HELP,
+                'execute' : monitor_update_many
             }
         }
     }
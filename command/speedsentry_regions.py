@@ -37,6 +37,8 @@ Class providing a API you can use to process regions information.
 import sys
 
 import libraries.regions as regions
+import libraries.table as table
+import libraries.output as output
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
 
@@ -387,13 +389,23 @@ def region_list(positional_arguments, arguments, rest_api, secret):
         r = regions.Regions(rest_api, secret)
         regions_data = r.get_all()
         if regions_data is not None:
-            for region_id, region_name in regions_data.items():
-                sys.stdout.write("%5d %s\n"%(region_id, region_name))
+            if output.output_format() == 'table':
+                for region_id, region_name in regions_data.items():
+                    sys.stdout.write("%5d %s\n"%(region_id, region_name))
+            else:
+                region_writer = output.writer(
+                    (
+                        table.Column("region id", "d", name = "region_id"),
+                        table.Column("name", "s", name = "region_name")
+                    )
+                )
+                region_writer.write(regions_data.items())
+                region_writer.close()
         else:
             sys.stderr.write(
                 "*** Failed to get regions data.\n"
             )
-        success = False
+            success = False
     else:
         sys.stderr.write(
             "*** Command region list does not accept arguments.\n"
@@ -398,19 +398,24 @@ def resources_list(positional_arguments, arguments, rest_api, secret):
 
         if success:
             r = resources.Resources(rest_api, secret)
-            result = r.list(
+            resource_iterator = r.iter_list(
                 customer_id = customer_id,
                 value_type = value_type,
                 start_timestamp = start_timestamp,
                 end_timestamp = end_timestamp
             )
 
-            if result is not None:
-                resource_data = result['resources']
-                for entry in resource_data:
-                    v = entry['value']
-                    ts = entry['timestamp']
-                    sys.stdout.write("%10d\t%f\n"%(ts, v))
+            if resource_iterator is not None:
+                try:
+                    for entry in resource_iterator:
+                        v = entry['value']
+                        ts = entry['timestamp']
+                        sys.stdout.write("%10d\t%f\n"%(ts, v))
+                except ValueError as e:
+                    sys.stderr.write(
+                        "*** Failed to get resource data: %s\n"%str(e)
+                    )
+                    success = False
             else:
                 sys.stderr.write("*** Failed to get resource data.\n")
                 success = False
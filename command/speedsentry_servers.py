@@ -35,9 +35,13 @@ Class providing a API you can use to process server information.
 #
 
 import sys
+import time
 
 import libraries.regions as regions
 import libraries.servers as servers
+import libraries.table as table
+import libraries.output as output
+import libraries.customer_mapping as customer_mapping
 import libraries.rest_api_common_v1 as rest_api_common_v1
 import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
 
@@ -45,6 +49,38 @@ import libraries.outbound_rest_api_v1 as outbound_rest_api_v1
 # Globals:
 #
 
+DEFAULT_DRAIN_BATCH_SIZE = 25
+"""
+The default maximum number of customers to move in a single drain batch.
+
+"""
+
+DEFAULT_DRAIN_PERIOD = 5000
+"""
+The default period between drain batches, in milliseconds.
+
+"""
+
+DEFAULT_DRAIN_CPU_LOADING = 0.75
+"""
+The default maximum destination server CPU loading during a drain.
+
+"""
+
+DEFAULT_DRAIN_RATE_INCREASE = 0.10
+"""
+The default maximum fractional increase in destination server monitor service
+rate allowed in a single drain batch.
+
+"""
+
+MAXIMUM_DRAIN_STALLS = 60
+"""
+The number of consecutive batch periods we will wait for loaded destination
+servers to recover before giving up on a drain.
+
+"""
+
 SERVER_BRIEF = "Allows you to manage backend polling servers."
 """
 Brief description for the server command.
@@ -98,6 +134,10 @@ functions.  The server command supports the following subcommands:
     Redistributes work across servers in a given region to balance workloads.
     You can use this command after adding new servers to reduce the total
     workload on each server.
+
+  server drain <from server id> [ <field> <value> [ <field> <value> ... ]]
+    Moves customers off a server in small batches, adjusting the batch size
+    based on the loading reported by the destination servers.
 """
 
 SERVER_GET_HELP = """
@@ -267,6 +307,49 @@ The <region id> is the region to distribute work across.
 
 """
 
+SERVER_DRAIN_HELP = """
+The server drain command moves customers off of a server in controlled batches.
+Unlike the server reassign command, which moves all the work in a single step,
+this command moves a limited number of customers at a time and reports progress
+as it goes.  The size of each batch adapts to the CPU loading and monitor
+service rate reported by the destination servers so that destination servers
+are not swamped.
+
+The server being drained should be deactivated before triggering this function
+so that new work is not assigned to the server while it's being drained.
+
+  server drain <from server id> [ <field> <value> [ <field> <value> ... ]]
+
+The <from server id> field is the ID of the server work is being taken from.
+You can optionally tune the drain by specifying field/value pairs.  At this
+time the following fields are supported:
+
+  to -     The ID of a destination server.  You can specify this field multiple
+           times to list several destination servers.  If not specified, then
+           all active servers in the same region as the drained server are
+           used.
+
+  batch -  The maximum number of customers to move in a single batch.  The
+           default is %d.
+
+  period - The delay between batches, in milliseconds.  The default is %d.
+
+  cpu -    The highest destination server CPU loading, between 0 and 1, that
+           is considered acceptable.  Destination servers at or above this
+           loading will not receive customers and batches shrink as
+           destination servers approach this loading.  The default is %.2f.
+
+  rate -   The largest fractional increase in the destination servers'
+           combined monitor service rate allowed in a single batch.  The
+           default is %.2f.
+
+"""%(
+    DEFAULT_DRAIN_BATCH_SIZE,
+    DEFAULT_DRAIN_PERIOD,
+    DEFAULT_DRAIN_CPU_LOADING,
+    DEFAULT_DRAIN_RATE_INCREASE
+)
+
 ###############################################################################
 # Functions:
 #
@@ -672,13 +755,19 @@ def server_list(positional_arguments, arguments, rest_api, secret):
 
         if success:
             s = servers.Servers(rest_api, secret)
-            servers_data = s.list(
+            server_iterator = s.iter_list(
                 region_id = region_id,
                 status = status
             )
 
-            if servers_data is not None:
-                __dump(servers_data, rest_api, secret)
+            if server_iterator is not None:
+                try:
+                    __dump(server_iterator, rest_api, secret)
+                except ValueError as e:
+                    sys.stderr.write(
+                        "*** Failed to retrieve server list: %s\n"%str(e)
+                    )
+                    success = False
             else:
                 sys.stderr.write("*** Failed to retrieve server list.\n")
                 success = False
@@ -959,6 +1048,441 @@ def server_redistribute(positional_arguments, arguments, rest_api, secret):
     return success
 
 
+def server_drain(positional_arguments, arguments, rest_api, secret):
+    """
+    Function that moves customers off of a server in throttled batches.
+
+    :param positional_arguments:
+        The command line positional arguments.
+
+    :param arguments:
+        The command line arguments parsed by argparse.
+
+    :param rest_api:
+        The outbound REST API to use to communicate with Inesonic
+        infrastructure.
+
+    :param secret:
+        The secret required to use the Inesonic REST API.
+
+    :return:
+        Returns True on success.  Returns False on error.
+
+    :type positional_arguments: list
+    :type arguments:            argparse.Namespace
+    :type rest_api:             outbound_rest_api_v1.Server
+    :type secret:               bytes
+    :rtype:                     bool
+
+    """
+
+    success = True
+    number_arguments = len(positional_arguments)
+    if number_arguments >= 1 and (number_arguments % 2) == 1:
+        try:
+            from_server_id = int(positional_arguments[0])
+        except:
+            from_server_id = None
+
+        if from_server_id is None  or \
+           from_server_id <= 0     or \
+           from_server_id > 0xFFFF    :
+            sys.stderr.write("*** Invalid from server id value.\n")
+            success = False
+
+        to_server_ids = list()
+        maximum_batch_size = None
+        update_period = None
+        maximum_cpu_loading = None
+        maximum_rate_increase = None
+
+        argument_index = 1
+        while success and argument_index < number_arguments:
+            field = positional_arguments[argument_index].lower()
+            value = positional_arguments[argument_index + 1]
+
+            if field == 'to':
+                try:
+                    to_server_id = int(value)
+                except:
+                    to_server_id = None
+
+                if to_server_id is not None    and \
+                   to_server_id > 0            and \
+                   to_server_id <= 0xFFFF      and \
+                   to_server_id != from_server_id  :
+                    to_server_ids.append(to_server_id)
+                else:
+                    sys.stderr.write("*** Invalid to server id value.\n")
+                    success = False
+            elif field == 'batch':
+                if maximum_batch_size is None:
+                    try:
+                        maximum_batch_size = int(value)
+                    except:
+                        maximum_batch_size = 0
+
+                    if maximum_batch_size <= 0:
+                        sys.stderr.write("*** Invalid batch size.\n")
+                        success = False
+                else:
+                    sys.stderr.write("*** Duplicate batch field.\n")
+                    success = False
+            elif field == 'period':
+                if update_period is None:
+                    try:
+                        update_period = int(value)
+                    except:
+                        update_period = -1
+
+                    if update_period < 0:
+                        sys.stderr.write("*** Invalid period.\n")
+                        success = False
+                else:
+                    sys.stderr.write("*** Duplicate period field.\n")
+                    success = False
+            elif field == 'cpu':
+                if maximum_cpu_loading is None:
+                    try:
+                        maximum_cpu_loading = float(value)
+                    except:
+                        maximum_cpu_loading = 0
+
+                    if maximum_cpu_loading <= 0 or maximum_cpu_loading > 1:
+                        sys.stderr.write("*** Invalid CPU loading.\n")
+                        success = False
+                else:
+                    sys.stderr.write("*** Duplicate cpu field.\n")
+                    success = False
+            elif field == 'rate':
+                if maximum_rate_increase is None:
+                    try:
+                        maximum_rate_increase = float(value)
+                    except:
+                        maximum_rate_increase = 0
+
+                    if maximum_rate_increase <= 0:
+                        sys.stderr.write("*** Invalid rate increase.\n")
+                        success = False
+                else:
+                    sys.stderr.write("*** Duplicate rate field.\n")
+                    success = False
+            else:
+                sys.stderr.write("*** Unknown field \"%s\".\n"%field)
+                success = False
+
+            argument_index += 2
+
+        if maximum_batch_size is None:
+            maximum_batch_size = DEFAULT_DRAIN_BATCH_SIZE
+
+        if update_period is None:
+            update_period = DEFAULT_DRAIN_PERIOD
+
+        if maximum_cpu_loading is None:
+            maximum_cpu_loading = DEFAULT_DRAIN_CPU_LOADING
+
+        if maximum_rate_increase is None:
+            maximum_rate_increase = DEFAULT_DRAIN_RATE_INCREASE
+
+        if success:
+            s = servers.Servers(rest_api, secret)
+            from_server = s.get(from_server_id)
+            if from_server is None:
+                sys.stderr.write("*** Unknown server ID.\n")
+                success = False
+
+        if success:
+            cm = customer_mapping.CustomerMapping(rest_api, secret)
+            mappings = cm.list(from_server_id)
+            if mappings is None:
+                sys.stderr.write("*** Failed to retrieve customer mappings.\n")
+                success = False
+
+        if success:
+            destinations = __drain_destinations(s, from_server, to_server_ids)
+            if not destinations:
+                sys.stderr.write("*** No active destination servers.\n")
+                success = False
+
+        if success:
+            customer_ids = sorted(mappings.keys())
+            number_customers = len(customer_ids)
+
+            if number_customers > 0:
+                customer_rate = (
+                    from_server.monitors_per_second / number_customers
+                )
+            else:
+                customer_rate = 0
+
+            sys.stdout.write(
+                "Draining %d customers from server %d - %s:\n"%(
+                    number_customers,
+                    from_server.server_id,
+                    from_server.identifier
+                )
+            )
+
+            failed_customer_ids = list()
+            customer_index = 0
+            number_stalls = 0
+            while success and customer_index < number_customers:
+                rest_api.invalidate_cache('server/')
+                destinations = __drain_destinations(
+                    s,
+                    from_server,
+                    to_server_ids,
+                    maximum_cpu_loading
+                )
+
+                if destinations is None:
+                    sys.stderr.write(
+                        "*** Failed to retrieve destination servers.\n"
+                    )
+                    success = False
+                    batch_size = 0
+                else:
+                    batch_size = __drain_batch_size(
+                        destinations,
+                        customer_rate,
+                        maximum_batch_size,
+                        maximum_cpu_loading,
+                        maximum_rate_increase
+                    )
+
+                if success and batch_size == 0:
+                    number_stalls += 1
+                    if number_stalls > MAXIMUM_DRAIN_STALLS:
+                        sys.stderr.write(
+                            "*** Destination servers did not recover, "
+                            "%d customers not moved.\n"%(
+                                number_customers - customer_index
+                            )
+                        )
+                        success = False
+                    else:
+                        sys.stdout.write(
+                            "    Destination servers busy, waiting.\n"
+                        )
+                        time.sleep(update_period / 1000.0)
+                elif success:
+                    number_stalls = 0
+                    estimated_rates = {
+                        d.server_id : d.monitors_per_second
+                        for d in destinations
+                    }
+
+                    batch_customer_ids = customer_ids[
+                        customer_index : customer_index + batch_size
+                    ]
+
+                    for customer_id in batch_customer_ids:
+                        mapping = mappings[customer_id]
+                        candidates = [
+                            server_id for server_id in estimated_rates.keys()
+                            if server_id not in mapping
+                        ]
+
+                        if candidates:
+                            to_server_id = min(
+                                candidates,
+                                key = lambda x: estimated_rates[x]
+                            )
+
+                            if mapping.primary_server_id == from_server_id:
+                                primary_server_id = to_server_id
+                            else:
+                                primary_server_id = mapping.primary_server_id
+
+                            new_servers = set(mapping)
+                            new_servers.discard(from_server_id)
+                            new_servers.add(to_server_id)
+
+                            moved = (
+                                    cm.update(
+                                        customer_id,
+                                        primary_server_id,
+                                        new_servers
+                                    )
+                                and cm.activate(customer_id)
+                            )
+                        else:
+                            moved = False
+
+                        if moved:
+                            estimated_rates[to_server_id] += customer_rate
+                            sys.stdout.write(
+                                "    %d - Moved to server %d\n"%(
+                                    customer_id,
+                                    to_server_id
+                                )
+                            )
+                        else:
+                            failed_customer_ids.append(customer_id)
+                            sys.stderr.write(
+                                "*** Failed to move customer %d\n"%customer_id
+                            )
+
+                    customer_index += len(batch_customer_ids)
+                    sys.stdout.write(
+                        "    Batch of %d complete, %d of %d customers "
+                        "processed.\n"%(
+                            len(batch_customer_ids),
+                            customer_index,
+                            number_customers
+                        )
+                    )
+
+                    if customer_index < number_customers:
+                        time.sleep(update_period / 1000.0)
+
+            if failed_customer_ids:
+                sys.stderr.write(
+                    "*** Failed to move %d customers: %s\n"%(
+                        len(failed_customer_ids),
+                        ' '.join([ str(x) for x in failed_customer_ids ])
+                    )
+                )
+                success = False
+    else:
+        sys.stderr.write("*** Invalid number of parameters.\n")
+        success = False
+
+    return success
+
+
+def __drain_destinations(
+    s,
+    from_server,
+    to_server_ids,
+    maximum_cpu_loading = None
+    ):
+    """
+    Function that obtains fresh loading data for the destination servers
+    during a drain.
+
+    :param s:
+        The Servers instance used to query the servers.
+
+    :param from_server:
+        The server being drained.
+
+    :param to_server_ids:
+        A list of explicitly requested destination server IDs.  An empty list
+        indicates all active servers in the same region as the server being
+        drained.
+
+    :param maximum_cpu_loading:
+        The highest acceptable CPU loading.  Servers at or above this loading
+        are excluded.  A value of None disables the check.
+
+    :return:
+        Returns a list of active Server instances that can accept work.  None
+        is returned on error.
+
+    :type s:                   servers.Servers
+    :type from_server:         servers.Server
+    :type to_server_ids:       list
+    :type maximum_cpu_loading: float or None
+    :rtype:                    list or None
+
+    """
+
+    if to_server_ids:
+        candidates = list()
+        for to_server_id in to_server_ids:
+            server = s.get(to_server_id)
+            if server is not None:
+                candidates.append(server)
+    else:
+        candidates = s.list(
+            region_id = from_server.region_id,
+            status = servers.STATUS.ACTIVE
+        )
+
+    if candidates:
+        result = [
+            server for server in candidates
+            if server.server_id != from_server.server_id   and
+               server.status == servers.STATUS.ACTIVE       and
+               (   maximum_cpu_loading is None
+                or server.cpu_loading < maximum_cpu_loading)
+        ]
+    elif candidates is None or candidates is False:
+        result = None
+    else:
+        result = list()
+
+    return result
+
+
+def __drain_batch_size(
+    destinations,
+    customer_rate,
+    maximum_batch_size,
+    maximum_cpu_loading,
+    maximum_rate_increase
+    ):
+    """
+    Function that determines the size of the next drain batch from the loading
+    reported by the destination servers.
+
+    :param destinations:
+        The destination servers that can currently accept work.
+
+    :param customer_rate:
+        The estimated monitor service rate added by a single customer.
+
+    :param maximum_batch_size:
+        The largest allowed batch.
+
+    :param maximum_cpu_loading:
+        The highest acceptable destination CPU loading.
+
+    :param maximum_rate_increase:
+        The largest allowed fractional increase in the combined destination
+        monitor service rate.
+
+    :return:
+        Returns the number of customers to move in the next batch.  A value of
+        zero indicates that we should wait for the destinations to recover.
+
+    :type destinations:          list
+    :type customer_rate:         float
+    :type maximum_batch_size:    int
+    :type maximum_cpu_loading:   float
+    :type maximum_rate_increase: float
+    :rtype:                      int
+
+    """
+
+    if destinations:
+        average_cpu_loading = (
+              sum([ d.cpu_loading for d in destinations ])
+            / len(destinations)
+        )
+
+        headroom = (
+              (maximum_cpu_loading - average_cpu_loading)
+            / maximum_cpu_loading
+        )
+
+        result = max(1, int(maximum_batch_size * headroom))
+
+        total_rate = sum([ d.monitors_per_second for d in destinations ])
+        if customer_rate > 0 and total_rate > 0:
+            rate_limited_size = int(
+                maximum_rate_increase * total_rate / customer_rate
+            )
+
+            result = max(1, min(result, rate_limited_size))
+    else:
+        result = 0
+
+    return result
+
+
 def __get_regions(rest_api, secret):
     """
     Function that gets all the server regions.
@@ -1026,101 +1550,65 @@ def __dump(servers_data, rest_api, secret):
         secret
     )
 
-    maximum_identifier_length = len("identifier")
-    valid_servers_data = list()
-    invalid_servers_data = list()
-
-    for server_data in servers_data:
-        if not isinstance(server_data, int) and \
-           not isinstance(server_data, str)     :
-            valid_servers_data.append(server_data)
-            identifier_length = len(server_data.identifier)
-            maximum_identifier_length = max(
-                maximum_identifier_length,
-                identifier_length
-            )
-
-    for server_data in invalid_servers_data:
-        sys.stdout.write(
-            "*** Unknown server %s\n"%str(server_data)
-        )
-
-    if valid_servers_data:
-        maximum_region_name_length = max(
-            maximum_region_name_length,
-            len("region name")
-        )
-
-        fmt_string = "| %%10d | %%-%ds | %%10d | %%-%ds | %%-11s | %%19f " \
-                     "| %%11f | %%14f |\n"%(
-            maximum_identifier_length,
-            maximum_region_name_length
-        )
-
-        fmt_head_string = "| %%10s | %%-%ds | %%10s | %%-%ds | %%-11s " \
-                          "| %%19s | %%11s | %%14s |\n"%(
-            maximum_identifier_length,
-            maximum_region_name_length
-        )
-
-        divider_string = (
-              "+-"
-            + "-" * 10 + "-+-"
-            + "-" * maximum_identifier_length + "-+-"
-            + "-" * 10 + "-+-"
-            + "-" * maximum_region_name_length + "-+-"
-            + "-" * 11 + "-+-"
-            + "-" * 19 + "-+-"
-            + "-" * 11 + "-+-"
-            + "-" * 14 + "-+\n"
-        )
-
-        sys.stdout.write(divider_string)
-        sys.stdout.write(
-            fmt_head_string%(
+    server_writer = output.writer(
+        (
+            table.Column(
                 "server id",
-                "identifier",
+                "d",
+                10,
+                title_alignment = table.ALIGNMENT.RIGHT
+            ),
+            table.Column("identifier", "s"),
+            table.Column(
                 "region id",
+                "d",
+                10,
+                title_alignment = table.ALIGNMENT.RIGHT
+            ),
+            table.Column(
                 "region name",
-                "status",
+                "s",
+                max(maximum_region_name_length, len("region name"))
+            ),
+            table.Column("status", "s", 11),
+            table.Column(
                 "monitors per second",
+                "f",
+                19,
+                title_alignment = table.ALIGNMENT.RIGHT
+            ),
+            table.Column(
                 "cpu loading",
-                "memory_loading"
+                "f",
+                11,
+                title_alignment = table.ALIGNMENT.RIGHT
+            ),
+            table.Column(
+                "memory_loading",
+                "f",
+                14,
+                title_alignment = table.ALIGNMENT.RIGHT
             )
-        )
+        ),
+        show_empty = False
+    )
 
-        sys.stdout.write(
-              "+="
-            + "=" * 10 + "=+="
-            + "=" * maximum_identifier_length + "=+="
-            + "=" * 10 + "=+="
-            + "=" * maximum_region_name_length + "=+="
-            + "=" * 11 + "=+="
-            + "=" * 19 + "=+="
-            + "=" * 11 + "=+="
-            + "=" * 14 + "=+\n"
+    server_writer.write(
+        (
+            server_data.server_id,
+            server_data.identifier,
+            server_data.region_id,
+            all_regions.get(server_data.region_id, '???'),
+            str(server_data.status).lower(),
+            server_data.monitors_per_second,
+            server_data.cpu_loading,
+            server_data.memory_loading
         )
-
-        for server_data in valid_servers_data:
-            region_id = server_data.region_id
-            try:
-                region_name = all_regions[region_id]
-            except:
-                region_name = '???'
-
-            sys.stdout.write(
-                fmt_string%(
-                    server_data.server_id,
-                    server_data.identifier,
-                    region_id,
-                    region_name,
-                    str(server_data.status).lower(),
-                    server_data.monitors_per_second,
-                    server_data.cpu_loading,
-                    server_data.memory_loading
-                )
-            )
-            sys.stdout.write(divider_string)
+        for server_data in servers_data
+        if not isinstance(server_data, int) and
+           not isinstance(server_data, str)
+    )
+    server_writer.close()
 
 ###############################################################################
 # Extension configuration:
@@ -1170,6 +1658,10 @@ COMMANDS = {
             'redistribute' : {
                 'help' : SERVER_REDISTRIBUTE_HELP,
                 'execute' : server_redistribute,
+            },
+            'drain' : {
+                'help' : SERVER_DRAIN_HELP,
+                'execute' : server_drain,
             }
         }
     }